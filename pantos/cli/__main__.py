@@ -2,9 +2,13 @@
 
 """
 import argparse
+import concurrent.futures
+import datetime
 import decimal
+import functools
 import getpass
 import importlib.resources
+import logging
 import pathlib
 import shutil
 import sys
@@ -12,12 +16,79 @@ import typing
 import uuid
 
 from pantos.client.library import api
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
 from pantos.common.servicenodes import ServiceNodeTransferStatus
 
 from pantos.cli.application import initialize_application
+from pantos.cli.balances import BalanceChange
+from pantos.cli.balances import TokenBalances
+from pantos.cli.balances import check_transfer_balance
+from pantos.cli.balances import follow_token_balance
+from pantos.cli.balances import get_account_addresses
+from pantos.cli.balances import read_token_balances
+from pantos.cli.bids import stream_service_node_bids
+from pantos.cli.blockchains import get_account_address
+from pantos.cli.cache import load_transfer_status
+from pantos.cli.cache import store_transfer_status
+from pantos.cli.completion import SHELLS
+from pantos.cli.completion import create_completion_script
+from pantos.cli.completion import update_completion_data
 from pantos.cli.configuration import config
 from pantos.cli.configuration import get_blockchain_config
 from pantos.cli.exceptions import ClientCliError
+from pantos.cli.exceptions import InsufficientBalanceError
+from pantos.cli.history import IndexedTransfer
+from pantos.cli.history import find_indexed_transfers
+from pantos.cli.history import get_transfer_index_checkpoint
+from pantos.cli.history import update_transfer_index
+from pantos.cli.jobs import Job
+from pantos.cli.jobs import JobState
+from pantos.cli.jobs import add_jobs
+from pantos.cli.jobs import count_jobs
+from pantos.cli.jobs import read_jobs
+from pantos.cli.jobs import run_worker
+from pantos.cli.loadtest import LoadTestPhaseResult
+from pantos.cli.loadtest import run_load_test
+from pantos.cli.nodes import CircuitState
+from pantos.cli.nodes import ServiceNodeHealth
+from pantos.cli.nodes import get_service_node_addresses
+from pantos.cli.nodes import load_service_node_health
+from pantos.cli.nodes import probe_service_nodes
+from pantos.cli.nodes import reset_service_node_health
+from pantos.cli.statuses import get_token_transfer_status
+from pantos.cli.sweeps import SweepAccount
+from pantos.cli.sweeps import get_sweep_amount
+from pantos.cli.sweeps import read_sweep_accounts
+from pantos.cli.sweeps import sweep_tokens
+from pantos.cli.tokens import TokenMetadata
+from pantos.cli.tokens import convert_amount_to_main_unit
+from pantos.cli.tokens import convert_amount_to_subunit
+from pantos.cli.tokens import get_token_address
+from pantos.cli.tokens import get_token_symbols
+from pantos.cli.tokens import refresh_token_metadata
+from pantos.cli.transfers import SignedTransfer
+from pantos.cli.transfers import TransferInput
+from pantos.cli.transfers import is_service_node_bid_expired
+from pantos.cli.transfers import read_signed_transfers
+from pantos.cli.transfers import read_transfer_inputs
+from pantos.cli.transfers import select_service_node_bid
+from pantos.cli.transfers import sign_transfers
+from pantos.cli.transfers import submit_signed_transfers
+from pantos.cli.transfers import write_signed_transfers
+
+_CIRCUIT_STATE_NAMES: typing.Final[typing.Dict[CircuitState, str]] = {
+    CircuitState.CLOSED: 'available',
+    CircuitState.OPEN: 'unavailable',
+    CircuitState.HALF_OPEN: 'retrying'
+}
+"""Names of the service node circuit states shown to the user."""
+
+_BID_CHANGED_MESSAGE: typing.Final[str] = (
+    'The service node bid has expired and has been renewed with a '
+    'different service node or fee\n')
+"""Message shown before a renewed service node bid is confirmed."""
+
+_logger = logging.getLogger(__name__)
 
 
 def main() -> None:
@@ -31,8 +102,26 @@ def main() -> None:
             _execute_command_bids(arguments)
         elif arguments.command == 'transfer':
             _execute_command_transfer(arguments)
+        elif arguments.command == 'sign':
+            _execute_command_sign(arguments)
+        elif arguments.command == 'submit':
+            _execute_command_submit(arguments)
+        elif arguments.command == 'queue':
+            _execute_command_queue(arguments)
+        elif arguments.command == 'sweep':
+            _execute_command_sweep(arguments)
         elif arguments.command == 'status':
             _execute_command_status(arguments)
+        elif arguments.command == 'history':
+            _execute_command_history(arguments)
+        elif arguments.command == 'nodes':
+            _execute_command_nodes(arguments)
+        elif arguments.command == 'loadtest':
+            _execute_command_loadtest(arguments)
+        elif arguments.command == 'tokens':
+            _execute_command_tokens(arguments)
+        elif arguments.command == 'completion':
+            _execute_command_completion(arguments)
         elif arguments.command == 'create-config':
             _execute_command_create_config(arguments)
         else:
@@ -45,10 +134,9 @@ def main() -> None:
 
 
 def _create_argument_parser() -> argparse.ArgumentParser:
-    active_blockchain_names = sorted([
-        blockchain.name.lower() for blockchain in api.Blockchain
-        if get_blockchain_config(blockchain)['active']
-    ])
+    active_blockchain_names = [
+        blockchain.name.lower() for blockchain in _get_active_blockchains()
+    ]
     # Show help if no argument is given
     if len(sys.argv) == 1:
         sys.argv.append('--help')
@@ -67,10 +155,24 @@ def _create_argument_parser() -> argparse.ArgumentParser:
     parser_balance.add_argument(
         'token', type=api.TokenSymbol,
         help='symbol of the Pantos-supported token to show the balance for')
-    parser_balance.add_argument(
+    group_balance_account = parser_balance.add_mutually_exclusive_group()
+    group_balance_account.add_argument(
         '-k', '--keystore', type=pathlib.Path,
         help='path to a keystore file with your encrypted private key '
         '(default keystore is used if not provided)')
+    group_balance_account.add_argument(
+        '-a', '--address', action='append', metavar='ADDRESS',
+        help='address of an account to show the balance for instead of '
+        'your own account (no keystore is required; can be repeated)')
+    group_balance_account.add_argument(
+        '-A', '--address-file', type=pathlib.Path, metavar='FILE',
+        help='file with the addresses of accounts to show the balances for, '
+        'one per line (no keystore is required)')
+    parser_balance.add_argument(
+        '-f', '--follow', action='store_true',
+        help='keep running and print a line on each change of the balance '
+        '(only blocks with the configured number of confirmations are '
+        'taken into account)')
     # Argument parser for service node bids
     parser_bids = subparsers.add_parser(
         'bids', help='list the available service node bids')
@@ -107,12 +209,160 @@ def _create_argument_parser() -> argparse.ArgumentParser:
         '(default keystore is used if not provided)')
     parser_transfer.add_argument(
         '-s', '--service', nargs=2, type=_string_int_pair,
-        help='address and bid ID of the service node on the source blockchain '
-        '(least expensive service node bid is used if not provided)',
+        help='address of the service node on the source blockchain and the '
+        'index of its bid in the order listed by the bids command, starting '
+        'at 0 (least expensive service node bid is used if not provided)',
         metavar=('node', 'bid'))
     parser_transfer.add_argument(
         '-y', '--yes', action='store_true',
         help='transfer the tokens immediately without prior confirmation')
+    parser_transfer.add_argument(
+        '--bid-deadline', type=_positive_float, metavar='seconds',
+        help='use the least expensive service node bid received within the '
+        'given number of seconds instead of waiting for all service nodes '
+        '(ignored if a service node is given)')
+    parser_transfer.add_argument(
+        '--sign-only', type=pathlib.Path, metavar='file',
+        help='only sign the transfer and append it to the given file '
+        '(to be submitted later with the submit command)')
+    # Argument parser for signing transfers in bulk
+    parser_sign = subparsers.add_parser(
+        'sign', help='sign many transfers without submitting them')
+    parser_sign.add_argument(
+        'source', choices=active_blockchain_names,
+        help='source blockchain (where you hold the tokens to be transferred)')
+    parser_sign.add_argument(
+        'transfers', type=pathlib.Path,
+        help='CSV file with the columns destination, recipient, token, and '
+        'amount (and a header row)')
+    parser_sign.add_argument(
+        'output', type=pathlib.Path,
+        help='file to append the signed transfers to (to be submitted later '
+        'with the submit command)')
+    parser_sign.add_argument(
+        '-k', '--keystore', type=pathlib.Path,
+        help='path to a keystore file with your encrypted private key '
+        '(default keystore is used if not provided)')
+    parser_sign.add_argument(
+        '-s', '--service', nargs=2, type=_string_int_pair,
+        help='address of the service node on the source blockchain and the '
+        'index of its bid in the order listed by the bids command, starting '
+        'at 0 (least expensive service node bid is used if not provided)',
+        metavar=('node', 'bid'))
+    parser_sign.add_argument(
+        '-w', '--workers', type=_positive_int, default=16,
+        help='maximum number of transfers signed concurrently (default: 16)')
+    # Argument parser for submitting signed transfers
+    parser_submit = subparsers.add_parser(
+        'submit', help='submit signed transfers to the service nodes')
+    parser_submit.add_argument('file', type=pathlib.Path,
+                               help='file with the signed transfers')
+    parser_submit.add_argument(
+        '-w', '--workers', type=_positive_int, default=16,
+        help='maximum number of transfers submitted concurrently '
+        '(default: 16)')
+    parser_submit.add_argument(
+        '-y', '--yes', action='store_true',
+        help='submit the transfers immediately without prior confirmation')
+    # Argument parser for the distributed job queue
+    parser_queue = subparsers.add_parser(
+        'queue', help='distribute many transfers across workers through a '
+        'shared job queue')
+    queue_subparsers = parser_queue.add_subparsers(dest='queue_command',
+                                                   required=True)
+    parser_queue_add = queue_subparsers.add_parser(
+        'add', help='add the transfers of a sender to a job queue (which is '
+        'created if it does not exist yet)')
+    parser_queue_add.add_argument('queue', type=pathlib.Path,
+                                  help='path of the job queue database')
+    parser_queue_add.add_argument(
+        'source', choices=active_blockchain_names,
+        help='source blockchain (where you hold the tokens to be transferred)')
+    parser_queue_add.add_argument(
+        'keystore', type=pathlib.Path,
+        help='path to the keystore file with the encrypted private key of '
+        'the sender (must be accessible to all workers under the same path)')
+    parser_queue_add.add_argument(
+        'transfers', type=pathlib.Path,
+        help='CSV file with the columns destination, recipient, token, and '
+        'amount (and a header row)')
+    parser_queue_work = queue_subparsers.add_parser(
+        'work', help='process the jobs of a source blockchain until none are '
+        'left (each sender keystore is used by one worker at a time)')
+    parser_queue_work.add_argument('queue', type=pathlib.Path,
+                                   help='path of the job queue database')
+    parser_queue_work.add_argument(
+        'source', choices=active_blockchain_names,
+        help='source blockchain of the jobs to be processed')
+    parser_queue_work.add_argument(
+        '-w', '--workers', type=_positive_int, default=16,
+        help='maximum number of transfers signed or submitted concurrently '
+        '(default: 16)')
+    parser_queue_work.add_argument(
+        '--lease', type=_positive_float, default=60.0, metavar='SECONDS',
+        help='number of seconds after which the keystore of a worker that '
+        'has stopped can be taken over by another worker (default: 60)')
+    parser_queue_work.add_argument(
+        '--batch', type=_positive_int, default=100,
+        help='number of jobs of a keystore processed at once (default: 100)')
+    parser_queue_work.add_argument(
+        '--bid-deadline', type=_positive_float, metavar='SECONDS',
+        help='use the least expensive service node bid received within the '
+        'given number of seconds instead of waiting for all service nodes')
+    parser_queue_work.add_argument(
+        '--max-attempts', type=_positive_int, default=3,
+        help='maximum number of attempts to sign and submit the transfer of '
+        'a job before it fails (default: 3)')
+    parser_queue_work.add_argument(
+        '--retry-delay', type=_non_negative_float, default=30.0,
+        metavar='SECONDS',
+        help='number of seconds after which a job whose transfer could not '
+        'be signed or submitted is retried (default: 30)')
+    parser_queue_status = queue_subparsers.add_parser(
+        'status', help='show the number of jobs per state and the failed '
+        'jobs')
+    parser_queue_status.add_argument('queue', type=pathlib.Path,
+                                     help='path of the job queue database')
+    # Argument parser for sweeping many accounts
+    parser_sweep = subparsers.add_parser(
+        'sweep', help='transfer the whole token balances of many accounts to '
+        'a single recipient')
+    parser_sweep.add_argument(
+        'source', choices=active_blockchain_names,
+        help='source blockchain (where the accounts hold the tokens to be '
+        'swept)')
+    parser_sweep.add_argument(
+        'destination', choices=active_blockchain_names,
+        help='destination blockchain (where the recipient\'s account is '
+        'located)')
+    parser_sweep.add_argument(
+        'recipient', type=api.BlockchainAddress,
+        help='address of the recipient on the destination blockchain')
+    parser_sweep.add_argument(
+        'token', type=api.TokenSymbol,
+        help='symbol of the Pantos-supported token to be swept')
+    parser_sweep.add_argument(
+        'keystores', nargs='+', type=pathlib.Path,
+        help='paths to keystore files with the encrypted private keys of the '
+        'accounts to be swept (all with the same password)',
+        metavar='keystore')
+    parser_sweep.add_argument(
+        '-m', '--min-amount', type=decimal.Decimal, default=decimal.Decimal(0),
+        help='minimum amount of tokens to be swept from an account; accounts '
+        'with less tokens are skipped (default: 0)')
+    parser_sweep.add_argument(
+        '-s', '--service', nargs=2, type=_string_int_pair,
+        help='address of the service node on the source blockchain and the '
+        'index of its bid in the order listed by the bids command, starting '
+        'at 0 (least expensive service node bid is used if not provided)',
+        metavar=('node', 'bid'))
+    parser_sweep.add_argument(
+        '-w', '--workers', type=_positive_int, default=16,
+        help='maximum number of accounts processed concurrently '
+        '(default: 16)')
+    parser_sweep.add_argument(
+        '-y', '--yes', action='store_true',
+        help='sweep the accounts immediately without prior confirmation')
     # Argument parser for status
     parser_status = subparsers.add_parser('status',
                                           help='show the status of a transfer')
@@ -129,6 +379,95 @@ def _create_argument_parser() -> argparse.ArgumentParser:
         help='The number of blocks to query for the transfer on the '
         'destination blockchain. If not specified, the query will '
         'include all blocks from the latest to the genesis block.')
+    # Argument parser for the transfer history
+    parser_history = subparsers.add_parser(
+        'history', help='list the token transfers from a blockchain (from '
+        'a local index that is updated first)')
+    parser_history.add_argument('source', choices=active_blockchain_names,
+                                help='the source blockchain of the transfers')
+    parser_history.add_argument('-s', '--sender', type=api.BlockchainAddress,
+                                metavar='ADDRESS',
+                                help='only list the transfers of this sender')
+    parser_history.add_argument(
+        '-r', '--recipient', type=api.BlockchainAddress, metavar='ADDRESS',
+        help='only list the transfers to this recipient')
+    parser_history.add_argument('-t', '--token', type=api.TokenSymbol,
+                                help='only list the transfers of this token')
+    parser_history.add_argument(
+        '-n', '--limit', type=_positive_int,
+        help='list at most this number of transfers (the most recent '
+        'first)')
+    parser_history.add_argument(
+        '--from-block', type=_non_negative_int, default=0, metavar='BLOCK',
+        help='the first block to index if the blockchain has not been '
+        'indexed yet (default: 0)')
+    parser_history.add_argument(
+        '--offline', action='store_true',
+        help='do not update the local index before listing the transfers')
+    # Argument parser for the service node health
+    parser_nodes = subparsers.add_parser(
+        'nodes', help='show the health of the service nodes (unavailable '
+        'service nodes are skipped for a while)')
+    parser_nodes.add_argument(
+        'blockchain', choices=active_blockchain_names,
+        help='blockchain where the service nodes are registered')
+    group_nodes_action = parser_nodes.add_mutually_exclusive_group()
+    group_nodes_action.add_argument(
+        '-p', '--probe', action='store_true',
+        help='probe all service nodes (including the skipped ones) before '
+        'showing their health')
+    group_nodes_action.add_argument(
+        '--reset', action='store_true',
+        help='reset the health records of all service nodes (so that no '
+        'service node is skipped anymore)')
+    # Argument parser for load tests
+    parser_loadtest = subparsers.add_parser(
+        'loadtest', help='measure the throughput and latency of the bids, '
+        'transfer, and status requests against a local stand-in service '
+        'node and blockchain nodes (offline)')
+    parser_loadtest.add_argument('source', choices=active_blockchain_names,
+                                 help='source blockchain of the transfers')
+    parser_loadtest.add_argument(
+        'destination', choices=active_blockchain_names,
+        help='destination blockchain of the transfers')
+    parser_loadtest.add_argument(
+        '-n', '--requests', type=_positive_int, default=100,
+        help='number of requests per phase (default: 100)')
+    parser_loadtest.add_argument(
+        '-c', '--concurrency', type=_positive_int, default=10,
+        help='maximum number of concurrent requests (default: 10)')
+    parser_loadtest.add_argument(
+        '-r', '--rate', type=_positive_float,
+        help='number of requests started per second (default: as many as '
+        'the concurrency allows)')
+    parser_loadtest.add_argument(
+        '--service-node-latency', type=_non_negative_float, default=0.0,
+        help='simulated processing time of each service node request in '
+        'seconds (default: 0)')
+    parser_loadtest.add_argument(
+        '--rpc-latency', type=_non_negative_float, default=0.0,
+        help='simulated processing time of each blockchain node request in '
+        'seconds (default: 0)')
+    # Argument parser for the token metadata cache
+    parser_tokens = subparsers.add_parser(
+        'tokens', help='manage the local token metadata cache')
+    tokens_subparsers = parser_tokens.add_subparsers(dest='tokens_command',
+                                                     required=True)
+    parser_tokens_refresh = tokens_subparsers.add_parser(
+        'refresh', help='read the metadata of all configured tokens and '
+        'replace the cached token metadata')
+    parser_tokens_refresh.add_argument(
+        'blockchains', nargs='*',
+        type=functools.partial(_active_blockchain_name,
+                               active_blockchain_names),
+        help='blockchains to refresh the token metadata for (all active '
+        'blockchains if not provided)', metavar='blockchain')
+    # Argument parser for shell completion
+    parser_completion = subparsers.add_parser(
+        'completion', help='print a shell completion script and update the '
+        'cached completion data')
+    parser_completion.add_argument('shell', choices=SHELLS,
+                                   help='shell to print the script for')
     parser_config = subparsers.add_parser('create-config',
                                           help='Create a new empty env file')
     parser_config.add_argument(
@@ -138,6 +477,63 @@ def _create_argument_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _get_active_blockchains() -> typing.List[api.Blockchain]:
+    return sorted([
+        blockchain for blockchain in api.Blockchain
+        if get_blockchain_config(blockchain)['active']
+    ], key=lambda blockchain: blockchain.name)
+
+
+def _active_blockchain_name(active_blockchain_names: typing.List[str],
+                            argument: str) -> str:
+    # Replaces argparse's choices for positional arguments with nargs='*',
+    # which reject an empty list of arguments on Python < 3.13
+    if argument not in active_blockchain_names:
+        choices = ', '.join(f'\'{name}\'' for name in active_blockchain_names)
+        raise argparse.ArgumentTypeError(
+            f'invalid choice: \'{argument}\' (choose from {choices})')
+    return argument
+
+
+def _positive_int(argument: str) -> int:
+    value = _non_negative_int(argument)
+    if value == 0:
+        raise argparse.ArgumentTypeError(
+            f'must be a positive int: \'{argument}\'')
+    return value
+
+
+def _non_negative_int(argument: str) -> int:
+    try:
+        value = int(argument)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid int value: \'{argument}\'')
+    if value < 0:
+        raise argparse.ArgumentTypeError(
+            f'must be a non-negative int: \'{argument}\'')
+    return value
+
+
+def _positive_float(argument: str) -> float:
+    value = _non_negative_float(argument)
+    if value == 0:
+        raise argparse.ArgumentTypeError(
+            f'must be a positive float: \'{argument}\'')
+    return value
+
+
+def _non_negative_float(argument: str) -> float:
+    try:
+        value = float(argument)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'invalid float value: \'{argument}\'')
+    if not 0 <= value < float('inf'):
+        raise argparse.ArgumentTypeError(
+            f'must be a non-negative float: \'{argument}\'')
+    return value
+
+
 _string_int_pair_first = True
 
 
@@ -158,43 +554,287 @@ def _string_int_pair(argument):
 
 def _execute_command_balance(arguments: argparse.Namespace) -> None:
     blockchain = api.Blockchain.from_name(arguments.blockchain)
+    if arguments.address is not None or arguments.address_file is not None:
+        # Read-only query, the keystore is not needed
+        _show_account_balances(blockchain, arguments.token, arguments.address,
+                               arguments.address_file, arguments.follow)
+        return
     private_key = _load_private_key(blockchain, arguments.keystore)
-    balance = api.retrieve_token_balance(blockchain, private_key,
-                                         arguments.token)
-    assert isinstance(balance, decimal.Decimal)
+    account_address = get_account_address(blockchain, private_key)
+    if arguments.follow:
+        _follow_balance(blockchain, arguments.token, account_address)
+        return
+    token_address = get_token_address(blockchain, arguments.token)
+    token_balances = read_token_balances(blockchain, [token_address],
+                                         [account_address])
+    balance = convert_amount_to_main_unit(
+        blockchain, arguments.token,
+        token_balances.get_balance(token_address, account_address))
     _print_balance(blockchain, arguments.token, balance)
 
 
 def _execute_command_bids(arguments: argparse.Namespace) -> None:
     source_blockchain = api.Blockchain.from_name(arguments.source)
     destination_blockchain = api.Blockchain.from_name(arguments.destination)
-    service_node_bids = api.retrieve_service_node_bids(source_blockchain,
-                                                       destination_blockchain)
-    _print_bids(source_blockchain, destination_blockchain, service_node_bids)
+    _print_bids_header(source_blockchain, destination_blockchain)
+    # Print the bids of each service node as soon as they arrive
+    for service_node_address, bids in stream_service_node_bids(
+            source_blockchain, destination_blockchain):
+        for bid in bids:
+            assert isinstance(bid.fee, int)
+            bid.fee = convert_amount_to_main_unit(source_blockchain,
+                                                  TOKEN_SYMBOL_PAN, bid.fee)
+        _print_service_node_bids(service_node_address, bids)
 
 
 def _execute_command_transfer(arguments: argparse.Namespace) -> None:
     source_blockchain = api.Blockchain.from_name(arguments.source)
     destination_blockchain = api.Blockchain.from_name(arguments.destination)
+    if arguments.sign_only is not None:
+        _sign_transfers(source_blockchain, [
+            TransferInput(destination_blockchain, arguments.recipient,
+                          arguments.token, arguments.amount)
+        ], arguments.sign_only, arguments.keystore, arguments.service,
+                        bid_deadline=arguments.bid_deadline)
+        return
+    service_node = None if arguments.service is None else (
+        api.BlockchainAddress(str(arguments.service[0])),
+        int(arguments.service[1]))
+    bid_index = None if arguments.service is None else arguments.service[1]
+    # The transfer is prepared in the background while the user
+    # confirms it
+    executor = concurrent.futures.ThreadPoolExecutor()
+    try:
+        amount_future = executor.submit(convert_amount_to_subunit,
+                                        source_blockchain, arguments.token,
+                                        arguments.amount)
+        bid_future = executor.submit(select_service_node_bid,
+                                     source_blockchain, destination_blockchain,
+                                     service_node, arguments.bid_deadline)
+        # The keystore can only be decrypted in the background if its
+        # password does not have to be entered
+        private_key_future = None
+        balance_future = None
+        if _get_configured_keystore_password(source_blockchain) is not None:
+            private_key_future = executor.submit(_load_private_key,
+                                                 source_blockchain,
+                                                 arguments.keystore)
+            balance_future = executor.submit(_check_transfer_balance,
+                                             source_blockchain,
+                                             arguments.token, amount_future,
+                                             private_key_future, bid_future)
+        if not arguments.yes:
+            _print_transfer_inputs(source_blockchain, destination_blockchain,
+                                   arguments.recipient, arguments.token,
+                                   arguments.amount, arguments.keystore,
+                                   bid_index, bid_future.result())
+            execute = input('Are you sure you want to execute this '
+                            'transfer? (no/yes, default: no) ')
+            if execute != 'yes':
+                print('\nTransfer aborted')
+                return
+        amount_subunit = amount_future.result()
+        if private_key_future is None:
+            sender_private_key = _load_private_key(source_blockchain,
+                                                   arguments.keystore)
+        else:
+            sender_private_key = private_key_future.result()
+        service_node_bid, bid_changed = _renew_service_node_bid(
+            source_blockchain, destination_blockchain, service_node,
+            bid_future.result(), arguments.bid_deadline)
+        if bid_changed:
+            print(_BID_CHANGED_MESSAGE)
+            _print_service_node_bid(source_blockchain, bid_index,
+                                    service_node_bid)
+            if not arguments.yes:
+                execute = input('Are you sure you want to execute this '
+                                'transfer? (no/yes, default: no) ')
+                if execute != 'yes':
+                    print('\nTransfer aborted')
+                    return
+            if balance_future is not None:
+                # The balances are checked again against the new fee
+                balance_future = executor.submit(
+                    check_transfer_balance, source_blockchain,
+                    get_account_address(source_blockchain, sender_private_key),
+                    arguments.token, amount_subunit, service_node_bid[1].fee)
+        if balance_future is not None:
+            # The balance check is only a pre-check, so the transfer is
+            # only stopped if a balance does not suffice
+            try:
+                balance_future.result()
+            except InsufficientBalanceError:
+                raise
+            except Exception:
+                _logger.warning(
+                    'unable to check the balances before the '
+                    'transfer', exc_info=True)
+    finally:
+        # Preparations that are not needed anymore (e.g. after an
+        # abort) are cancelled or left to finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+    service_node_task_info = api.transfer_tokens(
+        source_blockchain, destination_blockchain, sender_private_key,
+        arguments.recipient, arguments.token, amount_subunit, service_node_bid)
+    update_completion_data(
+        service_node_tasks=[(service_node_task_info.service_node_address,
+                             service_node_task_info.task_id)])
+    _print_transfer_output(service_node_task_info)
+
+
+def _execute_command_sign(arguments: argparse.Namespace) -> None:
+    source_blockchain = api.Blockchain.from_name(arguments.source)
+    transfer_inputs = read_transfer_inputs(arguments.transfers)
+    if len(transfer_inputs) == 0:
+        raise ClientCliError(f'no transfers found in {arguments.transfers}')
+    _sign_transfers(source_blockchain, transfer_inputs, arguments.output,
+                    arguments.keystore, arguments.service, arguments.workers)
+
+
+def _execute_command_submit(arguments: argparse.Namespace) -> None:
+    signed_transfers = read_signed_transfers(arguments.file)
+    if len(signed_transfers) == 0:
+        raise ClientCliError(f'no signed transfers found in {arguments.file}')
     if not arguments.yes:
-        _print_transfer_inputs(
-            source_blockchain, destination_blockchain, arguments.recipient,
-            arguments.token, arguments.amount, arguments.keystore,
-            None if arguments.service is None else arguments.service[0],
-            None if arguments.service is None else arguments.service[1])
-        execute = input('Are you sure you want to execute this transfer? '
+        execute = input(f'Are you sure you want to submit '
+                        f'{len(signed_transfers)} transfer(s)? '
                         '(no/yes, default: no) ')
         if execute != 'yes':
-            print('\nTransfer aborted')
+            print('\nSubmission aborted')
             return
-    sender_private_key = _load_private_key(source_blockchain,
-                                           arguments.keystore)
-    service_node_task_info = api.transfer_tokens(
-        source_blockchain, destination_blockchain, sender_private_key,
-        arguments.recipient, arguments.token, arguments.amount,
-        None if arguments.service is None else
-        (arguments.service[0], arguments.service[1]))
-    _print_transfer_output(service_node_task_info)
+    results = submit_signed_transfers(signed_transfers, arguments.workers)
+    update_completion_data(
+        service_node_tasks=[(result.service_node_address, result.task_id)
+                            for result in results
+                            if not isinstance(result, Exception)])
+    _print_submit_results(signed_transfers, results)
+    failures = sum(isinstance(result, Exception) for result in results)
+    if failures > 0:
+        raise ClientCliError(f'{failures} of {len(results)} transfer(s) could '
+                             'not be submitted')
+
+
+def _execute_command_queue(arguments: argparse.Namespace) -> None:
+    if arguments.queue_command == 'add':
+        source_blockchain = api.Blockchain.from_name(arguments.source)
+        transfer_inputs = read_transfer_inputs(arguments.transfers)
+        if len(transfer_inputs) == 0:
+            raise ClientCliError(
+                f'no transfers found in {arguments.transfers}')
+        # Convert the amounts first to fail early on invalid inputs
+        for transfer_input in transfer_inputs:
+            convert_amount_to_subunit(
+                source_blockchain, transfer_input.token_symbol,
+                decimal.Decimal(transfer_input.token_amount))
+        add_jobs(arguments.queue, source_blockchain, arguments.keystore,
+                 transfer_inputs)
+        print(f'Added {len(transfer_inputs)} job(s) to {arguments.queue}')
+    elif arguments.queue_command == 'work':
+        source_blockchain = api.Blockchain.from_name(arguments.source)
+        worker_result = run_worker(arguments.queue, source_blockchain,
+                                   _get_keystore_password(source_blockchain),
+                                   arguments.lease, arguments.batch,
+                                   arguments.workers, arguments.bid_deadline,
+                                   arguments.max_attempts,
+                                   arguments.retry_delay)
+        print(f'Submitted {worker_result.submitted} transfer(s)')
+        if worker_result.failed > 0:
+            raise ClientCliError(f'{worker_result.failed} job(s) failed (see '
+                                 'the queue status command)')
+    else:
+        assert arguments.queue_command == 'status'
+        _print_queue_status(count_jobs(arguments.queue),
+                            read_jobs(arguments.queue, JobState.FAILED))
+
+
+def _execute_command_sweep(arguments: argparse.Namespace) -> None:
+    source_blockchain = api.Blockchain.from_name(arguments.source)
+    destination_blockchain = api.Blockchain.from_name(arguments.destination)
+    token_symbol = arguments.token
+    min_amount = convert_amount_to_subunit(source_blockchain, token_symbol,
+                                           arguments.min_amount)
+    sweep_accounts = read_sweep_accounts(
+        source_blockchain, token_symbol, arguments.keystores,
+        _get_keystore_password(source_blockchain), arguments.workers)
+    service_node = None if arguments.service is None else (
+        api.BlockchainAddress(str(arguments.service[0])),
+        int(arguments.service[1]))
+    service_node_bid = select_service_node_bid(source_blockchain,
+                                               destination_blockchain,
+                                               service_node)
+    read_failures = sum(
+        isinstance(sweep_account, Exception)
+        for sweep_account in sweep_accounts)
+    while True:
+        sweep_amounts = [
+            (sweep_account, 0 if isinstance(sweep_account, Exception) else
+             get_sweep_amount(sweep_account, token_symbol,
+                              service_node_bid[1].fee, min_amount))
+            for sweep_account in sweep_accounts
+        ]
+        _print_sweep_accounts(source_blockchain, destination_blockchain,
+                              arguments.recipient, token_symbol,
+                              arguments.keystores, sweep_amounts,
+                              service_node_bid)
+        transfers = [
+            (sweep_account, sweep_amount)
+            for sweep_account, sweep_amount in sweep_amounts
+            if isinstance(sweep_account, SweepAccount) and sweep_amount > 0
+        ]
+        if len(transfers) == 0:
+            break
+        if not arguments.yes:
+            execute = input(f'Are you sure you want to execute '
+                            f'{len(transfers)} transfer(s)? '
+                            '(no/yes, default: no) ')
+            if execute != 'yes':
+                print('\nSweep aborted')
+                return
+        service_node_bid, bid_changed = _renew_service_node_bid(
+            source_blockchain, destination_blockchain, service_node,
+            service_node_bid)
+        if not bid_changed:
+            break
+        # The sweep amounts depend on the fee, so they are recomputed
+        # and confirmed again
+        print(_BID_CHANGED_MESSAGE)
+    if len(transfers) > 0:
+        results = sweep_tokens(source_blockchain, destination_blockchain,
+                               arguments.recipient, token_symbol, transfers,
+                               service_node_bid, arguments.workers)
+        update_completion_data(
+            service_node_tasks=[(result.service_node_address, result.task_id)
+                                for result in results
+                                if not isinstance(result, Exception)])
+        _print_sweep_results(transfers, results)
+    else:
+        results = []
+    failures = read_failures + sum(
+        isinstance(result, Exception) for result in results)
+    if failures > 0:
+        raise ClientCliError(f'{failures} of {len(sweep_accounts)} '
+                             'account(s) could not be swept')
+
+
+def _renew_service_node_bid(
+    source_blockchain: api.Blockchain, destination_blockchain: api.Blockchain,
+    service_node: typing.Optional[typing.Tuple[api.BlockchainAddress, int]],
+    service_node_bid: typing.Tuple[api.BlockchainAddress, api.ServiceNodeBid],
+    bid_deadline: typing.Optional[float] = None
+) -> typing.Tuple[typing.Tuple[api.BlockchainAddress, api.ServiceNodeBid],
+                  bool]:
+    if not is_service_node_bid_expired(service_node_bid[1]):
+        return service_node_bid, False
+    # The bid has expired while the user confirmed the transfer(s)
+    renewed_service_node_bid = select_service_node_bid(source_blockchain,
+                                                       destination_blockchain,
+                                                       service_node,
+                                                       bid_deadline)
+    # Only the service node and the fee have been confirmed by the
+    # user
+    bid_changed = (renewed_service_node_bid[0] != service_node_bid[0] or
+                   renewed_service_node_bid[1].fee != service_node_bid[1].fee)
+    return renewed_service_node_bid, bid_changed
 
 
 def _execute_command_status(arguments: argparse.Namespace) -> None:
@@ -202,13 +842,98 @@ def _execute_command_status(arguments: argparse.Namespace) -> None:
     service_node_address = arguments.service
     task_id = arguments.task
     blocks = arguments.blocks
-    transfer_status = api.get_token_transfer_status(source_blockchain,
+    transfer_status = load_transfer_status(source_blockchain,
+                                           service_node_address, task_id)
+    if transfer_status is None:
+        transfer_status = get_token_transfer_status(source_blockchain,
                                                     service_node_address,
                                                     task_id, blocks)
+        store_transfer_status(source_blockchain, service_node_address, task_id,
+                              transfer_status)
+    update_completion_data(service_node_tasks=[(service_node_address,
+                                                task_id)])
     _print_status(source_blockchain, service_node_address, task_id,
                   transfer_status)
 
 
+def _execute_command_history(arguments: argparse.Namespace) -> None:
+    source_blockchain = api.Blockchain.from_name(arguments.source)
+    token_address = (None if arguments.token is None else get_token_address(
+        source_blockchain, arguments.token))
+    if arguments.offline:
+        checkpoint = get_transfer_index_checkpoint(source_blockchain)
+    else:
+        checkpoint = update_transfer_index(source_blockchain,
+                                           arguments.from_block)
+    if checkpoint is None:
+        raise ClientCliError('the token transfers from '
+                             f'{source_blockchain.name} have not been '
+                             'indexed yet')
+    indexed_transfers = find_indexed_transfers(source_blockchain,
+                                               arguments.sender,
+                                               arguments.recipient,
+                                               token_address, arguments.limit)
+    token_symbols = {}
+    for token_symbol in get_token_symbols(source_blockchain):
+        token_symbols[get_token_address(source_blockchain,
+                                        token_symbol).lower()] = token_symbol
+    _print_indexed_transfers(source_blockchain, checkpoint, indexed_transfers,
+                             token_symbols)
+
+
+def _execute_command_nodes(arguments: argparse.Namespace) -> None:
+    blockchain = api.Blockchain.from_name(arguments.blockchain)
+    service_node_addresses = get_service_node_addresses(blockchain)
+    if arguments.probe:
+        probe_service_nodes(blockchain, service_node_addresses)
+    elif arguments.reset:
+        for service_node_address in service_node_addresses:
+            reset_service_node_health(blockchain, service_node_address)
+    _print_service_node_health(
+        blockchain,
+        [(service_node_address,
+          load_service_node_health(blockchain, service_node_address))
+         for service_node_address in service_node_addresses])
+
+
+def _execute_command_loadtest(arguments: argparse.Namespace) -> None:
+    source_blockchain = api.Blockchain.from_name(arguments.source)
+    destination_blockchain = api.Blockchain.from_name(arguments.destination)
+    phase_results = run_load_test(source_blockchain, destination_blockchain,
+                                  arguments.requests, arguments.concurrency,
+                                  arguments.rate,
+                                  arguments.service_node_latency,
+                                  arguments.rpc_latency)
+    _print_load_test_results(source_blockchain, destination_blockchain,
+                             phase_results)
+    errors = sum(phase_result.errors for phase_result in phase_results)
+    if errors > 0:
+        requests = sum(phase_result.requests for phase_result in phase_results)
+        raise ClientCliError(f'{errors} of {requests} load test request(s) '
+                             'failed')
+
+
+def _execute_command_tokens(arguments: argparse.Namespace) -> None:
+    assert arguments.tokens_command == 'refresh'
+    blockchains = [
+        api.Blockchain.from_name(blockchain_name)
+        for blockchain_name in arguments.blockchains
+    ] if len(arguments.blockchains) > 0 else _get_active_blockchains()
+    for blockchain in blockchains:
+        tokens_metadata = refresh_token_metadata(blockchain)
+        _print_tokens(blockchain, tokens_metadata)
+
+
+def _execute_command_completion(arguments: argparse.Namespace) -> None:
+    active_blockchains = _get_active_blockchains()
+    update_completion_data(active_blockchains, [
+        token_symbol for blockchain in active_blockchains
+        for token_symbol in get_token_symbols(blockchain)
+    ])
+    print(create_completion_script(_create_argument_parser(), arguments.shell),
+          end='')
+
+
 def _execute_command_create_config(arguments: argparse.Namespace) -> None:
     path = arguments.path
     if path is None:
@@ -225,6 +950,65 @@ def _execute_command_create_config(arguments: argparse.Namespace) -> None:
     print(f'Created .env files in {path}')
 
 
+def _follow_balance(blockchain: api.Blockchain, token_symbol: api.TokenSymbol,
+                    account_address: api.BlockchainAddress) -> None:
+    print(f'Following your {token_symbol.upper()} token balance on '
+          f'{blockchain.name} (press Ctrl+C to stop):')
+    try:
+        for balance_change in follow_token_balance(blockchain, token_symbol,
+                                                   account_address):
+            _print_balance_change(blockchain, token_symbol, balance_change)
+    except KeyboardInterrupt:
+        pass
+
+
+def _show_account_balances(blockchain: api.Blockchain,
+                           token_symbol: api.TokenSymbol,
+                           account_addresses: typing.Optional[
+                               typing.List[str]],
+                           file_path: typing.Optional[pathlib.Path],
+                           follow: bool) -> None:
+    all_account_addresses = get_account_addresses(blockchain,
+                                                  account_addresses, file_path)
+    if len(all_account_addresses) == 0:
+        raise ClientCliError('no account addresses given')
+    if follow:
+        if len(all_account_addresses) > 1:
+            raise ClientCliError('only a single account balance can be '
+                                 'followed')
+        _follow_balance(blockchain, token_symbol, all_account_addresses[0])
+        return
+    token_address = get_token_address(blockchain, token_symbol)
+    token_balances = read_token_balances(blockchain, [token_address],
+                                         all_account_addresses)
+    _print_account_balances(blockchain, token_symbol, token_address,
+                            all_account_addresses, token_balances)
+
+
+def _sign_transfers(source_blockchain: api.Blockchain,
+                    transfer_inputs: typing.List[TransferInput],
+                    output_path: pathlib.Path,
+                    keystore_path: typing.Optional[pathlib.Path],
+                    service: typing.Optional[typing.List[typing.Union[str,
+                                                                      int]]],
+                    max_workers: int = 1,
+                    bid_deadline: typing.Optional[float] = None) -> None:
+    # Convert the amounts first to fail early on invalid inputs
+    for transfer_input in transfer_inputs:
+        if isinstance(transfer_input.token_amount, decimal.Decimal):
+            convert_amount_to_subunit(source_blockchain,
+                                      transfer_input.token_symbol,
+                                      transfer_input.token_amount)
+    sender_private_key = _load_private_key(source_blockchain, keystore_path)
+    service_node = None if service is None else (api.BlockchainAddress(
+        str(service[0])), int(service[1]))
+    signed_transfers = sign_transfers(source_blockchain, sender_private_key,
+                                      transfer_inputs, service_node,
+                                      max_workers, bid_deadline)
+    write_signed_transfers(output_path, signed_transfers)
+    _print_sign_output(signed_transfers, output_path)
+
+
 def _load_private_key(
         blockchain: api.Blockchain,
         keystore_path: typing.Optional[pathlib.Path] = None) -> api.PrivateKey:
@@ -241,11 +1025,36 @@ def _load_private_key(
         keystore = keystore_path.read_text()
     except Exception:
         raise ClientCliError(f'unable to read the keystore {keystore_path}')
-    password = (None if keystore_config is None else
-                keystore_config.get('password'))
+    return api.decrypt_private_key(blockchain, keystore,
+                                   _get_keystore_password(blockchain))
+
+
+def _check_transfer_balance(
+    source_blockchain: api.Blockchain, token_symbol: api.TokenSymbol,
+    amount_future: concurrent.futures.Future[int],
+    private_key_future: concurrent.futures.Future[api.PrivateKey],
+    bid_future: concurrent.futures.Future[typing.Tuple[api.BlockchainAddress,
+                                                       api.ServiceNodeBid]]
+) -> None:
+    check_transfer_balance(
+        source_blockchain,
+        get_account_address(source_blockchain, private_key_future.result()),
+        token_symbol, amount_future.result(),
+        bid_future.result()[1].fee)
+
+
+def _get_keystore_password(blockchain: api.Blockchain) -> str:
+    password = _get_configured_keystore_password(blockchain)
     if password is None:
         password = getpass.getpass('Enter your keystore password: ')
-    return api.decrypt_private_key(blockchain, keystore, password)
+    return password
+
+
+def _get_configured_keystore_password(
+        blockchain: api.Blockchain) -> typing.Optional[str]:
+    keystore_config = get_blockchain_config(blockchain).get('keystore')
+    return (None
+            if keystore_config is None else keystore_config.get('password'))
 
 
 def _print_balance(blockchain: api.Blockchain, token_symbol: api.TokenSymbol,
@@ -255,34 +1064,65 @@ def _print_balance(blockchain: api.Blockchain, token_symbol: api.TokenSymbol,
         f'{balance}')
 
 
-def _print_bids(
-        source_blockchain: api.Blockchain,
-        destination_blockchain: api.Blockchain,
-        service_node_bids: typing.Dict[api.BlockchainAddress,
-                                       typing.List[api.ServiceNodeBid]]) \
-        -> None:
+def _print_account_balances(blockchain: api.Blockchain,
+                            token_symbol: api.TokenSymbol,
+                            token_address: api.BlockchainAddress,
+                            account_addresses: typing.List[
+                                api.BlockchainAddress],
+                            token_balances: TokenBalances) -> None:
+    print(f'{token_symbol.upper()} token balances on {blockchain.name} at '
+          f'block {token_balances.block_number}:\n')  # noqa E231
+    print('Account\t\t\t\t\t\tBalance')
+    print('==================================='
+          '==================================')
+    for account_address in account_addresses:
+        balance = convert_amount_to_main_unit(
+            blockchain, token_symbol,
+            token_balances.get_balance(token_address, account_address))
+        print(f'{account_address}\t{balance}')
+    print('')
+
+
+def _print_balance_change(blockchain: api.Blockchain,
+                          token_symbol: api.TokenSymbol,
+                          balance_change: BalanceChange) -> None:
+    balance = convert_amount_to_main_unit(blockchain, token_symbol,
+                                          balance_change.balance)
+    line = f'Block {balance_change.block_number}: {balance}'
+    if balance_change.balance_change != 0:
+        sign = '+' if balance_change.balance_change > 0 else '-'
+        amount = convert_amount_to_main_unit(
+            blockchain, token_symbol, abs(balance_change.balance_change))
+        line += f' ({sign}{amount})'
+    print(line, flush=True)
+
+
+def _print_bids_header(source_blockchain: api.Blockchain,
+                       destination_blockchain: api.Blockchain) -> None:
     print('Pantos service node bids for token transfers from the\n'
           f'source blockchain {source_blockchain.name} to the destination '
           f'blockchain {destination_blockchain.name}:\n')  # noqa E231
     print('Service node\t\t\t\t\tTime\tFee')
     print('\t\t\t\t\t\t(s)\t(PAN)')
-    print('==================================='
-          '==================================')
-    for service_node_address, bids in service_node_bids.items():
-        for bid in bids:
-            print(f'{service_node_address}\t{bid.execution_time}'
-                  f'\t{bid.fee}')
+    print(
+        '==================================='
+        '==================================', flush=True)
 
 
-def _print_transfer_inputs(source_blockchain: api.Blockchain,
-                           destination_blockchain: api.Blockchain,
-                           recipient_address: api.BlockchainAddress,
-                           token_symbol: api.TokenSymbol,
-                           amount: decimal.Decimal,
-                           keystore_path: typing.Optional[pathlib.Path] = None,
-                           service_node_address: typing.Optional[
-                               api.BlockchainAddress] = None,
-                           bid_id: typing.Optional[int] = None) -> None:
+def _print_service_node_bids(service_node_address: api.BlockchainAddress,
+                             bids: typing.List[api.ServiceNodeBid]) -> None:
+    for bid in bids:
+        print(f'{service_node_address}\t{bid.execution_time}'
+              f'\t{bid.fee}', flush=True)
+
+
+def _print_transfer_inputs(
+    source_blockchain: api.Blockchain, destination_blockchain: api.Blockchain,
+    recipient_address: api.BlockchainAddress, token_symbol: api.TokenSymbol,
+    amount: decimal.Decimal, keystore_path: typing.Optional[pathlib.Path],
+    bid_index: typing.Optional[int],
+    service_node_bid: typing.Tuple[api.BlockchainAddress, api.ServiceNodeBid]
+) -> None:
     print('New Pantos transfer:\n')
     print(f'Source blockchain:\t{source_blockchain.name}')  # noqa E231
     print(f'Destination blockchain:'  # noqa E231
@@ -294,11 +1134,95 @@ def _print_transfer_inputs(source_blockchain: api.Blockchain,
     print(f'Keystore ({source_blockchain.name}):\t'  # noqa E231
           '{}'.format('default (from configuration)' if keystore_path is
                       None else keystore_path))
-    print('Service node:\t\t{}'.format(
-        'default (lowest fee)' if service_node_address is
-        None else service_node_address))
-    print('Service node bid:\t{}\n'.format('default (lowest fee)' if bid_id is
-                                           None else bid_id))
+    _print_service_node_bid(source_blockchain, bid_index, service_node_bid)
+
+
+def _print_service_node_bid(
+    source_blockchain: api.Blockchain, bid_index: typing.Optional[int],
+    service_node_bid: typing.Tuple[api.BlockchainAddress, api.ServiceNodeBid]
+) -> None:
+    print(f'Service node:\t\t{service_node_bid[0]}')  # noqa E231
+    print('Service node bid index:\t{}'.format(
+        'default (lowest fee)' if bid_index is None else bid_index))
+    fee = convert_amount_to_main_unit(source_blockchain, TOKEN_SYMBOL_PAN,
+                                      service_node_bid[1].fee)
+    print(f'Service node fee:\t{fee} PAN\n')  # noqa E231
+
+
+def _print_indexed_transfers(
+        source_blockchain: api.Blockchain, checkpoint: int,
+        indexed_transfers: typing.List[IndexedTransfer],
+        token_symbols: typing.Dict[str, api.TokenSymbol]) -> None:
+    print(f'Pantos token transfers from {source_blockchain.name} (indexed '
+          f'up to block {checkpoint}):\n')
+    if len(indexed_transfers) == 0:
+        print('No matching token transfers found.')
+        return
+    for indexed_transfer in indexed_transfers:
+        token_symbol = token_symbols.get(
+            indexed_transfer.source_token_address.lower())
+        token = (indexed_transfer.source_token_address
+                 if token_symbol is None else f'{token_symbol.upper()} '
+                 f'({indexed_transfer.source_token_address})')
+        print(f'Block:\t\t\t{indexed_transfer.block_number}')  # noqa E231
+        print(f'Transaction ID:\t\t'  # noqa E231
+              f'{indexed_transfer.transaction_id}')
+        print(f'Destination blockchain:\t'  # noqa E231
+              f'{indexed_transfer.destination_blockchain.name}')
+        print(f'Sender address:\t\t'  # noqa E231
+              f'{indexed_transfer.sender_address}')
+        print(f'Recipient address:\t'  # noqa E231
+              f'{indexed_transfer.recipient_address}')
+        print(f'Token:\t\t\t{token}')  # noqa E231
+        print(f'Token amount:\t\t{indexed_transfer.amount}')  # noqa E231
+        print(f'Service node:\t\t'  # noqa E231
+              f'{indexed_transfer.service_node_address}')
+        print(f'Service node fee:\t{indexed_transfer.fee}\n')  # noqa E231
+
+
+def _print_service_node_health(
+    blockchain: api.Blockchain,
+    service_node_healths: typing.List[typing.Tuple[api.BlockchainAddress,
+                                                   ServiceNodeHealth]]
+) -> None:
+    print(f'Pantos service nodes on {blockchain.name}:\n')  # noqa E231
+    print('Service node\t\t\t\t\tState\t\tLatency\tFailures\tLast '
+          'success')
+    print('\t\t\t\t\t\t\t\t(s)')
+    print('==================================='
+          '==================================')
+    for service_node_address, service_node_health in service_node_healths:
+        circuit_state = service_node_health.get_circuit_state()
+        average_latency = service_node_health.get_average_latency()
+        latency = ('-'
+                   if average_latency is None else f'{average_latency:.3f}')
+        last_success = ('-' if service_node_health.last_success is None else
+                        _format_timestamp(service_node_health.last_success))
+        print(f'{service_node_address}\t{_CIRCUIT_STATE_NAMES[circuit_state]}'
+              f'\t{latency}\t{service_node_health.failures}\t\t'
+              f'{last_success}')
+        retry_time = service_node_health.get_retry_time()
+        if retry_time is not None:
+            print(f'\tskipped until {_format_timestamp(retry_time)}')
+    print('')
+
+
+def _format_timestamp(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(
+        timespec='seconds')
+
+
+def _print_tokens(blockchain: api.Blockchain,
+                  tokens_metadata: typing.List[TokenMetadata]) -> None:
+    print(f'Token metadata on {blockchain.name}:\n')  # noqa E231
+    print('Symbol\tDecimals\tAddress')
+    print('==================================='
+          '==================================')
+    for token_metadata in tokens_metadata:
+        print(f'{token_metadata.token_symbol.upper()}\t'
+              f'{token_metadata.token_decimals}\t\t'
+              f'{token_metadata.token_address}')
+    print('')
 
 
 def _print_transfer_output(
@@ -308,6 +1232,117 @@ def _print_transfer_output(
           f'the following task ID: {service_node_task_info.task_id}')
 
 
+def _print_sign_output(signed_transfers: typing.List[SignedTransfer],
+                       output_path: pathlib.Path) -> None:
+    valid_until = min(
+        min(signed_transfer.valid_until,
+            signed_transfer.service_node_bid.valid_until)
+        for signed_transfer in signed_transfers)
+    print(f'Signed {len(signed_transfers)} transfer(s) and appended them to '
+          f'{output_path}\n(to be submitted before '
+          f'{datetime.datetime.fromtimestamp(valid_until).isoformat()})')
+
+
+def _print_submit_results(
+    signed_transfers: typing.List[SignedTransfer],
+    results: typing.List[typing.Union[api.ServiceNodeTaskInfo, Exception]]
+) -> None:
+    print('Transfer\tService node\t\t\t\t\tTask ID')
+    print('==================================='
+          '==================================')
+    for index, (signed_transfer,
+                result) in enumerate(zip(signed_transfers, results), start=1):
+        if isinstance(result, Exception):
+            print(f'{index}\t\t{signed_transfer.service_node_address}\t'
+                  f'failed: {result}')
+        else:
+            print(f'{index}\t\t{result.service_node_address}\t'
+                  f'{result.task_id}')
+
+
+def _print_queue_status(job_counts: typing.Dict[JobState, int],
+                        failed_jobs: typing.List[Job]) -> None:
+    print('State\t\tJobs')
+    print('====================')
+    for job_state, count in job_counts.items():
+        print(f'{job_state.value}\t\t{count}')
+    if len(failed_jobs) > 0:
+        print('\nJob\tKeystore\tFailure')
+        print('===================================='
+              '=================================')
+        for job in failed_jobs:
+            print(f'{job.job_id}\t{job.keystore_path}\t{job.error}')
+
+
+def _print_sweep_accounts(
+    source_blockchain: api.Blockchain, destination_blockchain: api.Blockchain,
+    recipient_address: api.BlockchainAddress, token_symbol: api.TokenSymbol,
+    keystore_paths: typing.List[pathlib.Path],
+    sweep_amounts: typing.List[typing.Tuple[typing.Union[SweepAccount,
+                                                         Exception], int]],
+    service_node_bid: typing.Tuple[api.BlockchainAddress, api.ServiceNodeBid]
+) -> None:
+    print(f'Pantos sweep of {token_symbol.upper()} tokens from '
+          f'{source_blockchain.name} to the recipient\n'
+          f'{recipient_address} on {destination_blockchain.name}:\n')
+    print('Keystore\tAccount\t\t\t\t\t\tAmount')
+    print('==================================='
+          '==================================')
+    total_amount = 0
+    for keystore_path, (sweep_account,
+                        sweep_amount) in zip(keystore_paths, sweep_amounts):
+        if isinstance(sweep_account, Exception):
+            print(f'{keystore_path}\tfailed: {sweep_account}')
+            continue
+        amount = ('skipped'
+                  if sweep_amount == 0 else convert_amount_to_main_unit(
+                      source_blockchain, token_symbol, sweep_amount))
+        print(f'{keystore_path}\t{sweep_account.address}\t{amount}')
+        total_amount += sweep_amount
+    service_node_address, bid = service_node_bid
+    fee = convert_amount_to_main_unit(source_blockchain, TOKEN_SYMBOL_PAN,
+                                      bid.fee)
+    total = convert_amount_to_main_unit(source_blockchain, token_symbol,
+                                        total_amount)
+    print(f'\nTotal amount:\t\t{total}')  # noqa E231
+    print(f'Service node:\t\t{service_node_address}')  # noqa E231
+    print(f'Fee per transfer (PAN):\t{fee}\n')  # noqa E231
+
+
+def _print_sweep_results(
+    sweep_amounts: typing.List[typing.Tuple[SweepAccount, int]],
+    results: typing.List[typing.Union[api.ServiceNodeTaskInfo, Exception]]
+) -> None:
+    print('Account\t\t\t\t\t\tTask ID')
+    print('==================================='
+          '==================================')
+    for (sweep_account, _), result in zip(sweep_amounts, results):
+        if isinstance(result, Exception):
+            print(f'{sweep_account.address}\tfailed: {result}')
+        else:
+            print(f'{sweep_account.address}\t{result.task_id}')
+
+
+def _print_load_test_results(
+        source_blockchain: api.Blockchain,
+        destination_blockchain: api.Blockchain,
+        phase_results: typing.List[LoadTestPhaseResult]) -> None:
+    print('Load test of token transfers from the\n'
+          f'source blockchain {source_blockchain.name} to the destination '
+          f'blockchain {destination_blockchain.name}:\n')  # noqa E231
+    print('Phase\t\tRequests\tErrors\tThroughput\tp50\tp95\tp99')
+    print('\t\t\t\t\t(1/s)\t\t(ms)\t(ms)\t(ms)')
+    print('==================================='
+          '==================================')
+    for phase_result in phase_results:
+        latency_percentiles = '\t'.join(
+            f'{phase_result.get_latency_percentile(percentile) * 1000:.0f}'
+            for percentile in (50, 95, 99))
+        print(f'{phase_result.phase:<16}{phase_result.requests}\t\t'
+              f'{phase_result.errors}\t{phase_result.throughput:.1f}\t\t'
+              f'{latency_percentiles}')
+
+
 def _print_status(source_blockchain: api.Blockchain,
                   service_node_address: api.BlockchainAddress,
                   task_id: uuid.UUID,
@@ -0,0 +1,489 @@
+"""Module for reading and following token balances.
+
+"""
+import concurrent.futures
+import dataclasses
+import itertools
+import logging
+import pathlib
+import time
+import typing
+
+import web3
+from pantos.client.library import api
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+from pantos.common.blockchains.base import NodeConnections
+from pantos.common.blockchains.base import VersionedContractAbi
+from pantos.common.blockchains.enums import ContractAbi
+
+from pantos.cli.blockchains import get_blockchain_client
+from pantos.cli.blockchains import get_blockchain_utilities
+from pantos.cli.blockchains import get_library_blockchain_config
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.exceptions import InsufficientBalanceError
+from pantos.cli.tokens import convert_amount_to_main_unit
+from pantos.cli.tokens import get_token_address
+
+_MULTICALL_ADDRESS: typing.Final[api.BlockchainAddress] = \
+    api.BlockchainAddress('0xcA11bde05977b3631167028862bE2a173976CA11')
+"""Address of the Multicall3 contract (the same on all EVM
+blockchains)."""
+
+_MULTICALL_ABI: typing.Final[typing.List[typing.Dict[str, typing.Any]]] = [{
+    'name': 'aggregate3',
+    'type': 'function',
+    'stateMutability': 'payable',
+    'inputs': [{
+        'name': 'calls',
+        'type': 'tuple[]',
+        'components': [{
+            'name': 'target',
+            'type': 'address'
+        }, {
+            'name': 'allowFailure',
+            'type': 'bool'
+        }, {
+            'name': 'callData',
+            'type': 'bytes'
+        }]
+    }],
+    'outputs': [{
+        'name': 'returnData',
+        'type': 'tuple[]',
+        'components': [{
+            'name': 'success',
+            'type': 'bool'
+        }, {
+            'name': 'returnData',
+            'type': 'bytes'
+        }]
+    }]
+}]
+"""ABI of the Multicall3 contract's aggregate3 function."""
+
+_MAX_CALLS_PER_MULTICALL: typing.Final[int] = 250
+"""Maximum number of balanceOf calls aggregated into a single eth_call
+(to stay below the nodes' gas and response size limits)."""
+
+_BALANCE_OF_SELECTOR: typing.Final[bytes] = bytes.fromhex('70a08231')
+"""Function selector of the ERC20 balanceOf function."""
+
+_DEFAULT_MAX_WORKERS: typing.Final[int] = 16
+"""Default maximum number of concurrent balanceOf calls if the
+Multicall3 contract is not available."""
+
+_logger = logging.getLogger(__name__)
+
+_codec = web3.Web3().codec
+
+
+@dataclasses.dataclass
+class BalanceChange:
+    """Change of an account's token balance.
+
+    Attributes
+    ----------
+    block_number : int
+        The number of the (confirmed) block the balance refers to.
+    balance : int
+        The account's token balance in the token's smallest subunit.
+    balance_change : int
+        The change of the token balance in the token's smallest subunit
+        since the previously reported balance.
+
+    """
+    block_number: int
+    balance: int
+    balance_change: int
+
+
+@dataclasses.dataclass
+class TokenBalances:
+    """Token balances of many accounts at a single block.
+
+    Attributes
+    ----------
+    block_number : int
+        The number of the block the balances refer to.
+    balances : dict
+        The token balances in the tokens' smallest subunits by token
+        address and account address.
+
+    """
+    block_number: int
+    balances: typing.Dict[typing.Tuple[api.BlockchainAddress,
+                                       api.BlockchainAddress], int]
+
+    def get_balance(self, token_address: api.BlockchainAddress,
+                    account_address: api.BlockchainAddress) -> int:
+        """Get the token balance of an account.
+
+        Parameters
+        ----------
+        token_address : api.BlockchainAddress
+            The address of the token.
+        account_address : api.BlockchainAddress
+            The address of the account.
+
+        Returns
+        -------
+        int
+            The account's token balance in the token's smallest
+            subunit.
+
+        """
+        return self.balances[(token_address, account_address)]
+
+
+def get_account_addresses(
+        blockchain: api.Blockchain,
+        account_addresses: typing.Optional[typing.List[str]] = None,
+        file_path: typing.Optional[pathlib.Path] = None) \
+        -> typing.List[api.BlockchainAddress]:
+    """Get the validated addresses of accounts given directly and/or in
+    a file. The file must contain one address per line; empty lines and
+    lines starting with # are ignored.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain of the accounts.
+    account_addresses : list of str, optional
+        The addresses of the accounts.
+    file_path : pathlib.Path, optional
+        The path of a file with the addresses of further accounts.
+
+    Returns
+    -------
+    list of api.BlockchainAddress
+        The addresses of the accounts (without duplicates, in the order
+        given).
+
+    Raises
+    ------
+    ClientCliError
+        If the file cannot be read or an address is invalid.
+
+    """
+    all_account_addresses = list(account_addresses or [])
+    if file_path is not None:
+        try:
+            lines = file_path.read_text().splitlines()
+        except (OSError, UnicodeDecodeError):
+            raise ClientCliError(
+                f'unable to read the account addresses file {file_path}')
+        all_account_addresses += [
+            line.strip() for line in lines
+            if len(line.strip()) > 0 and not line.strip().startswith('#')
+        ]
+    utilities = get_blockchain_utilities(blockchain)
+    for account_address in all_account_addresses:
+        if not utilities.is_valid_address(account_address):
+            raise ClientCliError(
+                f'invalid {blockchain.name} account address {account_address}')
+    return [
+        api.BlockchainAddress(account_address)
+        for account_address in dict.fromkeys(all_account_addresses)
+    ]
+
+
+def read_token_balances(
+        blockchain: api.Blockchain,
+        token_addresses: typing.List[api.BlockchainAddress],
+        account_addresses: typing.List[api.BlockchainAddress],
+        block_number: typing.Optional[int] = None,
+        max_workers: int = _DEFAULT_MAX_WORKERS) -> TokenBalances:
+    """Read the balances of many tokens for many accounts. The balanceOf
+    calls are aggregated through the Multicall3 contract, so that only
+    one eth_call per chunk of calls is needed. All balances are read at
+    the same block. If the Multicall3 contract is not deployed on the
+    blockchain, the balances are read with concurrent individual
+    balanceOf calls (still at the same block).
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain of the tokens and accounts.
+    token_addresses : list of api.BlockchainAddress
+        The addresses of the tokens.
+    account_addresses : list of api.BlockchainAddress
+        The addresses of the accounts.
+    block_number : int, optional
+        The number of the block to read the balances at (default: the
+        latest block).
+    max_workers : int, optional
+        The maximum number of concurrent balanceOf calls if the
+        Multicall3 contract is not available.
+
+    Returns
+    -------
+    TokenBalances
+        The balances of each token for each account.
+
+    Raises
+    ------
+    ClientCliError
+        If a token balance cannot be read.
+    Exception
+        If the blockchain nodes cannot be queried.
+
+    """
+    node_connections = get_blockchain_utilities(
+        blockchain).create_node_connections()
+    if block_number is None:
+        block_number = \
+            node_connections.eth.get_block_number().get_minimum_result()
+    balance_keys = list(
+        dict.fromkeys(itertools.product(token_addresses, account_addresses)))
+    if _is_multicall_available(node_connections, block_number):
+        balances = []
+        for index in range(0, len(balance_keys), _MAX_CALLS_PER_MULTICALL):
+            balances += _read_balances_multicall(
+                node_connections,
+                balance_keys[index:index + _MAX_CALLS_PER_MULTICALL],
+                block_number)
+    else:
+        balances = _read_balances_individually(blockchain, node_connections,
+                                               balance_keys, block_number,
+                                               max_workers)
+    return TokenBalances(block_number, dict(zip(balance_keys, balances)))
+
+
+def check_transfer_balance(blockchain: api.Blockchain,
+                           account_address: api.BlockchainAddress,
+                           token_symbol: api.TokenSymbol, token_amount: int,
+                           service_node_fee: int) -> None:
+    """Check if an account's balances suffice for a token transfer
+    and its service node fee (which is paid in PAN). Both balances are
+    read at the same block.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The source blockchain of the token transfer.
+    account_address : api.BlockchainAddress
+        The address of the sender's account.
+    token_symbol : api.TokenSymbol
+        The symbol of the token to be transferred.
+    token_amount : int
+        The amount of tokens to be transferred in the token's smallest
+        subunit.
+    service_node_fee : int
+        The service node fee in the smallest subunit of PAN.
+
+    Raises
+    ------
+    InsufficientBalanceError
+        If a balance does not suffice.
+    ClientCliError
+        If a balance cannot be read.
+    Exception
+        If the blockchain nodes cannot be queried.
+
+    """
+    required_amounts = {token_symbol.lower(): token_amount}
+    required_amounts[TOKEN_SYMBOL_PAN] = \
+        required_amounts.get(TOKEN_SYMBOL_PAN, 0) + service_node_fee
+    token_addresses = {
+        required_token_symbol: get_token_address(
+            blockchain, api.TokenSymbol(required_token_symbol))
+        for required_token_symbol in required_amounts
+    }
+    token_balances = read_token_balances(blockchain,
+                                         list(token_addresses.values()),
+                                         [account_address])
+    for required_token_symbol, required_amount in required_amounts.items():
+        balance = token_balances.get_balance(
+            token_addresses[required_token_symbol], account_address)
+        if balance < required_amount:
+            required_token_symbol = api.TokenSymbol(required_token_symbol)
+            available = convert_amount_to_main_unit(blockchain,
+                                                    required_token_symbol,
+                                                    balance)
+            required = convert_amount_to_main_unit(blockchain,
+                                                   required_token_symbol,
+                                                   required_amount)
+            raise InsufficientBalanceError(
+                f'insufficient {required_token_symbol.upper()} balance on '
+                f'{blockchain.name} ({available} available, {required} '
+                'required)')
+
+
+def follow_token_balance(
+        blockchain: api.Blockchain, token_symbol: api.TokenSymbol,
+        account_address: api.BlockchainAddress,
+        poll_interval: typing.Optional[float] = None) \
+        -> typing.Iterator[BalanceChange]:
+    """Follow an account's token balance. The balance is read only
+    once; afterwards, only the token's Transfer events from or to the
+    account are queried from new blocks and applied to it. Only blocks
+    with the configured number of confirmations are taken into account
+    so that the followed balance is not affected by chain
+    reorganizations.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain of the account.
+    token_symbol : api.TokenSymbol
+        The symbol of the token.
+    account_address : api.BlockchainAddress
+        The address of the account.
+    poll_interval : float, optional
+        The number of seconds to wait between two queries for new
+        blocks (default: the blockchain's average block time).
+
+    Yields
+    ------
+    BalanceChange
+        The initial balance (with a balance change of zero) and
+        afterwards each changed balance.
+
+    Raises
+    ------
+    ClientCliError
+        If the token symbol is unknown on the blockchain.
+    Exception
+        If the initial balance cannot be read. Failures of the
+        subsequent event queries are logged and retried.
+
+    """
+    blockchain_config = get_library_blockchain_config(blockchain)
+    if poll_interval is None:
+        poll_interval = blockchain_config['average_block_time']
+    confirmations = blockchain_config['confirmations']
+    blocks_per_query = blockchain_config['blocks_per_query']
+    token_address = get_token_address(blockchain, token_symbol)
+    node_connections = get_blockchain_utilities(
+        blockchain).create_node_connections()
+    token_contract = _create_token_contract(blockchain, token_address,
+                                            node_connections)
+    block_number = _read_confirmed_block_number(node_connections,
+                                                confirmations)
+    balance = token_contract.functions.balanceOf(account_address).call(
+        block_identifier=block_number).get()
+    yield BalanceChange(block_number, balance, 0)
+    while True:
+        time.sleep(poll_interval)
+        try:
+            to_block_number = _read_confirmed_block_number(
+                node_connections, confirmations)
+            if to_block_number <= block_number:
+                continue
+            balance_change = _read_balance_change(token_contract,
+                                                  account_address,
+                                                  block_number + 1,
+                                                  to_block_number,
+                                                  blocks_per_query)
+        except Exception:
+            _logger.warning('unable to read the token transfers of an account',
+                            exc_info=True)
+            continue
+        block_number = to_block_number
+        if balance_change != 0:
+            balance += balance_change
+            yield BalanceChange(block_number, balance, balance_change)
+
+
+def _create_token_contract(
+        blockchain: api.Blockchain, token_address: api.BlockchainAddress,
+        node_connections: NodeConnections) -> NodeConnections.Wrapper:
+    protocol_version = get_blockchain_client(blockchain).protocol_version
+    return get_blockchain_utilities(blockchain).create_contract(
+        token_address,
+        VersionedContractAbi(ContractAbi.PANTOS_TOKEN, protocol_version),
+        node_connections)
+
+
+def _is_multicall_available(node_connections: NodeConnections,
+                            block_number: int) -> bool:
+    code = node_connections.eth.get_code(_MULTICALL_ADDRESS,
+                                         block_number).get()
+    return len(code) > 0
+
+
+def _read_balances_multicall(node_connections: NodeConnections,
+                             balance_keys: typing.List[
+                                 typing.Tuple[api.BlockchainAddress,
+                                              api.BlockchainAddress]],
+                             block_number: int) -> typing.List[int]:
+    multicall_contract = node_connections.eth.contract(
+        address=_MULTICALL_ADDRESS, abi=_MULTICALL_ABI)
+    calls = [
+        (token_address, True,
+         _BALANCE_OF_SELECTOR + _codec.encode(['address'], [account_address]))
+        for token_address, account_address in balance_keys
+    ]
+    results = multicall_contract.functions.aggregate3(calls).call(
+        block_identifier=block_number).get()
+    balances = []
+    for (token_address,
+         account_address), (success,
+                            return_data) in zip(balance_keys, results):
+        # Each call may fail individually (e.g. for a non-token address)
+        if not success or len(return_data) != 32:
+            raise _create_balance_error(token_address, account_address)
+        balances.append(_codec.decode(['uint256'], return_data)[0])
+    return balances
+
+
+def _read_balances_individually(blockchain: api.Blockchain,
+                                node_connections: NodeConnections,
+                                balance_keys: typing.List[typing.Tuple[
+                                    api.BlockchainAddress,
+                                    api.BlockchainAddress]], block_number: int,
+                                max_workers: int) -> typing.List[int]:
+    token_contracts = {
+        token_address: _create_token_contract(blockchain, token_address,
+                                              node_connections)
+        for token_address in
+        {token_address
+         for token_address, _ in balance_keys}
+    }
+
+    def read_balance(
+        balance_key: typing.Tuple[api.BlockchainAddress, api.BlockchainAddress]
+    ) -> int:
+        token_address, account_address = balance_key
+        try:
+            return token_contracts[token_address].functions.balanceOf(
+                account_address).call(block_identifier=block_number).get()
+        except Exception:
+            raise _create_balance_error(token_address, account_address)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        return list(executor.map(read_balance, balance_keys))
+
+
+def _create_balance_error(
+        token_address: api.BlockchainAddress,
+        account_address: api.BlockchainAddress) -> ClientCliError:
+    return ClientCliError(f'unable to read the balance of the token '
+                          f'{token_address} of the account {account_address}')
+
+
+def _read_confirmed_block_number(node_connections: NodeConnections,
+                                 confirmations: int) -> int:
+    block_number = node_connections.eth.get_block_number().get_minimum_result()
+    return max(block_number - confirmations, 0)
+
+
+def _read_balance_change(token_contract: NodeConnections.Wrapper,
+                         account_address: api.BlockchainAddress,
+                         from_block_number: int, to_block_number: int,
+                         blocks_per_query: int) -> int:
+    balance_change = 0
+    for from_block_number_ in range(from_block_number, to_block_number + 1,
+                                    blocks_per_query):
+        to_block_number_ = min(from_block_number_ + blocks_per_query - 1,
+                               to_block_number)
+        for argument_name, sign in (('to', 1), ('from', -1)):
+            transfer_event_logs = token_contract.events.Transfer().get_logs(
+                fromBlock=from_block_number_, toBlock=to_block_number_,
+                argument_filters={
+                    argument_name: account_address
+                }).get()
+            balance_change += sign * sum(
+                transfer_event_log['args']['value']
+                for transfer_event_log in transfer_event_logs)
+    return balance_change
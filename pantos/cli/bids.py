@@ -0,0 +1,133 @@
+"""Module for retrieving service node bids.
+
+"""
+import concurrent.futures
+import logging
+import time
+import typing
+
+from pantos.client.library import api
+from pantos.client.library.blockchains import BlockchainClient
+from pantos.common.servicenodes import ServiceNodeClient
+
+from pantos.cli.blockchains import get_blockchain_client
+from pantos.cli.blockchains import get_service_node_timeout
+from pantos.cli.nodes import get_service_node_addresses
+from pantos.cli.nodes import is_service_node_available
+from pantos.cli.nodes import record_service_node_failure
+from pantos.cli.nodes import record_service_node_success
+
+_logger = logging.getLogger(__name__)
+
+
+def stream_service_node_bids(
+        source_blockchain: api.Blockchain,
+        destination_blockchain: api.Blockchain,
+        deadline: typing.Optional[float] = None) \
+        -> typing.Iterator[typing.Tuple[api.BlockchainAddress,
+                                        typing.List[api.ServiceNodeBid]]]:
+    """Retrieve the service node bids for token transfers, yielding the
+    bids of each service node as soon as they arrive. All registered
+    service nodes are queried concurrently, and each of them is given
+    at most the configured service node timeout to answer. Service
+    nodes that fail to answer in time are skipped, as are service nodes
+    known to be unavailable (see is_service_node_available). The
+    outcome of each request is recorded in the service node's health
+    record.
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the token transfers.
+    destination_blockchain : api.Blockchain
+        The destination blockchain of the token transfers.
+    deadline : float, optional
+        The number of seconds after which the remaining service nodes
+        are no longer waited for, provided that at least one service
+        node has answered with bids (default: all service nodes are
+        waited for).
+
+    Yields
+    ------
+    tuple of api.BlockchainAddress and list of api.ServiceNodeBid
+        The address of a service node and its bids (with the fees in
+        the smallest subunit of PAN), in the order of arrival.
+
+    Raises
+    ------
+    ClientCliError
+        If the registered service nodes cannot be read.
+
+    """
+    blockchain_client = get_blockchain_client(source_blockchain)
+    available_service_node_addresses = []
+    for service_node_address in get_service_node_addresses(source_blockchain):
+        if is_service_node_available(source_blockchain, service_node_address):
+            available_service_node_addresses.append(service_node_address)
+        else:
+            _logger.info('skipping the unavailable service node %s',
+                         service_node_address)
+    if len(available_service_node_addresses) == 0:
+        return
+    timeout = get_service_node_timeout()
+    start_time = time.monotonic()
+    executor = concurrent.futures.ThreadPoolExecutor(
+        len(available_service_node_addresses))
+    try:
+        future_to_service_node_address = {}
+        for service_node_address in available_service_node_addresses:
+            future = executor.submit(_retrieve_service_node_bids,
+                                     blockchain_client, source_blockchain,
+                                     destination_blockchain,
+                                     service_node_address, timeout)
+            future_to_service_node_address[future] = service_node_address
+        pending = set(future_to_service_node_address)
+        bids_received = False
+        while len(pending) > 0:
+            wait_until = start_time + timeout
+            if deadline is not None and bids_received:
+                wait_until = min(wait_until, start_time + deadline)
+            remaining_time = wait_until - time.monotonic()
+            if remaining_time <= 0:
+                break
+            done, pending = concurrent.futures.wait(
+                pending, remaining_time, concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                service_node_address = future_to_service_node_address[future]
+                try:
+                    service_node_bids = future.result()
+                except Exception:
+                    _logger.warning(
+                        'unable to retrieve the bids of the service node %s',
+                        service_node_address, exc_info=True)
+                    continue
+                if len(service_node_bids) > 0:
+                    bids_received = True
+                yield service_node_address, service_node_bids
+        for future in pending:
+            _logger.info('the service node %s did not answer in time',
+                         future_to_service_node_address[future])
+    finally:
+        # Do not wait for the service nodes that have not answered yet
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _retrieve_service_node_bids(
+        blockchain_client: BlockchainClient, source_blockchain: api.Blockchain,
+        destination_blockchain: api.Blockchain,
+        service_node_address: api.BlockchainAddress,
+        timeout: float) -> typing.List[api.ServiceNodeBid]:
+    service_node_url = blockchain_client.read_service_node_url(
+        service_node_address)
+    start_time = time.perf_counter()
+    try:
+        service_node_bids = ServiceNodeClient().bids(service_node_url,
+                                                     source_blockchain,
+                                                     destination_blockchain,
+                                                     timeout)
+    except Exception:
+        record_service_node_failure(source_blockchain, service_node_address)
+        raise
+    record_service_node_success(source_blockchain, service_node_address,
+                                time.perf_counter() - start_time)
+    return service_node_bids
@@ -0,0 +1,154 @@
+"""Module for the Client CLI's direct access to blockchain clients and
+the client library's configuration.
+
+"""
+import typing
+
+from pantos.client.library import configuration as library_configuration
+from pantos.client.library import initialize_library
+from pantos.client.library.blockchains import BlockchainClient
+from pantos.client.library.blockchains import \
+    get_blockchain_client as get_library_blockchain_client
+from pantos.common.blockchains.base import Blockchain
+from pantos.common.blockchains.base import BlockchainUtilities
+from pantos.common.blockchains.factory import \
+    get_blockchain_utilities as get_common_blockchain_utilities
+from pantos.common.types import BlockchainAddress
+from pantos.common.types import PrivateKey
+
+
+def get_blockchain_client(blockchain: Blockchain) -> BlockchainClient:
+    """Get the client library's blockchain client for a blockchain,
+    initializing the client library first if necessary.
+
+    Parameters
+    ----------
+    blockchain : Blockchain
+        The blockchain to get the client for.
+
+    Returns
+    -------
+    BlockchainClient
+        The blockchain-specific client.
+
+    Raises
+    ------
+    pantos.client.library.exceptions.ClientLibraryError
+        If the client library or the blockchain client cannot be
+        initialized.
+
+    """
+    initialize_library(False)
+    return get_library_blockchain_client(blockchain)
+
+
+def get_blockchain_utilities(blockchain: Blockchain) -> BlockchainUtilities:
+    """Get the common blockchain utilities for a blockchain,
+    initializing the client library and the blockchain's utilities
+    first if necessary.
+
+    Parameters
+    ----------
+    blockchain : Blockchain
+        The blockchain to get the utilities for.
+
+    Returns
+    -------
+    BlockchainUtilities
+        The blockchain-specific utilities.
+
+    Raises
+    ------
+    pantos.client.library.exceptions.ClientLibraryError
+        If the client library or the blockchain utilities cannot be
+        initialized.
+
+    """
+    # The blockchain utilities are initialized by the client library's
+    # blockchain client
+    get_blockchain_client(blockchain)
+    return get_common_blockchain_utilities(blockchain)
+
+
+def get_account_address(blockchain: Blockchain,
+                        private_key: PrivateKey) -> BlockchainAddress:
+    """Get the address of a blockchain account.
+
+    Parameters
+    ----------
+    blockchain : Blockchain
+        The blockchain of the account.
+    private_key : PrivateKey
+        The unencrypted private key of the account.
+
+    Returns
+    -------
+    BlockchainAddress
+        The account's address.
+
+    """
+    return BlockchainAddress(
+        get_blockchain_utilities(blockchain).get_address(private_key))
+
+
+def get_library_blockchain_config(
+        blockchain: Blockchain) -> typing.Dict[str, typing.Any]:
+    """Get the client library's configuration dictionary of a
+    blockchain, initializing the client library first if necessary.
+
+    Parameters
+    ----------
+    blockchain : Blockchain
+        The blockchain to get the configuration for.
+
+    Returns
+    -------
+    dict
+        The blockchain-specific client library configuration.
+
+    Raises
+    ------
+    pantos.client.library.exceptions.ClientLibraryError
+        If the client library cannot be initialized.
+
+    """
+    initialize_library(False)
+    return library_configuration.get_blockchain_config(blockchain)
+
+
+def get_protocol_version() -> str:
+    """Get the configured (testnet) Pantos protocol version,
+    initializing the client library first if necessary.
+
+    Returns
+    -------
+    str
+        The protocol version.
+
+    Raises
+    ------
+    pantos.client.library.exceptions.ClientLibraryError
+        If the client library cannot be initialized.
+
+    """
+    initialize_library(False)
+    return library_configuration.config['protocol']['testnet']
+
+
+def get_service_node_timeout() -> float:
+    """Get the configured timeout for requests to service nodes,
+    initializing the client library first if necessary.
+
+    Returns
+    -------
+    float
+        The timeout in seconds.
+
+    Raises
+    ------
+    pantos.client.library.exceptions.ClientLibraryError
+        If the client library cannot be initialized.
+
+    """
+    initialize_library(False)
+    return library_configuration.config['service_nodes']['timeout']
@@ -0,0 +1,308 @@
+"""Module for the Client CLI's persistent local cache.
+
+"""
+import contextlib
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import typing
+import uuid
+
+from pantos.client.library import api
+from pantos.common.servicenodes import ServiceNodeTransferStatus
+
+from pantos.cli.configuration import get_cache_config
+
+_TRANSFER_STATUSES_DIRECTORY: typing.Final[str] = 'transfer-statuses'
+"""Cache subdirectory for the finalized token transfer statuses."""
+
+_TRANSFER_STATUS_ADDRESS_FIELDS: typing.Final[typing.Tuple[str, ...]] = (
+    'sender_address', 'recipient_address', 'source_token_address',
+    'destination_token_address')
+"""Token transfer status fields holding a single blockchain address."""
+
+_logger = logging.getLogger(__name__)
+
+
+def is_cache_enabled() -> bool:
+    """Determine if the local cache is enabled.
+
+    Returns
+    -------
+    bool
+        True if the local cache is enabled.
+
+    """
+    return get_cache_config()['enabled']
+
+
+def get_cache_directory() -> pathlib.Path:
+    """Get the directory of the local cache.
+
+    Returns
+    -------
+    pathlib.Path
+        The (user-expanded) cache directory.
+
+    """
+    return pathlib.Path(get_cache_config()['directory']).expanduser()
+
+
+@contextlib.contextmanager
+def disable_cache() -> typing.Iterator[None]:
+    """Disable the local cache temporarily, so that nothing is read
+    from or written to it (e.g. no service node health records).
+
+    """
+    cache_config = get_cache_config()
+    enabled = cache_config['enabled']
+    cache_config['enabled'] = False
+    try:
+        yield
+    finally:
+        cache_config['enabled'] = enabled
+
+
+def get_rpc_responses_max_size() -> int:
+    """Get the maximum size of the cached blockchain RPC responses.
+
+    Returns
+    -------
+    int
+        The maximum size in megabytes (0 if the responses are not to be
+        cached).
+
+    """
+    return get_cache_config()['rpc_responses_max_size']
+
+
+def read_cache_entry(relative_path: pathlib.PurePath) -> typing.Any:
+    """Read a JSON-encoded entry from the local cache.
+
+    Parameters
+    ----------
+    relative_path : pathlib.PurePath
+        The path of the cache entry relative to the cache directory.
+
+    Returns
+    -------
+    Any
+        The decoded cache entry, or None if the cache is disabled or
+        the entry does not exist or cannot be read.
+
+    """
+    text = read_cache_text(relative_path)
+    if text is None:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        _logger.warning(f'unable to decode the cache entry {relative_path}',
+                        exc_info=True)
+        return None
+
+
+def write_cache_entry(relative_path: pathlib.PurePath,
+                      entry: typing.Any) -> None:
+    """Write a JSON-encoded entry to the local cache. The entry is
+    written atomically, and failures are logged but not raised since
+    the cache must never prevent a command from completing.
+
+    Parameters
+    ----------
+    relative_path : pathlib.PurePath
+        The path of the cache entry relative to the cache directory.
+    entry : Any
+        The JSON-serializable cache entry.
+
+    """
+    try:
+        text = json.dumps(entry, separators=(',', ':'))
+    except (TypeError, ValueError):
+        _logger.warning(f'unable to encode the cache entry {relative_path}',
+                        exc_info=True)
+        return
+    write_cache_text(relative_path, text)
+
+
+def read_cache_text(relative_path: pathlib.PurePath) -> typing.Optional[str]:
+    """Read a plain-text entry from the local cache.
+
+    Parameters
+    ----------
+    relative_path : pathlib.PurePath
+        The path of the cache entry relative to the cache directory.
+
+    Returns
+    -------
+    str or None
+        The cache entry, or None if the cache is disabled or the entry
+        does not exist or cannot be read.
+
+    """
+    if not is_cache_enabled():
+        return None
+    path = get_cache_directory() / relative_path
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        _logger.warning(f'unable to read the cache entry {path}',
+                        exc_info=True)
+        return None
+
+
+def write_cache_text(relative_path: pathlib.PurePath, text: str) -> None:
+    """Write a plain-text entry to the local cache. The entry is written
+    atomically, and failures are logged but not raised.
+
+    Parameters
+    ----------
+    relative_path : pathlib.PurePath
+        The path of the cache entry relative to the cache directory.
+    text : str
+        The cache entry.
+
+    """
+    if not is_cache_enabled():
+        return
+    path = get_cache_directory() / relative_path
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=path.parent,
+                                         prefix=f'.{path.name}.',
+                                         delete=False) as temporary_file:
+            temporary_file.write(text)
+        os.replace(temporary_file.name, path)
+    except OSError:
+        _logger.warning(f'unable to write the cache entry {path}',
+                        exc_info=True)
+
+
+def is_final_transfer_status(transfer_status: api.TokenTransferStatus) -> bool:
+    """Determine if a token transfer status is final, i.e. if it can
+    never change again.
+
+    Parameters
+    ----------
+    transfer_status : api.TokenTransferStatus
+        The token transfer status.
+
+    Returns
+    -------
+    bool
+        True if the token transfer is confirmed on both the source and
+        the destination blockchain.
+
+    """
+    return (transfer_status.source_transfer_status
+            is ServiceNodeTransferStatus.CONFIRMED
+            and transfer_status.destination_transfer_status
+            is api.DestinationTransferStatus.CONFIRMED)
+
+
+def load_transfer_status(
+        source_blockchain: api.Blockchain,
+        service_node_address: api.BlockchainAddress,
+        task_id: uuid.UUID) -> typing.Optional[api.TokenTransferStatus]:
+    """Load a finalized token transfer status from the local cache.
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the token transfer.
+    service_node_address : api.BlockchainAddress
+        The address of the service node that processed the token
+        transfer.
+    task_id : uuid.UUID
+        The service node task ID of the token transfer.
+
+    Returns
+    -------
+    api.TokenTransferStatus or None
+        The cached token transfer status, or None if it is not cached.
+
+    """
+    entry = read_cache_entry(
+        _get_transfer_status_path(source_blockchain, service_node_address,
+                                  task_id))
+    if entry is None:
+        return None
+    try:
+        return _decode_transfer_status(entry)
+    except (KeyError, TypeError, ValueError):
+        _logger.warning('invalid cached token transfer status', exc_info=True)
+        return None
+
+
+def store_transfer_status(source_blockchain: api.Blockchain,
+                          service_node_address: api.BlockchainAddress,
+                          task_id: uuid.UUID,
+                          transfer_status: api.TokenTransferStatus) -> None:
+    """Store a token transfer status in the local cache if it is final.
+    Non-final token transfer statuses are ignored.
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the token transfer.
+    service_node_address : api.BlockchainAddress
+        The address of the service node that processed the token
+        transfer.
+    task_id : uuid.UUID
+        The service node task ID of the token transfer.
+    transfer_status : api.TokenTransferStatus
+        The token transfer status to be stored.
+
+    """
+    if not is_final_transfer_status(transfer_status):
+        return
+    write_cache_entry(
+        _get_transfer_status_path(source_blockchain, service_node_address,
+                                  task_id),
+        _encode_transfer_status(transfer_status))
+
+
+def _get_transfer_status_path(source_blockchain: api.Blockchain,
+                              service_node_address: api.BlockchainAddress,
+                              task_id: uuid.UUID) -> pathlib.PurePath:
+    return pathlib.PurePath(_TRANSFER_STATUSES_DIRECTORY,
+                            source_blockchain.name.lower(),
+                            service_node_address.lower(), f'{task_id}.json')
+
+
+def _encode_transfer_status(
+        transfer_status: api.TokenTransferStatus) -> typing.Any:
+    entry = dataclasses.asdict(transfer_status)
+    entry['destination_blockchain'] = \
+        transfer_status.destination_blockchain.name
+    entry['source_transfer_status'] = \
+        transfer_status.source_transfer_status.name
+    entry['destination_transfer_status'] = \
+        transfer_status.destination_transfer_status.name
+    return entry
+
+
+def _decode_transfer_status(entry: typing.Any) -> api.TokenTransferStatus:
+    transfer_status = api.TokenTransferStatus(**entry)
+    transfer_status.destination_blockchain = api.Blockchain[
+        entry['destination_blockchain']]
+    transfer_status.source_transfer_status = ServiceNodeTransferStatus[
+        entry['source_transfer_status']]
+    transfer_status.destination_transfer_status = \
+        api.DestinationTransferStatus[entry['destination_transfer_status']]
+    for address_field in _TRANSFER_STATUS_ADDRESS_FIELDS:
+        address = getattr(transfer_status, address_field)
+        if address is not None:
+            setattr(transfer_status, address_field,
+                    api.BlockchainAddress(address))
+    if transfer_status.signer_addresses is not None:
+        transfer_status.signer_addresses = [
+            api.BlockchainAddress(signer_address)
+            for signer_address in transfer_status.signer_addresses
+        ]
+    return transfer_status
@@ -0,0 +1,346 @@
+"""Module for the Client CLI's shell completion.
+
+The generated completion scripts contain the static structure of the
+command line (commands, options, and positional arguments) and read the
+dynamic completion data (active blockchains, token symbols, and recently
+used service nodes and task IDs) from a small plain-text file in the
+local cache, so that the completion never has to start the CLI itself.
+
+"""
+import argparse
+import pathlib
+import shlex
+import typing
+import uuid
+
+from pantos.client.library import api
+
+from pantos.cli.cache import get_cache_directory
+from pantos.cli.cache import read_cache_text
+from pantos.cli.cache import write_cache_text
+
+ServiceNodeTask = typing.Tuple[api.BlockchainAddress, uuid.UUID]
+"""Pair of a service node address and a service node task ID."""
+
+SHELLS: typing.Final[typing.Tuple[str, ...]] = ('bash', 'zsh')
+"""Shells supported by the completion scripts."""
+
+_COMPLETION_DATA_PATH: typing.Final[pathlib.PurePath] = pathlib.PurePath(
+    'completion')
+"""Cache path of the completion data file."""
+
+_MAX_RECENT_ENTRIES: typing.Final[int] = 20
+"""Maximum number of remembered service nodes and task IDs."""
+
+_DATA_KIND_BLOCKCHAINS: typing.Final[str] = 'blockchains'
+_DATA_KIND_TOKENS: typing.Final[str] = 'tokens'
+_DATA_KIND_SERVICE_NODES: typing.Final[str] = 'service_nodes'
+_DATA_KIND_TASKS: typing.Final[str] = 'tasks'
+_DATA_KIND_FILES: typing.Final[str] = 'files'
+
+_ARGUMENT_DATA_KINDS: typing.Final[typing.Dict[str, str]] = {
+    'blockchain': _DATA_KIND_BLOCKCHAINS,
+    'blockchains': _DATA_KIND_BLOCKCHAINS,
+    'source': _DATA_KIND_BLOCKCHAINS,
+    'destination': _DATA_KIND_BLOCKCHAINS,
+    'token': _DATA_KIND_TOKENS,
+    'service': _DATA_KIND_SERVICE_NODES,
+    'task': _DATA_KIND_TASKS
+}
+"""Completion data kinds of command line arguments (by destination)."""
+
+_PROGRAM_NAMES: typing.Final[typing.Tuple[str, ...]] = ('pantos-client',
+                                                        'pantos-cli')
+"""Program names the completion is registered for."""
+
+_BASH_SCRIPT_TEMPLATE: typing.Final[str] = '''\
+_pantos_client_data_file={data_file}
+
+_pantos_client_complete() {{
+    local cur=${{COMP_WORDS[COMP_CWORD]}} key values
+    case $1 in
+        '')
+            ;;
+        files)
+            COMPREPLY=($(compgen -f -- "$cur"))
+            ;;
+        words:*)
+            COMPREPLY=($(compgen -W "${{1#words:}}" -- "$cur"))
+            ;;
+        *)
+            [[ -r $_pantos_client_data_file ]] || return 0
+            while read -r key values; do
+                if [[ $key == "$1" ]]; then
+                    COMPREPLY=($(compgen -W "$values" -- "$cur"))
+                    return 0
+                fi
+            done < "$_pantos_client_data_file"
+            ;;
+    esac
+}}
+
+_pantos_client_command() {{
+    case $1 in
+{subcommands}
+        *) subcommands='' ;;
+    esac
+    case $1 in
+{options}
+        *) options='-h --help' ;;
+    esac
+}}
+
+_pantos_client_option() {{
+    case "$1 $2" in
+{option_values}
+        *) option_values=() ;;
+    esac
+}}
+
+_pantos_client_positional() {{
+    case "$1 $2" in
+{positionals}
+        *) kind='' ;;
+    esac
+}}
+
+_pantos_client() {{
+    local cur=${{COMP_WORDS[COMP_CWORD]}} command='' index=0 i word
+    local kind='' subcommands='' options=''
+    local -a option_values=() pending=()
+    COMPREPLY=()
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        word=${{COMP_WORDS[i]}}
+        if ((${{#pending[@]}} > 0)); then
+            pending=("${{pending[@]:1}}")
+        elif [[ -z $command ]]; then
+            [[ $word == -* ]] || command=$word
+        elif [[ $word == -* ]]; then
+            _pantos_client_option "$command" "$word"
+            pending=("${{option_values[@]}}")
+        else
+            _pantos_client_command "$command"
+            if ((index == 0)) && [[ -n $subcommands ]]; then
+                command="$command $word"
+            else
+                ((index++))
+            fi
+        fi
+    done
+    if ((${{#pending[@]}} > 0)); then
+        _pantos_client_complete "${{pending[0]}}"
+    elif [[ -z $command ]]; then
+        _pantos_client_complete 'words:{commands} -h --help'
+    else
+        _pantos_client_command "$command"
+        if [[ $cur == -* ]]; then
+            _pantos_client_complete "words:$options"
+        elif ((index == 0)) && [[ -n $subcommands ]]; then
+            _pantos_client_complete "words:$subcommands"
+        else
+            _pantos_client_positional "$command" $((index + 1))
+            _pantos_client_complete "$kind"
+        fi
+    fi
+}}
+
+complete -F _pantos_client {program_names}
+'''
+"""Template of the bash completion script."""
+
+_ZSH_SCRIPT_PREAMBLE: typing.Final[str] = '''\
+autoload -U +X bashcompinit && bashcompinit
+
+'''
+"""Preamble of the zsh completion script (which reuses the bash
+completion script via zsh's bash completion emulation)."""
+
+
+def create_completion_script(parser: argparse.ArgumentParser,
+                             shell: str) -> str:
+    """Create a shell completion script for the command line of the
+    Client CLI.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The Client CLI's argument parser.
+    shell : str
+        The shell to create the completion script for (one of SHELLS).
+
+    Returns
+    -------
+    str
+        The shell completion script.
+
+    """
+    assert shell in SHELLS
+    subcommands: typing.List[str] = []
+    options: typing.List[str] = []
+    option_values: typing.List[str] = []
+    positionals: typing.List[str] = []
+    commands = _get_subparsers(parser)
+    for command, command_parser in commands.items():
+        _add_command_cases(command, command_parser, subcommands, options,
+                           option_values, positionals)
+    script = _BASH_SCRIPT_TEMPLATE.format(
+        data_file=shlex.quote(str(get_completion_data_path())),
+        subcommands='\n'.join(subcommands), options='\n'.join(options),
+        option_values='\n'.join(option_values),
+        positionals='\n'.join(positionals), commands=' '.join(commands),
+        program_names=' '.join(_PROGRAM_NAMES))
+    if shell == 'zsh':
+        script = _ZSH_SCRIPT_PREAMBLE + script
+    return script
+
+
+def get_completion_data_path() -> pathlib.Path:
+    """Get the path of the completion data file.
+
+    Returns
+    -------
+    pathlib.Path
+        The path of the completion data file in the local cache.
+
+    """
+    return get_cache_directory() / _COMPLETION_DATA_PATH
+
+
+def read_completion_data() -> typing.Dict[str, typing.List[str]]:
+    """Read the completion data file.
+
+    Returns
+    -------
+    dict
+        The completion words by data kind (empty if the completion data
+        file does not exist or the cache is disabled).
+
+    """
+    text = read_cache_text(_COMPLETION_DATA_PATH)
+    if text is None:
+        return {}
+    completion_data = {}
+    for line in text.splitlines():
+        if line.strip():
+            kind, *words = line.split()
+            completion_data[kind] = words
+    return completion_data
+
+
+def update_completion_data(
+    blockchains: typing.Optional[typing.List[api.Blockchain]] = None,
+    token_symbols: typing.Optional[typing.List[api.TokenSymbol]] = None,
+    service_node_tasks: typing.Optional[typing.List[ServiceNodeTask]] = None
+) -> None:
+    """Update the completion data file. Recently used service nodes and
+    task IDs are added in front of the previously remembered ones.
+
+    Parameters
+    ----------
+    blockchains : list of api.Blockchain, optional
+        The active blockchains (unchanged if not provided).
+    token_symbols : list of api.TokenSymbol, optional
+        The available token symbols (unchanged if not provided).
+    service_node_tasks : list of tuple of api.BlockchainAddress and
+            uuid.UUID, optional
+        Recently used service nodes with the corresponding task IDs
+        (in chronological order).
+
+    """
+    if service_node_tasks is None:
+        service_node_tasks = []
+    completion_data = read_completion_data()
+    if blockchains is not None:
+        completion_data[_DATA_KIND_BLOCKCHAINS] = [
+            blockchain.name.lower() for blockchain in blockchains
+        ]
+    if token_symbols is not None:
+        completion_data[_DATA_KIND_TOKENS] = sorted(
+            {token_symbol.lower()
+             for token_symbol in token_symbols})
+    _add_recent_words(completion_data, _DATA_KIND_SERVICE_NODES, [
+        str(service_node_address)
+        for service_node_address, _ in service_node_tasks
+    ])
+    _add_recent_words(completion_data, _DATA_KIND_TASKS,
+                      [str(task_id) for _, task_id in service_node_tasks])
+    write_cache_text(
+        _COMPLETION_DATA_PATH,
+        ''.join(f'{" ".join([kind] + words)}\n'
+                for kind, words in completion_data.items()))
+
+
+def _add_recent_words(completion_data: typing.Dict[str, typing.List[str]],
+                      kind: str, words: typing.List[str]) -> None:
+    if len(words) == 0:
+        return
+    # Most recent words first, without duplicates
+    recent_words = dict.fromkeys(words[::-1] + completion_data.get(kind, []))
+    completion_data[kind] = list(recent_words)[:_MAX_RECENT_ENTRIES]
+
+
+def _get_subparsers(
+    parser: argparse.ArgumentParser
+) -> typing.Dict[str, argparse.ArgumentParser]:
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return dict(action.choices)
+    return {}
+
+
+def _get_data_kind(action: argparse.Action) -> str:
+    if action.dest in _ARGUMENT_DATA_KINDS:
+        return _ARGUMENT_DATA_KINDS[action.dest]
+    if action.type is pathlib.Path:
+        return _DATA_KIND_FILES
+    if action.choices is not None:
+        return 'words:' + ' '.join(str(choice) for choice in action.choices)
+    return ''
+
+
+def _add_command_cases(command: str, command_parser: argparse.ArgumentParser,
+                       subcommands: typing.List[str],
+                       options: typing.List[str],
+                       option_values: typing.List[str],
+                       positionals: typing.List[str]) -> None:
+    nested_commands = _get_subparsers(command_parser)
+    if len(nested_commands) > 0:
+        subcommands.append(f"        {shlex.quote(command)}) subcommands="
+                           f"{shlex.quote(' '.join(nested_commands))} ;;")
+        for nested_command, nested_parser in nested_commands.items():
+            _add_command_cases(f'{command} {nested_command}', nested_parser,
+                               subcommands, options, option_values,
+                               positionals)
+    option_strings: typing.List[str] = []
+    position = 1
+    for action in command_parser._actions:
+        if len(action.option_strings) > 0:
+            option_strings += action.option_strings
+            if action.nargs == 0:
+                continue
+            number_values = (action.nargs
+                             if isinstance(action.nargs, int) else 1)
+            # Only the first value of an option is completed with data
+            values = ' '.join(
+                shlex.quote(value) for value in [_get_data_kind(action)] +
+                [''] * (number_values - 1))
+            patterns = '|'.join(
+                shlex.quote(f'{command} {option_string}')
+                for option_string in action.option_strings)
+            option_values.append(
+                f'        {patterns}) option_values=({values}) ;;')
+        elif (not isinstance(action, argparse._SubParsersAction)
+              and position > 0):
+            kind = shlex.quote(_get_data_kind(action))
+            if action.nargs in ('*', '+'):
+                # All remaining positional arguments are of the same kind
+                positionals.append(f"        {shlex.quote(command + ' ')}*) "
+                                   f"kind={kind} ;;")
+                position = 0
+            else:
+                positionals.append(
+                    f"        {shlex.quote(f'{command} {position}')}) "
+                    f"kind={kind} ;;")
+                position += 1
+    options.append(f'        {shlex.quote(command)}) options='
+                   f'{shlex.quote(" ".join(option_strings))} ;;')
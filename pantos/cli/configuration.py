@@ -21,6 +21,11 @@ _VALIDATION_SCHEMA_BLOCKCHAIN = {
             'type': 'boolean',
             'default': True
         },
+        'max_parallel_queries': {
+            'type': 'integer',
+            'min': 1,
+            'default': 4
+        },
         'keystore': {
             'type': 'dict',
             'schema': {
@@ -48,6 +53,42 @@ _VALIDATION_SCHEMA = {
             }
         }
     },
+    'cache': {
+        'type': 'dict',
+        'default': {},
+        'schema': {
+            'enabled': {
+                'type': 'boolean',
+                'default': True
+            },
+            'directory': {
+                'type': 'string',
+                'empty': False,
+                'default': '~/.cache/pantos/client-cli'
+            },
+            'rpc_responses_max_size': {
+                'type': 'integer',
+                'min': 0,
+                'default': 64
+            }
+        }
+    },
+    'service_nodes': {
+        'type': 'dict',
+        'default': {},
+        'schema': {
+            'failure_threshold': {
+                'type': 'integer',
+                'min': 1,
+                'default': 3
+            },
+            'retry_interval': {
+                'type': 'integer',
+                'min': 0,
+                'default': 300
+            }
+        }
+    },
     'blockchains': {
         'type': 'dict',
         'schema': dict(
@@ -76,6 +117,31 @@ def get_blockchain_config(
     return config['blockchains'][blockchain.name.lower()]
 
 
+def get_cache_config() -> typing.Dict[str, typing.Any]:
+    """Get the configuration dictionary of the local cache.
+
+    Returns
+    -------
+    dict
+        The cache configuration.
+
+    """
+    return config['cache']
+
+
+def get_service_nodes_config() -> typing.Dict[str, typing.Any]:
+    """Get the configuration dictionary of the service node health
+    tracking.
+
+    Returns
+    -------
+    dict
+        The service nodes configuration.
+
+    """
+    return config['service_nodes']
+
+
 def load_config(file_path: typing.Optional[str] = None,
                 reload: bool = True) -> None:
     """Load the configuration from a configuration file.
@@ -9,3 +9,11 @@ class ClientCliError(ClientError):
 
     """
     pass
+
+
+class InsufficientBalanceError(ClientCliError):
+    """Exception class for account balances that do not suffice for a
+    token transfer.
+
+    """
+    pass
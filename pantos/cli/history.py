@@ -0,0 +1,409 @@
+"""Module for the local index of Pantos token transfers.
+
+The Pantos Hub's TransferSucceeded and TransferFromSucceeded events of
+a source blockchain are ingested into an SQLite database in the local
+cache, indexed by sender, recipient, and token. For each blockchain and
+Pantos Hub, the last indexed block is stored as a checkpoint, so that
+subsequent updates only query the blocks added since. Only blocks with
+the configured number of confirmations are indexed, so that indexed
+transfers are never rolled back.
+
+"""
+import concurrent.futures
+import contextlib
+import dataclasses
+import logging
+import sqlite3
+import typing
+
+from pantos.client.library import api
+from pantos.common.blockchains.base import NodeConnections
+from pantos.common.blockchains.base import VersionedContractAbi
+from pantos.common.blockchains.enums import ContractAbi
+
+from pantos.cli.blockchains import get_blockchain_client
+from pantos.cli.blockchains import get_blockchain_utilities
+from pantos.cli.blockchains import get_library_blockchain_config
+from pantos.cli.cache import get_cache_directory
+from pantos.cli.cache import is_cache_enabled
+from pantos.cli.configuration import get_blockchain_config
+from pantos.cli.exceptions import ClientCliError
+
+_DATABASE_FILE_NAME: typing.Final[str] = 'transfer-index.sqlite3'
+"""Cache file name of the transfer index database."""
+
+_SCHEMA_VERSION: typing.Final[int] = 1
+"""Version of the transfer index database schema."""
+
+_SCHEMA: typing.Final[str] = '''
+CREATE TABLE IF NOT EXISTS transfers (
+    source_blockchain INTEGER NOT NULL,
+    transaction_id TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    source_transfer_id TEXT NOT NULL,
+    destination_blockchain INTEGER NOT NULL,
+    sender_address TEXT NOT NULL COLLATE NOCASE,
+    recipient_address TEXT NOT NULL COLLATE NOCASE,
+    source_token_address TEXT NOT NULL COLLATE NOCASE,
+    destination_token_address TEXT NOT NULL COLLATE NOCASE,
+    amount TEXT NOT NULL,
+    service_node_address TEXT NOT NULL,
+    fee TEXT NOT NULL,
+    PRIMARY KEY (source_blockchain, transaction_id, log_index)
+);
+CREATE INDEX IF NOT EXISTS transfers_sender
+    ON transfers (source_blockchain, sender_address, block_number);
+CREATE INDEX IF NOT EXISTS transfers_recipient
+    ON transfers (source_blockchain, recipient_address, block_number);
+CREATE INDEX IF NOT EXISTS transfers_token
+    ON transfers (source_blockchain, source_token_address, block_number);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    blockchain INTEGER NOT NULL,
+    hub_address TEXT NOT NULL COLLATE NOCASE,
+    block_number INTEGER NOT NULL,
+    PRIMARY KEY (blockchain, hub_address)
+);
+'''
+"""Schema of the transfer index database."""
+
+_TRANSFER_EVENT_NAMES: typing.Final[typing.Tuple[str, ...]] = (
+    'TransferSucceeded', 'TransferFromSucceeded')
+"""Pantos Hub events of token transfers from a source blockchain."""
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class IndexedTransfer:
+    """Token transfer from the local transfer index.
+
+    Attributes
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the transfer.
+    destination_blockchain : api.Blockchain
+        The destination blockchain of the transfer (the same as the
+        source blockchain for a single-chain transfer).
+    block_number : int
+        The number of the source blockchain block that includes the
+        transfer.
+    transaction_id : str
+        The ID of the transfer's source blockchain transaction.
+    source_transfer_id : int
+        The Pantos transfer ID on the source blockchain.
+    sender_address : api.BlockchainAddress
+        The address of the sender on the source blockchain.
+    recipient_address : api.BlockchainAddress
+        The address of the recipient on the destination blockchain.
+    source_token_address : api.BlockchainAddress
+        The address of the token on the source blockchain.
+    destination_token_address : api.BlockchainAddress
+        The address of the token on the destination blockchain.
+    amount : int
+        The transferred amount in the token's smallest subunit.
+    service_node_address : api.BlockchainAddress
+        The address of the service node that submitted the transfer.
+    fee : int
+        The service node fee in the smallest subunit of PAN.
+
+    """
+    source_blockchain: api.Blockchain
+    destination_blockchain: api.Blockchain
+    block_number: int
+    transaction_id: str
+    source_transfer_id: int
+    sender_address: api.BlockchainAddress
+    recipient_address: api.BlockchainAddress
+    source_token_address: api.BlockchainAddress
+    destination_token_address: api.BlockchainAddress
+    amount: int
+    service_node_address: api.BlockchainAddress
+    fee: int
+
+
+def update_transfer_index(blockchain: api.Blockchain,
+                          from_block_number: int = 0) -> typing.Optional[int]:
+    """Ingest the token transfers of the blocks added since the last
+    update into the local transfer index. The block range is split into
+    chunks of the blockchain's configured number of blocks per query,
+    which are queried in ascending order with at most the configured
+    number of parallel queries. The transfers of each batch of chunks
+    are stored together with the new checkpoint, so that an interrupted
+    update resumes where it stopped.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The source blockchain of the token transfers.
+    from_block_number : int, optional
+        The first block to index if the blockchain's Pantos Hub has not
+        been indexed yet (default: 0).
+
+    Returns
+    -------
+    int or None
+        The number of the last indexed block, or None if no block has
+        enough confirmations yet.
+
+    Raises
+    ------
+    ClientCliError
+        If the local cache is disabled or the token transfers cannot be
+        queried or stored.
+
+    """
+    library_blockchain_config = get_library_blockchain_config(blockchain)
+    hub_address = library_blockchain_config['hub']
+    try:
+        node_connections = get_blockchain_utilities(
+            blockchain).create_node_connections()
+        hub_contract = _create_hub_contract(blockchain, node_connections)
+        latest_block_number = \
+            node_connections.eth.get_block_number().get_minimum_result()
+    except Exception:
+        raise ClientCliError(
+            f'unable to connect to the blockchain nodes of {blockchain.name}')
+    to_block_number = (latest_block_number -
+                       library_blockchain_config['confirmations'])
+    blocks_per_query = library_blockchain_config['blocks_per_query']
+    max_parallel_queries = get_blockchain_config(
+        blockchain)['max_parallel_queries']
+
+    def query_blocks(chunk: typing.Tuple[int, int]) -> typing.List[typing.Any]:
+        transfer_event_logs = []
+        for event_name in _TRANSFER_EVENT_NAMES:
+            transfer_event_logs.extend(
+                getattr(hub_contract.events,
+                        event_name)().get_logs(fromBlock=chunk[0],
+                                               toBlock=chunk[1]).get())
+        return transfer_event_logs
+
+    with _connect_database() as connection:
+        checkpoint = _read_checkpoint(connection, blockchain, hub_address)
+        if checkpoint is not None:
+            from_block_number = checkpoint + 1
+        chunks = [
+            (from_block_number_,
+             min(from_block_number_ + blocks_per_query - 1,
+                 to_block_number)) for from_block_number_ in range(
+                     from_block_number, to_block_number + 1, blocks_per_query)
+        ]
+        with concurrent.futures.ThreadPoolExecutor(
+                max_parallel_queries) as executor:
+            for index in range(0, len(chunks), max_parallel_queries):
+                batch = chunks[index:index + max_parallel_queries]
+                try:
+                    transfer_event_logs = [
+                        transfer_event_log
+                        for chunk_event_logs in executor.map(
+                            query_blocks, batch)
+                        for transfer_event_log in chunk_event_logs
+                    ]
+                except Exception:
+                    raise ClientCliError(
+                        'unable to query the token transfers of blocks '
+                        f'{batch[0][0]} to {batch[-1][1]} on '
+                        f'{blockchain.name}')
+                _store_transfers(connection, blockchain, hub_address,
+                                 transfer_event_logs, batch[-1][1])
+                _logger.info(
+                    'indexed the token transfers of %s up to block '
+                    '%d', blockchain.name, batch[-1][1])
+        return _read_checkpoint(connection, blockchain, hub_address)
+
+
+def get_transfer_index_checkpoint(
+        blockchain: api.Blockchain) -> typing.Optional[int]:
+    """Get the number of the last block of a blockchain's Pantos Hub
+    that has been ingested into the local transfer index.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The source blockchain of the token transfers.
+
+    Returns
+    -------
+    int or None
+        The number of the last indexed block, or None if the
+        blockchain's Pantos Hub has not been indexed yet.
+
+    Raises
+    ------
+    ClientCliError
+        If the local cache is disabled or the transfer index cannot be
+        read.
+
+    """
+    hub_address = get_library_blockchain_config(blockchain)['hub']
+    with _connect_database() as connection:
+        return _read_checkpoint(connection, blockchain, hub_address)
+
+
+def find_indexed_transfers(
+        blockchain: api.Blockchain,
+        sender_address: typing.Optional[api.BlockchainAddress] = None,
+        recipient_address: typing.Optional[api.BlockchainAddress] = None,
+        token_address: typing.Optional[api.BlockchainAddress] = None,
+        limit: typing.Optional[int] = None) -> typing.List[IndexedTransfer]:
+    """Find token transfers in the local transfer index. Addresses are
+    compared case-insensitively.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The source blockchain of the token transfers.
+    sender_address : api.BlockchainAddress, optional
+        Only find the transfers of this sender.
+    recipient_address : api.BlockchainAddress, optional
+        Only find the transfers to this recipient.
+    token_address : api.BlockchainAddress, optional
+        Only find the transfers of this token (on the source
+        blockchain).
+    limit : int, optional
+        The maximum number of transfers to find (default: all).
+
+    Returns
+    -------
+    list of IndexedTransfer
+        The matching transfers, the most recent first.
+
+    Raises
+    ------
+    ClientCliError
+        If the local cache is disabled or the transfer index cannot be
+        read.
+
+    """
+    conditions = ['source_blockchain = ?']
+    parameters: typing.List[typing.Any] = [blockchain.value]
+    for column, value in [('sender_address', sender_address),
+                          ('recipient_address', recipient_address),
+                          ('source_token_address', token_address)]:
+        if value is not None:
+            conditions.append(f'{column} = ?')
+            parameters.append(value)
+    # Only the fixed column names above are interpolated (all values
+    # are bound), and the filtered columns are kept in separate
+    # conditions so that their indexes can be used
+    query = (
+        'SELECT destination_blockchain, block_number, '  # nosec B608
+        'transaction_id, source_transfer_id, sender_address, '
+        'recipient_address, source_token_address, destination_token_address, '
+        'amount, service_node_address, fee FROM transfers WHERE '
+        f'{" AND ".join(conditions)} ORDER BY block_number DESC, '
+        'log_index DESC')
+    if limit is not None:
+        query += ' LIMIT ?'
+        parameters.append(limit)
+    with _connect_database() as connection:
+        rows = connection.execute(query, parameters).fetchall()
+    return [
+        IndexedTransfer(blockchain, api.Blockchain(row[0]), row[1], row[2],
+                        int(row[3]), api.BlockchainAddress(row[4]),
+                        api.BlockchainAddress(row[5]),
+                        api.BlockchainAddress(row[6]),
+                        api.BlockchainAddress(row[7]), int(row[8]),
+                        api.BlockchainAddress(row[9]), int(row[10]))
+        for row in rows
+    ]
+
+
+@contextlib.contextmanager
+def _connect_database() -> typing.Iterator[sqlite3.Connection]:
+    if not is_cache_enabled():
+        raise ClientCliError(
+            'the transfer index requires the local cache to be enabled')
+    database_path = get_cache_directory() / _DATABASE_FILE_NAME
+    try:
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(database_path)
+    except (OSError, sqlite3.Error):
+        raise ClientCliError(
+            f'unable to open the transfer index {database_path}')
+    try:
+        schema_version = connection.execute(
+            'PRAGMA user_version').fetchone()[0]
+        if schema_version != _SCHEMA_VERSION:
+            if schema_version != 0:
+                # The index is rebuilt from the blockchains
+                _logger.warning('discarding the outdated transfer index')
+                connection.executescript('DROP TABLE IF EXISTS transfers; '
+                                         'DROP TABLE IF EXISTS checkpoints;')
+            connection.executescript(_SCHEMA)
+            connection.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+        yield connection
+    except sqlite3.Error:
+        raise ClientCliError(
+            f'unable to access the transfer index {database_path}')
+    finally:
+        connection.close()
+
+
+def _read_checkpoint(connection: sqlite3.Connection,
+                     blockchain: api.Blockchain,
+                     hub_address: str) -> typing.Optional[int]:
+    row = connection.execute(
+        'SELECT block_number FROM checkpoints WHERE blockchain = ? AND '
+        'hub_address = ?', (blockchain.value, hub_address)).fetchone()
+    return None if row is None else row[0]
+
+
+def _store_transfers(connection: sqlite3.Connection,
+                     blockchain: api.Blockchain, hub_address: str,
+                     transfer_event_logs: typing.List[typing.Any],
+                     checkpoint: int) -> None:
+    # The transfers and the checkpoint are stored in one transaction
+    with connection:
+        connection.executemany(
+            'INSERT OR IGNORE INTO transfers VALUES '
+            '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+                _create_transfer_row(blockchain, transfer_event_log)
+                for transfer_event_log in transfer_event_logs
+            ])
+        connection.execute(
+            'INSERT INTO checkpoints VALUES (?, ?, ?) ON CONFLICT '
+            '(blockchain, hub_address) DO UPDATE SET block_number = '
+            'MAX(block_number, excluded.block_number)',
+            (blockchain.value, hub_address, checkpoint))
+
+
+def _create_transfer_row(blockchain: api.Blockchain,
+                         transfer_event_log: typing.Any) -> typing.Tuple:
+    transfer_event_args = transfer_event_log['args']
+    transfer_event_request = transfer_event_args['request']
+    if 'transferId' in transfer_event_args:
+        # Single-chain transfer
+        source_transfer_id = transfer_event_args['transferId']
+        destination_blockchain_id = blockchain.value
+        source_token_address = transfer_event_request['token']
+        destination_token_address = source_token_address
+    else:
+        source_transfer_id = transfer_event_args['sourceTransferId']
+        destination_blockchain_id = \
+            transfer_event_request['destinationBlockchainId']
+        source_token_address = transfer_event_request['sourceToken']
+        destination_token_address = \
+            transfer_event_request['destinationToken']
+    # Unsigned 256-bit integers are stored as text since they may not
+    # fit into SQLite's 64-bit integers
+    return (blockchain.value,
+            transfer_event_log['transactionHash'].to_0x_hex(),
+            transfer_event_log['logIndex'], transfer_event_log['blockNumber'],
+            str(source_transfer_id), destination_blockchain_id,
+            transfer_event_request['sender'],
+            transfer_event_request['recipient'], source_token_address,
+            destination_token_address, str(transfer_event_request['amount']),
+            transfer_event_request['serviceNode'],
+            str(transfer_event_request['fee']))
+
+
+def _create_hub_contract(
+        blockchain: api.Blockchain,
+        node_connections: NodeConnections) -> NodeConnections.Wrapper:
+    protocol_version = get_blockchain_client(blockchain).protocol_version
+    return get_blockchain_utilities(blockchain).create_contract(
+        get_library_blockchain_config(blockchain)['hub'],
+        VersionedContractAbi(ContractAbi.PANTOS_HUB, protocol_version),
+        node_connections)
@@ -0,0 +1,692 @@
+"""Module for distributing token transfers across worker processes
+through a shared job queue.
+
+The job queue is an SQLite database that all worker processes can
+access (e.g. on a shared filesystem). Each job is a token transfer of a
+sender keystore. The jobs of a keystore form a partition that is leased
+by a single worker at a time, so that a sender account is never used by
+two workers concurrently. A worker keeps its lease alive with
+heartbeats; the partition of a worker that has stopped sending
+heartbeats can be leased by another worker once the lease has expired.
+
+A job's token transfer is signed and stored in the job queue before it
+is submitted. If a worker stops during a submission, the next worker
+resubmits the stored signed token transfer instead of signing a new
+one. Since the signed token transfer's sender nonce can only be used
+once, a job is never executed twice. The outcomes of the submissions
+are only recorded while the worker still holds the lease; otherwise,
+the next worker resubmits the stored signed token transfers.
+
+A job whose token transfer cannot be signed or submitted (e.g. because
+no service node bid is available) is retried after a delay, until the
+maximum number of attempts has been reached. A job whose token transfer
+has been signed keeps its signed token transfer for the retries.
+
+"""
+import concurrent.futures
+import contextlib
+import dataclasses
+import decimal
+import enum
+import json
+import logging
+import os
+import pathlib
+import socket
+import sqlite3
+import threading
+import time
+import typing
+import uuid
+
+from pantos.client.library import api
+
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.transfers import SignedTransfer
+from pantos.cli.transfers import TransferInput
+from pantos.cli.transfers import decode_signed_transfer
+from pantos.cli.transfers import encode_signed_transfer
+from pantos.cli.transfers import select_service_node_bid
+from pantos.cli.transfers import sign_transfer
+from pantos.cli.transfers import submit_signed_transfers
+
+_DEFAULT_LEASE_DURATION: typing.Final[float] = 60.0
+"""Default number of seconds a partition lease is valid without a
+heartbeat."""
+
+_DEFAULT_BATCH_SIZE: typing.Final[int] = 100
+"""Default number of jobs of a partition that are processed at once."""
+
+_DEFAULT_MAX_WORKERS: typing.Final[int] = 16
+"""Default maximum number of concurrently signed or submitted token
+transfers of a worker."""
+
+_DEFAULT_MAX_ATTEMPTS: typing.Final[int] = 3
+"""Default maximum number of attempts to sign and submit a job's token
+transfer."""
+
+_DEFAULT_RETRY_DELAY: typing.Final[float] = 30.0
+"""Default number of seconds after which a job is retried."""
+
+_BUSY_TIMEOUT: typing.Final[float] = 30.0
+"""Number of seconds to wait for other workers' write transactions."""
+
+_SCHEMA: typing.Final[str] = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_blockchain TEXT NOT NULL,
+    keystore TEXT NOT NULL,
+    destination_blockchain TEXT NOT NULL,
+    recipient_address TEXT NOT NULL,
+    token_symbol TEXT NOT NULL,
+    token_amount TEXT NOT NULL,
+    state TEXT NOT NULL,
+    signed_transfer TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    service_node_address TEXT,
+    task_id TEXT,
+    error TEXT,
+    worker TEXT,
+    retry_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_partition
+    ON jobs (source_blockchain, keystore, state);
+CREATE TABLE IF NOT EXISTS leases (
+    keystore TEXT PRIMARY KEY,
+    worker TEXT NOT NULL,
+    expiry REAL NOT NULL
+);
+'''
+"""Schema of the job queue database."""
+
+_logger = logging.getLogger(__name__)
+
+
+class JobState(enum.Enum):
+    """Enumeration of the states of a job.
+
+    """
+    PENDING = 'pending'
+    """The token transfer has not been signed yet (it may be retried)."""
+    SIGNED = 'signed'
+    """The token transfer has been signed (and possibly submitted, it may
+    be retried)."""
+    SUBMITTED = 'submitted'
+    """The token transfer has been accepted by a service node."""
+    FAILED = 'failed'
+    """The token transfer could not be signed or submitted (within the
+    maximum number of attempts)."""
+
+
+_OPEN_JOB_STATES: typing.Final[typing.Tuple[str, ...]] = tuple(
+    job_state.value for job_state in (JobState.PENDING, JobState.SIGNED))
+"""States of the jobs that still need to be processed (bound to the
+"state IN (?, ?)" conditions of the job queries)."""
+
+
+@dataclasses.dataclass
+class Job:
+    """Token transfer job of the job queue.
+
+    Attributes
+    ----------
+    job_id : int
+        The unique ID of the job.
+    source_blockchain : api.Blockchain
+        The source blockchain of the token transfer.
+    keystore_path : pathlib.Path
+        The path of the sender's keystore file.
+    transfer_input : TransferInput
+        The input of the token transfer.
+    state : JobState
+        The state of the job.
+    attempts : int
+        The number of attempts to sign and submit the token transfer.
+    service_node_address : api.BlockchainAddress or None
+        The address of the service node that has accepted the token
+        transfer.
+    task_id : uuid.UUID or None
+        The service node task ID of the token transfer.
+    error : str or None
+        The error of the job's last failed attempt.
+
+    """
+    job_id: int
+    source_blockchain: api.Blockchain
+    keystore_path: pathlib.Path
+    transfer_input: TransferInput
+    state: JobState
+    attempts: int
+    service_node_address: typing.Optional[api.BlockchainAddress]
+    task_id: typing.Optional[uuid.UUID]
+    error: typing.Optional[str]
+
+
+@dataclasses.dataclass
+class WorkerResult:
+    """Result of a worker's run.
+
+    Attributes
+    ----------
+    submitted : int
+        The number of token transfers submitted by the worker.
+    failed : int
+        The number of jobs that have failed in the worker.
+
+    """
+    submitted: int = 0
+    failed: int = 0
+
+
+def add_jobs(queue_path: pathlib.Path, source_blockchain: api.Blockchain,
+             keystore_path: pathlib.Path,
+             transfer_inputs: typing.List[TransferInput]) -> None:
+    """Add token transfer jobs of a sender to a job queue (which is
+    created if it does not exist yet).
+
+    Parameters
+    ----------
+    queue_path : pathlib.Path
+        The path of the job queue database.
+    source_blockchain : api.Blockchain
+        The source blockchain of the token transfers.
+    keystore_path : pathlib.Path
+        The path of the sender's keystore file (which must be
+        accessible to all workers under the same path).
+    transfer_inputs : list of TransferInput
+        The inputs of the token transfers.
+
+    Raises
+    ------
+    ClientCliError
+        If the keystore is not available or the job queue cannot be
+        accessed.
+
+    """
+    if not keystore_path.is_file():
+        raise ClientCliError(f'the keystore {keystore_path} is not available')
+    keystore = str(keystore_path.resolve())
+    with _connect_queue(queue_path, create=True) as connection:
+        with _transaction(connection):
+            connection.executemany(
+                'INSERT INTO jobs (source_blockchain, keystore, '
+                'destination_blockchain, recipient_address, token_symbol, '
+                'token_amount, state) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(source_blockchain.name, keystore,
+                  transfer_input.destination_blockchain.name,
+                  transfer_input.recipient_address,
+                  transfer_input.token_symbol, str(
+                      transfer_input.token_amount), JobState.PENDING.value)
+                 for transfer_input in transfer_inputs])
+
+
+def read_jobs(queue_path: pathlib.Path,
+              state: typing.Optional[JobState] = None) -> typing.List[Job]:
+    """Read the jobs of a job queue.
+
+    Parameters
+    ----------
+    queue_path : pathlib.Path
+        The path of the job queue database.
+    state : JobState, optional
+        Only read the jobs in this state (default: all jobs).
+
+    Returns
+    -------
+    list of Job
+        The jobs in the order they were added.
+
+    Raises
+    ------
+    ClientCliError
+        If the job queue cannot be accessed.
+
+    """
+    query = ('SELECT job_id, source_blockchain, keystore, '
+             'destination_blockchain, recipient_address, token_symbol, '
+             'token_amount, state, attempts, service_node_address, task_id, '
+             'error FROM jobs')
+    parameters: typing.List[str] = []
+    if state is not None:
+        query += ' WHERE state = ?'
+        parameters.append(state.value)
+    with _connect_queue(queue_path) as connection:
+        rows = connection.execute(f'{query} ORDER BY job_id',
+                                  parameters).fetchall()
+    return [_create_job(row) for row in rows]
+
+
+def count_jobs(queue_path: pathlib.Path) -> typing.Dict[JobState, int]:
+    """Count the jobs of a job queue per state.
+
+    Parameters
+    ----------
+    queue_path : pathlib.Path
+        The path of the job queue database.
+
+    Returns
+    -------
+    dict
+        The number of jobs per job state.
+
+    Raises
+    ------
+    ClientCliError
+        If the job queue cannot be accessed.
+
+    """
+    with _connect_queue(queue_path) as connection:
+        rows = connection.execute(
+            'SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+    job_counts = dict.fromkeys(JobState, 0)
+    job_counts.update((JobState(state), count) for state, count in rows)
+    return job_counts
+
+
+def run_worker(queue_path: pathlib.Path, source_blockchain: api.Blockchain,
+               password: str, lease_duration: float = _DEFAULT_LEASE_DURATION,
+               batch_size: int = _DEFAULT_BATCH_SIZE,
+               max_workers: int = _DEFAULT_MAX_WORKERS,
+               bid_deadline: typing.Optional[float] = None,
+               max_attempts: int = _DEFAULT_MAX_ATTEMPTS,
+               retry_delay: float = _DEFAULT_RETRY_DELAY) -> WorkerResult:
+    """Process the jobs of a source blockchain until none are left.
+    The worker leases one partition (the jobs of a sender keystore) at
+    a time and processes its jobs in batches: the token transfers of a
+    batch are signed concurrently and stored, and then submitted
+    concurrently (see submit_signed_transfers). While other workers
+    hold the leases of the remaining partitions (or their jobs wait to
+    be retried), the worker waits, so that it can take over the
+    partitions of workers that have stopped.
+
+    Parameters
+    ----------
+    queue_path : pathlib.Path
+        The path of the job queue database.
+    source_blockchain : api.Blockchain
+        The source blockchain of the jobs to be processed.
+    password : str
+        The password of the sender keystores.
+    lease_duration : float, optional
+        The number of seconds a partition lease is valid without a
+        heartbeat (heartbeats are sent three times as often).
+    batch_size : int, optional
+        The number of jobs of a partition that are processed at once.
+    max_workers : int, optional
+        The maximum number of concurrently signed or submitted token
+        transfers.
+    bid_deadline : float, optional
+        The number of seconds after which the least expensive service
+        node bid received so far is used (see select_service_node_bid).
+    max_attempts : int, optional
+        The maximum number of attempts to sign and submit a job's token
+        transfer before the job fails.
+    retry_delay : float, optional
+        The number of seconds after which a job is retried.
+
+    Returns
+    -------
+    WorkerResult
+        The numbers of the submitted token transfers and the failed
+        jobs.
+
+    Raises
+    ------
+    ClientCliError
+        If the job queue cannot be accessed.
+
+    """
+    worker = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+    worker_result = WorkerResult()
+    with _connect_queue(queue_path) as connection:
+        while True:
+            keystore = _lease_partition(connection, source_blockchain, worker,
+                                        lease_duration)
+            if keystore is None:
+                if not _has_open_jobs(connection, source_blockchain):
+                    return worker_result
+                time.sleep(lease_duration / 3)
+                continue
+            _logger.info('worker %s has leased the keystore %s', worker,
+                         keystore)
+            heartbeat = _Heartbeat(queue_path, keystore, worker,
+                                   lease_duration)
+            heartbeat.start()
+            try:
+                _process_partition(
+                    connection, source_blockchain, keystore, worker, password,
+                    heartbeat,
+                    _WorkerOptions(batch_size, max_workers, bid_deadline,
+                                   max_attempts, retry_delay), worker_result)
+            finally:
+                heartbeat.stop()
+                connection.execute(
+                    'DELETE FROM leases WHERE keystore = ? AND worker = ?',
+                    (keystore, worker))
+
+
+class _LeaseLostError(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class _WorkerOptions:
+    batch_size: int
+    max_workers: int
+    bid_deadline: typing.Optional[float]
+    max_attempts: int
+    retry_delay: float
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, queue_path: pathlib.Path, keystore: str, worker: str,
+                 lease_duration: float):
+        super().__init__(daemon=True)
+        self.__queue_path = queue_path
+        self.__keystore = keystore
+        self.__worker = worker
+        self.__lease_duration = lease_duration
+        self.__stopped = threading.Event()
+        self.__lease_lost = threading.Event()
+
+    def is_lease_lost(self) -> bool:
+        return self.__lease_lost.is_set()
+
+    def run(self) -> None:
+        try:
+            with _connect_queue(self.__queue_path) as connection:
+                while not self.__stopped.wait(self.__lease_duration / 3):
+                    cursor = connection.execute(
+                        'UPDATE leases SET expiry = ? WHERE keystore = ? AND '
+                        'worker = ?', (time.time() + self.__lease_duration,
+                                       self.__keystore, self.__worker))
+                    if cursor.rowcount == 0:
+                        self.__lease_lost.set()
+                        return
+        except Exception:
+            _logger.error('unable to renew the lease of the keystore %s',
+                          self.__keystore, exc_info=True)
+            self.__lease_lost.set()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        self.join()
+
+
+def _process_partition(connection: sqlite3.Connection,
+                       source_blockchain: api.Blockchain, keystore: str,
+                       worker: str, password: str, heartbeat: _Heartbeat,
+                       worker_options: _WorkerOptions,
+                       worker_result: WorkerResult) -> None:
+    try:
+        _process_leased_partition(connection, source_blockchain, keystore,
+                                  worker, password, heartbeat, worker_options,
+                                  worker_result)
+    except _LeaseLostError:
+        # Another worker has taken over the partition
+        _logger.warning('worker %s has lost the lease of the keystore %s',
+                        worker, keystore)
+
+
+def _process_leased_partition(connection: sqlite3.Connection,
+                              source_blockchain: api.Blockchain, keystore: str,
+                              worker: str, password: str,
+                              heartbeat: _Heartbeat,
+                              worker_options: _WorkerOptions,
+                              worker_result: WorkerResult) -> None:
+    # The keystore is only decrypted once there are token transfers to
+    # be signed
+    private_key: typing.Union[api.PrivateKey, ClientCliError, None] = None
+
+    def decrypt_keystore() -> api.PrivateKey:
+        nonlocal private_key
+        if private_key is None:
+            try:
+                private_key = api.decrypt_private_key(
+                    source_blockchain,
+                    pathlib.Path(keystore).read_text(), password)
+            except Exception:
+                # The error must not disclose the keystore's content
+                private_key = ClientCliError(
+                    f'unable to decrypt the keystore {keystore}')
+        if isinstance(private_key, ClientCliError):
+            raise private_key
+        return private_key
+
+    while not heartbeat.is_lease_lost():
+        rows = connection.execute(
+            'SELECT job_id, source_blockchain, keystore, '
+            'destination_blockchain, recipient_address, token_symbol, '
+            'token_amount, state, attempts, service_node_address, task_id, '
+            'error, signed_transfer FROM jobs WHERE source_blockchain = ? AND '
+            'keystore = ? AND state IN (?, ?) AND retry_at <= ? '
+            'ORDER BY job_id LIMIT ?',
+            (source_blockchain.name, keystore, *_OPEN_JOB_STATES, time.time(),
+             worker_options.batch_size)).fetchall()
+        if len(rows) == 0:
+            return
+        jobs = [(_create_job(row[:-1]), row[-1]) for row in rows]
+        _process_jobs(connection, source_blockchain, keystore, worker,
+                      decrypt_keystore, jobs, worker_options, worker_result)
+    raise _LeaseLostError
+
+
+def _process_jobs(connection: sqlite3.Connection,
+                  source_blockchain: api.Blockchain, keystore: str,
+                  worker: str,
+                  decrypt_keystore: typing.Callable[[], api.PrivateKey],
+                  jobs: typing.List[typing.Tuple[Job, typing.Optional[str]]],
+                  worker_options: _WorkerOptions,
+                  worker_result: WorkerResult) -> None:
+    # Signed token transfers stored by a previous attempt are resubmitted
+    # as long as they are valid, since they may have been submitted
+    # already
+    signed_jobs: typing.List[typing.Tuple[Job, SignedTransfer]] = []
+    pending_jobs: typing.List[Job] = []
+    failed_jobs: typing.List[typing.Tuple[Job, str]] = []
+    unsigned_jobs: typing.List[typing.Tuple[Job, str]] = []
+    for job, encoded_signed_transfer in jobs:
+        if encoded_signed_transfer is None:
+            pending_jobs.append(job)
+            continue
+        signed_transfer = decode_signed_transfer(
+            json.loads(encoded_signed_transfer))
+        if signed_transfer.is_expired():
+            failed_jobs.append(
+                (job, 'the signed transfer has expired (it may have been '
+                 'submitted before, check its status)'))
+        else:
+            signed_jobs.append((job, signed_transfer))
+    if len(pending_jobs) > 0:
+        try:
+            private_key = decrypt_keystore()
+        except ClientCliError as error:
+            unsigned_jobs.extend((job, str(error)) for job in pending_jobs)
+        else:
+            signed_jobs.extend(
+                _sign_jobs(source_blockchain, private_key, pending_jobs,
+                           worker_options.max_workers,
+                           worker_options.bid_deadline, unsigned_jobs))
+    with _leased_transaction(connection, keystore, worker):
+        # The attempt is recorded before the submission
+        connection.executemany(
+            'UPDATE jobs SET state = ?, signed_transfer = ?, attempts = '
+            'attempts + 1, worker = ? WHERE job_id = ?',
+            [(JobState.SIGNED.value,
+              json.dumps(
+                  encode_signed_transfer(signed_transfer)), worker, job.job_id)
+             for job, signed_transfer in signed_jobs])
+        connection.executemany(
+            'UPDATE jobs SET state = ?, error = ?, worker = ? WHERE '
+            'job_id = ?', [(JobState.FAILED.value, error, worker, job.job_id)
+                           for job, error in failed_jobs])
+        connection.executemany(
+            'UPDATE jobs SET attempts = attempts + 1, worker = ? WHERE '
+            'job_id = ?', [(worker, job.job_id) for job, _ in unsigned_jobs])
+        worker_result.failed += len(failed_jobs) + _record_attempt_failures(
+            connection, unsigned_jobs, JobState.PENDING, worker_options)
+    results = submit_signed_transfers(
+        [signed_transfer for _, signed_transfer in signed_jobs],
+        worker_options.max_workers)
+    submitted_jobs = []
+    unsubmitted_jobs = []
+    for (job, _), result in zip(signed_jobs, results):
+        if isinstance(result, Exception):
+            unsubmitted_jobs.append((job, str(result)))
+        else:
+            submitted_jobs.append((job, result))
+    # The results are discarded if another worker may have taken over
+    # the jobs in the meantime (it resubmits the signed transfers)
+    with _leased_transaction(connection, keystore, worker):
+        connection.executemany(
+            'UPDATE jobs SET state = ?, service_node_address = ?, task_id = '
+            '?, error = NULL WHERE job_id = ?',
+            [(JobState.SUBMITTED.value, result.service_node_address,
+              str(result.task_id), job.job_id)
+             for job, result in submitted_jobs])
+        worker_result.submitted += len(submitted_jobs)
+        worker_result.failed += _record_attempt_failures(
+            connection, unsubmitted_jobs, JobState.SIGNED, worker_options)
+
+
+def _record_attempt_failures(connection: sqlite3.Connection,
+                             failed_jobs: typing.List[typing.Tuple[Job, str]],
+                             retry_state: JobState,
+                             worker_options: _WorkerOptions) -> int:
+    # The jobs' failed attempts have already been counted; they are
+    # retried unless their maximum number of attempts has been reached
+    retry_at = time.time() + worker_options.retry_delay
+    parameters = []
+    for job, error in failed_jobs:
+        retried = job.attempts + 1 < worker_options.max_attempts
+        parameters.append(
+            (retry_state.value if retried else JobState.FAILED.value, error,
+             retry_at, job.job_id))
+    connection.executemany(
+        'UPDATE jobs SET state = ?, error = ?, retry_at = ? WHERE job_id = ?',
+        parameters)
+    return sum(1 for state, _, _, _ in parameters
+               if state == JobState.FAILED.value)
+
+
+def _sign_jobs(
+        source_blockchain: api.Blockchain, private_key: api.PrivateKey,
+        jobs: typing.List[Job], max_workers: int,
+        bid_deadline: typing.Optional[float],
+        failed_jobs: typing.List[typing.Tuple[Job, str]]) \
+        -> typing.List[typing.Tuple[Job, SignedTransfer]]:
+    # The service node bids are selected only once per destination
+    # blockchain
+    service_node_bids: typing.Dict[api.Blockchain, typing.Union[typing.Tuple[
+        api.BlockchainAddress, api.ServiceNodeBid], Exception]] = {}
+    for job in jobs:
+        destination_blockchain = job.transfer_input.destination_blockchain
+        if destination_blockchain not in service_node_bids:
+            try:
+                service_node_bids[destination_blockchain] = \
+                    select_service_node_bid(source_blockchain,
+                                            destination_blockchain,
+                                            deadline=bid_deadline)
+            except Exception as error:
+                service_node_bids[destination_blockchain] = error
+
+    def sign_job(job: Job) -> SignedTransfer:
+        service_node_bid = service_node_bids[
+            job.transfer_input.destination_blockchain]
+        if isinstance(service_node_bid, Exception):
+            raise service_node_bid
+        return sign_transfer(source_blockchain, private_key,
+                             job.transfer_input, service_node_bid)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        futures = [executor.submit(sign_job, job) for job in jobs]
+    signed_jobs = []
+    for job, future in zip(jobs, futures):
+        try:
+            signed_jobs.append((job, future.result()))
+        except Exception as error:
+            failed_jobs.append((job, str(error)))
+    return signed_jobs
+
+
+def _lease_partition(connection: sqlite3.Connection,
+                     source_blockchain: api.Blockchain, worker: str,
+                     lease_duration: float) -> typing.Optional[str]:
+    now = time.time()
+    with _transaction(connection):
+        row = connection.execute(
+            'SELECT keystore FROM jobs WHERE source_blockchain = ? AND '
+            'state IN (?, ?) AND retry_at <= ? AND keystore NOT IN '
+            '(SELECT keystore FROM leases WHERE expiry > ?) ORDER BY job_id '
+            'LIMIT 1',
+            (source_blockchain.name, *_OPEN_JOB_STATES, now, now)).fetchone()
+        if row is None:
+            return None
+        connection.execute(
+            'INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT (keystore) DO '
+            'UPDATE SET worker = excluded.worker, expiry = excluded.expiry',
+            (row[0], worker, now + lease_duration))
+    return row[0]
+
+
+def _has_open_jobs(connection: sqlite3.Connection,
+                   source_blockchain: api.Blockchain) -> bool:
+    return connection.execute(
+        'SELECT 1 FROM jobs WHERE source_blockchain = ? AND '
+        'state IN (?, ?) LIMIT 1',
+        (source_blockchain.name, *_OPEN_JOB_STATES)).fetchone() is not None
+
+
+def _create_job(row: typing.Tuple) -> Job:
+    return Job(
+        row[0], api.Blockchain[row[1]], pathlib.Path(row[2]),
+        TransferInput(api.Blockchain[row[3]], api.BlockchainAddress(row[4]),
+                      api.TokenSymbol(row[5]), decimal.Decimal(row[6])),
+        JobState(row[7]), row[8],
+        None if row[9] is None else api.BlockchainAddress(row[9]),
+        None if row[10] is None else uuid.UUID(row[10]), row[11])
+
+
+@contextlib.contextmanager
+def _connect_queue(
+        queue_path: pathlib.Path,
+        create: bool = False) -> typing.Iterator[sqlite3.Connection]:
+    if not create and not queue_path.is_file():
+        raise ClientCliError(f'the job queue {queue_path} does not exist')
+    try:
+        # Transactions are managed explicitly (see _transaction)
+        connection = sqlite3.connect(queue_path, timeout=_BUSY_TIMEOUT,
+                                     isolation_level=None)
+    except sqlite3.Error:
+        raise ClientCliError(f'unable to open the job queue {queue_path}')
+    try:
+        connection.executescript(_SCHEMA)
+        yield connection
+    except sqlite3.Error:
+        raise ClientCliError(f'unable to access the job queue {queue_path}')
+    finally:
+        connection.close()
+
+
+@contextlib.contextmanager
+def _transaction(connection: sqlite3.Connection) -> typing.Iterator[None]:
+    # The database is locked for writing at the start of the transaction
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        yield
+    except BaseException:
+        connection.execute('ROLLBACK')
+        raise
+    connection.execute('COMMIT')
+
+
+@contextlib.contextmanager
+def _leased_transaction(connection: sqlite3.Connection, keystore: str,
+                        worker: str) -> typing.Iterator[None]:
+    with _transaction(connection):
+        lease = connection.execute(
+            'SELECT 1 FROM leases WHERE keystore = ? AND worker = ? AND '
+            'expiry > ?', (keystore, worker, time.time())).fetchone()
+        if lease is None:
+            raise _LeaseLostError
+        yield
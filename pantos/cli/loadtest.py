@@ -0,0 +1,196 @@
+"""Module for load testing the Client CLI's transfer path against a
+local stand-in of a service node and the blockchain nodes.
+
+"""
+import concurrent.futures
+import dataclasses
+import math
+import time
+import typing
+
+import web3
+from pantos.client.library import api
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+
+from pantos.cli.cache import disable_cache
+from pantos.cli.standin import StandInServer
+from pantos.cli.statuses import get_token_transfer_status
+
+_TRANSFER_AMOUNT: typing.Final[int] = 1
+"""Amount of each load test transfer (in the smallest subunit)."""
+
+
+@dataclasses.dataclass
+class LoadTestPhaseResult:
+    """Result of a load test phase.
+
+    Attributes
+    ----------
+    phase : str
+        The name of the phase.
+    latencies : list of float
+        The latencies of the successful requests in seconds (sorted).
+        With a request rate, the latency of a request is measured from
+        its scheduled start, so that it includes any time the request
+        had to wait for a free worker.
+    errors : int
+        The number of failed requests.
+    duration : float
+        The duration of the phase in seconds.
+
+    """
+    phase: str
+    latencies: typing.List[float]
+    errors: int
+    duration: float
+
+    @property
+    def requests(self) -> int:
+        """The total number of requests of the phase.
+
+        """
+        return len(self.latencies) + self.errors
+
+    @property
+    def throughput(self) -> float:
+        """The number of successful requests per second.
+
+        """
+        return (len(self.latencies) /
+                self.duration if self.duration > 0 else 0.0)
+
+    def get_latency_percentile(self, percentile: float) -> float:
+        """Get a percentile of the successful requests' latencies
+        (using the nearest-rank method).
+
+        Parameters
+        ----------
+        percentile : float
+            The percentile (between 0 and 100).
+
+        Returns
+        -------
+        float
+            The latency percentile in seconds, or NaN if there has been
+            no successful request.
+
+        """
+        if len(self.latencies) == 0:
+            return math.nan
+        rank = max(math.ceil(percentile / 100 * len(self.latencies)), 1)
+        return self.latencies[rank - 1]
+
+
+def run_load_test(
+        source_blockchain: api.Blockchain,
+        destination_blockchain: api.Blockchain, requests: int,
+        concurrency: int, request_rate: typing.Optional[float] = None,
+        service_node_latency: float = 0.0,
+        rpc_latency: float = 0.0) -> typing.List[LoadTestPhaseResult]:
+    """Run a load test of the transfer path against a local stand-in
+    of a service node and the blockchain nodes (see StandInServer).
+    Each phase sends the given number of requests through the client
+    library, the same way the bids, transfer, and status commands do:
+    first the service node bids are retrieved, then transfers are
+    submitted (with a new random sender account), and finally the
+    status of the submitted transfers is retrieved. The local cache is
+    disabled during the load test, so that the stand-in service node
+    is not recorded in it and no cached responses skew the latencies.
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the transfers.
+    destination_blockchain : api.Blockchain
+        The destination blockchain of the transfers.
+    requests : int
+        The number of requests per phase.
+    concurrency : int
+        The maximum number of concurrent requests.
+    request_rate : float, optional
+        The number of requests started per second (default: as many
+        as the concurrency allows).
+    service_node_latency : float, optional
+        The simulated processing time of each service node request in
+        seconds (default: 0).
+    rpc_latency : float, optional
+        The simulated processing time of each blockchain node request
+        in seconds (default: 0).
+
+    Returns
+    -------
+    list of LoadTestPhaseResult
+        The results of the phases (in execution order).
+
+    """
+    sender_private_key = web3.Account.create().key.hex()
+    recipient_address = api.BlockchainAddress(web3.Account.create().address)
+    blockchains = list(
+        dict.fromkeys([source_blockchain, destination_blockchain]))
+    with disable_cache(), StandInServer(blockchains, service_node_latency,
+                                        rpc_latency):
+        bids_result, _ = _run_phase(
+            'bids', lambda _: api.retrieve_service_node_bids(
+                source_blockchain, destination_blockchain), range(requests),
+            concurrency, request_rate)
+        transfer_result, service_node_task_infos = _run_phase(
+            'transfer', lambda _: api.transfer_tokens(
+                source_blockchain, destination_blockchain, sender_private_key,
+                recipient_address, TOKEN_SYMBOL_PAN, _TRANSFER_AMOUNT),
+            range(requests), concurrency, request_rate)
+        status_result, _ = _run_phase(
+            'status', lambda service_node_task_info: get_token_transfer_status(
+                source_blockchain, service_node_task_info.service_node_address,
+                service_node_task_info.task_id), service_node_task_infos,
+            concurrency, request_rate)
+    return [bids_result, transfer_result, status_result]
+
+
+_Argument = typing.TypeVar('_Argument')
+
+_Result = typing.TypeVar('_Result')
+
+
+def _run_phase(
+    phase: str, function: typing.Callable[[_Argument], _Result],
+    arguments: typing.Iterable[_Argument], concurrency: int,
+    request_rate: typing.Optional[float]
+) -> typing.Tuple[LoadTestPhaseResult, typing.List[_Result]]:
+    start_time = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        futures = []
+        for index, argument in enumerate(arguments):
+            scheduled_time = None
+            if request_rate is not None:
+                scheduled_time = start_time + index / request_rate
+                time.sleep(max(scheduled_time - time.perf_counter(), 0))
+            futures.append(
+                executor.submit(_measure_request, function, argument,
+                                scheduled_time))
+    duration = time.perf_counter() - start_time
+    latencies = []
+    results = []
+    errors = 0
+    for future in futures:
+        latency, result = future.result()
+        if isinstance(result, Exception):
+            errors += 1
+        else:
+            latencies.append(latency)
+            results.append(result)
+    return LoadTestPhaseResult(phase, sorted(latencies), errors,
+                               duration), results
+
+
+def _measure_request(
+    function: typing.Callable[[_Argument], _Result], argument: _Argument,
+    scheduled_time: typing.Optional[float]
+) -> typing.Tuple[float, typing.Union[_Result, Exception]]:
+    start_time = (time.perf_counter()
+                  if scheduled_time is None else scheduled_time)
+    result: typing.Union[_Result, Exception]
+    try:
+        result = function(argument)
+    except Exception as error:
+        result = error
+    return time.perf_counter() - start_time, result
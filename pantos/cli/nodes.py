@@ -0,0 +1,358 @@
+"""Module for tracking the health of service nodes.
+
+The outcome of each request to a service node is recorded in the local
+cache. After the configured number of consecutive failures, the
+service node's circuit is opened: the service node is skipped until
+the configured retry interval has elapsed since its last failure.
+Afterwards, a single request is let through again to probe it (the
+circuit is half-open); its outcome closes or reopens the circuit.
+
+"""
+import concurrent.futures
+import dataclasses
+import enum
+import logging
+import pathlib
+import statistics
+import threading
+import time
+import typing
+
+from pantos.client.library import api
+from pantos.common.servicenodes import ServiceNodeClient
+
+from pantos.cli.blockchains import get_blockchain_client
+from pantos.cli.blockchains import get_service_node_timeout
+from pantos.cli.cache import read_cache_entry
+from pantos.cli.cache import write_cache_entry
+from pantos.cli.configuration import get_service_nodes_config
+from pantos.cli.exceptions import ClientCliError
+
+_SERVICE_NODE_HEALTH_DIRECTORY: typing.Final[str] = 'service-node-health'
+"""Cache subdirectory for the service node health records."""
+
+_MAX_LATENCIES: typing.Final[int] = 10
+"""Maximum number of recent latencies kept per service node."""
+
+_logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+class CircuitState(enum.Enum):
+    """Enumeration of the circuit states of a service node.
+
+    """
+    CLOSED = 0
+    """The service node is used."""
+    OPEN = 1
+    """The service node is skipped."""
+    HALF_OPEN = 2
+    """The service node is probed with the next request."""
+
+
+@dataclasses.dataclass
+class ServiceNodeHealth:
+    """Health record of a service node.
+
+    Attributes
+    ----------
+    latencies : list of float
+        The latencies in seconds of the most recent successful
+        requests (oldest first).
+    failures : int
+        The number of consecutive failed requests.
+    last_success : float or None
+        The Unix timestamp of the last successful request.
+    last_failure : float or None
+        The Unix timestamp of the last failed request.
+
+    """
+    latencies: typing.List[float] = dataclasses.field(default_factory=list)
+    failures: int = 0
+    last_success: typing.Optional[float] = None
+    last_failure: typing.Optional[float] = None
+
+    def get_average_latency(self) -> typing.Optional[float]:
+        """Get the average latency of the most recent successful
+        requests.
+
+        Returns
+        -------
+        float or None
+            The average latency in seconds, or None if no successful
+            request has been recorded.
+
+        """
+        if len(self.latencies) == 0:
+            return None
+        return statistics.fmean(self.latencies)
+
+    def get_circuit_state(self,
+                          now: typing.Optional[float] = None) -> CircuitState:
+        """Get the circuit state of the service node.
+
+        Parameters
+        ----------
+        now : float, optional
+            The current Unix timestamp (default: the current time).
+
+        Returns
+        -------
+        CircuitState
+            The circuit state according to the configured failure
+            threshold and retry interval.
+
+        """
+        service_nodes_config = get_service_nodes_config()
+        if self.failures < service_nodes_config['failure_threshold']:
+            return CircuitState.CLOSED
+        if now is None:
+            now = time.time()
+        assert self.last_failure is not None
+        if now - self.last_failure < service_nodes_config['retry_interval']:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def get_retry_time(self) -> typing.Optional[float]:
+        """Get the time when an open circuit becomes half-open.
+
+        Returns
+        -------
+        float or None
+            The Unix timestamp after which the service node is probed
+            again, or None if the circuit is not open.
+
+        """
+        if self.get_circuit_state() is not CircuitState.OPEN:
+            return None
+        assert self.last_failure is not None
+        return (self.last_failure +
+                get_service_nodes_config()['retry_interval'])
+
+
+def get_service_node_addresses(
+        blockchain: api.Blockchain) -> typing.List[api.BlockchainAddress]:
+    """Get the addresses of the service nodes registered on a
+    blockchain.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain the service nodes are registered on.
+
+    Returns
+    -------
+    list of api.BlockchainAddress
+        The addresses of the active service nodes.
+
+    Raises
+    ------
+    ClientCliError
+        If the registered service nodes cannot be read.
+
+    """
+    try:
+        return get_blockchain_client(blockchain).read_service_node_addresses()
+    except Exception:
+        raise ClientCliError('unable to read the service nodes registered '
+                             f'on {blockchain.name}')
+
+
+def load_service_node_health(
+        blockchain: api.Blockchain,
+        service_node_address: api.BlockchainAddress) -> ServiceNodeHealth:
+    """Load the health record of a service node from the local cache.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain the service node is registered on.
+    service_node_address : api.BlockchainAddress
+        The address of the service node.
+
+    Returns
+    -------
+    ServiceNodeHealth
+        The service node's health record (an empty record if none has
+        been stored or the local cache is disabled).
+
+    """
+    entry = read_cache_entry(
+        _get_service_node_health_path(blockchain, service_node_address))
+    if entry is None:
+        return ServiceNodeHealth()
+    try:
+        return ServiceNodeHealth(**entry)
+    except TypeError:
+        _logger.warning('invalid cached service node health record',
+                        exc_info=True)
+        return ServiceNodeHealth()
+
+
+def is_service_node_available(
+        blockchain: api.Blockchain,
+        service_node_address: api.BlockchainAddress) -> bool:
+    """Determine if a service node is to be used, i.e. if its circuit
+    is not open.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain the service node is registered on.
+    service_node_address : api.BlockchainAddress
+        The address of the service node.
+
+    Returns
+    -------
+    bool
+        True if the service node's circuit is closed or half-open.
+
+    """
+    return load_service_node_health(
+        blockchain,
+        service_node_address).get_circuit_state() is not CircuitState.OPEN
+
+
+def record_service_node_success(blockchain: api.Blockchain,
+                                service_node_address: api.BlockchainAddress,
+                                latency: float) -> None:
+    """Record a successful request to a service node (which closes its
+    circuit).
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain the service node is registered on.
+    service_node_address : api.BlockchainAddress
+        The address of the service node.
+    latency : float
+        The latency of the request in seconds.
+
+    """
+    with _lock:
+        service_node_health = load_service_node_health(blockchain,
+                                                       service_node_address)
+        service_node_health.latencies = (service_node_health.latencies +
+                                         [latency])[-_MAX_LATENCIES:]
+        service_node_health.failures = 0
+        service_node_health.last_success = time.time()
+        _store_service_node_health(blockchain, service_node_address,
+                                   service_node_health)
+
+
+def record_service_node_failure(
+        blockchain: api.Blockchain,
+        service_node_address: api.BlockchainAddress) -> None:
+    """Record a failed request to a service node.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain the service node is registered on.
+    service_node_address : api.BlockchainAddress
+        The address of the service node.
+
+    """
+    with _lock:
+        service_node_health = load_service_node_health(blockchain,
+                                                       service_node_address)
+        service_node_health.failures += 1
+        service_node_health.last_failure = time.time()
+        _store_service_node_health(blockchain, service_node_address,
+                                   service_node_health)
+    failure_threshold = get_service_nodes_config()['failure_threshold']
+    if service_node_health.failures == failure_threshold:
+        _logger.warning(
+            'the service node %s has failed %d times in a row and is '
+            'skipped for now', service_node_address,
+            service_node_health.failures)
+
+
+def reset_service_node_health(
+        blockchain: api.Blockchain,
+        service_node_address: api.BlockchainAddress) -> None:
+    """Reset the health record of a service node (which closes its
+    circuit).
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain the service node is registered on.
+    service_node_address : api.BlockchainAddress
+        The address of the service node.
+
+    """
+    with _lock:
+        _store_service_node_health(blockchain, service_node_address,
+                                   ServiceNodeHealth())
+
+
+def probe_service_nodes(
+        blockchain: api.Blockchain,
+        service_node_addresses: typing.List[api.BlockchainAddress]) \
+        -> typing.List[bool]:
+    """Probe service nodes concurrently by requesting their bids,
+    regardless of their circuit states. The outcomes are recorded.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain the service nodes are registered on.
+    service_node_addresses : list of api.BlockchainAddress
+        The addresses of the service nodes.
+
+    Returns
+    -------
+    list of bool
+        For each service node (in the same order), True if it has
+        answered.
+
+    """
+    if len(service_node_addresses) == 0:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(
+            len(service_node_addresses)) as executor:
+        return list(
+            executor.map(
+                lambda service_node_address: _probe_service_node(
+                    blockchain, service_node_address), service_node_addresses))
+
+
+def _probe_service_node(blockchain: api.Blockchain,
+                        service_node_address: api.BlockchainAddress) -> bool:
+    try:
+        service_node_url = get_blockchain_client(
+            blockchain).read_service_node_url(service_node_address)
+    except Exception:
+        _logger.warning('unable to read the URL of the service node %s',
+                        service_node_address, exc_info=True)
+        return False
+    start_time = time.perf_counter()
+    try:
+        ServiceNodeClient().bids(service_node_url, blockchain, blockchain,
+                                 get_service_node_timeout())
+    except Exception:
+        _logger.info('probe of the service node %s failed',
+                     service_node_address, exc_info=True)
+        record_service_node_failure(blockchain, service_node_address)
+        return False
+    record_service_node_success(blockchain, service_node_address,
+                                time.perf_counter() - start_time)
+    return True
+
+
+def _store_service_node_health(blockchain: api.Blockchain,
+                               service_node_address: api.BlockchainAddress,
+                               service_node_health: ServiceNodeHealth) -> None:
+    write_cache_entry(
+        _get_service_node_health_path(blockchain, service_node_address),
+        dataclasses.asdict(service_node_health))
+
+
+def _get_service_node_health_path(
+        blockchain: api.Blockchain,
+        service_node_address: api.BlockchainAddress) -> pathlib.PurePath:
+    return pathlib.PurePath(_SERVICE_NODE_HEALTH_DIRECTORY,
+                            blockchain.name.lower(),
+                            f'{service_node_address.lower()}.json')
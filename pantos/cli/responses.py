@@ -0,0 +1,204 @@
+"""Module for caching immutable responses of the blockchain nodes.
+
+Only responses that can never change are cached, e.g. the event logs of
+block ranges that have the configured number of confirmations. The
+responses are stored content-addressed (by a hash of their request) in
+an SQLite database in the local cache directory, each one as compressed
+compact JSON. Once the configured maximum size of the cached responses
+is exceeded, the least recently used responses are evicted.
+
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+import typing
+import zlib
+
+import hexbytes
+from pantos.client.library import api
+from web3.datastructures import AttributeDict
+
+from pantos.cli.blockchains import get_library_blockchain_config
+from pantos.cli.cache import get_cache_directory
+from pantos.cli.cache import get_rpc_responses_max_size
+from pantos.cli.cache import is_cache_enabled
+
+_DATABASE_FILE_NAME: typing.Final[str] = 'rpc-responses.sqlite3'
+"""File name of the response cache database in the cache directory."""
+
+_SCHEMA_VERSION: typing.Final[int] = 1
+"""Version of the response cache database schema (the responses are
+discarded if it does not match)."""
+
+_SCHEMA: typing.Final[str] = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key BLOB PRIMARY KEY,
+    response BLOB NOT NULL,
+    last_access REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_last_access
+    ON responses (last_access);
+'''
+"""Schema of the response cache database."""
+
+_BUSY_TIMEOUT: typing.Final[float] = 10.0
+"""Number of seconds to wait for concurrent writes to the response
+cache database."""
+
+_BYTES_PER_MEGABYTE: typing.Final[int] = 1024 * 1024
+
+_Response = typing.TypeVar('_Response')
+
+_logger = logging.getLogger(__name__)
+
+
+def is_final_block_range(blockchain: api.Blockchain, to_block_number: int,
+                         latest_block_number: int) -> bool:
+    """Determine if a block range is final, i.e. if its last block has
+    the blockchain's configured number of confirmations.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain of the block range.
+    to_block_number : int
+        The last block number of the range (inclusive).
+    latest_block_number : int
+        The number of the blockchain's latest block.
+
+    Returns
+    -------
+    bool
+        True if the block range is final.
+
+    """
+    confirmations = get_library_blockchain_config(blockchain)['confirmations']
+    return latest_block_number - to_block_number >= confirmations
+
+
+def get_cached_response(blockchain: api.Blockchain,
+                        request: typing.List[typing.Any],
+                        query: typing.Callable[[], _Response]) -> _Response:
+    """Get the response to an immutable blockchain node request. The
+    response is read from the local cache if possible; otherwise, it is
+    queried and stored in the cache. Cache failures are logged but not
+    raised, and responses that cannot be encoded are not cached.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain of the request.
+    request : list
+        The JSON-serializable description of the request, which must
+        identify its response uniquely (e.g. the method, the contract
+        address, and the block range).
+    query : callable
+        The function querying the response from the blockchain nodes.
+
+    Returns
+    -------
+    Any
+        The (cached or queried) response. Dictionaries are returned as
+        web3 AttributeDicts and byte strings as HexBytes.
+
+    Raises
+    ------
+    Exception
+        If the response is not cached and cannot be queried.
+
+    """
+    max_size = get_rpc_responses_max_size() * _BYTES_PER_MEGABYTE
+    if not is_cache_enabled() or max_size == 0:
+        return query()
+    key = hashlib.sha256(
+        json.dumps([blockchain.name, request],
+                   separators=(',', ':')).encode()).digest()
+    try:
+        with _connect_database() as connection:
+            row = connection.execute(
+                'SELECT response FROM responses WHERE key = ?',
+                (key, )).fetchone()
+            if row is not None:
+                connection.execute(
+                    'UPDATE responses SET last_access = ? WHERE key = ?',
+                    (time.time(), key))
+                return _decode_response(json.loads(zlib.decompress(row[0])))
+    except (OSError, ValueError, sqlite3.Error, zlib.error):
+        _logger.warning('unable to read a cached response', exc_info=True)
+    response = query()
+    try:
+        compressed_response = zlib.compress(
+            json.dumps(_encode_response(response),
+                       separators=(',', ':')).encode())
+    except (TypeError, ValueError):
+        _logger.warning('unable to encode a response', exc_info=True)
+        return response
+    try:
+        with _connect_database() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                (key, compressed_response, time.time()))
+            # The least recently used responses exceeding the maximum
+            # size are evicted
+            connection.execute(
+                'DELETE FROM responses WHERE key IN (SELECT key FROM '
+                '(SELECT key, SUM(LENGTH(response)) OVER (ORDER BY '
+                'last_access DESC, key) AS size FROM responses) WHERE '
+                'size > ?)', (max_size, ))
+    except (OSError, sqlite3.Error):
+        _logger.warning('unable to cache a response', exc_info=True)
+    return response
+
+
+def _encode_response(response: typing.Any) -> typing.Any:
+    # Dictionaries and byte strings are tagged to be restored later
+    if isinstance(response, bytes):
+        return {'b': response.hex()}
+    if isinstance(response, typing.Mapping):
+        return {
+            'd': {
+                str(key): _encode_response(value)
+                for key, value in response.items()
+            }
+        }
+    if isinstance(response, (list, tuple)):
+        return [_encode_response(value) for value in response]
+    if response is None or isinstance(response, (bool, int, str)):
+        return response
+    raise TypeError(f'unsupported response type {type(response)}')
+
+
+def _decode_response(entry: typing.Any) -> typing.Any:
+    if isinstance(entry, list):
+        return [_decode_response(value) for value in entry]
+    if isinstance(entry, dict):
+        if 'b' in entry:
+            return hexbytes.HexBytes(bytes.fromhex(entry['b']))
+        return AttributeDict({
+            key: _decode_response(value)
+            for key, value in entry['d'].items()
+        })
+    return entry
+
+
+@contextlib.contextmanager
+def _connect_database() -> typing.Iterator[sqlite3.Connection]:
+    database_path = get_cache_directory() / _DATABASE_FILE_NAME
+    database_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(database_path, timeout=_BUSY_TIMEOUT)
+    try:
+        schema_version = connection.execute(
+            'PRAGMA user_version').fetchone()[0]
+        if schema_version != _SCHEMA_VERSION:
+            if schema_version != 0:
+                _logger.warning('discarding the outdated cached responses')
+                connection.execute('DROP TABLE IF EXISTS responses')
+            connection.executescript(_SCHEMA)
+            connection.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+        with connection:
+            yield connection
+    finally:
+        connection.close()
@@ -0,0 +1,120 @@
+"""Module for scanning block ranges of a blockchain in parallel.
+
+"""
+import concurrent.futures
+import typing
+
+_Result = typing.TypeVar('_Result')
+
+
+def get_block_range_chunks(
+        from_block_number: int, to_block_number: int, blocks_per_query: int,
+        aligned: bool = False) -> typing.Iterator[typing.Tuple[int, int]]:
+    """Split a block range into chunks, starting with the most recent
+    blocks.
+
+    Parameters
+    ----------
+    from_block_number : int
+        The first block number of the range.
+    to_block_number : int
+        The last block number of the range (inclusive).
+    blocks_per_query : int
+        The maximum number of blocks of a chunk.
+    aligned : bool, optional
+        If True, the chunks start at multiples of the number of blocks
+        per query (except for the first block of the range), so that
+        the same blocks always form the same chunks regardless of the
+        range's boundaries (default: False).
+
+    Yields
+    ------
+    tuple of int and int
+        The first and last block numbers (inclusive) of each chunk, in
+        descending order.
+
+    """
+    assert blocks_per_query > 0
+    if aligned:
+        while to_block_number >= from_block_number:
+            chunk_from_block_number = max(
+                to_block_number // blocks_per_query * blocks_per_query,
+                from_block_number)
+            yield (chunk_from_block_number, to_block_number)
+            to_block_number = chunk_from_block_number - 1
+        return
+    for to_block_number_ in range(to_block_number, from_block_number - 1,
+                                  -blocks_per_query):
+        yield (max(to_block_number_ - blocks_per_query + 1,
+                   from_block_number), to_block_number_)
+
+
+def scan_block_range(from_block_number: int, to_block_number: int,
+                     blocks_per_query: int, max_parallel_queries: int,
+                     query_blocks: typing.Callable[[int, int],
+                                                   typing.Optional[_Result]],
+                     aligned: bool = False) -> typing.Optional[_Result]:
+    """Scan a block range for a result. The range is split into chunks
+    of at most the given number of blocks (see get_block_range_chunks),
+    which are queried concurrently. At most the given number of chunk
+    queries is in progress at any time, so that a node provider's rate
+    limits can be respected. As soon as a chunk query has found a
+    result, no further chunks are queried and the queries of chunks
+    that have not been started yet are cancelled.
+
+    Parameters
+    ----------
+    from_block_number : int
+        The first block number of the range.
+    to_block_number : int
+        The last block number of the range (inclusive).
+    blocks_per_query : int
+        The maximum number of blocks of a chunk.
+    max_parallel_queries : int
+        The maximum number of concurrent chunk queries.
+    query_blocks : callable
+        The function querying a chunk. It is called with the first and
+        last block numbers (inclusive) of the chunk and returns the
+        result, or None if the chunk does not contain it.
+    aligned : bool, optional
+        If True, the chunks are aligned to multiples of the number of
+        blocks per query (see get_block_range_chunks).
+
+    Returns
+    -------
+    object or None
+        The result of the first chunk query that has found one, or None
+        if no chunk contains a result.
+
+    Raises
+    ------
+    Exception
+        If a chunk query fails (the remaining chunk queries are
+        cancelled).
+
+    """
+    assert max_parallel_queries > 0
+    chunks = get_block_range_chunks(from_block_number, to_block_number,
+                                    blocks_per_query, aligned)
+    executor = concurrent.futures.ThreadPoolExecutor(max_parallel_queries)
+    futures: typing.Set[concurrent.futures.Future] = set()
+    try:
+        while True:
+            # Only submit as many chunks as can be queried at once, so
+            # that no further chunks are queried after a result is found
+            for chunk in chunks:
+                futures.add(executor.submit(query_blocks, *chunk))
+                if len(futures) == max_parallel_queries:
+                    break
+            if len(futures) == 0:
+                return None
+            done_futures, futures = concurrent.futures.wait(
+                futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done_futures:
+                result = future.result()
+                if result is not None:
+                    return result
+    finally:
+        # Chunk queries that are already in progress cannot be
+        # interrupted, but their results are not waited for
+        executor.shutdown(wait=False, cancel_futures=True)
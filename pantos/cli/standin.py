@@ -0,0 +1,445 @@
+"""Module for a local stand-in of a Pantos service node and the
+blockchain nodes, so that the Client CLI's transfer path can be
+exercised (e.g. load tested) without any network access.
+
+A single HTTP server serves both the service node's REST resources
+(bids, transfer submission, and transfer status) and a JSON-RPC
+endpoint per (Ethereum-compatible) blockchain. The JSON-RPC endpoints
+answer exactly the requests the client library sends for the transfer
+path: the hub contract's service node, nonce and external token
+queries, the token contract's queries, and the block and event log
+queries. While the server is running, the client library's
+configuration points to it instead of the configured blockchain nodes.
+
+"""
+import dataclasses
+import functools
+import http.server
+import json
+import logging
+import secrets
+import threading
+import time
+import typing
+import urllib.parse
+import uuid
+
+import web3
+from pantos.client.library import api
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+from pantos.common.blockchains.base import VersionedContractAbi
+from pantos.common.blockchains.enums import ContractAbi
+from pantos.common.entities import ServiceNodeTransferStatus
+
+from pantos.cli.blockchains import get_blockchain_client
+from pantos.cli.blockchains import get_blockchain_utilities
+from pantos.cli.blockchains import get_library_blockchain_config
+
+_RPC_PATH_PREFIX: typing.Final[str] = '/rpc/'
+"""Path prefix of the blockchains' JSON-RPC endpoints."""
+
+_CLIENT_VERSION: typing.Final[str] = 'pantos-client-cli/stand-in'
+"""Client version reported by the JSON-RPC endpoints."""
+
+_INITIAL_BLOCK_NUMBER: typing.Final[int] = 1000
+"""Block number of the stand-in blockchains at the server start."""
+
+_BID_FEE: typing.Final[int] = 10**7
+"""Fee of the stand-in service node's bid (in the smallest subunit)."""
+
+_BID_EXECUTION_TIME: typing.Final[int] = 600
+"""Execution time of the stand-in service node's bid in seconds."""
+
+_BID_VALIDITY: typing.Final[int] = 3600
+"""Validity period of the stand-in service node's bid in seconds."""
+
+_TOKEN_DECIMALS: typing.Final[int] = 8
+"""Number of decimals of all stand-in tokens."""
+
+_TOKEN_BALANCE: typing.Final[int] = 10**18
+"""Token balance of all accounts on the stand-in blockchains."""
+
+_INVALID_REQUEST_ERROR_CODE: typing.Final[int] = -32600
+"""JSON-RPC error code for invalid or unsupported requests."""
+
+_SERVER_ERROR_CODE: typing.Final[int] = -32000
+"""JSON-RPC error code for any other failed request."""
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class _ContractFunction:
+    name: str
+    input_types: typing.List[str]
+    output_types: typing.List[str]
+
+
+class StandInServer:
+    """Local HTTP server standing in for a Pantos service node and the
+    nodes of one or more blockchains. Every submitted transfer is
+    immediately reported as confirmed on the source blockchain.
+
+    The server must be started before the client library's blockchain
+    clients are first used in the process, since they keep the
+    blockchain node URLs they have been created with.
+
+    Attributes
+    ----------
+    service_node_address : api.BlockchainAddress
+        The address of the (only) stand-in service node.
+
+    """
+    def __init__(self, blockchains: typing.List[api.Blockchain],
+                 service_node_latency: float = 0.0, rpc_latency: float = 0.0):
+        """Construct a stand-in server instance.
+
+        Parameters
+        ----------
+        blockchains : list of api.Blockchain
+            The blockchains to provide JSON-RPC endpoints for.
+        service_node_latency : float, optional
+            The simulated processing time of each service node request
+            in seconds (default: 0).
+        rpc_latency : float, optional
+            The simulated processing time of each JSON-RPC request in
+            seconds (default: 0).
+
+        """
+        self.service_node_address = _create_address()
+        self.__blockchains = blockchains
+        self.__service_node_latency = service_node_latency
+        self.__rpc_latency = rpc_latency
+        self.__original_blockchain_configs: typing.Dict[
+            api.Blockchain, typing.Dict[str, typing.Any]] = {}
+        self.__start_time = time.time()
+        self.__transfers: typing.Dict[uuid.UUID, typing.Dict[str,
+                                                             typing.Any]] = {}
+        self.__transfers_lock = threading.Lock()
+        self.__codec = web3.Web3().codec
+        self.__http_server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), _create_request_handler_class(self))
+        self.__http_server.daemon_threads = True
+        self.__thread: typing.Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'StandInServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """The base URL of the stand-in server (which is also the
+        stand-in service node's URL).
+
+        """
+        host, port = self.__http_server.server_address[:2]
+        return f'http://{host!s}:{port}/'
+
+    def get_rpc_url(self, blockchain: api.Blockchain) -> str:
+        """Get the URL of a blockchain's stand-in JSON-RPC endpoint.
+
+        Parameters
+        ----------
+        blockchain : api.Blockchain
+            The blockchain to get the JSON-RPC endpoint's URL for.
+
+        Returns
+        -------
+        str
+            The JSON-RPC endpoint's URL.
+
+        """
+        return f'{self.url[:-1]}{_RPC_PATH_PREFIX}{blockchain.name.lower()}'
+
+    def start(self) -> None:
+        """Start serving requests in a background thread and point the
+        client library's configuration of the blockchains to the
+        stand-in JSON-RPC endpoints.
+
+        """
+        assert self.__thread is None
+        for blockchain in self.__blockchains:
+            blockchain_config = get_library_blockchain_config(blockchain)
+            self.__original_blockchain_configs[blockchain] = \
+                blockchain_config.copy()
+            blockchain_config.update({
+                'active': True,
+                'provider': self.get_rpc_url(blockchain),
+                'fallback_providers': []
+            })
+            # The stand-in accepts any contract address, but the client
+            # library needs the addresses to be configured
+            for key in ('hub', 'forwarder'):
+                if not blockchain_config.get(key):
+                    blockchain_config[key] = _create_address()
+            blockchain_config['tokens'] = dict(blockchain_config['tokens'])
+            if not blockchain_config['tokens'].get(TOKEN_SYMBOL_PAN):
+                blockchain_config['tokens'][TOKEN_SYMBOL_PAN] = \
+                    _create_address()
+        self.__thread = threading.Thread(
+            target=self.__http_server.serve_forever, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop serving requests and restore the client library's
+        configuration of the blockchains.
+
+        """
+        if self.__thread is not None:
+            self.__http_server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__http_server.server_close()
+        for blockchain, original_blockchain_config in \
+                self.__original_blockchain_configs.items():
+            get_library_blockchain_config(blockchain).update(
+                original_blockchain_config)
+        self.__original_blockchain_configs.clear()
+
+    def _handle_get(self, path: str) -> typing.Tuple[int, typing.Any]:
+        time.sleep(self.__service_node_latency)
+        url = urllib.parse.urlsplit(path)
+        resources = url.path.strip('/').split('/')
+        if resources == ['bids']:
+            return 200, [{
+                'fee': _BID_FEE,
+                'execution_time': _BID_EXECUTION_TIME,
+                'valid_until': int(time.time()) + _BID_VALIDITY,
+                'signature': '0x' + secrets.token_hex(65)
+            }]
+        if (len(resources) == 3 and resources[0] == 'transfer'
+                and resources[2] == 'status'):
+            try:
+                task_id = uuid.UUID(resources[1])
+                with self.__transfers_lock:
+                    transfer = self.__transfers[task_id]
+            except (KeyError, ValueError):
+                return 404, {'message': 'unknown task ID'}
+            return 200, transfer
+        return 404, {'message': 'unknown resource'}
+
+    def _handle_post(self, path: str,
+                     body: typing.Any) -> typing.Tuple[int, typing.Any]:
+        if path.startswith(_RPC_PATH_PREFIX):
+            time.sleep(self.__rpc_latency)
+            blockchain_name = path[len(_RPC_PATH_PREFIX):].strip('/')
+            return 200, self.__handle_rpc_request(blockchain_name, body)
+        time.sleep(self.__service_node_latency)
+        if path.strip('/') != 'transfer':
+            return 404, {'message': 'unknown resource'}
+        try:
+            task_id = uuid.uuid4()
+            transfer = {
+                'task_id': str(task_id),
+                'source_blockchain_id': body['source_blockchain_id'],
+                'destination_blockchain_id': body['destination_blockchain_id'],
+                'sender_address': body['sender_address'],
+                'recipient_address': body['recipient_address'],
+                'source_token_address': body['source_token_address'],
+                'destination_token_address': body['destination_token_address'],
+                'amount': body['amount'],
+                'fee': body['bid']['fee'],
+                'status': ServiceNodeTransferStatus.CONFIRMED.name.lower(),
+                'transaction_id': '0x' + secrets.token_hex(32)
+            }
+        except (KeyError, TypeError):
+            return 400, {'message': 'invalid transfer request'}
+        with self.__transfers_lock:
+            transfer['transfer_id'] = len(self.__transfers)
+            self.__transfers[task_id] = transfer
+        return 200, {'task_id': str(task_id)}
+
+    def __handle_rpc_request(
+            self, blockchain_name: str,
+            request: typing.Any) -> typing.Dict[str, typing.Any]:
+        response: typing.Dict[str, typing.Any] = {
+            'jsonrpc': '2.0',
+            'id': request.get('id')
+        }
+        try:
+            blockchain = api.Blockchain.from_name(blockchain_name)
+            assert blockchain in self.__blockchains
+            response['result'] = self.__call_rpc_method(
+                blockchain, request['method'], request.get('params', []))
+        except ValueError as error:
+            _logger.debug(f'invalid stand-in JSON-RPC request: {error}')
+            response['error'] = {
+                'code': _INVALID_REQUEST_ERROR_CODE,
+                'message': str(error)
+            }
+        except Exception as error:
+            _logger.debug('stand-in JSON-RPC request failed', exc_info=True)
+            response['error'] = {
+                'code': _SERVER_ERROR_CODE,
+                'message': str(error)
+            }
+        return response
+
+    def __call_rpc_method(self, blockchain: api.Blockchain, method: str,
+                          params: typing.List[typing.Any]) -> typing.Any:
+        blockchain_config = get_library_blockchain_config(blockchain)
+        if method == 'web3_clientVersion':
+            return _CLIENT_VERSION
+        if method == 'eth_chainId':
+            return hex(blockchain_config['chain_id'])
+        if method == 'net_version':
+            return str(blockchain_config['chain_id'])
+        if method == 'eth_blockNumber':
+            return hex(self.__get_block_number(blockchain_config))
+        if method == 'eth_getBlockByNumber':
+            return self.__create_block(blockchain_config, params[0])
+        if method == 'eth_call':
+            return self.__call_contract_function(blockchain, blockchain_config,
+                                                 params[0])
+        if method == 'eth_getLogs':
+            return []
+        if method == 'eth_getCode':
+            # No contracts other than the Pantos contracts are deployed
+            return '0x'
+        raise ValueError(f'unsupported method {method}')
+
+    def __get_block_number(
+            self, blockchain_config: typing.Dict[str, typing.Any]) -> int:
+        return _INITIAL_BLOCK_NUMBER + int(
+            (time.time() - self.__start_time) /
+            blockchain_config['average_block_time'])
+
+    def __create_block(self, blockchain_config: typing.Dict[str, typing.Any],
+                       block_identifier: str) -> typing.Dict[str, typing.Any]:
+        latest_block_number = self.__get_block_number(blockchain_config)
+        block_number = (latest_block_number
+                        if not block_identifier.startswith('0x') else min(
+                            int(block_identifier, 16), latest_block_number))
+        return {
+            'number': hex(block_number),
+            'hash': '0x' + block_number.to_bytes(32, 'big').hex(),
+            'parentHash': '0x' + (block_number - 1).to_bytes(32, 'big').hex(),
+            'timestamp': hex(
+                int(self.__start_time) +
+                (block_number - _INITIAL_BLOCK_NUMBER) *
+                blockchain_config['average_block_time']),
+            'miner': '0x' + '00' * 20,
+            'extraData': '0x',
+            'gasLimit': hex(30_000_000),
+            'gasUsed': '0x0',
+            'baseFeePerGas': '0x1',
+            'difficulty': '0x0',
+            'totalDifficulty': '0x0',
+            'nonce': '0x' + '00' * 8,
+            'size': '0x0',
+            'transactions': [],
+            'uncles': []
+        }
+
+    def __call_contract_function(
+            self, blockchain: api.Blockchain,
+            blockchain_config: typing.Dict[str, typing.Any],
+            transaction: typing.Dict[str, typing.Any]) -> str:
+        data = bytes.fromhex(
+            transaction.get('data', transaction.get('input', '0x'))[2:])
+        is_hub = (
+            transaction['to'].lower() == blockchain_config['hub'].lower())
+        contract_function = _load_contract_functions(
+            blockchain)[ContractAbi.PANTOS_HUB if is_hub else ContractAbi.
+                        PANTOS_TOKEN][data[:4]]
+        arguments = self.__codec.decode(contract_function.input_types,
+                                        data[4:])
+        result = self.__get_contract_function_result(contract_function.name,
+                                                     arguments)
+        return '0x' + self.__codec.encode(contract_function.output_types,
+                                          result).hex()
+
+    def __get_contract_function_result(
+            self, function_name: str,
+            arguments: typing.Tuple[typing.Any,
+                                    ...]) -> typing.List[typing.Any]:
+        if function_name == 'getServiceNodes':
+            return [[self.service_node_address]]
+        if function_name == 'getServiceNodeRecord':
+            return [(arguments[0].lower() == self.service_node_address.lower(),
+                     self.url, 0, self.service_node_address, 0)]
+        if function_name == 'isValidSenderNonce':
+            return [True]
+        if function_name == 'getExternalTokenRecord':
+            # Tokens have the same address on all stand-in blockchains
+            return [(True, web3.Web3.to_checksum_address(arguments[0]))]
+        if function_name == 'decimals':
+            return [_TOKEN_DECIMALS]
+        if function_name == 'balanceOf':
+            return [_TOKEN_BALANCE]
+        raise ValueError(f'unsupported function {function_name}')
+
+
+def _create_request_handler_class(
+        server: StandInServer
+) -> typing.Type[http.server.BaseHTTPRequestHandler]:
+    class RequestHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self) -> None:
+            self.__send_response(*server._handle_get(self.path))
+
+        def do_POST(self) -> None:
+            content_length = int(self.headers.get('Content-Length', 0))
+            try:
+                body = json.loads(self.rfile.read(content_length))
+            except ValueError:
+                self.__send_response(400, {'message': 'invalid JSON'})
+                return
+            self.__send_response(*server._handle_post(self.path, body))
+
+        def log_message(self, format: str, *args: typing.Any) -> None:
+            _logger.debug(format, *args)
+
+        def __send_response(self, status_code: int, body: typing.Any) -> None:
+            content = json.dumps(body).encode()
+            self.send_response(status_code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    return RequestHandler
+
+
+@functools.cache
+def _load_contract_functions(
+    blockchain: api.Blockchain
+) -> typing.Dict[ContractAbi, typing.Dict[bytes, _ContractFunction]]:
+    protocol_version = get_blockchain_client(blockchain).protocol_version
+    utilities = get_blockchain_utilities(blockchain)
+    contract_functions: typing.Dict[ContractAbi,
+                                    typing.Dict[bytes,
+                                                _ContractFunction]] = {}
+    for contract_abi in (ContractAbi.PANTOS_HUB, ContractAbi.PANTOS_TOKEN):
+        loaded_contract_abi = utilities.load_contract_abi(
+            VersionedContractAbi(contract_abi, protocol_version))
+        contract_functions[contract_abi] = {}
+        for entry in loaded_contract_abi:
+            if entry['type'] != 'function':
+                continue
+            input_types = [_get_abi_type(input_) for input_ in entry['inputs']]
+            output_types = [
+                _get_abi_type(output) for output in entry['outputs']
+            ]
+            selector = web3.Web3.keccak(
+                text=f'{entry["name"]}({",".join(input_types)})')[:4]
+            contract_functions[contract_abi][bytes(selector)] = \
+                _ContractFunction(entry['name'], input_types, output_types)
+    return contract_functions
+
+
+def _create_address() -> api.BlockchainAddress:
+    return api.BlockchainAddress(web3.Account.create().address)
+
+
+def _get_abi_type(parameter: typing.Dict[str, typing.Any]) -> str:
+    abi_type = parameter['type']
+    if not abi_type.startswith('tuple'):
+        return abi_type
+    component_types = ','.join(
+        _get_abi_type(component) for component in parameter['components'])
+    return f'({component_types}){abi_type[len("tuple"):]}'
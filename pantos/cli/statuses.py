@@ -0,0 +1,247 @@
+"""Module for retrieving the status of token transfers.
+
+"""
+import time
+import typing
+import uuid
+
+from pantos.client.library import api
+from pantos.client.library.blockchains import BlockchainClient
+from pantos.common.blockchains.base import NodeConnections
+from pantos.common.blockchains.base import VersionedContractAbi
+from pantos.common.blockchains.enums import ContractAbi
+from pantos.common.servicenodes import ServiceNodeClient
+from pantos.common.servicenodes import ServiceNodeTransferStatus
+
+from pantos.cli.blockchains import get_blockchain_client
+from pantos.cli.blockchains import get_blockchain_utilities
+from pantos.cli.blockchains import get_library_blockchain_config
+from pantos.cli.blockchains import get_service_node_timeout
+from pantos.cli.configuration import get_blockchain_config
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.nodes import is_service_node_available
+from pantos.cli.nodes import record_service_node_failure
+from pantos.cli.nodes import record_service_node_success
+from pantos.cli.responses import get_cached_response
+from pantos.cli.responses import is_final_block_range
+from pantos.cli.scans import scan_block_range
+
+
+def get_token_transfer_status(
+        source_blockchain: api.Blockchain,
+        service_node_address: api.BlockchainAddress, task_id: uuid.UUID,
+        blocks_to_search: typing.Optional[int] = None) \
+        -> api.TokenTransferStatus:
+    """Get the status of a token transfer. Its source status is
+    retrieved from the service node (unless the service node is known
+    to be unavailable, see is_service_node_available). For a transfer
+    confirmed on the source blockchain, the destination blockchain is
+    searched for the transfer (see find_destination_transfer).
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the transfer.
+    service_node_address : api.BlockchainAddress
+        The address of the service node the transfer was submitted to.
+    task_id : uuid.UUID
+        The service node's task ID of the transfer.
+    blocks_to_search : int, optional
+        The number of most recent blocks to search for the transfer on
+        the destination blockchain (default: all blocks).
+
+    Returns
+    -------
+    api.TokenTransferStatus
+        The status of the token transfer.
+
+    Raises
+    ------
+    ClientCliError
+        If the status of the token transfer cannot be retrieved.
+
+    """
+    if not is_service_node_available(source_blockchain, service_node_address):
+        raise ClientCliError(
+            f'the service node {service_node_address} is currently '
+            'unavailable (see the nodes command)')
+    try:
+        service_node_url = get_blockchain_client(
+            source_blockchain).read_service_node_url(service_node_address)
+    except Exception:
+        raise ClientCliError('unable to read the URL of the service node '
+                             f'{service_node_address}')
+    start_time = time.perf_counter()
+    try:
+        source_status = ServiceNodeClient().status(service_node_url, task_id,
+                                                   get_service_node_timeout())
+    except Exception:
+        record_service_node_failure(source_blockchain, service_node_address)
+        raise ClientCliError('unable to get the token transfer status from '
+                             f'the service node {service_node_address}')
+    record_service_node_success(source_blockchain, service_node_address,
+                                time.perf_counter() - start_time)
+    transfer_status = api.TokenTransferStatus(
+        destination_blockchain=source_status.destination_blockchain,
+        source_transfer_status=source_status.status,
+        destination_transfer_status=api.DestinationTransferStatus.UNKNOWN,
+        sender_address=source_status.sender_address,
+        recipient_address=source_status.recipient_address,
+        source_token_address=source_status.source_token_address,
+        destination_token_address=source_status.destination_token_address,
+        amount=source_status.token_amount)
+    if source_status.status is not ServiceNodeTransferStatus.CONFIRMED:
+        return transfer_status
+    transfer_status.source_transaction_id = source_status.transaction_id
+    transfer_status.source_transfer_id = source_status.transfer_id
+    try:
+        destination_transfer = find_destination_transfer(
+            source_status.destination_blockchain, source_blockchain,
+            source_status.transaction_id, blocks_to_search)
+    except Exception:
+        raise ClientCliError(
+            'unable to search the destination blockchain '
+            f'{source_status.destination_blockchain.name} for the token '
+            'transfer')
+    if destination_transfer is None:
+        return transfer_status
+    confirmations = get_library_blockchain_config(
+        source_status.destination_blockchain)['confirmations']
+    transfer_status.destination_transfer_status = (
+        api.DestinationTransferStatus.SUBMITTED
+        if destination_transfer.latest_block_number -
+        destination_transfer.transaction_block_number < confirmations else
+        api.DestinationTransferStatus.CONFIRMED)
+    transfer_status.destination_transaction_id = \
+        destination_transfer.destination_transaction_id
+    transfer_status.destination_transfer_id = \
+        destination_transfer.destination_transfer_id
+    transfer_status.validator_nonce = destination_transfer.validator_nonce
+    transfer_status.signer_addresses = destination_transfer.signer_addresses
+    transfer_status.signatures = destination_transfer.signatures
+    return transfer_status
+
+
+def find_destination_transfer(
+        destination_blockchain: api.Blockchain,
+        source_blockchain: api.Blockchain, source_transaction_id: str,
+        blocks_to_search: typing.Optional[int] = None) \
+        -> typing.Optional[BlockchainClient.DestinationTransferResponse]:
+    """Search the destination blockchain for a token transfer. The
+    searched block range is split into chunks of the destination
+    blockchain's configured number of blocks per query, which are
+    scanned for the Pantos Hub's TransferToSucceeded events in parallel
+    (with at most the configured number of parallel queries). The scan
+    stops as soon as the transfer has been found. The chunks are
+    aligned to multiples of the number of blocks per query, and the
+    events of the chunks with enough confirmations are cached (see
+    get_cached_response).
+
+    Parameters
+    ----------
+    destination_blockchain : api.Blockchain
+        The destination blockchain of the transfer.
+    source_blockchain : api.Blockchain
+        The source blockchain of the transfer.
+    source_transaction_id : str
+        The transaction ID of the transfer on the source blockchain.
+    blocks_to_search : int, optional
+        The number of most recent blocks to search (default: all
+        blocks).
+
+    Returns
+    -------
+    BlockchainClient.DestinationTransferResponse or None
+        The data of the transfer on the destination blockchain, or None
+        if it has not been found.
+
+    Raises
+    ------
+    Exception
+        If the destination blockchain cannot be searched.
+
+    """
+    node_connections = get_blockchain_utilities(
+        destination_blockchain).create_node_connections()
+    hub_contract = _create_hub_contract(destination_blockchain,
+                                        node_connections)
+    hub_address = get_library_blockchain_config(destination_blockchain)['hub']
+    protocol_version = get_blockchain_client(
+        destination_blockchain).protocol_version
+    latest_block_number = \
+        node_connections.eth.get_block_number().get_minimum_result()
+    from_block_number = (max(latest_block_number - blocks_to_search +
+                             1, 0) if blocks_to_search else 0)
+
+    def query_blocks(
+        from_block_number_: int, to_block_number_: int
+    ) -> typing.Optional[BlockchainClient.DestinationTransferResponse]:
+        def query_transfer_event_logs() -> typing.List[typing.Any]:
+            return hub_contract.events.TransferToSucceeded().get_logs(
+                fromBlock=from_block_number_, toBlock=to_block_number_).get()
+
+        if is_final_block_range(destination_blockchain, to_block_number_,
+                                latest_block_number):
+            transfer_event_logs = get_cached_response(
+                destination_blockchain, [
+                    'TransferToSucceeded', hub_address,
+                    str(protocol_version), from_block_number_, to_block_number_
+                ], query_transfer_event_logs)
+        else:
+            transfer_event_logs = query_transfer_event_logs()
+        for transfer_event_log in transfer_event_logs:
+            if _is_destination_transfer(transfer_event_log, source_blockchain,
+                                        source_transaction_id):
+                return _create_destination_transfer_response(
+                    transfer_event_log, latest_block_number)
+        return None
+
+    return scan_block_range(
+        from_block_number, latest_block_number,
+        get_library_blockchain_config(
+            destination_blockchain)['blocks_per_query'],
+        get_blockchain_config(destination_blockchain)['max_parallel_queries'],
+        query_blocks, aligned=True)
+
+
+def _create_hub_contract(
+        blockchain: api.Blockchain,
+        node_connections: NodeConnections) -> NodeConnections.Wrapper:
+    protocol_version = get_blockchain_client(blockchain).protocol_version
+    return get_blockchain_utilities(blockchain).create_contract(
+        get_library_blockchain_config(blockchain)['hub'],
+        VersionedContractAbi(ContractAbi.PANTOS_HUB, protocol_version),
+        node_connections)
+
+
+def _is_destination_transfer(transfer_event_log: typing.Any,
+                             source_blockchain: api.Blockchain,
+                             source_transaction_id: str) -> bool:
+    transfer_event_request = transfer_event_log['args']['request']
+    return (transfer_event_request['sourceTransactionId']
+            == source_transaction_id
+            and transfer_event_request['sourceBlockchainId']
+            == source_blockchain.value)
+
+
+def _create_destination_transfer_response(
+        transfer_event_log: typing.Any, latest_block_number: int
+) -> BlockchainClient.DestinationTransferResponse:
+    transfer_event_args = transfer_event_log['args']
+    transfer_event_request = transfer_event_args['request']
+    return BlockchainClient.DestinationTransferResponse(
+        latest_block_number, transfer_event_log['blockNumber'],
+        transfer_event_log['transactionHash'].to_0x_hex(),
+        transfer_event_request['sourceTransferId'],
+        transfer_event_args['destinationTransferId'],
+        api.BlockchainAddress(transfer_event_request['sender']),
+        api.BlockchainAddress(transfer_event_request['recipient']),
+        api.BlockchainAddress(transfer_event_request['sourceToken']),
+        api.BlockchainAddress(transfer_event_request['destinationToken']),
+        transfer_event_request['amount'], transfer_event_request['nonce'], [
+            api.BlockchainAddress(signer_address)
+            for signer_address in transfer_event_args['signerAddresses']
+        ], [
+            f'0x{signature.hex()}'
+            for signature in transfer_event_args['signatures']
+        ])
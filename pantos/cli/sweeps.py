@@ -0,0 +1,260 @@
+"""Module for sweeping the token balances of many accounts into a
+single recipient account.
+
+"""
+import concurrent.futures
+import dataclasses
+import pathlib
+import typing
+
+from pantos.client.library import api
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+
+from pantos.cli.balances import read_token_balances
+from pantos.cli.blockchains import get_account_address
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.tokens import get_token_address
+from pantos.cli.transfers import SignedTransfer
+from pantos.cli.transfers import TransferInput
+from pantos.cli.transfers import sign_transfer
+from pantos.cli.transfers import submit_signed_transfers
+
+_DEFAULT_MAX_WORKERS: typing.Final[int] = 16
+"""Default maximum number of concurrently processed accounts."""
+
+
+@dataclasses.dataclass
+class SweepAccount:
+    """Account whose token balance is to be swept.
+
+    Attributes
+    ----------
+    keystore_path : pathlib.Path
+        The path of the account's keystore file.
+    private_key : api.PrivateKey
+        The unencrypted private key of the account.
+    address : api.BlockchainAddress
+        The address of the account.
+    balance : int
+        The account's balance of the swept token in the token's
+        smallest subunit.
+    fee_balance : int
+        The account's PAN balance (to pay the service node fee) in the
+        smallest subunit of PAN.
+
+    """
+    keystore_path: pathlib.Path
+    private_key: api.PrivateKey
+    address: api.BlockchainAddress
+    balance: int
+    fee_balance: int
+
+
+def read_sweep_accounts(
+        source_blockchain: api.Blockchain, token_symbol: api.TokenSymbol,
+        keystore_paths: typing.List[pathlib.Path], password: str,
+        max_workers: int = _DEFAULT_MAX_WORKERS) \
+        -> typing.List[typing.Union[SweepAccount, Exception]]:
+    """Read the accounts to be swept. The keystores are decrypted
+    concurrently, and the balances of all accounts are then read in
+    batches at the same block (see read_token_balances).
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The blockchain of the accounts.
+    token_symbol : api.TokenSymbol
+        The symbol of the token to be swept.
+    keystore_paths : list of pathlib.Path
+        The paths of the accounts' keystore files.
+    password : str
+        The password of the keystores.
+    max_workers : int, optional
+        The maximum number of concurrently read accounts.
+
+    Returns
+    -------
+    list of SweepAccount or Exception
+        For each keystore (in the same order), either the account to be
+        swept or the error that prevented reading it.
+
+    Raises
+    ------
+    ClientCliError
+        If the token symbol is unknown on the blockchain or the
+        accounts' balances cannot be read.
+
+    """
+    token_address = get_token_address(source_blockchain, token_symbol)
+    fee_token_address = get_token_address(source_blockchain, TOKEN_SYMBOL_PAN)
+
+    def decrypt_keystore(
+        keystore_path: pathlib.Path
+    ) -> typing.Tuple[api.PrivateKey, api.BlockchainAddress]:
+        try:
+            keystore = keystore_path.read_text()
+        except (OSError, UnicodeDecodeError):
+            raise ClientCliError(
+                f'unable to read the keystore {keystore_path}')
+        try:
+            private_key = api.decrypt_private_key(source_blockchain, keystore,
+                                                  password)
+        except Exception:
+            # The error must not disclose the keystore's content
+            raise ClientCliError(
+                f'unable to decrypt the keystore {keystore_path}')
+        return private_key, get_account_address(source_blockchain, private_key)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        futures = [
+            executor.submit(decrypt_keystore, keystore_path)
+            for keystore_path in keystore_paths
+        ]
+    accounts: typing.List[typing.Union[typing.Tuple[api.PrivateKey,
+                                                    api.BlockchainAddress],
+                                       Exception]] = []
+    for future in futures:
+        try:
+            accounts.append(future.result())
+        except Exception as error:
+            accounts.append(error)
+    account_addresses = [
+        account[1] for account in accounts
+        if not isinstance(account, Exception)
+    ]
+    if len(account_addresses) == 0:
+        return typing.cast(typing.List[typing.Union[SweepAccount, Exception]],
+                           accounts)
+    try:
+        token_balances = read_token_balances(
+            source_blockchain, [token_address, fee_token_address],
+            account_addresses, max_workers=max_workers)
+    except ClientCliError:
+        raise
+    except Exception:
+        raise ClientCliError('unable to read the balances of the accounts')
+    results: typing.List[typing.Union[SweepAccount, Exception]] = []
+    for keystore_path, account in zip(keystore_paths, accounts):
+        if isinstance(account, Exception):
+            results.append(account)
+            continue
+        private_key, address = account
+        results.append(
+            SweepAccount(
+                keystore_path, private_key, address,
+                token_balances.get_balance(token_address, address),
+                token_balances.get_balance(fee_token_address, address)))
+    return results
+
+
+def get_sweep_amount(sweep_account: SweepAccount,
+                     token_symbol: api.TokenSymbol, service_node_fee: int,
+                     min_amount: int = 0) -> int:
+    """Get the amount of tokens to be swept from an account. The whole
+    balance is swept, except for the service node fee if the swept
+    token is PAN.
+
+    Parameters
+    ----------
+    sweep_account : SweepAccount
+        The account to be swept.
+    token_symbol : api.TokenSymbol
+        The symbol of the token to be swept.
+    service_node_fee : int
+        The service node fee of a transfer in the smallest subunit of
+        PAN.
+    min_amount : int, optional
+        The minimum amount of tokens to be swept in the token's
+        smallest subunit (default: 0). Smaller amounts (dust) are not
+        swept.
+
+    Returns
+    -------
+    int
+        The amount of tokens to be swept in the token's smallest
+        subunit, or 0 if the account is not to be swept (because its
+        balance is dust or it cannot pay the service node fee).
+
+    """
+    if token_symbol.lower() == TOKEN_SYMBOL_PAN:
+        sweep_amount = sweep_account.balance - service_node_fee
+    elif sweep_account.fee_balance >= service_node_fee:
+        sweep_amount = sweep_account.balance
+    else:
+        return 0
+    if sweep_amount <= 0 or sweep_amount < min_amount:
+        return 0
+    return sweep_amount
+
+
+def sweep_tokens(
+        source_blockchain: api.Blockchain,
+        destination_blockchain: api.Blockchain,
+        recipient_address: api.BlockchainAddress,
+        token_symbol: api.TokenSymbol,
+        sweep_amounts: typing.List[typing.Tuple[SweepAccount, int]],
+        service_node_bid: typing.Tuple[api.BlockchainAddress,
+                                       api.ServiceNodeBid],
+        max_workers: int = _DEFAULT_MAX_WORKERS) \
+        -> typing.List[typing.Union[api.ServiceNodeTaskInfo, Exception]]:
+    """Sweep tokens from many accounts to a single recipient. The
+    token transfers are signed concurrently, each by its sender, and
+    then submitted concurrently (see submit_signed_transfers).
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The blockchain of the swept accounts.
+    destination_blockchain : api.Blockchain
+        The blockchain of the recipient.
+    recipient_address : api.BlockchainAddress
+        The address of the recipient on the destination blockchain.
+    token_symbol : api.TokenSymbol
+        The symbol of the token to be swept.
+    sweep_amounts : list of tuple of SweepAccount and int
+        The accounts to be swept with the amounts of tokens to be swept
+        (in the token's smallest subunit, see get_sweep_amount).
+    service_node_bid : tuple of api.BlockchainAddress and
+            api.ServiceNodeBid
+        The address of the service node and its bid to be used for all
+        token transfers (see select_service_node_bid).
+    max_workers : int, optional
+        The maximum number of concurrently signed or submitted token
+        transfers.
+
+    Returns
+    -------
+    list of api.ServiceNodeTaskInfo or Exception
+        For each swept account (in the same order), either the service
+        node task information of its token transfer or the error that
+        prevented signing or submitting it.
+
+    """
+    def sign_sweep_transfer(
+            sweep_amount: typing.Tuple[SweepAccount, int]) -> SignedTransfer:
+        sweep_account, token_amount = sweep_amount
+        return sign_transfer(
+            source_blockchain, sweep_account.private_key,
+            TransferInput(destination_blockchain, recipient_address,
+                          token_symbol, token_amount), service_node_bid)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        futures = [
+            executor.submit(sign_sweep_transfer, sweep_amount)
+            for sweep_amount in sweep_amounts
+        ]
+    signed_transfers: typing.List[SignedTransfer] = []
+    results: typing.List[typing.Union[api.ServiceNodeTaskInfo, Exception,
+                                      None]] = []
+    for future in futures:
+        try:
+            signed_transfers.append(future.result())
+            results.append(None)
+        except Exception as error:
+            results.append(error)
+    submit_results = iter(
+        submit_signed_transfers(signed_transfers, max_workers))
+    return [
+        next(submit_results) if result is None else result
+        for result in results
+    ]
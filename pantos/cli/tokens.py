@@ -0,0 +1,294 @@
+"""Module for the Client CLI's per-blockchain token metadata cache.
+
+Token addresses are taken from the client library's configuration and
+the token decimals are read from the blockchain only once and then
+served from the local cache. A blockchain's cached token metadata is
+discarded as soon as its configured Pantos Hub address or the
+configured protocol version changes.
+
+"""
+import concurrent.futures
+import dataclasses
+import decimal
+import pathlib
+import threading
+import typing
+
+from pantos.client.library import api
+
+from pantos.cli.blockchains import get_blockchain_client
+from pantos.cli.blockchains import get_library_blockchain_config
+from pantos.cli.blockchains import get_protocol_version
+from pantos.cli.cache import read_cache_entry
+from pantos.cli.cache import write_cache_entry
+from pantos.cli.exceptions import ClientCliError
+
+_TOKENS_DIRECTORY: typing.Final[str] = 'tokens'
+"""Cache subdirectory for the token metadata."""
+
+_cache_lock = threading.Lock()
+"""Lock for concurrent updates of the token metadata cache."""
+
+
+@dataclasses.dataclass
+class TokenMetadata:
+    """Metadata of a Pantos-compatible token on a blockchain.
+
+    Attributes
+    ----------
+    token_symbol : api.TokenSymbol
+        The symbol of the token.
+    token_address : api.BlockchainAddress
+        The address of the token.
+    token_decimals : int
+        The number of decimals of the token.
+
+    """
+    token_symbol: api.TokenSymbol
+    token_address: api.BlockchainAddress
+    token_decimals: int
+
+
+def get_token_address(blockchain: api.Blockchain,
+                      token_symbol: api.TokenSymbol) -> api.BlockchainAddress:
+    """Get the configured address of a token.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain to get the token address for.
+    token_symbol : api.TokenSymbol
+        The symbol of the token.
+
+    Returns
+    -------
+    api.BlockchainAddress
+        The token's address.
+
+    Raises
+    ------
+    ClientCliError
+        If the token symbol is unknown on the blockchain.
+
+    """
+    token_address = get_library_blockchain_config(blockchain)['tokens'].get(
+        token_symbol.lower())
+    if not token_address:
+        raise ClientCliError(f'the token {token_symbol.upper()} is not '
+                             f'available on {blockchain.name}')
+    return api.BlockchainAddress(token_address)
+
+
+def get_token_symbols(
+        blockchain: api.Blockchain) -> typing.List[api.TokenSymbol]:
+    """Get the symbols of all tokens configured on a blockchain.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain to get the token symbols for.
+
+    Returns
+    -------
+    list of api.TokenSymbol
+        The sorted token symbols.
+
+    """
+    return sorted(
+        api.TokenSymbol(token_symbol) for token_symbol, token_address in
+        get_library_blockchain_config(blockchain)['tokens'].items()
+        if token_address)
+
+
+def get_token_metadata(blockchain: api.Blockchain,
+                       token_symbol: api.TokenSymbol) -> TokenMetadata:
+    """Get the metadata of a token, reading it from the blockchain only
+    if it is not cached yet.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain to get the token metadata for.
+    token_symbol : api.TokenSymbol
+        The symbol of the token.
+
+    Returns
+    -------
+    TokenMetadata
+        The token's metadata.
+
+    Raises
+    ------
+    ClientCliError
+        If the token symbol is unknown on the blockchain.
+    pantos.client.library.exceptions.ClientLibraryError
+        If the token decimals cannot be read from the blockchain.
+
+    """
+    token_symbol = api.TokenSymbol(token_symbol.lower())
+    token_address = get_token_address(blockchain, token_symbol)
+    cached_tokens = _read_cached_tokens(blockchain)
+    cached_token = cached_tokens.get(token_symbol)
+    if (cached_token is not None and cached_token['address'] == token_address):
+        return TokenMetadata(token_symbol, token_address,
+                             cached_token['decimals'])
+    token_metadata = _read_token_metadata(blockchain, token_symbol)
+    _update_cached_tokens(blockchain, [token_metadata])
+    return token_metadata
+
+
+def refresh_token_metadata(
+        blockchain: api.Blockchain) -> typing.List[TokenMetadata]:
+    """Read the metadata of all configured tokens of a blockchain and
+    replace the blockchain's cached token metadata with it.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain to refresh the token metadata for.
+
+    Returns
+    -------
+    list of TokenMetadata
+        The metadata of all configured tokens, sorted by symbol.
+
+    Raises
+    ------
+    pantos.client.library.exceptions.ClientLibraryError
+        If the token metadata cannot be read from the blockchain.
+
+    """
+    token_symbols = get_token_symbols(blockchain)
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        tokens_metadata = list(
+            executor.map(
+                lambda token_symbol: _read_token_metadata(
+                    blockchain, token_symbol), token_symbols))
+    _update_cached_tokens(blockchain, tokens_metadata, replace=True)
+    return tokens_metadata
+
+
+def convert_amount_to_main_unit(blockchain: api.Blockchain,
+                                token_symbol: api.TokenSymbol,
+                                amount_subunit: int) -> decimal.Decimal:
+    """Convert an amount from a token's smallest subunit to its main
+    unit.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain to convert the token amount for.
+    token_symbol : api.TokenSymbol
+        The symbol of the token.
+    amount_subunit : int
+        The amount in the token's smallest subunit.
+
+    Returns
+    -------
+    decimal.Decimal
+        The amount in the token's main unit.
+
+    Raises
+    ------
+    ClientCliError
+        If the amount is negative or the token symbol is unknown.
+
+    """
+    if amount_subunit < 0:
+        raise ClientCliError('the amount must be non-negative')
+    if amount_subunit == 0:
+        return decimal.Decimal(0)
+    token_decimals = get_token_metadata(blockchain,
+                                        token_symbol).token_decimals
+    return decimal.Decimal(amount_subunit) / (10**token_decimals)
+
+
+def convert_amount_to_subunit(blockchain: api.Blockchain,
+                              token_symbol: api.TokenSymbol,
+                              amount_main_unit: decimal.Decimal) -> int:
+    """Convert an amount from a token's main unit to its smallest
+    subunit.
+
+    Parameters
+    ----------
+    blockchain : api.Blockchain
+        The blockchain to convert the token amount for.
+    token_symbol : api.TokenSymbol
+        The symbol of the token.
+    amount_main_unit : decimal.Decimal
+        The amount in the token's main unit.
+
+    Returns
+    -------
+    int
+        The amount in the token's smallest subunit.
+
+    Raises
+    ------
+    ClientCliError
+        If the amount is negative, has more decimals than the token,
+        or the token symbol is unknown.
+
+    """
+    if amount_main_unit < 0:
+        raise ClientCliError('the amount must be non-negative')
+    if amount_main_unit == 0:
+        return 0
+    token_decimals = get_token_metadata(blockchain,
+                                        token_symbol).token_decimals
+    amount_subunit = amount_main_unit * (10**token_decimals)
+    amount_subunit_integer = int(amount_subunit)
+    if amount_subunit != amount_subunit_integer:
+        raise ClientCliError(
+            f'the amount must not have more than {token_decimals} decimals')
+    return amount_subunit_integer
+
+
+def _read_token_metadata(blockchain: api.Blockchain,
+                         token_symbol: api.TokenSymbol) -> TokenMetadata:
+    token_address = get_token_address(blockchain, token_symbol)
+    token_decimals = get_blockchain_client(blockchain).read_token_decimals(
+        token_address)
+    return TokenMetadata(token_symbol, token_address, token_decimals)
+
+
+def _get_cache_path(blockchain: api.Blockchain) -> pathlib.PurePath:
+    return pathlib.PurePath(_TOKENS_DIRECTORY,
+                            f'{blockchain.name.lower()}.json')
+
+
+def _get_cache_version(blockchain: api.Blockchain) -> typing.Dict[str, str]:
+    return {
+        'hub': get_library_blockchain_config(blockchain)['hub'].lower(),
+        'protocol_version': get_protocol_version()
+    }
+
+
+def _read_cached_tokens(
+        blockchain: api.Blockchain) -> typing.Dict[str, typing.Any]:
+    entry = read_cache_entry(_get_cache_path(blockchain))
+    if (not isinstance(entry, dict)
+            or entry.get('version') != _get_cache_version(blockchain)):
+        return {}
+    return entry.get('tokens', {})
+
+
+def _write_cached_tokens(blockchain: api.Blockchain,
+                         cached_tokens: typing.Dict[str, typing.Any]) -> None:
+    write_cache_entry(_get_cache_path(blockchain), {
+        'version': _get_cache_version(blockchain),
+        'tokens': cached_tokens
+    })
+
+
+def _update_cached_tokens(blockchain: api.Blockchain,
+                          tokens_metadata: typing.List[TokenMetadata],
+                          replace: bool = False) -> None:
+    with _cache_lock:
+        cached_tokens = {} if replace else _read_cached_tokens(blockchain)
+        for token_metadata in tokens_metadata:
+            cached_tokens[token_metadata.token_symbol] = {
+                'address': token_metadata.token_address,
+                'decimals': token_metadata.token_decimals
+            }
+        _write_cached_tokens(blockchain, cached_tokens)
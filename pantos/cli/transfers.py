@@ -0,0 +1,615 @@
+"""Module for signing token transfers ahead of time and submitting the
+signed token transfers to the service nodes later.
+
+Signed token transfers are stored as JSON lines, one signed token
+transfer per line. They can be submitted as long as both the chosen
+service node bid and the token transfer itself are still valid.
+
+"""
+import concurrent.futures
+import csv
+import dataclasses
+import decimal
+import json
+import math
+import pathlib
+import time
+import typing
+
+from pantos.client.library import api
+from pantos.client.library.blockchains import BlockchainClient
+from pantos.common.servicenodes import ServiceNodeClient
+
+from pantos.cli.bids import stream_service_node_bids
+from pantos.cli.blockchains import get_blockchain_client
+from pantos.cli.blockchains import get_service_node_timeout
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.tokens import convert_amount_to_subunit
+from pantos.cli.tokens import get_token_address
+
+_VALID_UNTIL_BUFFER: typing.Final[int] = 120
+"""Buffer in seconds added to the "valid until" timestamp of a token
+transfer (same as the client library's default)."""
+
+_DEFAULT_MAX_WORKERS: typing.Final[int] = 16
+"""Default maximum number of concurrently signed or submitted token
+transfers."""
+
+_TRANSFER_INPUT_FIELDS: typing.Final[typing.Tuple[str,
+                                                  ...]] = ('destination',
+                                                           'recipient',
+                                                           'token', 'amount')
+"""Columns of a CSV file with token transfer inputs."""
+
+
+@dataclasses.dataclass
+class TransferInput:
+    """Input data of a token transfer to be signed.
+
+    Attributes
+    ----------
+    destination_blockchain : api.Blockchain
+        The token transfer's destination blockchain.
+    recipient_address : api.BlockchainAddress
+        The address of the recipient on the destination blockchain.
+    token_symbol : api.TokenSymbol
+        The symbol of the token to be transferred.
+    token_amount : int or decimal.Decimal
+        The amount of tokens to be transferred (an integer value in
+        the token's smallest subunit, a decimal value in the token's
+        main unit).
+
+    """
+    destination_blockchain: api.Blockchain
+    recipient_address: api.BlockchainAddress
+    token_symbol: api.TokenSymbol
+    token_amount: typing.Union[int, decimal.Decimal]
+
+
+@dataclasses.dataclass
+class SignedTransfer:
+    """Signed token transfer that is ready to be submitted to a service
+    node.
+
+    Attributes
+    ----------
+    source_blockchain : api.Blockchain
+        The token transfer's source blockchain.
+    destination_blockchain : api.Blockchain
+        The token transfer's destination blockchain.
+    service_node_address : api.BlockchainAddress
+        The address of the chosen service node.
+    service_node_bid : api.ServiceNodeBid
+        The chosen service node bid (with the fee in the smallest
+        subunit of PAN).
+    sender_address : api.BlockchainAddress
+        The address of the sender on the source blockchain.
+    recipient_address : api.BlockchainAddress
+        The address of the recipient on the destination blockchain.
+    source_token_address : api.BlockchainAddress
+        The address of the token on the source blockchain.
+    destination_token_address : api.BlockchainAddress
+        The address of the token on the destination blockchain.
+    token_amount : int
+        The amount of tokens in the token's smallest subunit.
+    sender_nonce : int
+        The unique sender nonce of the token transfer.
+    valid_until : int
+        The timestamp until when the token transfer can be included on
+        the source blockchain (in seconds since the epoch).
+    signature : str
+        The sender's signature for the token transfer.
+
+    """
+    source_blockchain: api.Blockchain
+    destination_blockchain: api.Blockchain
+    service_node_address: api.BlockchainAddress
+    service_node_bid: api.ServiceNodeBid
+    sender_address: api.BlockchainAddress
+    recipient_address: api.BlockchainAddress
+    source_token_address: api.BlockchainAddress
+    destination_token_address: api.BlockchainAddress
+    token_amount: int
+    sender_nonce: int
+    valid_until: int
+    signature: str
+
+    def is_expired(self) -> bool:
+        """Determine if the signed token transfer cannot be submitted
+        anymore because the token transfer or the service node bid is
+        not valid anymore.
+
+        Returns
+        -------
+        bool
+            True if the signed token transfer is expired.
+
+        """
+        return (time.time() >= self.valid_until
+                or is_service_node_bid_expired(self.service_node_bid))
+
+
+def is_service_node_bid_expired(service_node_bid: api.ServiceNodeBid) -> bool:
+    """Determine if a service node bid cannot be used for a token
+    transfer anymore.
+
+    Parameters
+    ----------
+    service_node_bid : api.ServiceNodeBid
+        The service node bid.
+
+    Returns
+    -------
+    bool
+        True if the service node bid is expired.
+
+    """
+    return time.time() >= service_node_bid.valid_until
+
+
+def read_transfer_inputs(path: pathlib.Path) -> typing.List[TransferInput]:
+    """Read token transfer inputs from a CSV file with the columns
+    destination, recipient, token, and amount (and a header row).
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The path of the CSV file.
+
+    Returns
+    -------
+    list of TransferInput
+        The token transfer inputs.
+
+    Raises
+    ------
+    ClientCliError
+        If the CSV file cannot be read or contains an invalid row.
+
+    """
+    try:
+        with path.open(newline='') as csv_file:
+            rows = list(csv.DictReader(csv_file))
+    except (OSError, csv.Error, UnicodeDecodeError):
+        raise ClientCliError(f'unable to read the transfers file {path}')
+    transfer_inputs = []
+    for row_number, row in enumerate(rows, start=2):
+        try:
+            transfer_inputs.append(
+                TransferInput(
+                    api.Blockchain.from_name(row['destination'].strip()),
+                    api.BlockchainAddress(row['recipient'].strip()),
+                    api.TokenSymbol(row['token'].strip()),
+                    decimal.Decimal(row['amount'].strip())))
+        except (AttributeError, KeyError, NameError, decimal.InvalidOperation):
+            raise ClientCliError(
+                f'invalid transfer in line {row_number} of {path} (expected '
+                f'columns: {", ".join(_TRANSFER_INPUT_FIELDS)})')
+    return transfer_inputs
+
+
+def sign_transfers(
+        source_blockchain: api.Blockchain, sender_private_key: api.PrivateKey,
+        transfer_inputs: typing.List[TransferInput],
+        service_node: typing.Optional[typing.Tuple[api.BlockchainAddress,
+                                                   int]] = None,
+        max_workers: int = _DEFAULT_MAX_WORKERS,
+        bid_deadline: typing.Optional[float] = None) \
+        -> typing.List[SignedTransfer]:
+    """Sign token transfers without submitting them. The service node
+    bids are retrieved only once per destination blockchain, and the
+    token transfers are signed concurrently.
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the token transfers.
+    sender_private_key : api.PrivateKey
+        The unencrypted private key of the sender on the source
+        blockchain.
+    transfer_inputs : list of TransferInput
+        The inputs of the token transfers to be signed.
+    service_node : tuple of api.BlockchainAddress and int, optional
+        The address of the service node and the index of its bid (as
+        listed by the bids command) to be used (the least expensive
+        service node bid is used if not provided).
+    max_workers : int, optional
+        The maximum number of concurrently signed token transfers.
+    bid_deadline : float, optional
+        The number of seconds after which the least expensive service
+        node bid received so far is used (see select_service_node_bid).
+
+    Returns
+    -------
+    list of SignedTransfer
+        The signed token transfers (in the same order as the inputs).
+
+    Raises
+    ------
+    ClientCliError
+        If a token transfer input is invalid or no matching service
+        node bid is available.
+    pantos.client.library.exceptions.ClientLibraryError
+        If a token transfer cannot be signed.
+
+    """
+    blockchain_client = get_blockchain_client(source_blockchain)
+    service_node_bids = {
+        destination_blockchain: select_service_node_bid(
+            source_blockchain, destination_blockchain, service_node,
+            bid_deadline)
+        for destination_blockchain in {
+            transfer_input.destination_blockchain
+            for transfer_input in transfer_inputs
+        }
+    }
+
+    def sign_transfer(transfer_input: TransferInput) -> SignedTransfer:
+        return _sign_transfer(
+            blockchain_client, source_blockchain, sender_private_key,
+            transfer_input,
+            service_node_bids[transfer_input.destination_blockchain])
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        return list(executor.map(sign_transfer, transfer_inputs))
+
+
+def sign_transfer(
+    source_blockchain: api.Blockchain, sender_private_key: api.PrivateKey,
+    transfer_input: TransferInput,
+    service_node_bid: typing.Tuple[api.BlockchainAddress, api.ServiceNodeBid]
+) -> SignedTransfer:
+    """Sign a single token transfer without submitting it.
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the token transfer.
+    sender_private_key : api.PrivateKey
+        The unencrypted private key of the sender on the source
+        blockchain.
+    transfer_input : TransferInput
+        The input of the token transfer to be signed.
+    service_node_bid : tuple of api.BlockchainAddress and
+            api.ServiceNodeBid
+        The address of the service node and its bid to be used (see
+        select_service_node_bid).
+
+    Returns
+    -------
+    SignedTransfer
+        The signed token transfer.
+
+    Raises
+    ------
+    ClientCliError
+        If the token transfer input is invalid.
+    pantos.client.library.exceptions.ClientLibraryError
+        If the token transfer cannot be signed.
+
+    """
+    return _sign_transfer(get_blockchain_client(source_blockchain),
+                          source_blockchain, sender_private_key,
+                          transfer_input, service_node_bid)
+
+
+def write_signed_transfers(
+        path: pathlib.Path,
+        signed_transfers: typing.List[SignedTransfer]) -> None:
+    """Append signed token transfers to a file.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The path of the signed transfers file.
+    signed_transfers : list of SignedTransfer
+        The signed token transfers to be appended.
+
+    Raises
+    ------
+    ClientCliError
+        If the signed transfers file cannot be written.
+
+    """
+    try:
+        with path.open('a') as signed_transfers_file:
+            for signed_transfer in signed_transfers:
+                signed_transfers_file.write(
+                    json.dumps(encode_signed_transfer(signed_transfer)) + '\n')
+    except OSError:
+        raise ClientCliError(f'unable to write the signed transfers file '
+                             f'{path}')
+
+
+def read_signed_transfers(path: pathlib.Path) -> typing.List[SignedTransfer]:
+    """Read signed token transfers from a file.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The path of the signed transfers file.
+
+    Returns
+    -------
+    list of SignedTransfer
+        The signed token transfers.
+
+    Raises
+    ------
+    ClientCliError
+        If the signed transfers file cannot be read or contains an
+        invalid signed token transfer.
+
+    """
+    try:
+        lines = path.read_text().splitlines()
+    except (OSError, UnicodeDecodeError):
+        raise ClientCliError(f'unable to read the signed transfers file '
+                             f'{path}')
+    signed_transfers = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            signed_transfers.append(decode_signed_transfer(json.loads(line)))
+        except (KeyError, TypeError, ValueError):
+            raise ClientCliError(
+                f'invalid signed transfer in line {line_number} of {path}')
+    return signed_transfers
+
+
+def submit_signed_transfers(
+        signed_transfers: typing.List[SignedTransfer],
+        max_workers: int = _DEFAULT_MAX_WORKERS) \
+        -> typing.List[typing.Union[api.ServiceNodeTaskInfo, Exception]]:
+    """Submit signed token transfers to the service nodes concurrently.
+
+    Parameters
+    ----------
+    signed_transfers : list of SignedTransfer
+        The signed token transfers to be submitted.
+    max_workers : int, optional
+        The maximum number of concurrently submitted token transfers.
+
+    Returns
+    -------
+    list of api.ServiceNodeTaskInfo or Exception
+        For each signed token transfer (in the same order), either the
+        service node task information or the error that prevented its
+        submission.
+
+    """
+    service_node_urls: typing.Dict[typing.Tuple[api.Blockchain,
+                                                api.BlockchainAddress],
+                                   concurrent.futures.Future[str]] = {}
+    timeout = get_service_node_timeout()
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        # Each service node URL is read only once per source blockchain
+        for signed_transfer in signed_transfers:
+            service_node_key = (signed_transfer.source_blockchain,
+                                signed_transfer.service_node_address)
+            if service_node_key not in service_node_urls:
+                service_node_urls[service_node_key] = executor.submit(
+                    _read_service_node_url, *service_node_key)
+
+        def submit_signed_transfer(
+                signed_transfer: SignedTransfer) -> api.ServiceNodeTaskInfo:
+            if signed_transfer.is_expired():
+                raise ClientCliError('the signed transfer has expired')
+            service_node_url = service_node_urls[(
+                signed_transfer.source_blockchain,
+                signed_transfer.service_node_address)].result()
+            task_id = ServiceNodeClient().submit_transfer(
+                _create_submit_transfer_request(service_node_url,
+                                                signed_transfer), timeout)
+            return api.ServiceNodeTaskInfo(
+                task_id, signed_transfer.service_node_address)
+
+        futures = [
+            executor.submit(submit_signed_transfer, signed_transfer)
+            for signed_transfer in signed_transfers
+        ]
+        results: typing.List[typing.Union[api.ServiceNodeTaskInfo,
+                                          Exception]] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as error:
+                results.append(error)
+        return results
+
+
+def select_service_node_bid(
+        source_blockchain: api.Blockchain,
+        destination_blockchain: api.Blockchain,
+        service_node: typing.Optional[typing.Tuple[api.BlockchainAddress,
+                                                   int]] = None,
+        deadline: typing.Optional[float] = None) \
+        -> typing.Tuple[api.BlockchainAddress, api.ServiceNodeBid]:
+    """Select a service node bid for token transfers. The bids are
+    streamed from the service nodes (see stream_service_node_bids), so
+    that a given service node's bid is selected as soon as that service
+    node has answered.
+
+    Parameters
+    ----------
+    source_blockchain : api.Blockchain
+        The source blockchain of the token transfers.
+    destination_blockchain : api.Blockchain
+        The destination blockchain of the token transfers.
+    service_node : tuple of api.BlockchainAddress and int, optional
+        The address of the service node and the index of its bid (as
+        listed by the bids command) to be used (the least expensive
+        service node bid is selected if not provided).
+    deadline : float, optional
+        The number of seconds after which the least expensive service
+        node bid received so far is selected without waiting for the
+        remaining service nodes (default: all service nodes are waited
+        for).
+
+    Returns
+    -------
+    tuple of api.BlockchainAddress and api.ServiceNodeBid
+        The address of the service node and its bid (with the fee in
+        the smallest subunit of PAN).
+
+    Raises
+    ------
+    ClientCliError
+        If no matching service node bid is available.
+
+    """
+    if service_node is None:
+        bid_pairs = [
+            (service_node_address, bid)
+            for service_node_address, bids in stream_service_node_bids(
+                source_blockchain, destination_blockchain, deadline)
+            for bid in bids
+        ]
+        if len(bid_pairs) == 0:
+            raise ClientCliError(
+                'no service node bid is available for transfers from '
+                f'{source_blockchain.name} to {destination_blockchain.name}')
+        return min(
+            bid_pairs, key=lambda bid_pair:
+            (bid_pair[1].fee, bid_pair[1].execution_time))
+    service_node_address, bid_index = service_node
+    for service_node_address_, bids in stream_service_node_bids(
+            source_blockchain, destination_blockchain):
+        if service_node_address_.lower() == service_node_address.lower():
+            if 0 <= bid_index < len(bids):
+                return service_node_address_, bids[bid_index]
+            break
+    raise ClientCliError(
+        f'the service node {service_node_address} has no bid {bid_index} '
+        f'for transfers from {source_blockchain.name} to '
+        f'{destination_blockchain.name}')
+
+
+def encode_signed_transfer(
+        signed_transfer: SignedTransfer) -> typing.Dict[str, typing.Any]:
+    """Encode a signed token transfer as a JSON-serializable dictionary.
+
+    Parameters
+    ----------
+    signed_transfer : SignedTransfer
+        The signed token transfer to be encoded.
+
+    Returns
+    -------
+    dict
+        The encoded signed token transfer.
+
+    """
+    entry = dataclasses.asdict(signed_transfer)
+    entry['source_blockchain'] = signed_transfer.source_blockchain.name
+    entry['destination_blockchain'] = \
+        signed_transfer.destination_blockchain.name
+    entry['service_node_bid']['source_blockchain'] = \
+        signed_transfer.service_node_bid.source_blockchain.name
+    entry['service_node_bid']['destination_blockchain'] = \
+        signed_transfer.service_node_bid.destination_blockchain.name
+    return entry
+
+
+def decode_signed_transfer(entry: typing.Any) -> SignedTransfer:
+    """Decode a signed token transfer encoded by encode_signed_transfer.
+
+    Parameters
+    ----------
+    entry : Any
+        The encoded signed token transfer.
+
+    Returns
+    -------
+    SignedTransfer
+        The decoded signed token transfer.
+
+    Raises
+    ------
+    KeyError, TypeError, ValueError
+        If the encoded signed token transfer is invalid.
+
+    """
+    bid_entry = entry['service_node_bid']
+    service_node_bid = api.ServiceNodeBid(
+        api.Blockchain[bid_entry['source_blockchain']],
+        api.Blockchain[bid_entry['destination_blockchain']],
+        int(bid_entry['fee']), int(bid_entry['execution_time']),
+        int(bid_entry['valid_until']), str(bid_entry['signature']))
+    return SignedTransfer(
+        api.Blockchain[entry['source_blockchain']],
+        api.Blockchain[entry['destination_blockchain']],
+        api.BlockchainAddress(entry['service_node_address']), service_node_bid,
+        api.BlockchainAddress(entry['sender_address']),
+        api.BlockchainAddress(entry['recipient_address']),
+        api.BlockchainAddress(entry['source_token_address']),
+        api.BlockchainAddress(entry['destination_token_address']),
+        int(entry['token_amount']), int(entry['sender_nonce']),
+        int(entry['valid_until']), str(entry['signature']))
+
+
+def _read_service_node_url(source_blockchain: api.Blockchain,
+                           service_node_address: api.BlockchainAddress) -> str:
+    return get_blockchain_client(source_blockchain).read_service_node_url(
+        service_node_address)
+
+
+def _sign_transfer(
+    blockchain_client: BlockchainClient, source_blockchain: api.Blockchain,
+    sender_private_key: api.PrivateKey, transfer_input: TransferInput,
+    service_node_bid: typing.Tuple[api.BlockchainAddress, api.ServiceNodeBid]
+) -> SignedTransfer:
+    destination_blockchain = transfer_input.destination_blockchain
+    if not blockchain_client.is_valid_recipient_address(
+            transfer_input.recipient_address):
+        raise ClientCliError(
+            f'invalid recipient address {transfer_input.recipient_address}')
+    source_token_address = get_token_address(source_blockchain,
+                                             transfer_input.token_symbol)
+    destination_token_address = get_token_address(destination_blockchain,
+                                                  transfer_input.token_symbol)
+    token_amount = (transfer_input.token_amount if isinstance(
+        transfer_input.token_amount, int) else convert_amount_to_subunit(
+            source_blockchain, transfer_input.token_symbol,
+            transfer_input.token_amount))
+    service_node_address, bid = service_node_bid
+    valid_until = (math.ceil(time.time()) + bid.execution_time +
+                   _VALID_UNTIL_BUFFER)
+    signature_response: typing.Union[
+        BlockchainClient.ComputeTransferSignatureResponse,
+        BlockchainClient.ComputeTransferFromSignatureResponse]
+    if source_blockchain is destination_blockchain:
+        signature_response = blockchain_client.compute_transfer_signature(
+            BlockchainClient.ComputeTransferSignatureRequest(
+                sender_private_key, transfer_input.recipient_address,
+                source_token_address, token_amount, service_node_address, bid,
+                valid_until))
+    else:
+        signature_response = blockchain_client.compute_transfer_from_signature(
+            BlockchainClient.ComputeTransferFromSignatureRequest(
+                destination_blockchain, sender_private_key,
+                transfer_input.recipient_address, source_token_address,
+                destination_token_address, token_amount, service_node_address,
+                bid, valid_until))
+    return SignedTransfer(source_blockchain, destination_blockchain,
+                          service_node_address, bid,
+                          signature_response.sender_address,
+                          transfer_input.recipient_address,
+                          source_token_address, destination_token_address,
+                          token_amount, signature_response.sender_nonce,
+                          valid_until, signature_response.signature)
+
+
+def _create_submit_transfer_request(
+        service_node_url: str, signed_transfer: SignedTransfer) \
+        -> ServiceNodeClient.SubmitTransferRequest:
+    return ServiceNodeClient.SubmitTransferRequest(
+        service_node_url, signed_transfer.source_blockchain,
+        signed_transfer.destination_blockchain, signed_transfer.sender_address,
+        signed_transfer.recipient_address,
+        signed_transfer.source_token_address,
+        signed_transfer.destination_token_address,
+        signed_transfer.token_amount, signed_transfer.service_node_bid,
+        signed_transfer.sender_nonce, signed_transfer.valid_until,
+        signed_transfer.signature)
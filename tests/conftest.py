@@ -1,6 +1,8 @@
 """Shared fixtures for all pantos.cli package tests.
 
 """
+import threading
+import unittest.mock
 import uuid
 
 import hexbytes
@@ -43,6 +45,29 @@ _SIGNATURES = [
 ]
 
 
+@pytest.fixture
+def cache_config(tmp_path):
+    cache_config = {
+        'enabled': True,
+        'directory': str(tmp_path),
+        'rpc_responses_max_size': 1
+    }
+    with unittest.mock.patch('pantos.cli.cache.get_cache_config',
+                             return_value=cache_config):
+        yield cache_config
+
+
+@pytest.fixture
+def background_threads():
+    # Threads left to finish in the background (e.g. slow service
+    # nodes or block range queries) are waited for while the test's
+    # patches are still active
+    threads = set(threading.enumerate())
+    yield
+    for thread in set(threading.enumerate()) - threads:
+        thread.join()
+
+
 @pytest.fixture(scope='module')
 def service_node():
     return _SERVICE_NODE
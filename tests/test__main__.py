@@ -1,7 +1,10 @@
 import argparse
+import datetime
 import decimal
 import itertools
 import pathlib
+import threading
+import time
 import unittest
 import unittest.mock
 
@@ -17,11 +20,24 @@ from pantos.common.types import BlockchainAddress
 from pantos.cli.__main__ import _load_private_key
 from pantos.cli.__main__ import _string_int_pair
 from pantos.cli.__main__ import main
+from pantos.cli.balances import BalanceChange
+from pantos.cli.balances import TokenBalances
 from pantos.cli.exceptions import ClientCliError
+from pantos.cli.exceptions import InsufficientBalanceError
+from pantos.cli.history import IndexedTransfer
+from pantos.cli.jobs import Job
+from pantos.cli.jobs import JobState
+from pantos.cli.jobs import WorkerResult
+from pantos.cli.loadtest import LoadTestPhaseResult
+from pantos.cli.nodes import ServiceNodeHealth
+from pantos.cli.sweeps import SweepAccount
+from pantos.cli.tokens import TokenMetadata
+from pantos.cli.transfers import TransferInput
 
 TEST_KEYSTORE = pathlib.Path(__file__).parent.absolute() / 'test.keystore'
 MOCK_CLI_BLOCKCHAIN_COMMON_CONFIG = {
     'active': True,
+    'max_parallel_queries': 4,
     'keystore': {
         'file': 'test.keystore',
         'password': 'testing'  # NOSONAR
@@ -32,6 +48,15 @@ MOCK_CLI_CONFIG_DICT = {
     'application': {
         'debug': False
     },
+    'cache': {
+        'enabled': False,
+        'directory': '~/.cache/pantos/client-cli',
+        'rpc_responses_max_size': 64
+    },
+    'service_nodes': {
+        'failure_threshold': 3,
+        'retry_interval': 300
+    },
     'blockchains': {
         'avalanche': MOCK_CLI_BLOCKCHAIN_COMMON_CONFIG,
         'bnb_chain': MOCK_CLI_BLOCKCHAIN_COMMON_CONFIG,
@@ -93,15 +118,30 @@ MOCK_LIB_CONFIG_DICT = {
     }
 }
 
+MOCK_TOKEN_METADATA = TokenMetadata(
+    TOKEN_SYMBOL_PAN,
+    BlockchainAddress('0xC892F1D09a7BEF98d65e7f9bD4642d36BC506441'), 18)
+
 
 @unittest.mock.patch('pantos.cli.__main__._load_private_key',
                      return_value='key')
 @unittest.mock.patch('pantos.cli.__main__.config')
-@unittest.mock.patch('pantos.client.library.api.retrieve_token_balance')
-def test_balance(mock_retrieve_token_balance, mock_cli_config, mock_lib_config,
-                 capsys):
-    mock_retrieve_token_balance.return_value = decimal.Decimal('0.4')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.get_token_address',
+                     return_value=MOCK_TOKEN_METADATA.token_address)
+@unittest.mock.patch(
+    'pantos.cli.__main__.get_account_address', return_value=BlockchainAddress(
+        '0x2003c848eB0201AA261892081fBC9E4FC559c494'))
+@unittest.mock.patch('pantos.cli.__main__.read_token_balances')
+def test_balance(mock_read_token_balances, mock_get_account_address,
+                 mock_get_token_address, mock_get_token_metadata,
+                 mock_cli_config, mock_lib_config, capsys):
     mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    token_address = MOCK_TOKEN_METADATA.token_address
+    account_address = mock_get_account_address.return_value
+    mock_read_token_balances.return_value = TokenBalances(
+        100, {(token_address, account_address): 400000000000000000})
 
     cmd = f'pantos.cli balance -k {TEST_KEYSTORE} bnb_chain pan'
     expected = 'Your PAN token balance on BNB_CHAIN:\n0.4\n'
@@ -109,8 +149,11 @@ def test_balance(mock_retrieve_token_balance, mock_cli_config, mock_lib_config,
     with unittest.mock.patch('sys.argv', cmd.split(' ')):
         main()
 
-    mock_retrieve_token_balance.assert_called_once_with(
-        Blockchain.BNB_CHAIN, unittest.mock.ANY, TOKEN_SYMBOL_PAN)
+    mock_get_account_address.assert_called_once_with(Blockchain.BNB_CHAIN,
+                                                     'key')
+    mock_read_token_balances.assert_called_once_with(Blockchain.BNB_CHAIN,
+                                                     [token_address],
+                                                     [account_address])
 
     captured = capsys.readouterr()
     assert captured.out == expected
@@ -197,10 +240,9 @@ def test_no_arguments(mock_cli_config, mock_lib_config, capsys):
 
 @unittest.mock.patch('pantos.client.library.configuration.config')
 @unittest.mock.patch('pantos.cli.configuration.config')
-@unittest.mock.patch('pantos.client.library.api.retrieve_token_balance')
-def test_balance_blockchain_not_active(mock_retrieve_token_balance,
+@unittest.mock.patch('pantos.cli.__main__.read_token_balances')
+def test_balance_blockchain_not_active(mock_read_token_balances,
                                        mock_cli_config, mock_lib_config):
-    mock_retrieve_token_balance.return_value = decimal.Decimal('0.4')
     mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
     mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
 
@@ -210,14 +252,16 @@ def test_balance_blockchain_not_active(mock_retrieve_token_balance,
                              cmd.split(' ')), pytest.raises(SystemExit):
         main()
 
-    assert not mock_retrieve_token_balance.called
+    assert not mock_read_token_balances.called
 
 
 @unittest.mock.patch('pantos.client.library.configuration.config')
 @unittest.mock.patch('pantos.cli.configuration.config')
-@unittest.mock.patch('pantos.client.library.api.retrieve_service_node_bids')
-def test_bids(mock_retrieve_service_node_bids, mock_cli_config,
-              mock_lib_config, capsys):
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.stream_service_node_bids')
+def test_bids(mock_stream_service_node_bids, mock_get_token_metadata,
+              mock_cli_config, mock_lib_config, capsys):
     mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
     mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
 
@@ -225,16 +269,16 @@ def test_bids(mock_retrieve_service_node_bids, mock_cli_config,
         '0x9C20a03E230e9733561E4bab598409bB6d5AED12': [
             api.ServiceNodeBid(source_blockchain=Blockchain.BNB_CHAIN,
                                destination_blockchain=Blockchain.ETHEREUM,
-                               fee=decimal.Decimal('2'), execution_time=600,
+                               fee=2000000000000000000, execution_time=600,
                                valid_until=1701365269, signature='sig1'),
             api.ServiceNodeBid(source_blockchain=Blockchain.BNB_CHAIN,
                                destination_blockchain=Blockchain.ETHEREUM,
-                               fee=decimal.Decimal('1.5'), execution_time=1200,
+                               fee=1500000000000000000, execution_time=1200,
                                valid_until=1701365269, signature='sig12')
         ]
     }
 
-    mock_retrieve_service_node_bids.return_value = bids
+    mock_stream_service_node_bids.return_value = iter(bids.items())
 
     cmd = 'pantos.cli bids bnb_chain ethereum'
     expected = (
@@ -250,7 +294,7 @@ def test_bids(mock_retrieve_service_node_bids, mock_cli_config,
     with unittest.mock.patch('sys.argv', cmd.split(' ')):
         main()
 
-    mock_retrieve_service_node_bids.assert_called_once_with(
+    mock_stream_service_node_bids.assert_called_once_with(
         Blockchain.BNB_CHAIN, Blockchain.ETHEREUM)
 
     captured = capsys.readouterr()
@@ -259,13 +303,13 @@ def test_bids(mock_retrieve_service_node_bids, mock_cli_config,
 
 @unittest.mock.patch('pantos.client.library.configuration.config')
 @unittest.mock.patch('pantos.cli.configuration.config')
-@unittest.mock.patch('pantos.client.library.api.retrieve_service_node_bids')
-def test_bids_no_bids_available(mock_retrieve_service_node_bids,
-                                mock_cli_config, mock_lib_config, capsys):
+@unittest.mock.patch('pantos.cli.__main__.stream_service_node_bids')
+def test_bids_no_bids_available(mock_stream_service_node_bids, mock_cli_config,
+                                mock_lib_config, capsys):
     mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
     mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
     bids = {'0x9C20a03E230e9733561E4bab598409bB6d5AED12': []}
-    mock_retrieve_service_node_bids.return_value = bids
+    mock_stream_service_node_bids.return_value = iter(bids.items())
 
     cmd = 'pantos.cli bids bnb_chain ethereum'
     expected = (
@@ -280,7 +324,7 @@ def test_bids_no_bids_available(mock_retrieve_service_node_bids,
     with unittest.mock.patch('sys.argv', cmd.split(' ')):
         main()
 
-    mock_retrieve_service_node_bids.assert_called_once_with(
+    mock_stream_service_node_bids.assert_called_once_with(
         Blockchain.BNB_CHAIN, Blockchain.ETHEREUM)
 
     captured = capsys.readouterr()
@@ -290,15 +334,29 @@ def test_bids_no_bids_available(mock_retrieve_service_node_bids,
 @unittest.mock.patch('pantos.cli.__main__._load_private_key',
                      return_value='key')
 @unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.update_completion_data')
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.get_account_address',
+                     return_value='0xsender')
+@unittest.mock.patch('pantos.cli.__main__.check_transfer_balance')
 @unittest.mock.patch('pantos.client.library.api.transfer_tokens')
-def test_transfer(mock_transfer_tokens, mock_cli_config, mock_lib_config,
-                  service_node, task_uuid, capsys):
+def test_transfer(mock_transfer_tokens, mock_check_transfer_balance,
+                  mock_get_account_address, mock_select_service_node_bid,
+                  mock_update_completion_data, mock_get_token_metadata,
+                  mock_cli_config, mock_lib_config, service_node, task_uuid,
+                  capsys):
     mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    service_node_bid = (service_node,
+                        unittest.mock.Mock(valid_until=time.time() + 3600))
+    mock_select_service_node_bid.return_value = service_node_bid
     mock_transfer_tokens.return_value = ServiceNodeTaskInfo(
         task_uuid, service_node)
 
     cmd = (f'pantos.cli transfer -k {TEST_KEYSTORE} ethereum bnb_chain '
-           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan .6 --yes')
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan .6 --yes '
+           '--bid-deadline 1.5')
     expected = (f'\nThe service node {service_node}\naccepted the transfer'
                 f' request and returned\nthe following task ID: {task_uuid}\n')
 
@@ -308,12 +366,309 @@ def test_transfer(mock_transfer_tokens, mock_cli_config, mock_lib_config,
     mock_transfer_tokens.assert_called_once_with(
         Blockchain.ETHEREUM, Blockchain.BNB_CHAIN, unittest.mock.ANY,
         BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
-        TOKEN_SYMBOL_PAN, decimal.Decimal('.6'), None)
+        TOKEN_SYMBOL_PAN, 600000000000000000, service_node_bid)
+    mock_select_service_node_bid.assert_called_once_with(
+        Blockchain.ETHEREUM, Blockchain.BNB_CHAIN, None, 1.5)
+    mock_check_transfer_balance.assert_called_once_with(
+        Blockchain.ETHEREUM, '0xsender', TOKEN_SYMBOL_PAN, 600000000000000000,
+        service_node_bid[1].fee)
+    mock_update_completion_data.assert_called_once_with(
+        service_node_tasks=[(service_node, task_uuid)])
 
     captured = capsys.readouterr()
     assert captured.out == expected
 
 
+@unittest.mock.patch('pantos.cli.__main__._load_private_key',
+                     return_value='key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.update_completion_data')
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.get_account_address',
+                     return_value='0xsender')
+@unittest.mock.patch('pantos.cli.__main__.check_transfer_balance')
+@unittest.mock.patch('pantos.client.library.api.transfer_tokens')
+@pytest.mark.parametrize('answer', ['yes', 'no'])
+def test_transfer_confirmed(
+        mock_transfer_tokens, mock_check_transfer_balance,
+        mock_get_account_address, mock_select_service_node_bid,
+        mock_update_completion_data, mock_get_token_metadata, mock_cli_config,
+        mock_load_private_key, answer, service_node, task_uuid, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    keystore_decrypted = threading.Event()
+    mock_load_private_key.side_effect = \
+        lambda *args: keystore_decrypted.set() or 'key'
+    service_node_bid = (service_node,
+                        unittest.mock.Mock(fee=5 * 10**17,
+                                           valid_until=time.time() + 3600))
+    mock_select_service_node_bid.return_value = service_node_bid
+    mock_transfer_tokens.return_value = ServiceNodeTaskInfo(
+        task_uuid, service_node)
+
+    def input_(prompt):
+        # The keystore is decrypted while the user confirms the transfer
+        assert keystore_decrypted.wait(1)
+        return answer
+
+    cmd = ('pantos.cli transfer ethereum bnb_chain '
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan .6')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')), \
+            unittest.mock.patch('builtins.input',
+                                side_effect=input_) as mock_input:
+        main()
+
+    mock_input.assert_called_once()
+    captured = capsys.readouterr()
+    assert (f'Service node:\t\t{service_node}\n'
+            'Service node bid index:\tdefault (lowest fee)\n'
+            'Service node fee:\t0.5 PAN\n\n') in captured.out
+    mock_load_private_key.assert_called_once_with(Blockchain.ETHEREUM, None)
+    if answer == 'yes':
+        mock_transfer_tokens.assert_called_once_with(
+            Blockchain.ETHEREUM, Blockchain.BNB_CHAIN, 'key',
+            BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
+            TOKEN_SYMBOL_PAN, 600000000000000000, service_node_bid)
+    else:
+        assert not mock_transfer_tokens.called
+        assert captured.out.endswith('\nTransfer aborted\n')
+
+
+@unittest.mock.patch('pantos.cli.__main__._load_private_key',
+                     return_value='key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.get_account_address',
+                     return_value='0xsender')
+@unittest.mock.patch(
+    'pantos.cli.__main__.check_transfer_balance',
+    side_effect=InsufficientBalanceError('insufficient PAN balance'))
+@unittest.mock.patch('pantos.client.library.api.transfer_tokens')
+def test_transfer_insufficient_balance(
+        mock_transfer_tokens, mock_check_transfer_balance,
+        mock_get_account_address, mock_select_service_node_bid,
+        mock_get_token_metadata, mock_cli_config, mock_load_private_key,
+        service_node, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_select_service_node_bid.return_value = (service_node,
+                                                 unittest.mock.Mock(
+                                                     fee=1,
+                                                     valid_until=time.time() +
+                                                     3600))
+
+    cmd = ('pantos.cli transfer ethereum bnb_chain '
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan .6 --yes')
+
+    with unittest.mock.patch('sys.argv',
+                             cmd.split(' ')), pytest.raises(SystemExit):
+        main()
+
+    assert not mock_transfer_tokens.called
+    assert capsys.readouterr().out == 'insufficient PAN balance\n'
+
+
+@unittest.mock.patch('pantos.cli.__main__._load_private_key',
+                     return_value='key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.update_completion_data')
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.get_account_address',
+                     return_value='0xsender')
+@unittest.mock.patch('pantos.cli.__main__.check_transfer_balance',
+                     side_effect=ClientCliError('unable to read a balance'))
+@unittest.mock.patch('pantos.client.library.api.transfer_tokens')
+def test_transfer_balance_check_failed(
+        mock_transfer_tokens, mock_check_transfer_balance,
+        mock_get_account_address, mock_select_service_node_bid,
+        mock_update_completion_data, mock_get_token_metadata, mock_cli_config,
+        mock_load_private_key, service_node, task_uuid, caplog):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    service_node_bid = (service_node,
+                        unittest.mock.Mock(fee=1,
+                                           valid_until=time.time() + 3600))
+    mock_select_service_node_bid.return_value = service_node_bid
+    mock_transfer_tokens.return_value = ServiceNodeTaskInfo(
+        task_uuid, service_node)
+
+    cmd = ('pantos.cli transfer ethereum bnb_chain '
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan .6 --yes')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    # The transfer is not stopped if the balances cannot be checked
+    mock_transfer_tokens.assert_called_once_with(
+        Blockchain.ETHEREUM, Blockchain.BNB_CHAIN, 'key',
+        BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
+        TOKEN_SYMBOL_PAN, 600000000000000000, service_node_bid)
+    assert 'unable to check the balances' in caplog.text
+
+
+@unittest.mock.patch('pantos.cli.__main__._load_private_key',
+                     return_value='key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.update_completion_data')
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.get_account_address',
+                     return_value='0xsender')
+@unittest.mock.patch('pantos.cli.__main__.check_transfer_balance')
+@unittest.mock.patch('pantos.client.library.api.transfer_tokens')
+def test_transfer_bid_expired_during_confirmation(
+        mock_transfer_tokens, mock_check_transfer_balance,
+        mock_get_account_address, mock_select_service_node_bid,
+        mock_update_completion_data, mock_get_token_metadata, mock_cli_config,
+        mock_load_private_key, service_node, task_uuid):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    prefetched_bid = (service_node,
+                      unittest.mock.Mock(fee=1, valid_until=time.time() + 0.2))
+    fresh_bid = (service_node,
+                 unittest.mock.Mock(fee=1, valid_until=time.time() + 3600))
+    mock_select_service_node_bid.side_effect = [prefetched_bid, fresh_bid]
+    mock_transfer_tokens.return_value = ServiceNodeTaskInfo(
+        task_uuid, service_node)
+
+    def input_(prompt):
+        # The prefetched bid expires while the user confirms the transfer
+        time.sleep(0.3)
+        return 'yes'
+
+    cmd = ('pantos.cli transfer ethereum bnb_chain '
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan .6 -s '
+           f'{service_node} 1')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')), \
+            unittest.mock.patch('builtins.input', side_effect=input_):
+        main()
+
+    # A new bid of the same service node is selected
+    assert mock_select_service_node_bid.call_args_list == [
+        unittest.mock.call(Blockchain.ETHEREUM, Blockchain.BNB_CHAIN,
+                           (service_node, 1), None)
+    ] * 2
+    mock_transfer_tokens.assert_called_once_with(
+        Blockchain.ETHEREUM, Blockchain.BNB_CHAIN, 'key',
+        BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
+        TOKEN_SYMBOL_PAN, 600000000000000000, fresh_bid)
+
+
+@pytest.mark.parametrize('confirmation', ['yes', 'no'])
+@unittest.mock.patch('pantos.cli.__main__._load_private_key',
+                     return_value='key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.update_completion_data')
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.get_account_address',
+                     return_value='0xsender')
+@unittest.mock.patch('pantos.cli.__main__.check_transfer_balance')
+@unittest.mock.patch('pantos.client.library.api.transfer_tokens')
+def test_transfer_bid_expired_fee_changed(
+        mock_transfer_tokens, mock_check_transfer_balance,
+        mock_get_account_address, mock_select_service_node_bid,
+        mock_update_completion_data, mock_get_token_metadata, mock_cli_config,
+        mock_load_private_key, confirmation, service_node, task_uuid, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    prefetched_bid = (service_node,
+                      unittest.mock.Mock(fee=10**17,
+                                         valid_until=time.time() + 0.2))
+    # The renewed bid has a higher fee
+    renewed_bid = (service_node,
+                   unittest.mock.Mock(fee=2 * 10**17,
+                                      valid_until=time.time() + 3600))
+    mock_select_service_node_bid.side_effect = [prefetched_bid, renewed_bid]
+    mock_transfer_tokens.return_value = ServiceNodeTaskInfo(
+        task_uuid, service_node)
+    confirmations = iter(['yes', confirmation])
+
+    def input_(prompt):
+        # The prefetched bid expires while the user confirms the transfer
+        time.sleep(0.3)
+        return next(confirmations)
+
+    cmd = ('pantos.cli transfer ethereum bnb_chain '
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan .6')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')), \
+            unittest.mock.patch('builtins.input',
+                                side_effect=input_) as mock_input:
+        main()
+
+    # The new fee is shown and confirmed again
+    assert mock_input.call_count == 2
+    captured = capsys.readouterr()
+    assert 'renewed with a different service node or fee' in captured.out
+    assert 'Service node fee:\t0.2 PAN\n' in captured.out
+    if confirmation == 'yes':
+        # The balances are checked again against the new fee
+        assert [
+            call.args[4] for call in mock_check_transfer_balance.call_args_list
+        ] == [10**17, 2 * 10**17]
+        mock_transfer_tokens.assert_called_once_with(
+            Blockchain.ETHEREUM, Blockchain.BNB_CHAIN, 'key',
+            BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
+            TOKEN_SYMBOL_PAN, 600000000000000000, renewed_bid)
+    else:
+        assert captured.out.endswith('Transfer aborted\n')
+        assert not mock_transfer_tokens.called
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.refresh_token_metadata',
+                     return_value=[MOCK_TOKEN_METADATA])
+def test_tokens_refresh(mock_refresh_token_metadata, mock_cli_config,
+                        mock_lib_config, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+
+    cmd = 'pantos.cli tokens refresh ethereum bnb_chain'
+    expected = ('Token metadata on ETHEREUM:\n\n'
+                'Symbol\tDecimals\tAddress\n'
+                '============================================================'
+                '=========\n'
+                f'PAN\t18\t\t{MOCK_TOKEN_METADATA.token_address}\n\n')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    mock_refresh_token_metadata.assert_has_calls([
+        unittest.mock.call(Blockchain.ETHEREUM),
+        unittest.mock.call(Blockchain.BNB_CHAIN)
+    ])
+    captured = capsys.readouterr()
+    assert captured.out == expected + expected.replace('ETHEREUM', 'BNB_CHAIN')
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.refresh_token_metadata',
+                     return_value=[])
+def test_tokens_refresh_all_active(mock_refresh_token_metadata,
+                                   mock_cli_config, mock_lib_config):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+
+    cmd = 'pantos.cli tokens refresh'
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    assert [
+        call.args[0] for call in mock_refresh_token_metadata.call_args_list
+    ] == [
+        Blockchain.AVALANCHE, Blockchain.BNB_CHAIN, Blockchain.CELO,
+        Blockchain.CRONOS, Blockchain.ETHEREUM, Blockchain.POLYGON
+    ]
+
+
 @unittest.mock.patch('pantos.cli.__main__.get_blockchain_config')
 def test_load_private_key_no_private_key_no_config(mock_get_blockchain_config):
     mock_get_blockchain_config.return_value = {'ETHEREUM': None}
@@ -364,7 +719,7 @@ def test_string_int_pair_correct_cast():
 ], indirect=True)
 @unittest.mock.patch('pantos.client.library.configuration.config')
 @unittest.mock.patch('pantos.cli.configuration.config')
-@unittest.mock.patch('pantos.client.library.api.get_token_transfer_status')
+@unittest.mock.patch('pantos.cli.__main__.get_token_transfer_status')
 def test_print_status(mock_get_token_transfer_status, mock_cli_config,
                       mock_lib_config, token_transfer_status, service_node,
                       task_uuid, capsys):
@@ -382,6 +737,65 @@ def test_print_status(mock_get_token_transfer_status, mock_cli_config,
                         captured.out)
 
 
+@pytest.mark.parametrize('token_transfer_status', [[
+    Blockchain.BNB_CHAIN, ServiceNodeTransferStatus.CONFIRMED,
+    DestinationTransferStatus.CONFIRMED
+]], indirect=True)
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.get_token_transfer_status')
+def test_status_final_served_from_cache(mock_get_token_transfer_status,
+                                        mock_cli_config, mock_lib_config,
+                                        token_transfer_status, service_node,
+                                        task_uuid, tmp_path, capsys):
+    mock_cli_config.__getitem__.side_effect = {
+        **MOCK_CLI_CONFIG_DICT, 'cache': {
+            'enabled': True,
+            'directory': str(tmp_path)
+        }
+    }.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    mock_get_token_transfer_status.return_value = token_transfer_status
+
+    cmd = f'pantos.cli status ethereum {service_node} {task_uuid}'
+    for _ in range(2):
+        with unittest.mock.patch('sys.argv', cmd.split(' ')):
+            main()
+        captured = capsys.readouterr()
+        _test_status_output(service_node, task_uuid, token_transfer_status,
+                            captured.out)
+
+    mock_get_token_transfer_status.assert_called_once()
+
+
+@pytest.mark.parametrize('token_transfer_status', [[
+    Blockchain.BNB_CHAIN, ServiceNodeTransferStatus.CONFIRMED,
+    DestinationTransferStatus.SUBMITTED
+]], indirect=True)
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.get_token_transfer_status')
+def test_status_non_final_not_cached(mock_get_token_transfer_status,
+                                     mock_cli_config, mock_lib_config,
+                                     token_transfer_status, service_node,
+                                     task_uuid, tmp_path):
+    mock_cli_config.__getitem__.side_effect = {
+        **MOCK_CLI_CONFIG_DICT, 'cache': {
+            'enabled': True,
+            'directory': str(tmp_path)
+        }
+    }.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    mock_get_token_transfer_status.return_value = token_transfer_status
+
+    cmd = f'pantos.cli status ethereum {service_node} {task_uuid}'
+    for _ in range(2):
+        with unittest.mock.patch('sys.argv', cmd.split(' ')):
+            main()
+
+    assert mock_get_token_transfer_status.call_count == 2
+
+
 def _test_status_output(service_node_address, service_node_task_uuid,
                         transfer_status, captured_output):
     expected_output = (
@@ -424,3 +838,630 @@ def _test_status_output(service_node_address, service_node_task_uuid,
 
 if __name__ == '__main__':
     unittest.main()
+
+
+@unittest.mock.patch('pantos.cli.__main__._load_private_key',
+                     return_value='key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.get_account_address',
+                     return_value='0xAccount')
+@unittest.mock.patch('pantos.cli.__main__.follow_token_balance')
+def test_balance_follow(mock_follow_token_balance, mock_get_account_address,
+                        mock_get_token_metadata, mock_cli_config,
+                        mock_load_private_key, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+
+    def follow_token_balance(blockchain, token_symbol, account_address):
+        yield BalanceChange(100, 400000000000000000, 0)
+        yield BalanceChange(105, 1400000000000000000, 1000000000000000000)
+        yield BalanceChange(110, 1150000000000000000, -250000000000000000)
+        raise KeyboardInterrupt
+
+    mock_follow_token_balance.side_effect = follow_token_balance
+    cmd = f'pantos.cli balance -k {TEST_KEYSTORE} bnb_chain pan --follow'
+    expected = ('Following your PAN token balance on BNB_CHAIN (press Ctrl+C '
+                'to stop):\nBlock 100: 0.4\nBlock 105: 1.4 (+1)\n'
+                'Block 110: 1.15 (-0.25)\n')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    mock_get_account_address.assert_called_once_with(Blockchain.BNB_CHAIN,
+                                                     'key')
+    mock_follow_token_balance.assert_called_once_with(Blockchain.BNB_CHAIN,
+                                                      TOKEN_SYMBOL_PAN,
+                                                      '0xAccount')
+    captured = capsys.readouterr()
+    assert captured.out == expected
+
+
+@unittest.mock.patch('pantos.cli.__main__._load_private_key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.get_token_address',
+                     return_value=MOCK_TOKEN_METADATA.token_address)
+@unittest.mock.patch('pantos.cli.__main__.get_account_addresses')
+@unittest.mock.patch('pantos.cli.__main__.read_token_balances')
+def test_balance_addresses(mock_read_token_balances,
+                           mock_get_account_addresses, mock_get_token_address,
+                           mock_get_token_metadata, mock_cli_config,
+                           mock_load_private_key, tmp_path, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    account_addresses = [
+        BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
+        BlockchainAddress('0x5B1059888f0D2693459de34b4B2061A0DEff9d2F')
+    ]
+    mock_get_account_addresses.return_value = account_addresses
+    token_address = MOCK_TOKEN_METADATA.token_address
+    mock_read_token_balances.return_value = TokenBalances(
+        100, {
+            (token_address, account_addresses[0]): 400000000000000000,
+            (token_address, account_addresses[1]): 0
+        })
+    file_path = tmp_path / 'addresses.txt'
+
+    cmd = f'pantos.cli balance bnb_chain pan -A {file_path}'
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    mock_get_account_addresses.assert_called_once_with(Blockchain.BNB_CHAIN,
+                                                       None, file_path)
+    mock_read_token_balances.assert_called_once_with(Blockchain.BNB_CHAIN,
+                                                     [token_address],
+                                                     account_addresses)
+    assert not mock_load_private_key.called
+    captured = capsys.readouterr()
+    assert captured.out == (
+        'PAN token balances on BNB_CHAIN at block 100:\n\n'
+        'Account\t\t\t\t\t\tBalance\n' + '=' * 69 + '\n'
+        f'{account_addresses[0]}\t0.4\n{account_addresses[1]}\t0\n\n')
+
+
+@unittest.mock.patch('pantos.cli.__main__._load_private_key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.__main__.get_account_addresses')
+@unittest.mock.patch('pantos.cli.__main__.follow_token_balance')
+def test_balance_addresses_follow_many(mock_follow_token_balance,
+                                       mock_get_account_addresses,
+                                       mock_cli_config, mock_load_private_key,
+                                       capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_get_account_addresses.return_value = ['0xAccount1', '0xAccount2']
+
+    cmd = 'pantos.cli balance bnb_chain pan -a 0xAccount1 -a 0xAccount2 -f'
+
+    with unittest.mock.patch('sys.argv',
+                             cmd.split(' ')), pytest.raises(SystemExit):
+        main()
+
+    mock_get_account_addresses.assert_called_once_with(
+        Blockchain.BNB_CHAIN, ['0xAccount1', '0xAccount2'], None)
+    assert not mock_follow_token_balance.called
+    assert not mock_load_private_key.called
+    assert 'single account' in capsys.readouterr().out
+
+
+@unittest.mock.patch('pantos.cli.__main__._load_private_key',
+                     return_value='key')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__._string_int_pair_first', True)
+@unittest.mock.patch('pantos.cli.__main__.write_signed_transfers')
+@unittest.mock.patch('pantos.cli.__main__.sign_transfers')
+@unittest.mock.patch('pantos.client.library.api.transfer_tokens')
+def test_transfer_sign_only(mock_transfer_tokens, mock_sign_transfers,
+                            mock_write_signed_transfers,
+                            mock_get_token_metadata, mock_cli_config,
+                            mock_load_private_key, service_node, tmp_path,
+                            capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    signed_transfer = unittest.mock.MagicMock(valid_until=4102444800)
+    signed_transfer.service_node_bid.valid_until = 4102444800
+    mock_sign_transfers.return_value = [signed_transfer]
+    output_path = tmp_path / 'signed.jsonl'
+
+    cmd = (f'pantos.cli transfer -k {TEST_KEYSTORE} ethereum bnb_chain '
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan .6 -s '
+           f'{service_node} 1 --sign-only {output_path}')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    mock_sign_transfers.assert_called_once_with(Blockchain.ETHEREUM, 'key', [
+        TransferInput(
+            Blockchain.BNB_CHAIN,
+            BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
+            TOKEN_SYMBOL_PAN, decimal.Decimal('.6'))
+    ], (service_node, 1), 1, None)
+    mock_write_signed_transfers.assert_called_once_with(
+        output_path, [signed_transfer])
+    assert not mock_transfer_tokens.called
+    captured = capsys.readouterr()
+    assert captured.out.startswith(
+        f'Signed 1 transfer(s) and appended them to {output_path}\n')
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.read_signed_transfers')
+@unittest.mock.patch('pantos.cli.__main__.submit_signed_transfers')
+def test_submit(mock_submit_signed_transfers, mock_read_signed_transfers,
+                mock_cli_config, mock_lib_config, service_node, task_uuid,
+                capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    signed_transfers = [
+        unittest.mock.MagicMock(service_node_address=service_node)
+        for _ in range(2)
+    ]
+    mock_read_signed_transfers.return_value = signed_transfers
+    mock_submit_signed_transfers.return_value = [
+        ServiceNodeTaskInfo(task_uuid, service_node),
+        ClientCliError('the signed transfer has expired')
+    ]
+
+    cmd = 'pantos.cli submit signed.jsonl -w 4 --yes'
+
+    with unittest.mock.patch('sys.argv',
+                             cmd.split(' ')), pytest.raises(SystemExit):
+        main()
+
+    mock_read_signed_transfers.assert_called_once_with(
+        pathlib.Path('signed.jsonl'))
+    mock_submit_signed_transfers.assert_called_once_with(signed_transfers, 4)
+    captured = capsys.readouterr()
+    assert f'1\t\t{service_node}\t{task_uuid}\n' in captured.out
+    assert (f'2\t\t{service_node}\tfailed: the signed transfer has expired\n'
+            in captured.out)
+    assert captured.out.endswith('1 of 2 transfer(s) could not be submitted\n')
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.read_transfer_inputs')
+@unittest.mock.patch('pantos.cli.__main__.add_jobs')
+def test_queue_add(mock_add_jobs, mock_read_transfer_inputs,
+                   mock_get_token_metadata, mock_cli_config, mock_lib_config,
+                   recipient, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    transfer_inputs = [
+        TransferInput(Blockchain.BNB_CHAIN, recipient, TOKEN_SYMBOL_PAN,
+                      decimal.Decimal('.6'))
+    ] * 2
+    mock_read_transfer_inputs.return_value = transfer_inputs
+
+    cmd = ('pantos.cli queue add jobs.sqlite3 ethereum keystore '
+           'transfers.csv')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    mock_read_transfer_inputs.assert_called_once_with(
+        pathlib.Path('transfers.csv'))
+    mock_add_jobs.assert_called_once_with(pathlib.Path('jobs.sqlite3'),
+                                          Blockchain.ETHEREUM,
+                                          pathlib.Path('keystore'),
+                                          transfer_inputs)
+    assert capsys.readouterr().out == 'Added 2 job(s) to jobs.sqlite3\n'
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.__main__._get_keystore_password',
+                     return_value='password')
+@unittest.mock.patch('pantos.cli.__main__.run_worker')
+@pytest.mark.parametrize('failed', [0, 2])
+def test_queue_work(mock_run_worker, mock_get_keystore_password,
+                    mock_main_config, mock_cli_config, mock_lib_config, failed,
+                    capsys):
+    mock_main_config.__getitem__.side_effect = \
+        MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    mock_run_worker.return_value = WorkerResult(submitted=5, failed=failed)
+
+    cmd = ('pantos.cli queue work jobs.sqlite3 ethereum -w 4 --lease 30 '
+           '--batch 50 --bid-deadline 2 --max-attempts 5 --retry-delay 10')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        if failed > 0:
+            with pytest.raises(SystemExit):
+                main()
+        else:
+            main()
+
+    mock_run_worker.assert_called_once_with(pathlib.Path('jobs.sqlite3'),
+                                            Blockchain.ETHEREUM, 'password',
+                                            30.0, 50, 4, 2.0, 5, 10.0)
+    captured = capsys.readouterr()
+    assert captured.out.startswith('Submitted 5 transfer(s)\n')
+    assert ('2 job(s) failed' in captured.out) == (failed > 0)
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.count_jobs')
+@unittest.mock.patch('pantos.cli.__main__.read_jobs')
+def test_queue_status(mock_read_jobs, mock_count_jobs, mock_cli_config,
+                      mock_lib_config, recipient, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    mock_count_jobs.return_value = {
+        JobState.PENDING: 1,
+        JobState.SIGNED: 0,
+        JobState.SUBMITTED: 7,
+        JobState.FAILED: 1
+    }
+    mock_read_jobs.return_value = [
+        Job(
+            3, Blockchain.ETHEREUM, pathlib.Path('/keystore'),
+            TransferInput(Blockchain.BNB_CHAIN, recipient, TOKEN_SYMBOL_PAN,
+                          decimal.Decimal('.6')), JobState.FAILED, 1, None,
+            None, 'the signed transfer has expired')
+    ]
+
+    cmd = 'pantos.cli queue status jobs.sqlite3'
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    mock_read_jobs.assert_called_once_with(pathlib.Path('jobs.sqlite3'),
+                                           JobState.FAILED)
+    assert capsys.readouterr().out == (
+        'State\t\tJobs\n'
+        '====================\n'
+        'pending\t\t1\n'
+        'signed\t\t0\n'
+        'submitted\t\t7\n'
+        'failed\t\t1\n'
+        '\n'
+        'Job\tKeystore\tFailure\n'
+        '===================================='
+        '=================================\n'
+        '3\t/keystore\tthe signed transfer has expired\n')
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.update_completion_data')
+@unittest.mock.patch('pantos.cli.__main__.read_sweep_accounts')
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.sweep_tokens')
+def test_sweep(mock_sweep_tokens, mock_select_service_node_bid,
+               mock_read_sweep_accounts, mock_update_completion_data,
+               mock_get_token_metadata, mock_cli_config, mock_lib_config,
+               service_node, task_uuid, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    keystore_paths = [pathlib.Path(f'{index}.keystore') for index in range(4)]
+    sweep_accounts = [
+        SweepAccount(keystore_path, f'key{index}',
+                     BlockchainAddress(f'0x{index:040x}'), balance, balance)
+        for index, (keystore_path, balance) in enumerate(
+            zip(keystore_paths[:3], [10**18, 10**16, 2 * 10**18]))
+    ]
+    mock_read_sweep_accounts.return_value = sweep_accounts + [
+        ClientCliError('unable to decrypt the keystore 3.keystore')
+    ]
+    service_node_bid = (service_node,
+                        unittest.mock.Mock(fee=10**17,
+                                           valid_until=time.time() + 3600))
+    mock_select_service_node_bid.return_value = service_node_bid
+    mock_sweep_tokens.return_value = [
+        ServiceNodeTaskInfo(task_uuid, service_node),
+        ClientCliError('the signed transfer has expired')
+    ]
+
+    cmd = ('pantos.cli sweep ethereum bnb_chain '
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan '
+           f'{" ".join(str(path) for path in keystore_paths)} -m 0.5 -w 8')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')), \
+            unittest.mock.patch('builtins.input', return_value='yes'), \
+            pytest.raises(SystemExit):
+        main()
+
+    mock_read_sweep_accounts.assert_called_once_with(Blockchain.ETHEREUM,
+                                                     TOKEN_SYMBOL_PAN,
+                                                     keystore_paths, 'testing',
+                                                     8)
+    mock_select_service_node_bid.assert_called_once_with(
+        Blockchain.ETHEREUM, Blockchain.BNB_CHAIN, None)
+    # The second account holds only dust
+    mock_sweep_tokens.assert_called_once_with(
+        Blockchain.ETHEREUM, Blockchain.BNB_CHAIN,
+        BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
+        TOKEN_SYMBOL_PAN, [(sweep_accounts[0], 9 * 10**17),
+                           (sweep_accounts[2], 19 * 10**17)], service_node_bid,
+        8)
+    mock_update_completion_data.assert_called_once_with(
+        service_node_tasks=[(service_node, task_uuid)])
+    captured = capsys.readouterr()
+    assert f'1.keystore\t{sweep_accounts[1].address}\tskipped\n' in \
+        captured.out
+    assert 'Total amount:\t\t2.8\n' in captured.out
+    assert f'{sweep_accounts[0].address}\t{task_uuid}\n' in captured.out
+    assert captured.out.endswith('2 of 4 account(s) could not be swept\n')
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                     return_value=MOCK_TOKEN_METADATA)
+@unittest.mock.patch('pantos.cli.__main__.update_completion_data')
+@unittest.mock.patch('pantos.cli.__main__.read_sweep_accounts')
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.sweep_tokens')
+def test_sweep_bid_expired_during_confirmation(
+        mock_sweep_tokens, mock_select_service_node_bid,
+        mock_read_sweep_accounts, mock_update_completion_data,
+        mock_get_token_metadata, mock_cli_config, mock_lib_config,
+        service_node, task_uuid, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    sweep_account = SweepAccount(pathlib.Path('0.keystore'), 'key0',
+                                 BlockchainAddress(f'0x{0:040x}'), 10**18,
+                                 10**18)
+    mock_read_sweep_accounts.return_value = [sweep_account]
+    prefetched_bid = (service_node,
+                      unittest.mock.Mock(fee=10**17,
+                                         valid_until=time.time() + 0.2))
+    # The renewed bid has a higher fee
+    renewed_bid = (service_node,
+                   unittest.mock.Mock(fee=2 * 10**17,
+                                      valid_until=time.time() + 3600))
+    mock_select_service_node_bid.side_effect = [prefetched_bid, renewed_bid]
+    mock_sweep_tokens.return_value = [
+        ServiceNodeTaskInfo(task_uuid, service_node)
+    ]
+
+    def input_(prompt):
+        # The prefetched bid expires while the user confirms the sweep
+        time.sleep(0.3)
+        return 'yes'
+
+    cmd = ('pantos.cli sweep ethereum bnb_chain '
+           '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan 0.keystore -w 8')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')), \
+            unittest.mock.patch('builtins.input',
+                                side_effect=input_) as mock_input:
+        main()
+
+    # The sweep is confirmed again with the amount after the higher fee
+    assert mock_input.call_count == 2
+    assert mock_select_service_node_bid.call_count == 2
+    mock_sweep_tokens.assert_called_once_with(
+        Blockchain.ETHEREUM, Blockchain.BNB_CHAIN,
+        BlockchainAddress('0x2003c848eB0201AA261892081fBC9E4FC559c494'),
+        TOKEN_SYMBOL_PAN, [(sweep_account, 8 * 10**17)], renewed_bid, 8)
+    captured = capsys.readouterr()
+    assert 'Total amount:\t\t0.9\n' in captured.out
+    assert 'renewed with a different service node or fee' in captured.out
+    assert 'Total amount:\t\t0.8\n' in captured.out
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('builtins.input', return_value='no')
+@unittest.mock.patch('pantos.cli.__main__.read_sweep_accounts')
+@unittest.mock.patch('pantos.cli.__main__.select_service_node_bid')
+@unittest.mock.patch('pantos.cli.__main__.sweep_tokens')
+def test_sweep_aborted(mock_sweep_tokens, mock_select_service_node_bid,
+                       mock_read_sweep_accounts, mock_input, mock_cli_config,
+                       mock_lib_config, service_node):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    mock_read_sweep_accounts.return_value = [
+        SweepAccount(pathlib.Path('0.keystore'), 'key0',
+                     BlockchainAddress(f'0x{0:040x}'), 10**18, 10**18)
+    ]
+    mock_select_service_node_bid.return_value = (service_node,
+                                                 unittest.mock.Mock(fee=0))
+
+    cmd = 'pantos.cli sweep ethereum ethereum ' \
+        '0x2003c848eB0201AA261892081fBC9E4FC559c494 pan 0.keystore'
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')), \
+            unittest.mock.patch('pantos.cli.tokens.get_token_metadata',
+                                return_value=MOCK_TOKEN_METADATA):
+        main()
+
+    mock_input.assert_called_once()
+    assert not mock_sweep_tokens.called
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.get_token_symbols',
+                     return_value=[TOKEN_SYMBOL_PAN])
+@unittest.mock.patch('pantos.cli.__main__.update_completion_data')
+def test_completion(mock_update_completion_data, mock_get_token_symbols,
+                    mock_cli_config, mock_lib_config, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+
+    with unittest.mock.patch('sys.argv', ['pantos.cli', 'completion', 'zsh']):
+        main()
+
+    blockchains, token_symbols = mock_update_completion_data.call_args.args
+    assert Blockchain.ETHEREUM in blockchains
+    assert set(token_symbols) == {TOKEN_SYMBOL_PAN}
+    captured = capsys.readouterr()
+    assert captured.out.startswith('autoload -U +X bashcompinit')
+    assert captured.out.endswith('complete -F _pantos_client pantos-client '
+                                 'pantos-cli\n')
+
+
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.__main__.get_token_symbols',
+                     return_value=[TOKEN_SYMBOL_PAN])
+@unittest.mock.patch('pantos.cli.__main__.get_token_address',
+                     return_value=MOCK_TOKEN_METADATA.token_address)
+@unittest.mock.patch('pantos.cli.__main__.find_indexed_transfers')
+@unittest.mock.patch('pantos.cli.__main__.get_transfer_index_checkpoint',
+                     return_value=900)
+@unittest.mock.patch('pantos.cli.__main__.update_transfer_index',
+                     return_value=980)
+@pytest.mark.parametrize('offline', [False, True])
+def test_history(mock_update_transfer_index,
+                 mock_get_transfer_index_checkpoint,
+                 mock_find_indexed_transfers, mock_get_token_address,
+                 mock_get_token_symbols, mock_cli_config, offline, sender,
+                 recipient, service_node, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_find_indexed_transfers.return_value = [
+        IndexedTransfer(Blockchain.ETHEREUM, Blockchain.POLYGON, 950, '0x01',
+                        2, sender, recipient,
+                        MOCK_TOKEN_METADATA.token_address.lower(),
+                        MOCK_TOKEN_METADATA.token_address, 1000, service_node,
+                        10)
+    ]
+
+    cmd = (f'pantos.cli history ethereum -s {sender} -t pan -n 5 '
+           '--from-block 100')
+    if offline:
+        cmd += ' --offline'
+    checkpoint = 900 if offline else 980
+    expected = (f'Pantos token transfers from ETHEREUM (indexed up to block '
+                f'{checkpoint}):\n\n'
+                'Block:\t\t\t950\n'
+                'Transaction ID:\t\t0x01\n'
+                'Destination blockchain:\tPOLYGON\n'
+                f'Sender address:\t\t{sender}\n'
+                f'Recipient address:\t{recipient}\n'
+                'Token:\t\t\tPAN '
+                f'({MOCK_TOKEN_METADATA.token_address.lower()})\n'
+                'Token amount:\t\t1000\n'
+                f'Service node:\t\t{service_node}\n'
+                'Service node fee:\t10\n\n')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    if offline:
+        assert not mock_update_transfer_index.called
+    else:
+        mock_update_transfer_index.assert_called_once_with(
+            Blockchain.ETHEREUM, 100)
+    mock_find_indexed_transfers.assert_called_once_with(
+        Blockchain.ETHEREUM, sender, None, MOCK_TOKEN_METADATA.token_address,
+        5)
+    captured = capsys.readouterr()
+    assert captured.out == expected
+
+
+@unittest.mock.patch('pantos.cli.__main__.config')
+@unittest.mock.patch('pantos.cli.__main__.get_transfer_index_checkpoint',
+                     return_value=None)
+@unittest.mock.patch('pantos.cli.__main__.find_indexed_transfers')
+def test_history_not_indexed(mock_find_indexed_transfers,
+                             mock_get_transfer_index_checkpoint,
+                             mock_cli_config, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+
+    cmd = 'pantos.cli history ethereum --offline'
+
+    with unittest.mock.patch('sys.argv',
+                             cmd.split(' ')), pytest.raises(SystemExit):
+        main()
+
+    assert not mock_find_indexed_transfers.called
+    captured = capsys.readouterr()
+    assert captured.out == ('the token transfers from ETHEREUM have not been '
+                            'indexed yet\n')
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.reset_service_node_health')
+@unittest.mock.patch('pantos.cli.__main__.probe_service_nodes')
+@unittest.mock.patch('pantos.cli.__main__.load_service_node_health')
+@unittest.mock.patch('pantos.cli.__main__.get_service_node_addresses')
+@pytest.mark.parametrize('option', ['', ' --probe', ' --reset'])
+def test_nodes(mock_get_service_node_addresses, mock_load_service_node_health,
+               mock_probe_service_nodes, mock_reset_service_node_health,
+               mock_cli_config, mock_lib_config, option, capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    service_nodes = [
+        '0x9C20a03E230e9733561E4bab598409bB6d5AED12',
+        '0x5B1059888f0D2693459de34b4B2061A0DEff9d2F'
+    ]
+    last_failure = time.time()
+    service_node_healths = {
+        service_nodes[0]: ServiceNodeHealth(latencies=[0.1, 0.2]),
+        service_nodes[1]: ServiceNodeHealth(failures=3,
+                                            last_failure=last_failure)
+    }
+    mock_get_service_node_addresses.return_value = service_nodes
+    mock_load_service_node_health.side_effect = \
+        lambda _, service_node_address: service_node_healths[
+            service_node_address]
+
+    cmd = f'pantos.cli nodes ethereum{option}'
+    retry_time = datetime.datetime.fromtimestamp(last_failure + 300).isoformat(
+        timespec='seconds')
+    expected = (
+        'Pantos service nodes on ETHEREUM:\n'
+        '\n'
+        'Service node\t\t\t\t\tState\t\tLatency\tFailures\tLast success\n'
+        '\t\t\t\t\t\t\t\t(s)\n'
+        '===================================================================='
+        '=\n'
+        f'{service_nodes[0]}\tavailable\t0.150\t0\t\t-\n'
+        f'{service_nodes[1]}\tunavailable\t-\t3\t\t-\n'
+        f'\tskipped until {retry_time}\n'
+        '\n')
+
+    with unittest.mock.patch('sys.argv', cmd.split(' ')):
+        main()
+
+    if option == ' --probe':
+        mock_probe_service_nodes.assert_called_once_with(
+            Blockchain.ETHEREUM, service_nodes)
+    else:
+        assert not mock_probe_service_nodes.called
+    assert mock_reset_service_node_health.call_count == (2 if option
+                                                         == ' --reset' else 0)
+    captured = capsys.readouterr()
+    assert captured.out == expected
+
+
+@unittest.mock.patch('pantos.client.library.configuration.config')
+@unittest.mock.patch('pantos.cli.configuration.config')
+@unittest.mock.patch('pantos.cli.__main__.run_load_test')
+def test_loadtest(mock_run_load_test, mock_cli_config, mock_lib_config,
+                  capsys):
+    mock_cli_config.__getitem__.side_effect = MOCK_CLI_CONFIG_DICT.__getitem__
+    mock_lib_config.__getitem__.side_effect = MOCK_LIB_CONFIG_DICT.__getitem__
+    mock_run_load_test.return_value = [
+        LoadTestPhaseResult('bids', [0.1, 0.2, 0.3, 0.4], 0, 2.0),
+        LoadTestPhaseResult('transfer', [0.5, 0.6, 0.7], 1, 1.5)
+    ]
+
+    cmd = ('pantos.cli loadtest ethereum bnb_chain -n 4 -c 2 -r 2.5 '
+           '--rpc-latency 0.01')
+
+    with unittest.mock.patch('sys.argv',
+                             cmd.split(' ')), pytest.raises(SystemExit):
+        main()
+
+    mock_run_load_test.assert_called_once_with(Blockchain.ETHEREUM,
+                                               Blockchain.BNB_CHAIN, 4, 2, 2.5,
+                                               0.0, 0.01)
+    captured = capsys.readouterr()
+    assert 'bids            4\t\t0\t2.0\t\t200\t400\t400\n' in captured.out
+    assert 'transfer        4\t\t1\t2.0\t\t600\t700\t700\n' in captured.out
+    assert captured.out.endswith('1 of 8 load test request(s) failed\n')
@@ -0,0 +1,350 @@
+import decimal
+import itertools
+import unittest.mock
+
+import pytest
+import web3
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.types import BlockchainAddress
+
+from pantos.cli.balances import BalanceChange
+from pantos.cli.balances import TokenBalances
+from pantos.cli.balances import check_transfer_balance
+from pantos.cli.balances import follow_token_balance
+from pantos.cli.balances import get_account_addresses
+from pantos.cli.balances import read_token_balances
+from pantos.cli.exceptions import ClientCliError
+
+_ACCOUNT_ADDRESS = BlockchainAddress(
+    '0x8a8D3Bb6E4E6A6A4e3AaB5A5A7C3f2D1E0f9A8b7')
+
+_OTHER_ADDRESS = BlockchainAddress(
+    '0x5B1059888f0D2693459de34b4B2061A0DEff9d2F')
+
+_TRANSFERS = [(95, _OTHER_ADDRESS, _ACCOUNT_ADDRESS, 500),
+              (102, _OTHER_ADDRESS, _ACCOUNT_ADDRESS, 300),
+              (104, _ACCOUNT_ADDRESS, _OTHER_ADDRESS, 100),
+              (108, _ACCOUNT_ADDRESS, _ACCOUNT_ADDRESS, 50),
+              (115, _ACCOUNT_ADDRESS, _OTHER_ADDRESS, 200)]
+
+_TOKEN_ADDRESSES = [
+    BlockchainAddress('0x7EFfCc0a130E452c2FB78bFEDBd02a33E03FD50d'),
+    BlockchainAddress('0x57FeAEC5F8f3A19264d8DfF24a88dA9F774e30a2')
+]
+
+_ACCOUNT_ADDRESSES = [
+    BlockchainAddress(f'0x{index:040x}') for index in range(1, 5)
+]
+
+_codec = web3.Web3().codec
+
+
+@pytest.fixture
+def library_blockchain_config():
+    with unittest.mock.patch(
+            'pantos.cli.balances.get_library_blockchain_config', return_value={
+                'average_block_time': 3,
+                'blocks_per_query': 4,
+                'confirmations': 20
+            }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def token_address():
+    with unittest.mock.patch('pantos.cli.balances.get_token_address'):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def blockchain_client():
+    with unittest.mock.patch('pantos.cli.balances.get_blockchain_client'):
+        yield
+
+
+@pytest.fixture
+def sleep():
+    with unittest.mock.patch('pantos.cli.balances.time.sleep') as mock_sleep:
+        yield mock_sleep
+
+
+@pytest.fixture
+def utilities():
+    with unittest.mock.patch('pantos.cli.balances.get_blockchain_utilities'
+                             ) as mock_get_utilities:
+        yield mock_get_utilities()
+
+
+def _get_logs(fromBlock, toBlock, argument_filters):
+    assert toBlock - fromBlock < 4
+    ((argument_name, address), ) = argument_filters.items()
+    logs = []
+    for block_number, from_address, to_address, value in _TRANSFERS:
+        if (fromBlock <= block_number <= toBlock and {
+                'from': from_address,
+                'to': to_address
+        }[argument_name] == address):
+            logs.append({'args': {'value': value}})
+    result = unittest.mock.MagicMock()
+    result.get.return_value = logs
+    return result
+
+
+def _set_up_token_contract(utilities, block_numbers):
+    node_connections = utilities.create_node_connections()
+    node_connections.eth.get_block_number().get_minimum_result.side_effect = \
+        block_numbers
+    token_contract = utilities.create_contract()
+    token_contract.functions.balanceOf().call().get.return_value = 1000
+    token_contract.events.Transfer().get_logs.side_effect = _get_logs
+    return token_contract
+
+
+def test_follow_token_balance_correct(library_blockchain_config, sleep,
+                                      utilities):
+    token_contract = _set_up_token_contract(utilities,
+                                            [120, 120, 125, 130, 140])
+
+    balance_changes = list(
+        itertools.islice(
+            follow_token_balance(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN,
+                                 _ACCOUNT_ADDRESS), 3))
+
+    assert balance_changes == [
+        BalanceChange(100, 1000, 0),
+        BalanceChange(105, 1200, 200),
+        BalanceChange(120, 1000, -200)
+    ]
+    token_contract.functions.balanceOf().call.assert_called_with(
+        block_identifier=100)
+    sleep.assert_called_with(3)
+
+
+def test_follow_token_balance_unchanged_not_yielded(library_blockchain_config,
+                                                    sleep, utilities):
+    _set_up_token_contract(utilities, [125, 128, 135])
+
+    balance_changes = list(
+        itertools.islice(
+            follow_token_balance(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN,
+                                 _ACCOUNT_ADDRESS, poll_interval=1), 2))
+
+    assert balance_changes == [
+        BalanceChange(105, 1000, 0),
+        BalanceChange(115, 800, -200)
+    ]
+    assert sleep.call_count == 2
+
+
+def test_follow_token_balance_query_error_retried(library_blockchain_config,
+                                                  sleep, utilities):
+    _set_up_token_contract(utilities, [120, Exception, 125])
+
+    balance_changes = list(
+        itertools.islice(
+            follow_token_balance(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN,
+                                 _ACCOUNT_ADDRESS), 2))
+
+    assert balance_changes == [
+        BalanceChange(100, 1000, 0),
+        BalanceChange(105, 1200, 200)
+    ]
+    assert sleep.call_count == 2
+
+
+def _get_balance(token_address, account_address):
+    return (_TOKEN_ADDRESSES.index(token_address) * 1000 +
+            int(account_address, 16))
+
+
+def _set_up_multicall(utilities, failing_account_address=None):
+    node_connections = utilities.create_node_connections()
+    node_connections.eth.get_block_number().get_minimum_result.return_value = \
+        120
+    node_connections.eth.get_code().get.return_value = b'\x60\x80'
+    aggregated_calls = []
+
+    def aggregate3(calls):
+        results = []
+        for token_address, allow_failure, call_data in calls:
+            assert allow_failure
+            assert call_data[:4].hex() == '70a08231'
+            (account_address, ) = _codec.decode(['address'], call_data[4:])
+            if account_address == failing_account_address:
+                results.append((False, b''))
+            else:
+                results.append(
+                    (True,
+                     _codec.encode(
+                         ['uint256'],
+                         [_get_balance(token_address, account_address)])))
+
+        def call(block_identifier):
+            aggregated_calls.append((block_identifier, calls))
+            return unittest.mock.Mock(get=unittest.mock.Mock(
+                return_value=results))
+
+        return unittest.mock.Mock(call=call)
+
+    node_connections.eth.contract().functions.aggregate3.side_effect = \
+        aggregate3
+    return aggregated_calls
+
+
+@unittest.mock.patch('pantos.cli.balances._MAX_CALLS_PER_MULTICALL', 3)
+def test_read_token_balances_multicall_correct(utilities):
+    aggregated_calls = _set_up_multicall(utilities)
+
+    token_balances = read_token_balances(
+        Blockchain.ETHEREUM, _TOKEN_ADDRESSES,
+        _ACCOUNT_ADDRESSES + _ACCOUNT_ADDRESSES[:1])
+
+    assert token_balances.block_number == 120
+    assert token_balances.balances == {
+        (token_address, account_address): _get_balance(token_address,
+                                                       account_address)
+        for token_address in _TOKEN_ADDRESSES
+        for account_address in _ACCOUNT_ADDRESSES
+    }
+    # 8 distinct balances in chunks of at most 3 calls
+    assert [
+        (block_number, len(calls)) for block_number, calls in aggregated_calls
+    ] == [(120, 3), (120, 3), (120, 2)]
+
+
+def test_read_token_balances_multicall_pinned_block(utilities):
+    aggregated_calls = _set_up_multicall(utilities)
+    node_connections = utilities.create_node_connections()
+
+    token_balances = read_token_balances(Blockchain.ETHEREUM,
+                                         _TOKEN_ADDRESSES[:1],
+                                         _ACCOUNT_ADDRESSES[:1], 100)
+
+    assert token_balances.block_number == 100
+    assert token_balances.get_balance(_TOKEN_ADDRESSES[0],
+                                      _ACCOUNT_ADDRESSES[0]) == 1
+    node_connections.eth.get_code.assert_called_with(unittest.mock.ANY, 100)
+    assert [block_number for block_number, _ in aggregated_calls] == [100]
+
+
+def test_read_token_balances_multicall_call_failed(utilities):
+    _set_up_multicall(utilities, _ACCOUNT_ADDRESSES[1])
+
+    with pytest.raises(ClientCliError, match=_ACCOUNT_ADDRESSES[1]):
+        read_token_balances(Blockchain.ETHEREUM, _TOKEN_ADDRESSES,
+                            _ACCOUNT_ADDRESSES)
+
+
+def test_read_token_balances_individually_correct(utilities):
+    node_connections = utilities.create_node_connections()
+    node_connections.eth.get_block_number().get_minimum_result.return_value = \
+        120
+    node_connections.eth.get_code().get.return_value = b''
+    token_contracts = {
+        token_address: unittest.mock.MagicMock()
+        for token_address in _TOKEN_ADDRESSES
+    }
+    for token_address, token_contract in token_contracts.items():
+        token_contract.functions.balanceOf.side_effect = \
+            lambda account_address, token_address=token_address: \
+            unittest.mock.Mock(call=unittest.mock.Mock(
+                return_value=unittest.mock.Mock(get=unittest.mock.Mock(
+                    return_value=_get_balance(token_address,
+                                              account_address)))))
+    utilities.create_contract.side_effect = \
+        lambda token_address, abi, node_connections: \
+        token_contracts[token_address]
+
+    token_balances = read_token_balances(Blockchain.ETHEREUM, _TOKEN_ADDRESSES,
+                                         _ACCOUNT_ADDRESSES, max_workers=2)
+
+    assert token_balances.block_number == 120
+    assert token_balances.balances == {
+        (token_address, account_address): _get_balance(token_address,
+                                                       account_address)
+        for token_address in _TOKEN_ADDRESSES
+        for account_address in _ACCOUNT_ADDRESSES
+    }
+    node_connections.eth.contract().functions.aggregate3.assert_not_called()
+
+
+def test_read_token_balances_individually_error(utilities):
+    node_connections = utilities.create_node_connections()
+    node_connections.eth.get_code().get.return_value = b''
+    token_contract = utilities.create_contract()
+    token_contract.functions.balanceOf().call().get.side_effect = Exception
+
+    with pytest.raises(ClientCliError, match='unable to read the balance'):
+        read_token_balances(Blockchain.ETHEREUM, _TOKEN_ADDRESSES,
+                            _ACCOUNT_ADDRESSES)
+
+
+def test_get_account_addresses_correct(utilities, tmp_path):
+    utilities.is_valid_address.return_value = True
+    file_path = tmp_path / 'addresses.txt'
+    file_path.write_text(
+        f'# Deposit accounts\n{_ACCOUNT_ADDRESSES[1]}\n\n'
+        f'  {_ACCOUNT_ADDRESSES[2]}  \n{_ACCOUNT_ADDRESSES[0]}\n')
+
+    account_addresses = get_account_addresses(Blockchain.ETHEREUM,
+                                              _ACCOUNT_ADDRESSES[:1],
+                                              file_path)
+
+    assert account_addresses == [
+        _ACCOUNT_ADDRESSES[0], _ACCOUNT_ADDRESSES[1], _ACCOUNT_ADDRESSES[2]
+    ]
+
+
+def test_get_account_addresses_invalid_address(utilities):
+    utilities.is_valid_address.side_effect = \
+        lambda address: address != 'invalid'
+
+    with pytest.raises(ClientCliError, match='invalid'):
+        get_account_addresses(Blockchain.ETHEREUM,
+                              [_ACCOUNT_ADDRESSES[0], 'invalid'])
+
+
+def test_get_account_addresses_file_error(utilities, tmp_path):
+    with pytest.raises(ClientCliError, match='unable to read'):
+        get_account_addresses(Blockchain.ETHEREUM,
+                              file_path=tmp_path / 'missing.txt')
+
+
+@pytest.mark.parametrize('token_symbol, token_balance, pan_balance, error',
+                         [(TOKEN_SYMBOL_PAN, None, 15, None),
+                          (TOKEN_SYMBOL_PAN, None, 14, 'PAN'),
+                          ('bst', 10, 5, None), ('bst', 9, 5, 'BST'),
+                          ('bst', 10, 4, 'PAN')])
+@unittest.mock.patch('pantos.cli.balances.convert_amount_to_main_unit',
+                     side_effect=lambda _, __, amount: decimal.Decimal(amount))
+@unittest.mock.patch('pantos.cli.balances.read_token_balances')
+def test_check_transfer_balance(mock_read_token_balances,
+                                mock_convert_amount_to_main_unit, token_symbol,
+                                token_balance, pan_balance, error):
+    token_addresses = {
+        TOKEN_SYMBOL_PAN: _TOKEN_ADDRESSES[0],
+        'bst': _TOKEN_ADDRESSES[1]
+    }
+    balances = {(_TOKEN_ADDRESSES[0], _ACCOUNT_ADDRESS): pan_balance}
+    if token_balance is not None:
+        balances[(_TOKEN_ADDRESSES[1], _ACCOUNT_ADDRESS)] = token_balance
+    mock_read_token_balances.return_value = TokenBalances(100, balances)
+
+    with unittest.mock.patch(
+            'pantos.cli.balances.get_token_address',
+            side_effect=lambda _, token_symbol: token_addresses[token_symbol]):
+        if error is None:
+            check_transfer_balance(Blockchain.ETHEREUM, _ACCOUNT_ADDRESS,
+                                   token_symbol, 10, 5)
+        else:
+            with pytest.raises(ClientCliError,
+                               match=f'insufficient {error} balance'):
+                check_transfer_balance(Blockchain.ETHEREUM, _ACCOUNT_ADDRESS,
+                                       token_symbol, 10, 5)
+
+    # Both balances are read at once
+    mock_read_token_balances.assert_called_once_with(
+        Blockchain.ETHEREUM, [token_addresses[token_symbol]] +
+        ([] if token_symbol == TOKEN_SYMBOL_PAN else [_TOKEN_ADDRESSES[0]]),
+        [_ACCOUNT_ADDRESS])
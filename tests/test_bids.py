@@ -0,0 +1,161 @@
+import time
+import unittest.mock
+
+import pytest
+from pantos.common.blockchains.enums import Blockchain
+
+from pantos.cli.bids import stream_service_node_bids
+from pantos.cli.exceptions import ClientCliError
+
+_SERVICE_NODE_TIMEOUT = 0.5
+
+pytestmark = pytest.mark.usefixtures('cache_config', 'background_threads')
+
+
+@pytest.fixture
+def service_node_latencies():
+    return {}
+
+
+@pytest.fixture
+def unavailable_service_nodes():
+    return set()
+
+
+@pytest.fixture(autouse=True)
+def service_node_health(unavailable_service_nodes):
+    with unittest.mock.patch(
+            'pantos.cli.bids.is_service_node_available',
+            side_effect=lambda _, service_node_address: service_node_address
+            not in unavailable_service_nodes), \
+            unittest.mock.patch('pantos.cli.bids.record_service_node_success'
+                                ) as mock_record_success, \
+            unittest.mock.patch('pantos.cli.bids.record_service_node_failure'
+                                ) as mock_record_failure:
+        yield mock_record_success, mock_record_failure
+
+
+@pytest.fixture(autouse=True)
+def service_nodes(service_node_latencies):
+    def bids(service_node_url, source_blockchain, destination_blockchain,
+             timeout):
+        assert timeout == _SERVICE_NODE_TIMEOUT
+        latency = service_node_latencies[service_node_url]
+        if latency is None:
+            raise Exception('service node unavailable')
+        time.sleep(latency)
+        return [f'bid-{service_node_url}']
+
+    with unittest.mock.patch('pantos.cli.bids.get_blockchain_client'
+                             ) as mock_get_blockchain_client, \
+            unittest.mock.patch(
+                'pantos.cli.bids.get_service_node_addresses',
+                side_effect=lambda _: list(service_node_latencies)), \
+            unittest.mock.patch('pantos.cli.bids.get_service_node_timeout',
+                                return_value=_SERVICE_NODE_TIMEOUT), \
+            unittest.mock.patch('pantos.cli.bids.ServiceNodeClient'
+                                ) as mock_service_node_client:
+        blockchain_client = mock_get_blockchain_client()
+        blockchain_client.read_service_node_url.side_effect = \
+            lambda service_node_address: service_node_address
+        mock_service_node_client().bids.side_effect = bids
+        yield blockchain_client
+
+
+def test_stream_service_node_bids_order_of_arrival(service_node_latencies):
+    service_node_latencies.update({'node1': 0.2, 'node2': 0, 'node3': 0.1})
+
+    service_node_bids = list(
+        stream_service_node_bids(Blockchain.ETHEREUM, Blockchain.POLYGON))
+
+    assert service_node_bids == [('node2', ['bid-node2']),
+                                 ('node3', ['bid-node3']),
+                                 ('node1', ['bid-node1'])]
+
+
+def test_stream_service_node_bids_first_bids_not_delayed(
+        service_node_latencies):
+    service_node_latencies.update({'node1': 0.3, 'node2': 0})
+    start_time = time.monotonic()
+
+    service_node_bids = stream_service_node_bids(Blockchain.ETHEREUM,
+                                                 Blockchain.POLYGON)
+
+    assert next(service_node_bids) == ('node2', ['bid-node2'])
+    assert time.monotonic() - start_time < 0.2
+    service_node_bids.close()
+
+
+def test_stream_service_node_bids_failed_skipped(service_node_latencies,
+                                                 service_node_health):
+    service_node_latencies.update({'node1': None, 'node2': 0})
+    mock_record_success, mock_record_failure = service_node_health
+
+    service_node_bids = list(
+        stream_service_node_bids(Blockchain.ETHEREUM, Blockchain.POLYGON))
+
+    assert service_node_bids == [('node2', ['bid-node2'])]
+    mock_record_success.assert_called_once_with(Blockchain.ETHEREUM, 'node2',
+                                                unittest.mock.ANY)
+    mock_record_failure.assert_called_once_with(Blockchain.ETHEREUM, 'node1')
+
+
+def test_stream_service_node_bids_unavailable_not_queried(
+        service_node_latencies, unavailable_service_nodes):
+    # The unavailable service node would not answer in time
+    service_node_latencies.update({'node1': 5, 'node2': 0})
+    unavailable_service_nodes.add('node1')
+    start_time = time.monotonic()
+
+    service_node_bids = list(
+        stream_service_node_bids(Blockchain.ETHEREUM, Blockchain.POLYGON))
+
+    assert service_node_bids == [('node2', ['bid-node2'])]
+    assert time.monotonic() - start_time < 0.2
+
+
+def test_stream_service_node_bids_timeout_skipped(service_node_latencies):
+    service_node_latencies.update({'node1': 1, 'node2': 0})
+    start_time = time.monotonic()
+
+    service_node_bids = list(
+        stream_service_node_bids(Blockchain.ETHEREUM, Blockchain.POLYGON))
+
+    assert service_node_bids == [('node2', ['bid-node2'])]
+    assert time.monotonic() - start_time < 1
+
+
+def test_stream_service_node_bids_deadline(service_node_latencies):
+    service_node_latencies.update({'node1': 0.4, 'node2': 0})
+    start_time = time.monotonic()
+
+    service_node_bids = list(
+        stream_service_node_bids(Blockchain.ETHEREUM, Blockchain.POLYGON, 0.1))
+
+    assert service_node_bids == [('node2', ['bid-node2'])]
+    assert time.monotonic() - start_time < 0.3
+
+
+def test_stream_service_node_bids_deadline_no_bids_yet(service_node_latencies):
+    service_node_latencies.update({'node1': 0.2, 'node2': None})
+
+    service_node_bids = list(
+        stream_service_node_bids(Blockchain.ETHEREUM, Blockchain.POLYGON, 0.1))
+
+    # The deadline only applies once bids have been received
+    assert service_node_bids == [('node1', ['bid-node1'])]
+
+
+def test_stream_service_node_bids_no_service_nodes(service_node_latencies):
+    assert list(
+        stream_service_node_bids(Blockchain.ETHEREUM,
+                                 Blockchain.POLYGON)) == []
+
+
+def test_stream_service_node_bids_error(service_nodes):
+    with unittest.mock.patch('pantos.cli.bids.get_service_node_addresses',
+                             side_effect=ClientCliError('unavailable')):
+        with pytest.raises(ClientCliError, match='unavailable'):
+            list(
+                stream_service_node_bids(Blockchain.ETHEREUM,
+                                         Blockchain.POLYGON))
@@ -0,0 +1,54 @@
+import unittest.mock
+
+from pantos.common.blockchains.enums import Blockchain
+
+from pantos.cli.blockchains import get_blockchain_utilities
+from pantos.cli.blockchains import get_library_blockchain_config
+from pantos.cli.blockchains import get_protocol_version
+
+
+@unittest.mock.patch('pantos.cli.blockchains.get_common_blockchain_utilities')
+@unittest.mock.patch('pantos.cli.blockchains.get_library_blockchain_client')
+@unittest.mock.patch('pantos.cli.blockchains.initialize_library')
+def test_get_blockchain_utilities_initializes_utilities(
+        mock_initialize_library, mock_get_library_blockchain_client,
+        mock_get_common_blockchain_utilities):
+    mock_get_common_blockchain_utilities.side_effect = \
+        lambda _: mock_get_library_blockchain_client.assert_called_once_with(
+            Blockchain.ETHEREUM)
+
+    get_blockchain_utilities(Blockchain.ETHEREUM)
+
+    mock_initialize_library.assert_called_once_with(False)
+    mock_get_common_blockchain_utilities.assert_called_once_with(
+        Blockchain.ETHEREUM)
+
+
+@unittest.mock.patch('pantos.cli.blockchains.library_configuration')
+@unittest.mock.patch('pantos.cli.blockchains.initialize_library')
+def test_get_library_blockchain_config_initializes_library(
+        mock_initialize_library, mock_library_configuration):
+    mock_library_configuration.get_blockchain_config.return_value = {
+        'hub': '0xhub'
+    }
+
+    assert get_library_blockchain_config(Blockchain.ETHEREUM) == {
+        'hub': '0xhub'
+    }
+
+    mock_initialize_library.assert_called_once_with(False)
+    mock_library_configuration.get_blockchain_config.assert_called_once_with(
+        Blockchain.ETHEREUM)
+
+
+@unittest.mock.patch('pantos.cli.blockchains.library_configuration')
+@unittest.mock.patch('pantos.cli.blockchains.initialize_library')
+def test_get_protocol_version_initializes_library(mock_initialize_library,
+                                                  mock_library_configuration):
+    mock_library_configuration.config.__getitem__.return_value = {
+        'testnet': '0.3.0'
+    }
+
+    assert get_protocol_version() == '0.3.0'
+
+    mock_initialize_library.assert_called_once_with(False)
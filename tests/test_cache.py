@@ -0,0 +1,74 @@
+import pathlib
+import uuid
+
+import pytest
+from pantos.client.library.api import DestinationTransferStatus
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.entities import ServiceNodeTransferStatus
+
+from pantos.cli.cache import load_transfer_status
+from pantos.cli.cache import read_cache_entry
+from pantos.cli.cache import store_transfer_status
+from pantos.cli.cache import write_cache_entry
+
+
+def test_cache_entry_round_trip(cache_config):
+    write_cache_entry(pathlib.PurePath('a/b.json'), {'key': [1, 'two']})
+
+    assert read_cache_entry(pathlib.PurePath('a/b.json')) == {
+        'key': [1, 'two']
+    }
+
+
+def test_cache_entry_missing(cache_config):
+    assert read_cache_entry(pathlib.PurePath('missing.json')) is None
+
+
+def test_cache_entry_corrupt(cache_config, tmp_path):
+    (tmp_path / 'corrupt.json').write_text('{')
+
+    assert read_cache_entry(pathlib.PurePath('corrupt.json')) is None
+
+
+def test_cache_entry_disabled(cache_config, tmp_path):
+    cache_config['enabled'] = False
+    write_cache_entry(pathlib.PurePath('entry.json'), 1)
+
+    assert not (tmp_path / 'entry.json').exists()
+    assert read_cache_entry(pathlib.PurePath('entry.json')) is None
+
+
+@pytest.mark.parametrize('token_transfer_status', [[
+    Blockchain.POLYGON, ServiceNodeTransferStatus.CONFIRMED,
+    DestinationTransferStatus.CONFIRMED
+]], indirect=True)
+def test_transfer_status_round_trip(cache_config, token_transfer_status,
+                                    service_node, task_uuid):
+    store_transfer_status(Blockchain.ETHEREUM, service_node, task_uuid,
+                          token_transfer_status)
+
+    assert load_transfer_status(Blockchain.ETHEREUM, service_node,
+                                task_uuid) == token_transfer_status
+    assert load_transfer_status(Blockchain.BNB_CHAIN, service_node,
+                                task_uuid) is None
+    assert load_transfer_status(Blockchain.ETHEREUM, service_node,
+                                uuid.uuid4()) is None
+
+
+@pytest.mark.parametrize(
+    'token_transfer_status',
+    [[
+        Blockchain.POLYGON, ServiceNodeTransferStatus.SUBMITTED,
+        DestinationTransferStatus.UNKNOWN
+    ],
+     [
+         Blockchain.POLYGON, ServiceNodeTransferStatus.CONFIRMED,
+         DestinationTransferStatus.SUBMITTED
+     ]], indirect=True)
+def test_transfer_status_not_final(cache_config, token_transfer_status,
+                                   service_node, task_uuid):
+    store_transfer_status(Blockchain.ETHEREUM, service_node, task_uuid,
+                          token_transfer_status)
+
+    assert load_transfer_status(Blockchain.ETHEREUM, service_node,
+                                task_uuid) is None
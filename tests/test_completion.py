@@ -0,0 +1,101 @@
+import argparse
+import pathlib
+import uuid
+
+import pytest
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.types import BlockchainAddress
+
+from pantos.cli.completion import create_completion_script
+from pantos.cli.completion import read_completion_data
+from pantos.cli.completion import update_completion_data
+
+_SERVICE_NODE_ADDRESS_1 = BlockchainAddress(
+    '0x07bd2D7b9A0dE9C3A8d1b2C1d7d2f0b1E5cA6f90')
+
+_SERVICE_NODE_ADDRESS_2 = BlockchainAddress(
+    '0x1F2e3D4c5B6a7980A1b2C3d4E5f60718293a4B5c')
+
+
+@pytest.fixture
+def parser():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest='command')
+    parser_status = subparsers.add_parser('status')
+    parser_status.add_argument('blockchain')
+    parser_status.add_argument('service')
+    parser_status.add_argument('task')
+    parser_submit = subparsers.add_parser('submit')
+    parser_submit.add_argument('input', type=pathlib.Path)
+    parser_submit.add_argument('-y', '--yes', action='store_true')
+    parser_tokens = subparsers.add_parser('tokens')
+    tokens_subparsers = parser_tokens.add_subparsers(dest='tokens_command')
+    parser_refresh = tokens_subparsers.add_parser('refresh')
+    parser_refresh.add_argument('blockchains', nargs='*')
+    parser_refresh.add_argument('-m', '--mode', choices=['fast', 'full'])
+    return parser
+
+
+def test_completion_data_round_trip(cache_config):
+    task_ids = [uuid.uuid4() for _ in range(3)]
+    update_completion_data([Blockchain.ETHEREUM, Blockchain.POLYGON],
+                           [TOKEN_SYMBOL_PAN],
+                           [(_SERVICE_NODE_ADDRESS_1, task_ids[0]),
+                            (_SERVICE_NODE_ADDRESS_2, task_ids[1])])
+    update_completion_data(service_node_tasks=[(_SERVICE_NODE_ADDRESS_1,
+                                                task_ids[2])])
+
+    assert read_completion_data() == {
+        'blockchains': ['ethereum', 'polygon'],
+        'tokens': ['pan'],
+        'service_nodes': [_SERVICE_NODE_ADDRESS_1, _SERVICE_NODE_ADDRESS_2],
+        'tasks': [str(task_id) for task_id in reversed(task_ids)]
+    }
+
+
+def test_completion_data_recent_entries_limited(cache_config):
+    task_ids = [uuid.uuid4() for _ in range(25)]
+    update_completion_data(service_node_tasks=[(_SERVICE_NODE_ADDRESS_1,
+                                                task_id)
+                                               for task_id in task_ids])
+
+    completion_data = read_completion_data()
+
+    assert completion_data['service_nodes'] == [_SERVICE_NODE_ADDRESS_1]
+    assert completion_data['tasks'] == [
+        str(task_id) for task_id in reversed(task_ids[5:])
+    ]
+
+
+def test_completion_data_cache_disabled(cache_config, tmp_path):
+    cache_config['enabled'] = False
+    update_completion_data([Blockchain.ETHEREUM])
+
+    assert not (tmp_path / 'completion').exists()
+    assert read_completion_data() == {}
+
+
+def test_create_completion_script_bash(cache_config, parser, tmp_path):
+    script = create_completion_script(parser, 'bash')
+
+    assert f'_pantos_client_data_file={tmp_path / "completion"}\n' in script
+    assert "'words:status submit tokens -h --help'" in script
+    assert "'status 1') kind=blockchains ;;" in script
+    assert "'status 2') kind=service_nodes ;;" in script
+    assert "'status 3') kind=tasks ;;" in script
+    assert "'submit 1') kind=files ;;" in script
+    assert "submit) options='-h --help -y --yes' ;;" in script
+    assert "tokens) subcommands=refresh ;;" in script
+    assert "'tokens refresh '*) kind=blockchains ;;" in script
+    assert ("'tokens refresh -m'|'tokens refresh --mode') "
+            "option_values=('words:fast full') ;;") in script
+    assert not script.startswith('autoload')
+
+
+def test_create_completion_script_zsh(cache_config, parser):
+    script = create_completion_script(parser, 'zsh')
+
+    assert script.startswith('autoload -U +X bashcompinit && bashcompinit\n')
+    assert script.endswith(
+        'complete -F _pantos_client pantos-client pantos-cli\n')
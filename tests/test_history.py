@@ -0,0 +1,268 @@
+import threading
+import unittest.mock
+
+import hexbytes
+import pytest
+from pantos.common.blockchains.enums import Blockchain
+
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.history import IndexedTransfer
+from pantos.cli.history import find_indexed_transfers
+from pantos.cli.history import get_transfer_index_checkpoint
+from pantos.cli.history import update_transfer_index
+
+_HUB_ADDRESS = '0x5e447968d4a177fE7bFB8877cA12aE20Bd60dD85'
+
+_BLOCKS_PER_QUERY = 100
+
+_CONFIRMATIONS = 20
+
+_LARGE_AMOUNT = 2**200
+
+pytestmark = pytest.mark.usefixtures('cache_config')
+
+
+@pytest.fixture
+def library_blockchain_config():
+    return {
+        'hub': _HUB_ADDRESS,
+        'blocks_per_query': _BLOCKS_PER_QUERY,
+        'confirmations': _CONFIRMATIONS
+    }
+
+
+@pytest.fixture(autouse=True)
+def blockchain_configs(library_blockchain_config):
+    with unittest.mock.patch(
+            'pantos.cli.history.get_library_blockchain_config',
+            return_value=library_blockchain_config), \
+            unittest.mock.patch('pantos.cli.history.get_blockchain_config',
+                                return_value={'max_parallel_queries': 3}), \
+            unittest.mock.patch('pantos.cli.history.get_blockchain_client'):
+        yield
+
+
+@pytest.fixture
+def queried_chunks():
+    return []
+
+
+@pytest.fixture
+def latest_block_number():
+    return [1000]
+
+
+@pytest.fixture
+def transfer_event_logs(queried_chunks, latest_block_number):
+    transfer_event_logs = {
+        'TransferSucceeded': [],
+        'TransferFromSucceeded': [],
+        'failing_block_number': None
+    }
+    lock = threading.Lock()
+
+    def get_logs(event_name):
+        def get_logs_(fromBlock, toBlock):
+            failing_block_number = transfer_event_logs['failing_block_number']
+            if (failing_block_number is not None
+                    and fromBlock <= failing_block_number <= toBlock):
+                raise Exception('query failed')
+            if event_name == 'TransferSucceeded':
+                with lock:
+                    queried_chunks.append((fromBlock, toBlock))
+            return unittest.mock.Mock(get=unittest.mock.Mock(return_value=[
+                transfer_event_log
+                for transfer_event_log in transfer_event_logs[event_name]
+                if fromBlock <= transfer_event_log['blockNumber'] <= toBlock
+            ]))
+
+        return get_logs_
+
+    with unittest.mock.patch('pantos.cli.history.get_blockchain_utilities'
+                             ) as mock_get_blockchain_utilities:
+        node_connections = \
+            mock_get_blockchain_utilities().create_node_connections()
+        node_connections.eth.get_block_number().get_minimum_result.\
+            side_effect = lambda: latest_block_number[0]
+        hub_contract = mock_get_blockchain_utilities().create_contract()
+        for event_name in ['TransferSucceeded', 'TransferFromSucceeded']:
+            getattr(hub_contract.events, event_name)().get_logs.side_effect = \
+                get_logs(event_name)
+        yield transfer_event_logs
+
+
+def _create_transfer_event_log(block_number, sender, recipient, token, amount,
+                               destination_blockchain=None, log_index=0):
+    transaction_hash = hexbytes.HexBytes(block_number.to_bytes(32, 'big'))
+    request = {
+        'sender': sender,
+        'recipient': recipient,
+        'amount': amount,
+        'serviceNode': '0x5188287E724140aa3C432dCfE69E00992aF09d09',
+        'fee': 10,
+        'nonce': block_number
+    }
+    if destination_blockchain is None:
+        args = {'transferId': block_number, 'request': request}
+        request['token'] = token
+    else:
+        args = {'sourceTransferId': block_number, 'request': request}
+        request['destinationBlockchainId'] = destination_blockchain.value
+        request['sourceToken'] = token
+        request['destinationToken'] = token.lower()
+    return {
+        'args': args,
+        'blockNumber': block_number,
+        'transactionHash': transaction_hash,
+        'logIndex': log_index
+    }
+
+
+@pytest.fixture
+def indexed_transfers(transfer_event_logs, sender, recipient, source_token,
+                      destination_token):
+    transfer_event_logs['TransferSucceeded'].extend([
+        _create_transfer_event_log(50, sender, recipient, source_token, 1),
+        _create_transfer_event_log(990, sender, recipient, source_token, 2)
+    ])
+    transfer_event_logs['TransferFromSucceeded'].extend([
+        _create_transfer_event_log(350, sender, recipient, destination_token,
+                                   _LARGE_AMOUNT, Blockchain.POLYGON),
+        _create_transfer_event_log(700, recipient, sender, source_token, 3,
+                                   Blockchain.BNB_CHAIN)
+    ])
+
+
+def test_update_transfer_index_correct(indexed_transfers, queried_chunks,
+                                       sender, recipient, source_token,
+                                       destination_token):
+    checkpoint = update_transfer_index(Blockchain.ETHEREUM)
+
+    # Only the blocks with enough confirmations are indexed
+    assert checkpoint == 1000 - _CONFIRMATIONS
+    assert get_transfer_index_checkpoint(Blockchain.ETHEREUM) == checkpoint
+    assert sorted(queried_chunks) == [
+        (from_block_number, min(from_block_number + 99, 980))
+        for from_block_number in range(0, 981, _BLOCKS_PER_QUERY)
+    ]
+    indexed_transfers = find_indexed_transfers(Blockchain.ETHEREUM)
+    assert [
+        indexed_transfer.block_number for indexed_transfer in indexed_transfers
+    ] == [700, 350, 50]
+    assert indexed_transfers[1] == IndexedTransfer(
+        Blockchain.ETHEREUM, Blockchain.POLYGON, 350,
+        f'0x{(350).to_bytes(32, "big").hex()}', 350, sender, recipient,
+        destination_token, destination_token.lower(), _LARGE_AMOUNT,
+        '0x5188287E724140aa3C432dCfE69E00992aF09d09', 10)
+    assert indexed_transfers[2].destination_blockchain is Blockchain.ETHEREUM
+    assert indexed_transfers[2].destination_token_address == source_token
+
+
+def test_update_transfer_index_incremental(indexed_transfers, queried_chunks,
+                                           latest_block_number):
+    update_transfer_index(Blockchain.ETHEREUM)
+    queried_chunks.clear()
+    latest_block_number[0] = 1100
+
+    checkpoint = update_transfer_index(Blockchain.ETHEREUM)
+
+    assert checkpoint == 1080
+    assert queried_chunks == [(981, 1080)]
+    assert [
+        indexed_transfer.block_number
+        for indexed_transfer in find_indexed_transfers(Blockchain.ETHEREUM)
+    ] == [990, 700, 350, 50]
+
+
+def test_update_transfer_index_from_block(indexed_transfers, queried_chunks):
+    update_transfer_index(Blockchain.ETHEREUM, 600)
+    queried_chunks.clear()
+
+    # The first block is only used for the first update
+    update_transfer_index(Blockchain.ETHEREUM, 0)
+
+    assert queried_chunks == []
+    assert [
+        indexed_transfer.block_number
+        for indexed_transfer in find_indexed_transfers(Blockchain.ETHEREUM)
+    ] == [700]
+
+
+def test_update_transfer_index_hub_changed(indexed_transfers, queried_chunks,
+                                           library_blockchain_config):
+    update_transfer_index(Blockchain.ETHEREUM, 600)
+    queried_chunks.clear()
+    library_blockchain_config['hub'] = \
+        '0x0000000000000000000000000000000000000001'
+
+    assert get_transfer_index_checkpoint(Blockchain.ETHEREUM) is None
+    update_transfer_index(Blockchain.ETHEREUM, 900)
+
+    assert queried_chunks == [(900, 980)]
+
+
+def test_update_transfer_index_resumed(indexed_transfers, transfer_event_logs,
+                                       queried_chunks):
+    transfer_event_logs['failing_block_number'] = 450
+
+    with pytest.raises(ClientCliError, match='blocks 300 to 599'):
+        update_transfer_index(Blockchain.ETHEREUM)
+
+    # The transfers of the completed batches are kept
+    assert get_transfer_index_checkpoint(Blockchain.ETHEREUM) == 299
+    assert [
+        indexed_transfer.block_number
+        for indexed_transfer in find_indexed_transfers(Blockchain.ETHEREUM)
+    ] == [50]
+    transfer_event_logs['failing_block_number'] = None
+    queried_chunks.clear()
+
+    update_transfer_index(Blockchain.ETHEREUM)
+
+    assert min(queried_chunks) == (300, 399)
+    assert len(find_indexed_transfers(Blockchain.ETHEREUM)) == 3
+
+
+def test_update_transfer_index_no_confirmed_blocks(transfer_event_logs,
+                                                   latest_block_number):
+    latest_block_number[0] = _CONFIRMATIONS - 1
+
+    assert update_transfer_index(Blockchain.ETHEREUM) is None
+
+
+def test_update_transfer_index_connection_error():
+    with unittest.mock.patch('pantos.cli.history.get_blockchain_utilities',
+                             side_effect=Exception):
+        with pytest.raises(ClientCliError, match='ETHEREUM'):
+            update_transfer_index(Blockchain.ETHEREUM)
+
+
+def test_find_indexed_transfers_filters(indexed_transfers, sender, recipient,
+                                        source_token, destination_token):
+    update_transfer_index(Blockchain.ETHEREUM)
+
+    def find_block_numbers(**kwargs):
+        return [
+            indexed_transfer.block_number
+            for indexed_transfer in find_indexed_transfers(
+                Blockchain.ETHEREUM, **kwargs)
+        ]
+
+    assert find_block_numbers(sender_address=sender) == [350, 50]
+    # Addresses are compared case-insensitively
+    assert find_block_numbers(sender_address=sender.lower()) == [350, 50]
+    assert find_block_numbers(recipient_address=sender) == [700]
+    assert find_block_numbers(token_address=source_token) == [700, 50]
+    assert find_block_numbers(sender_address=sender,
+                              token_address=destination_token) == [350]
+    assert find_block_numbers(sender_address=sender, limit=1) == [350]
+    assert find_indexed_transfers(Blockchain.POLYGON) == []
+
+
+def test_transfer_index_cache_disabled(cache_config):
+    cache_config['enabled'] = False
+
+    with pytest.raises(ClientCliError, match='cache'):
+        get_transfer_index_checkpoint(Blockchain.ETHEREUM)
+    with pytest.raises(ClientCliError, match='cache'):
+        find_indexed_transfers(Blockchain.ETHEREUM)
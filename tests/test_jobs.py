@@ -0,0 +1,434 @@
+import decimal
+import itertools
+import sqlite3
+import threading
+import time
+import unittest.mock
+import uuid
+
+import pytest
+from pantos.client.library import api
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.types import BlockchainAddress
+
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.jobs import JobState
+from pantos.cli.jobs import add_jobs
+from pantos.cli.jobs import count_jobs
+from pantos.cli.jobs import read_jobs
+from pantos.cli.jobs import run_worker
+from pantos.cli.transfers import SignedTransfer
+from pantos.cli.transfers import TransferInput
+
+_SERVICE_NODE_ADDRESS = BlockchainAddress(
+    '0x07bd2D7b9A0dE9C3A8d1b2C1d7d2f0b1E5cA6f90')
+
+_TOKEN_ADDRESS = BlockchainAddress(
+    '0xC892F1D09a7BEF98d65e7f9bD4642d36BC506441')
+
+_PASSWORD = 'password'
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return tmp_path / 'jobs.sqlite3'
+
+
+@pytest.fixture
+def keystore_paths(tmp_path):
+    keystore_paths = []
+    for index in range(2):
+        keystore_path = tmp_path / f'keystore{index}'
+        keystore_path.write_text(f'keystore{index}')
+        keystore_paths.append(keystore_path)
+    return keystore_paths
+
+
+def _create_transfer_inputs(recipient, count, destination_blockchain=None):
+    return [
+        TransferInput(
+            Blockchain.POLYGON if destination_blockchain is None else
+            destination_blockchain, recipient, api.TokenSymbol('pan'),
+            decimal.Decimal(index + 1)) for index in range(count)
+    ]
+
+
+@pytest.fixture
+def signing():
+    signing = {'signed': [], 'bid_valid_until': None}
+    sender_nonces = itertools.count()
+    lock = threading.Lock()
+
+    def sign_transfer(source_blockchain, private_key, transfer_input,
+                      service_node_bid):
+        assert private_key.startswith('key-')
+        bid_valid_until = signing['bid_valid_until']
+        if bid_valid_until is None:
+            bid_valid_until = int(time.time()) + 3600
+        with lock:
+            signing['signed'].append((private_key, transfer_input))
+            sender_nonce = next(sender_nonces)
+        return SignedTransfer(
+            source_blockchain, transfer_input.destination_blockchain,
+            service_node_bid[0],
+            api.ServiceNodeBid(source_blockchain,
+                               transfer_input.destination_blockchain, 10, 600,
+                               bid_valid_until, '0xbid'), private_key,
+            transfer_input.recipient_address, _TOKEN_ADDRESS, _TOKEN_ADDRESS,
+            int(transfer_input.token_amount * 10**8), sender_nonce,
+            int(time.time()) + 3600, '0xsignature')
+
+    with unittest.mock.patch(
+            'pantos.cli.jobs.api.decrypt_private_key',
+            side_effect=lambda blockchain, keystore, password:
+            f'key-{keystore}') as mock_decrypt_private_key, \
+            unittest.mock.patch(
+                'pantos.cli.jobs.select_service_node_bid',
+                return_value=(_SERVICE_NODE_ADDRESS, None)
+            ) as mock_select_service_node_bid, \
+            unittest.mock.patch('pantos.cli.jobs.sign_transfer',
+                                side_effect=sign_transfer):
+        signing['decrypt_private_key'] = mock_decrypt_private_key
+        signing['select_service_node_bid'] = mock_select_service_node_bid
+        yield signing
+
+
+@pytest.fixture
+def submissions():
+    submissions = {'submitted': [], 'error': None, 'failing_nonces': set()}
+
+    def submit_signed_transfer(signed_transfer):
+        if signed_transfer.sender_nonce in submissions['failing_nonces']:
+            # Each failing transfer fails only once
+            submissions['failing_nonces'].remove(signed_transfer.sender_nonce)
+            return Exception('service node unavailable')
+        submissions['submitted'].append(signed_transfer)
+        return api.ServiceNodeTaskInfo(uuid.uuid4(),
+                                       signed_transfer.service_node_address)
+
+    def submit_signed_transfers(signed_transfers, max_workers):
+        if submissions['error'] is not None:
+            raise submissions['error']
+        return [
+            submit_signed_transfer(signed_transfer)
+            for signed_transfer in signed_transfers
+        ]
+
+    with unittest.mock.patch('pantos.cli.jobs.submit_signed_transfers',
+                             side_effect=submit_signed_transfers):
+        yield submissions
+
+
+def _insert_lease(queue_path, keystore_path, expiry):
+    with sqlite3.connect(queue_path) as connection:
+        connection.execute(
+            'INSERT OR REPLACE INTO leases VALUES (?, ?, ?)',
+            (str(keystore_path.resolve()), 'other-worker', expiry))
+    connection.close()
+
+
+def test_add_jobs_correct(queue_path, keystore_paths, recipient):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 2))
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[1],
+             _create_transfer_inputs(recipient, 1, Blockchain.BNB_CHAIN))
+
+    jobs = read_jobs(queue_path)
+    assert [job.job_id for job in jobs] == [1, 2, 3]
+    assert jobs[0].keystore_path == keystore_paths[0].resolve()
+    assert jobs[1].transfer_input == TransferInput(Blockchain.POLYGON,
+                                                   recipient,
+                                                   api.TokenSymbol('pan'),
+                                                   decimal.Decimal(2))
+    assert jobs[2].transfer_input.destination_blockchain is \
+        Blockchain.BNB_CHAIN
+    assert all(job.state is JobState.PENDING and job.attempts == 0
+               for job in jobs)
+    assert count_jobs(queue_path) == {
+        JobState.PENDING: 3,
+        JobState.SIGNED: 0,
+        JobState.SUBMITTED: 0,
+        JobState.FAILED: 0
+    }
+
+
+def test_add_jobs_keystore_not_available(queue_path, tmp_path, recipient):
+    with pytest.raises(ClientCliError, match='keystore'):
+        add_jobs(queue_path, Blockchain.ETHEREUM, tmp_path / 'missing',
+                 _create_transfer_inputs(recipient, 1))
+
+    assert not queue_path.exists()
+
+
+def test_read_jobs_queue_not_existing(queue_path):
+    with pytest.raises(ClientCliError, match='does not exist'):
+        read_jobs(queue_path)
+
+
+def test_run_worker_correct(queue_path, keystore_paths, recipient, signing,
+                            submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 5))
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[1],
+             _create_transfer_inputs(recipient, 2, Blockchain.BNB_CHAIN))
+    # Jobs of other source blockchains are not processed
+    add_jobs(queue_path, Blockchain.POLYGON, keystore_paths[1],
+             _create_transfer_inputs(recipient, 1, Blockchain.ETHEREUM))
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD,
+                               batch_size=2)
+
+    assert worker_result.submitted == 7
+    assert worker_result.failed == 0
+    jobs = read_jobs(queue_path)
+    assert all(job.state is JobState.SUBMITTED and job.attempts == 1
+               and job.service_node_address == _SERVICE_NODE_ADDRESS
+               and job.task_id is not None for job in jobs[:7])
+    assert jobs[7].state is JobState.PENDING
+    assert len(submissions['submitted']) == 7
+    # Each keystore is decrypted only once
+    assert [
+        call.args[1] for call in signing['decrypt_private_key'].call_args_list
+    ] == ['keystore0', 'keystore1']
+    # The service node bids are selected once per batch
+    assert signing['select_service_node_bid'].call_count == 4
+
+
+def test_run_worker_leased_keystore_skipped(queue_path, keystore_paths,
+                                            recipient, signing, submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 2))
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[1],
+             _create_transfer_inputs(recipient, 2))
+    _insert_lease(queue_path, keystore_paths[0], time.time() + 0.5)
+    start_time = time.monotonic()
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD,
+                               lease_duration=0.3)
+
+    # The worker takes over the keystore once the other worker's lease
+    # has expired
+    assert worker_result.submitted == 4
+    assert time.monotonic() - start_time >= 0.5
+    assert [private_key for private_key, _ in signing['signed']
+            ] == ['key-keystore1'] * 2 + ['key-keystore0'] * 2
+
+
+def test_run_worker_lease_lost(queue_path, keystore_paths, recipient, signing,
+                               submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 2))
+
+    def select_service_node_bid(*args, **kwargs):
+        if signing['select_service_node_bid'].call_count == 1:
+            # Another worker takes over the keystore in the meantime
+            _insert_lease(queue_path, keystore_paths[0], time.time() + 0.2)
+        return (_SERVICE_NODE_ADDRESS, None)
+
+    signing['select_service_node_bid'].side_effect = select_service_node_bid
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD,
+                               lease_duration=0.3)
+
+    # The transfers signed while the lease was lost are never stored or
+    # submitted
+    assert worker_result.submitted == 2
+    assert len(signing['signed']) == 4
+    assert [
+        signed_transfer.sender_nonce
+        for signed_transfer in submissions['submitted']
+    ] == [2, 3]
+    assert all(job.attempts == 1 for job in read_jobs(queue_path))
+
+
+def test_run_worker_lease_lost_during_submission(queue_path, keystore_paths,
+                                                 recipient, signing,
+                                                 submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 2))
+
+    def submit_signed_transfers(signed_transfers, max_workers):
+        if len(submissions['submitted']) == 0:
+            # Another worker takes over the keystore in the meantime
+            _insert_lease(queue_path, keystore_paths[0], time.time() + 0.2)
+        submissions['submitted'].extend(signed_transfers)
+        return [
+            api.ServiceNodeTaskInfo(uuid.uuid4(),
+                                    signed_transfer.service_node_address)
+            for signed_transfer in signed_transfers
+        ]
+
+    with unittest.mock.patch('pantos.cli.jobs.submit_signed_transfers',
+                             side_effect=submit_signed_transfers):
+        worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD,
+                                   lease_duration=0.3)
+
+    # The results of the submission without the lease are not recorded,
+    # and the stored signed transfers are resubmitted later
+    assert worker_result.submitted == 2
+    assert len(signing['signed']) == 2
+    assert [
+        signed_transfer.sender_nonce
+        for signed_transfer in submissions['submitted']
+    ] == [0, 1, 0, 1]
+    assert all(job.state is JobState.SUBMITTED and job.attempts == 2
+               for job in read_jobs(queue_path))
+
+
+def test_run_worker_signed_transfers_resubmitted(queue_path, keystore_paths,
+                                                 recipient, signing,
+                                                 submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 2))
+    submissions['error'] = KeyboardInterrupt()
+
+    # The worker stops while submitting the transfers
+    with pytest.raises(KeyboardInterrupt):
+        run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD)
+
+    assert count_jobs(queue_path)[JobState.SIGNED] == 2
+    submissions['error'] = None
+    signing['decrypt_private_key'].reset_mock()
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD)
+
+    assert worker_result.submitted == 2
+    # The stored signed transfers are submitted without being signed
+    # again (and the keystore is not even decrypted)
+    assert len(signing['signed']) == 2
+    signing['decrypt_private_key'].assert_not_called()
+    assert [
+        signed_transfer.sender_nonce
+        for signed_transfer in submissions['submitted']
+    ] == [0, 1]
+    assert all(job.state is JobState.SUBMITTED and job.attempts == 2
+               for job in read_jobs(queue_path))
+
+
+def test_run_worker_signed_transfers_expired(queue_path, keystore_paths,
+                                             recipient, signing, submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 1))
+    signing['bid_valid_until'] = int(time.time()) - 1
+    submissions['error'] = KeyboardInterrupt()
+    with pytest.raises(KeyboardInterrupt):
+        run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD)
+    submissions['error'] = None
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD)
+
+    assert worker_result.failed == 1
+    job = read_jobs(queue_path)[0]
+    assert job.state is JobState.FAILED
+    assert 'expired' in job.error
+    assert submissions['submitted'] == []
+
+
+def test_run_worker_decryption_failed(queue_path, keystore_paths, recipient,
+                                      signing, submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 3))
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[1],
+             _create_transfer_inputs(recipient, 1))
+    signing['decrypt_private_key'].side_effect = \
+        lambda blockchain, keystore, password: \
+        f'key-{keystore}' if keystore == 'keystore1' else 1 / 0
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD,
+                               batch_size=2, max_attempts=1)
+
+    assert worker_result.submitted == 1
+    assert worker_result.failed == 3
+    # The keystore is only tried to be decrypted once per lease
+    assert signing['decrypt_private_key'].call_count == 2
+    failed_jobs = read_jobs(queue_path, JobState.FAILED)
+    assert [job.job_id for job in failed_jobs] == [1, 2, 3]
+    assert all(job.error == 'unable to decrypt the keystore '
+               f'{keystore_paths[0].resolve()}' for job in failed_jobs)
+
+
+def test_run_worker_signing_failed(queue_path, keystore_paths, recipient,
+                                   signing, submissions):
+    add_jobs(
+        queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+        _create_transfer_inputs(recipient, 1) +
+        _create_transfer_inputs(recipient, 2, Blockchain.BNB_CHAIN))
+
+    def select_service_node_bid(source_blockchain, destination_blockchain,
+                                deadline):
+        if destination_blockchain is Blockchain.BNB_CHAIN:
+            raise ClientCliError('no service node bids available')
+        return (_SERVICE_NODE_ADDRESS, None)
+
+    signing['select_service_node_bid'].side_effect = select_service_node_bid
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD,
+                               lease_duration=0.3, max_attempts=2,
+                               retry_delay=0.1)
+
+    assert worker_result.submitted == 1
+    assert worker_result.failed == 2
+    # The failed jobs have been retried once
+    assert signing['select_service_node_bid'].call_count == 3
+    assert [(job.job_id, job.attempts, job.error)
+            for job in read_jobs(queue_path, JobState.FAILED)
+            ] == [(2, 2, 'no service node bids available'),
+                  (3, 2, 'no service node bids available')]
+
+
+def test_run_worker_retried(queue_path, keystore_paths, recipient, signing,
+                            submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 2))
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[1],
+             _create_transfer_inputs(recipient, 1))
+    selection_errors = [ClientCliError('no service node bids available')]
+
+    def select_service_node_bid(source_blockchain, destination_blockchain,
+                                deadline):
+        if len(selection_errors) > 0 and len(signing['signed']) == 2:
+            # The bid selection for the second keystore fails once
+            raise selection_errors.pop()
+        return (_SERVICE_NODE_ADDRESS, None)
+
+    signing['select_service_node_bid'].side_effect = select_service_node_bid
+    # The submission of the first keystore's second transfer fails once
+    submissions['failing_nonces'].add(1)
+    start_time = time.monotonic()
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD,
+                               lease_duration=0.3, retry_delay=0.2)
+
+    assert worker_result.submitted == 3
+    assert worker_result.failed == 0
+    assert time.monotonic() - start_time >= 0.2
+    jobs = read_jobs(queue_path)
+    assert all(job.state is JobState.SUBMITTED and job.error is None
+               for job in jobs)
+    assert [job.attempts for job in jobs] == [1, 2, 2]
+    # The failed submission is retried with the same signed transfer
+    assert len(signing['signed']) == 3
+    assert sorted(
+        signed_transfer.sender_nonce
+        for signed_transfer in submissions['submitted']) == [0, 1, 2]
+
+
+def test_run_worker_submission_failed(queue_path, keystore_paths, recipient,
+                                      signing, submissions):
+    add_jobs(queue_path, Blockchain.ETHEREUM, keystore_paths[0],
+             _create_transfer_inputs(recipient, 1))
+    submissions['failing_nonces'].add(0)
+
+    worker_result = run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD,
+                               max_attempts=1)
+
+    assert worker_result.failed == 1
+    job = read_jobs(queue_path)[0]
+    assert job.state is JobState.FAILED
+    assert job.attempts == 1
+    assert job.error == 'service node unavailable'
+
+
+def test_run_worker_queue_not_existing(queue_path):
+    with pytest.raises(ClientCliError, match='does not exist'):
+        run_worker(queue_path, Blockchain.ETHEREUM, _PASSWORD)
@@ -0,0 +1,124 @@
+import math
+import unittest.mock
+import uuid
+
+import pytest
+from pantos.client.library.api import ServiceNodeTaskInfo
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+from pantos.common.blockchains.enums import Blockchain
+
+from pantos.cli.cache import is_cache_enabled
+from pantos.cli.loadtest import LoadTestPhaseResult
+from pantos.cli.loadtest import run_load_test
+from pantos.cli.nodes import record_service_node_success
+
+pytestmark = pytest.mark.usefixtures('cache_config')
+
+
+@pytest.fixture
+def stand_in_server():
+    with unittest.mock.patch(
+            'pantos.cli.loadtest.StandInServer') as mock_stand_in_server:
+        yield mock_stand_in_server
+
+
+@pytest.fixture
+def library_api():
+    with unittest.mock.patch('pantos.cli.loadtest.api') as mock_api:
+        yield mock_api
+
+
+@pytest.fixture
+def get_token_transfer_status():
+    with unittest.mock.patch('pantos.cli.loadtest.get_token_transfer_status'
+                             ) as mock_get_token_transfer_status:
+        yield mock_get_token_transfer_status
+
+
+def test_load_test_phase_result_statistics():
+    phase_result = LoadTestPhaseResult('bids',
+                                       [0.01 * i for i in range(1, 101)], 5,
+                                       2.0)
+
+    assert phase_result.requests == 105
+    assert phase_result.throughput == 50
+    assert phase_result.get_latency_percentile(50) == pytest.approx(0.5)
+    assert phase_result.get_latency_percentile(99) == pytest.approx(0.99)
+    assert phase_result.get_latency_percentile(0) == pytest.approx(0.01)
+    assert math.isnan(
+        LoadTestPhaseResult('status', [], 1, 1.0).get_latency_percentile(50))
+
+
+def test_run_load_test_correct(stand_in_server, library_api,
+                               get_token_transfer_status, service_node):
+    task_ids = [uuid.uuid4() for _ in range(4)]
+    library_api.transfer_tokens.side_effect = [
+        ServiceNodeTaskInfo(task_id, service_node) for task_id in task_ids
+    ]
+
+    phase_results = run_load_test(Blockchain.ETHEREUM, Blockchain.ETHEREUM, 4,
+                                  2, service_node_latency=0.5)
+
+    stand_in_server.assert_called_once_with([Blockchain.ETHEREUM], 0.5, 0.0)
+    assert [phase_result.phase for phase_result in phase_results
+            ] == ['bids', 'transfer', 'status']
+    assert all(phase_result.requests == 4 and phase_result.errors == 0
+               for phase_result in phase_results)
+    library_api.retrieve_service_node_bids.assert_called_with(
+        Blockchain.ETHEREUM, Blockchain.ETHEREUM)
+    assert library_api.transfer_tokens.call_args.args[4] == TOKEN_SYMBOL_PAN
+    assert sorted(call.args[2] for call in
+                  get_token_transfer_status.call_args_list) == sorted(task_ids)
+
+
+def test_run_load_test_failed_requests(stand_in_server, library_api,
+                                       get_token_transfer_status, service_node,
+                                       task_uuid):
+    library_api.transfer_tokens.side_effect = [
+        Exception,
+        ServiceNodeTaskInfo(task_uuid, service_node), Exception
+    ]
+    get_token_transfer_status.side_effect = Exception
+
+    phase_results = run_load_test(Blockchain.ETHEREUM, Blockchain.POLYGON, 3,
+                                  1)
+
+    stand_in_server.assert_called_once_with(
+        [Blockchain.ETHEREUM, Blockchain.POLYGON], 0.0, 0.0)
+    assert [(phase_result.requests, phase_result.errors)
+            for phase_result in phase_results] == [(3, 0), (3, 2), (1, 1)]
+
+
+def test_run_load_test_cache_disabled(stand_in_server, library_api,
+                                      get_token_transfer_status, service_node,
+                                      cache_config, tmp_path):
+    def get_token_transfer_status_(source_blockchain, service_node_address,
+                                   task_id):
+        assert not is_cache_enabled()
+        record_service_node_success(source_blockchain, service_node_address,
+                                    0.1)
+
+    library_api.transfer_tokens.return_value = ServiceNodeTaskInfo(
+        uuid.uuid4(), service_node)
+    get_token_transfer_status.side_effect = get_token_transfer_status_
+
+    phase_results = run_load_test(Blockchain.ETHEREUM, Blockchain.POLYGON, 2,
+                                  2)
+
+    assert phase_results[2].errors == 0
+    # No health record of the stand-in service node has been written
+    assert list(tmp_path.iterdir()) == []
+    assert cache_config['enabled']
+
+
+@unittest.mock.patch('pantos.cli.loadtest.time.sleep')
+def test_run_load_test_request_rate(mock_sleep, stand_in_server, library_api,
+                                    get_token_transfer_status):
+    run_load_test(Blockchain.ETHEREUM, Blockchain.POLYGON, 5, 5,
+                  request_rate=10)
+
+    # Each request is started at its scheduled time (0.1 s apart)
+    assert mock_sleep.call_count == 15
+    assert max(call.args[0]
+               for call in mock_sleep.call_args_list) == pytest.approx(
+                   0.4, abs=0.05)
@@ -0,0 +1,189 @@
+import unittest.mock
+
+import pytest
+from pantos.common.blockchains.enums import Blockchain
+
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.nodes import CircuitState
+from pantos.cli.nodes import ServiceNodeHealth
+from pantos.cli.nodes import get_service_node_addresses
+from pantos.cli.nodes import is_service_node_available
+from pantos.cli.nodes import load_service_node_health
+from pantos.cli.nodes import probe_service_nodes
+from pantos.cli.nodes import record_service_node_failure
+from pantos.cli.nodes import record_service_node_success
+from pantos.cli.nodes import reset_service_node_health
+
+_FAILURE_THRESHOLD = 3
+
+_RETRY_INTERVAL = 300
+
+pytestmark = pytest.mark.usefixtures('cache_config')
+
+
+@pytest.fixture(autouse=True)
+def service_nodes_config():
+    with unittest.mock.patch(
+            'pantos.cli.nodes.get_service_nodes_config', return_value={
+                'failure_threshold': _FAILURE_THRESHOLD,
+                'retry_interval': _RETRY_INTERVAL
+            }):
+        yield
+
+
+@pytest.fixture
+def blockchain_client():
+    with unittest.mock.patch('pantos.cli.nodes.get_blockchain_client'
+                             ) as mock_get_blockchain_client:
+        yield mock_get_blockchain_client()
+
+
+def _record_failures(service_node, count):
+    for _ in range(count):
+        record_service_node_failure(Blockchain.ETHEREUM, service_node)
+
+
+@pytest.mark.parametrize('failures, elapsed_time, circuit_state',
+                         [(0, None, CircuitState.CLOSED),
+                          (2, 0, CircuitState.CLOSED),
+                          (3, 0, CircuitState.OPEN),
+                          (3, 299, CircuitState.OPEN),
+                          (3, 300, CircuitState.HALF_OPEN),
+                          (5, 1000, CircuitState.HALF_OPEN)])
+def test_get_circuit_state_correct(failures, elapsed_time, circuit_state):
+    service_node_health = ServiceNodeHealth(
+        failures=failures, last_failure=None if elapsed_time is None else 1000)
+    now = 1000 + (0 if elapsed_time is None else elapsed_time)
+
+    assert service_node_health.get_circuit_state(now) is circuit_state
+
+
+def test_get_retry_time_correct():
+    assert ServiceNodeHealth().get_retry_time() is None
+    with unittest.mock.patch('pantos.cli.nodes.time.time', return_value=1100):
+        assert ServiceNodeHealth(failures=3,
+                                 last_failure=1000).get_retry_time() == 1300
+
+
+def test_load_service_node_health_missing(service_node):
+    assert load_service_node_health(Blockchain.ETHEREUM,
+                                    service_node) == ServiceNodeHealth()
+
+
+def test_record_service_node_success_correct(service_node):
+    _record_failures(service_node, 2)
+    for latency in range(12):
+        record_service_node_success(Blockchain.ETHEREUM, service_node,
+                                    float(latency))
+
+    service_node_health = load_service_node_health(Blockchain.ETHEREUM,
+                                                   service_node)
+    assert service_node_health.failures == 0
+    assert service_node_health.latencies == [
+        float(latency) for latency in range(2, 12)
+    ]
+    assert service_node_health.get_average_latency() == 6.5
+    assert service_node_health.last_success is not None
+    assert service_node_health.get_circuit_state() is CircuitState.CLOSED
+
+
+def test_record_service_node_failure_circuit_opened(service_node):
+    _record_failures(service_node, _FAILURE_THRESHOLD - 1)
+    assert is_service_node_available(Blockchain.ETHEREUM, service_node)
+
+    _record_failures(service_node, 1)
+
+    assert not is_service_node_available(Blockchain.ETHEREUM, service_node)
+    # Service nodes are tracked per blockchain
+    assert is_service_node_available(Blockchain.POLYGON, service_node)
+
+
+def test_circuit_half_open_after_retry_interval(service_node):
+    with unittest.mock.patch('pantos.cli.nodes.time.time', return_value=1000):
+        _record_failures(service_node, _FAILURE_THRESHOLD)
+    with unittest.mock.patch('pantos.cli.nodes.time.time',
+                             return_value=1000 + _RETRY_INTERVAL):
+        service_node_health = load_service_node_health(Blockchain.ETHEREUM,
+                                                       service_node)
+        assert service_node_health.get_circuit_state() is \
+            CircuitState.HALF_OPEN
+        assert is_service_node_available(Blockchain.ETHEREUM, service_node)
+        # A failed probe reopens the circuit
+        _record_failures(service_node, 1)
+        assert not is_service_node_available(Blockchain.ETHEREUM, service_node)
+
+
+def test_reset_service_node_health_correct(service_node):
+    _record_failures(service_node, _FAILURE_THRESHOLD)
+
+    reset_service_node_health(Blockchain.ETHEREUM, service_node)
+
+    assert is_service_node_available(Blockchain.ETHEREUM, service_node)
+    assert load_service_node_health(Blockchain.ETHEREUM,
+                                    service_node) == ServiceNodeHealth()
+
+
+def test_service_node_health_cache_disabled(cache_config, service_node):
+    cache_config['enabled'] = False
+
+    _record_failures(service_node, _FAILURE_THRESHOLD)
+
+    assert is_service_node_available(Blockchain.ETHEREUM, service_node)
+
+
+def test_service_node_health_invalid_entry(cache_config, tmp_path,
+                                           service_node):
+    health_path = (tmp_path / 'service-node-health' / 'ethereum' /
+                   f'{service_node.lower()}.json')
+    health_path.parent.mkdir(parents=True)
+    health_path.write_text('{"unknown": 1}')
+
+    assert load_service_node_health(Blockchain.ETHEREUM,
+                                    service_node) == ServiceNodeHealth()
+
+
+def test_get_service_node_addresses_error(blockchain_client):
+    blockchain_client.read_service_node_addresses.side_effect = Exception
+
+    with pytest.raises(ClientCliError, match='ETHEREUM'):
+        get_service_node_addresses(Blockchain.ETHEREUM)
+
+
+@unittest.mock.patch('pantos.cli.nodes.get_service_node_timeout',
+                     return_value=1)
+@unittest.mock.patch('pantos.cli.nodes.ServiceNodeClient')
+def test_probe_service_nodes_correct(mock_service_node_client,
+                                     mock_get_service_node_timeout,
+                                     blockchain_client):
+    service_nodes = ['0xNode1', '0xNode2', '0xNode3']
+    for service_node in service_nodes:
+        _record_failures(service_node, _FAILURE_THRESHOLD)
+
+    def read_service_node_url(service_node_address):
+        if service_node_address == '0xNode3':
+            raise Exception
+        return service_node_address
+
+    def bids(service_node_url, source_blockchain, destination_blockchain,
+             timeout):
+        if service_node_url == '0xNode2':
+            raise Exception
+        return []
+
+    blockchain_client.read_service_node_url.side_effect = \
+        read_service_node_url
+    mock_service_node_client().bids.side_effect = bids
+
+    # Skipped service nodes are probed as well
+    assert probe_service_nodes(Blockchain.ETHEREUM,
+                               service_nodes) == [True, False, False]
+    assert is_service_node_available(Blockchain.ETHEREUM, '0xNode1')
+    assert load_service_node_health(Blockchain.ETHEREUM,
+                                    '0xNode2').failures == 4
+    # The service node is not to blame if its URL cannot be read
+    assert load_service_node_health(Blockchain.ETHEREUM,
+                                    '0xNode3').failures == 3
+
+
+def test_probe_service_nodes_none():
+    assert probe_service_nodes(Blockchain.ETHEREUM, []) == []
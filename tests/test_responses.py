@@ -0,0 +1,116 @@
+import os
+import unittest.mock
+
+import hexbytes
+import pytest
+from pantos.common.blockchains.enums import Blockchain
+from web3.datastructures import AttributeDict
+
+from pantos.cli.responses import get_cached_response
+from pantos.cli.responses import is_final_block_range
+
+_CONFIRMATIONS = 20
+
+pytestmark = pytest.mark.usefixtures('cache_config')
+
+
+@pytest.fixture(autouse=True)
+def library_blockchain_config():
+    with unittest.mock.patch(
+            'pantos.cli.responses.get_library_blockchain_config',
+            return_value={'confirmations': _CONFIRMATIONS}):
+        yield
+
+
+@pytest.mark.parametrize('to_block_number, final', [(980, True), (900, True),
+                                                    (981, False),
+                                                    (1000, False)])
+def test_is_final_block_range_correct(to_block_number, final):
+    assert is_final_block_range(Blockchain.ETHEREUM, to_block_number,
+                                1000) is final
+
+
+def test_get_cached_response_hit():
+    response = [{
+        'blockNumber': 990,
+        'transactionHash': hexbytes.HexBytes(b'\x01' * 32),
+        'args': {
+            'amount': 2**200,
+            'signatures': [b'\x02' * 65],
+            'sender': '0x5188287E724140aa3C432dCfE69E00992aF09d09'
+        }
+    }]
+    query = unittest.mock.Mock(return_value=response)
+
+    assert get_cached_response(Blockchain.ETHEREUM, ['a', 1, 2],
+                               query) is response
+    cached_response = get_cached_response(Blockchain.ETHEREUM, ['a', 1, 2],
+                                          query)
+
+    query.assert_called_once_with()
+    assert cached_response == response
+    assert isinstance(cached_response[0], AttributeDict)
+    assert cached_response[0].args.signatures == [
+        hexbytes.HexBytes(b'\x02' * 65)
+    ]
+    assert cached_response[0]['transactionHash'].hex() == '01' * 32
+
+
+def test_get_cached_response_different_requests():
+    get_cached_response(Blockchain.ETHEREUM, ['a', 1, 2], lambda: [1])
+
+    assert get_cached_response(Blockchain.ETHEREUM, ['a', 1, 3],
+                               lambda: [2]) == [2]
+    assert get_cached_response(Blockchain.POLYGON, ['a', 1, 2],
+                               lambda: [3]) == [3]
+    assert get_cached_response(Blockchain.ETHEREUM, ['a', 1, 2],
+                               lambda: [4]) == [1]
+
+
+def test_get_cached_response_evicted():
+    # Random bytes cannot be compressed
+    responses = [hexbytes.HexBytes(os.urandom(256 * 1024)) for _ in range(3)]
+    with unittest.mock.patch('pantos.cli.responses._BYTES_PER_MEGABYTE',
+                             300 * 1024 * 2), \
+            unittest.mock.patch('pantos.cli.responses.time.time',
+                                side_effect=range(100)):
+        for block_number, response in enumerate(responses):
+            get_cached_response(Blockchain.ETHEREUM, [block_number],
+                                lambda: response)
+        query = unittest.mock.Mock(return_value=b'')
+
+        # The least recently used response has been evicted
+        get_cached_response(Blockchain.ETHEREUM, [2], query)
+        query.assert_not_called()
+        get_cached_response(Blockchain.ETHEREUM, [0], query)
+        query.assert_called_once_with()
+
+
+@pytest.mark.parametrize('enabled, max_size', [(False, 1), (True, 0)])
+def test_get_cached_response_disabled(enabled, max_size, cache_config,
+                                      tmp_path):
+    cache_config['enabled'] = enabled
+    cache_config['rpc_responses_max_size'] = max_size
+    query = unittest.mock.Mock(return_value=[1])
+
+    for _ in range(2):
+        assert get_cached_response(Blockchain.ETHEREUM, ['a'], query) == [1]
+
+    assert query.call_count == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_get_cached_response_not_encodable():
+    query = unittest.mock.Mock(return_value=[1.5])
+
+    for _ in range(2):
+        assert get_cached_response(Blockchain.ETHEREUM, ['a'], query) == [1.5]
+
+    assert query.call_count == 2
+
+
+def test_get_cached_response_query_error():
+    with pytest.raises(Exception, match='query failed'):
+        get_cached_response(
+            Blockchain.ETHEREUM, ['a'],
+            unittest.mock.Mock(side_effect=Exception('query failed')))
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from pantos.cli.scans import get_block_range_chunks
+from pantos.cli.scans import scan_block_range
+
+
+@pytest.mark.parametrize(
+    'from_block_number, to_block_number, '
+    'blocks_per_query, chunks', [(0, 9, 4, [(6, 9), (2, 5), (0, 1)]),
+                                 (10, 17, 4, [(14, 17), (10, 13)]),
+                                 (5, 5, 100, [(5, 5)]), (6, 5, 4, [])])
+def test_get_block_range_chunks_correct(from_block_number, to_block_number,
+                                        blocks_per_query, chunks):
+    assert list(
+        get_block_range_chunks(from_block_number, to_block_number,
+                               blocks_per_query)) == chunks
+
+
+@pytest.mark.parametrize(
+    'from_block_number, to_block_number, '
+    'blocks_per_query, chunks', [(0, 9, 4, [(8, 9), (4, 7), (0, 3)]),
+                                 (10, 17, 4, [(16, 17), (12, 15), (10, 11)]),
+                                 (4, 7, 4, [(4, 7)]), (6, 5, 4, [])])
+def test_get_block_range_chunks_aligned(from_block_number, to_block_number,
+                                        blocks_per_query, chunks):
+    assert list(
+        get_block_range_chunks(from_block_number, to_block_number,
+                               blocks_per_query, True)) == chunks
+
+
+def test_scan_block_range_not_found():
+    queried_chunks = []
+    lock = threading.Lock()
+
+    def query_blocks(from_block_number, to_block_number):
+        with lock:
+            queried_chunks.append((from_block_number, to_block_number))
+        return None
+
+    result = scan_block_range(0, 99, 10, 3, query_blocks)
+
+    assert result is None
+    assert sorted(queried_chunks) == [(i, i + 9) for i in range(0, 100, 10)]
+
+
+def test_scan_block_range_max_parallel_queries():
+    parallel_queries = 0
+    max_parallel_queries = 0
+    lock = threading.Lock()
+
+    def query_blocks(from_block_number, to_block_number):
+        nonlocal parallel_queries, max_parallel_queries
+        with lock:
+            parallel_queries += 1
+            max_parallel_queries = max(parallel_queries, max_parallel_queries)
+        time.sleep(0.01)
+        with lock:
+            parallel_queries -= 1
+        return None
+
+    scan_block_range(0, 199, 10, 4, query_blocks)
+
+    assert 1 < max_parallel_queries <= 4
+
+
+def test_scan_block_range_found_stops_scan():
+    queried_chunks = []
+    lock = threading.Lock()
+
+    def query_blocks(from_block_number, to_block_number):
+        with lock:
+            queried_chunks.append((from_block_number, to_block_number))
+        if from_block_number <= 950 <= to_block_number:
+            return to_block_number
+        time.sleep(0.01)
+        return None
+
+    result = scan_block_range(0, 999, 10, 2, query_blocks)
+
+    assert result == 959
+    # Only the chunks in progress when the result was found can have
+    # been queried in addition to the chunks preceding it
+    assert len(queried_chunks) <= 7
+    assert (950, 959) in queried_chunks
+
+
+def test_scan_block_range_error():
+    def query_blocks(from_block_number, to_block_number):
+        raise ConnectionError
+
+    with pytest.raises(ConnectionError):
+        scan_block_range(0, 99, 10, 2, query_blocks)
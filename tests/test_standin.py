@@ -0,0 +1,184 @@
+import importlib.resources
+import json
+import unittest.mock
+import uuid
+
+import pytest
+import semantic_version  # type: ignore
+import web3
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.blockchains.enums import ContractAbi
+from pantos.common.entities import ServiceNodeBid
+from pantos.common.entities import ServiceNodeTransferStatus
+from pantos.common.servicenodes import ServiceNodeClient
+from pantos.common.types import BlockchainAddress
+
+from pantos.cli.standin import StandInServer
+from pantos.cli.standin import _load_contract_functions
+
+_HUB_ADDRESS = BlockchainAddress('0x5e447968d4a177fE7bFB8877cA12aE20Bd60dD85')
+
+_TOKEN_ADDRESS = BlockchainAddress(
+    '0x7EFfCc0a130E452c2FB78bFEDBd02a33E03FD50d')
+
+_ACCOUNT_ADDRESS = BlockchainAddress(
+    '0x5B1059888f0D2693459de34b4B2061A0DEff9d2F')
+
+
+def _load_contract_abi(versioned_contract_abi):
+    version = versioned_contract_abi.version
+    contract_file = importlib.resources.files(
+        'pantos.common.blockchains.contracts.'
+        f'v{version.major}_{version.minor}_{version.patch}'
+    ) / versioned_contract_abi.contract_abi.get_file_name(Blockchain.ETHEREUM)
+    with contract_file.open('r') as contract_abi_file:
+        return json.load(contract_abi_file)
+
+
+@pytest.fixture
+def library_blockchain_configs():
+    library_blockchain_configs = {
+        blockchain: {
+            'active': False,
+            'provider': 'https://node',
+            'fallback_providers': ['https://fallback-node'],
+            'average_block_time': 10,
+            'chain_id': 17000,
+            'hub': _HUB_ADDRESS,
+            'forwarder': '',
+            'tokens': {
+                'pan': _TOKEN_ADDRESS
+            }
+        }
+        for blockchain in (Blockchain.ETHEREUM, Blockchain.POLYGON)
+    }
+    with unittest.mock.patch(
+            'pantos.cli.standin.get_library_blockchain_config',
+            side_effect=library_blockchain_configs.__getitem__):
+        yield library_blockchain_configs
+
+
+@pytest.fixture
+def contract_abis():
+    _load_contract_functions.cache_clear()
+    with unittest.mock.patch('pantos.cli.standin.get_blockchain_client'
+                             ) as mock_get_blockchain_client, \
+            unittest.mock.patch('pantos.cli.standin.get_blockchain_utilities'
+                                ) as mock_get_blockchain_utilities:
+        mock_get_blockchain_client().protocol_version = \
+            semantic_version.Version('0.3.0')
+        mock_get_blockchain_utilities().load_contract_abi.side_effect = \
+            _load_contract_abi
+        yield
+    _load_contract_functions.cache_clear()
+
+
+@pytest.fixture
+def stand_in_server(library_blockchain_configs, contract_abis):
+    with StandInServer([Blockchain.ETHEREUM,
+                        Blockchain.POLYGON]) as stand_in_server:
+        yield stand_in_server
+
+
+def test_stand_in_server_library_configuration(library_blockchain_configs,
+                                               contract_abis):
+    stand_in_server = StandInServer([Blockchain.ETHEREUM])
+
+    with stand_in_server:
+        ethereum_config = library_blockchain_configs[Blockchain.ETHEREUM]
+        assert ethereum_config['active']
+        assert ethereum_config['provider'] == stand_in_server.get_rpc_url(
+            Blockchain.ETHEREUM)
+        assert ethereum_config['fallback_providers'] == []
+        assert ethereum_config['hub'] == _HUB_ADDRESS
+        assert web3.Web3.is_checksum_address(ethereum_config['forwarder'])
+        assert library_blockchain_configs[
+            Blockchain.POLYGON]['provider'] == 'https://node'
+
+    assert library_blockchain_configs[Blockchain.ETHEREUM] == {
+        'active': False,
+        'provider': 'https://node',
+        'fallback_providers': ['https://fallback-node'],
+        'average_block_time': 10,
+        'chain_id': 17000,
+        'hub': _HUB_ADDRESS,
+        'forwarder': '',
+        'tokens': {
+            'pan': _TOKEN_ADDRESS
+        }
+    }
+
+
+def test_stand_in_server_service_node(stand_in_server):
+    service_node_client = ServiceNodeClient()
+    bids = service_node_client.bids(stand_in_server.url, Blockchain.ETHEREUM,
+                                    Blockchain.POLYGON, 10)
+    submit_transfer_request = ServiceNodeClient.SubmitTransferRequest(
+        stand_in_server.url, Blockchain.ETHEREUM, Blockchain.POLYGON,
+        _ACCOUNT_ADDRESS, _ACCOUNT_ADDRESS, _TOKEN_ADDRESS, _TOKEN_ADDRESS, 5,
+        bids[0], 1, 2, '0xsignature')
+
+    task_id = service_node_client.submit_transfer(submit_transfer_request, 10)
+    transfer_status = service_node_client.status(stand_in_server.url, task_id,
+                                                 10)
+
+    assert len(bids) == 1 and isinstance(bids[0], ServiceNodeBid)
+    assert transfer_status.task_id == task_id
+    assert transfer_status.source_blockchain is Blockchain.ETHEREUM
+    assert transfer_status.destination_blockchain is Blockchain.POLYGON
+    assert transfer_status.token_amount == 5
+    assert transfer_status.status is ServiceNodeTransferStatus.CONFIRMED
+
+
+def test_stand_in_server_unknown_task(stand_in_server):
+    with pytest.raises(Exception, match='status of the transfer'):
+        ServiceNodeClient().status(stand_in_server.url, uuid.uuid4(), 10)
+
+
+def test_stand_in_server_json_rpc(stand_in_server):
+    w3 = web3.Web3(
+        web3.Web3.HTTPProvider(stand_in_server.get_rpc_url(
+            Blockchain.POLYGON)))
+    hub_contract = w3.eth.contract(
+        address=_HUB_ADDRESS, abi=_load_contract_abi(
+            unittest.mock.Mock(contract_abi=ContractAbi.PANTOS_HUB,
+                               version=semantic_version.Version('0.3.0'))))
+    token_contract = w3.eth.contract(
+        address=_TOKEN_ADDRESS, abi=_load_contract_abi(
+            unittest.mock.Mock(contract_abi=ContractAbi.PANTOS_TOKEN,
+                               version=semantic_version.Version('0.3.0'))))
+
+    assert w3.is_connected()
+    assert w3.eth.chain_id == 17000
+    assert w3.eth.get_block('latest')['number'] == w3.eth.block_number
+    assert hub_contract.functions.getServiceNodes().call() == [
+        stand_in_server.service_node_address
+    ]
+    assert hub_contract.functions.getServiceNodeRecord(
+        stand_in_server.service_node_address).call()[:2] == (
+            True, stand_in_server.url)
+    assert hub_contract.functions.isValidSenderNonce(_ACCOUNT_ADDRESS,
+                                                     12345).call()
+    assert hub_contract.functions.getExternalTokenRecord(
+        _TOKEN_ADDRESS,
+        Blockchain.ETHEREUM.value).call() == (True, _TOKEN_ADDRESS)
+    assert token_contract.functions.decimals().call() == 8
+    assert w3.eth.get_logs({'fromBlock': 0, 'toBlock': 10}) == []
+
+
+@pytest.mark.parametrize(
+    'method, params',
+    [('eth_sendRawTransaction', ['0x00']),
+     ('eth_call', [{
+         'to': _TOKEN_ADDRESS,
+         'data': '0x' + web3.Web3.keccak(text='totalSupply()')[:4].hex()
+     }])])
+def test_stand_in_server_json_rpc_unsupported(method, params, stand_in_server):
+    w3 = web3.Web3(
+        web3.Web3.HTTPProvider(stand_in_server.get_rpc_url(
+            Blockchain.ETHEREUM)))
+
+    response = w3.provider.make_request(method, params)
+
+    assert response['error']['code'] == -32600
+    assert response['error']['message'].startswith('unsupported')
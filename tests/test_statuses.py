@@ -0,0 +1,258 @@
+import threading
+import unittest.mock
+
+import pytest
+from pantos.client.library.api import DestinationTransferStatus
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.servicenodes import ServiceNodeClient
+from pantos.common.servicenodes import ServiceNodeTransferStatus
+
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.statuses import find_destination_transfer
+from pantos.cli.statuses import get_token_transfer_status
+
+_LATEST_BLOCK_NUMBER = 1000
+
+_BLOCKS_PER_QUERY = 100
+
+pytestmark = pytest.mark.usefixtures('cache_config', 'background_threads')
+
+
+@pytest.fixture(autouse=True)
+def blockchain_configs():
+    library_blockchain_config = {
+        'hub': '0x5e447968d4a177fE7bFB8877cA12aE20Bd60dD85',
+        'blocks_per_query': _BLOCKS_PER_QUERY,
+        'confirmations': 20
+    }
+    with unittest.mock.patch(
+            'pantos.cli.statuses.get_library_blockchain_config',
+            return_value=library_blockchain_config), \
+            unittest.mock.patch(
+                'pantos.cli.responses.get_library_blockchain_config',
+                return_value=library_blockchain_config), \
+            unittest.mock.patch('pantos.cli.statuses.get_blockchain_config',
+                                return_value={'max_parallel_queries': 3}):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def blockchain_client():
+    with unittest.mock.patch('pantos.cli.statuses.get_blockchain_client'
+                             ) as mock_get_blockchain_client:
+        yield mock_get_blockchain_client()
+
+
+@pytest.fixture
+def queried_chunks():
+    return []
+
+
+@pytest.fixture
+def transfer_event_logs(queried_chunks):
+    transfer_event_logs = {}
+    lock = threading.Lock()
+
+    def get_logs(fromBlock, toBlock):
+        with lock:
+            queried_chunks.append((fromBlock, toBlock))
+        return unittest.mock.Mock(get=unittest.mock.Mock(
+            return_value=transfer_event_logs.get(fromBlock, [])))
+
+    with unittest.mock.patch('pantos.cli.statuses.get_blockchain_utilities'
+                             ) as mock_get_blockchain_utilities:
+        node_connections = \
+            mock_get_blockchain_utilities().create_node_connections()
+        node_connections.eth.get_block_number().get_minimum_result.\
+            return_value = _LATEST_BLOCK_NUMBER
+        hub_contract = mock_get_blockchain_utilities().create_contract()
+        hub_contract.events.TransferToSucceeded().get_logs.side_effect = \
+            get_logs
+        yield transfer_event_logs
+
+
+@pytest.fixture
+def transfer_event_log(transaction_hash, source_transfer_id,
+                       destination_transfer_id, sender, recipient,
+                       source_token, destination_token, amount, nonce,
+                       signer_addresses, signatures):
+    return {
+        'blockNumber': 990,
+        'transactionHash': transaction_hash,
+        'args': {
+            'destinationTransferId': destination_transfer_id,
+            'request': {
+                'sourceBlockchainId': Blockchain.ETHEREUM.value,
+                'sourceTransactionId': transaction_hash.to_0x_hex(),
+                'sourceTransferId': source_transfer_id,
+                'sender': sender,
+                'recipient': recipient,
+                'sourceToken': source_token,
+                'destinationToken': destination_token,
+                'amount': amount,
+                'nonce': nonce
+            },
+            'signerAddresses': signer_addresses,
+            'signatures': signatures
+        }
+    }
+
+
+@pytest.fixture
+def service_node_client(transaction_hash, source_transfer_id, task_uuid,
+                        sender, recipient, source_token, destination_token,
+                        amount):
+    with unittest.mock.patch('pantos.cli.statuses.ServiceNodeClient'
+                             ) as mock_service_node_client, \
+            unittest.mock.patch(
+                'pantos.cli.statuses.get_service_node_timeout',
+                return_value=10), \
+            unittest.mock.patch(
+                'pantos.cli.statuses.is_service_node_available',
+                return_value=True), \
+            unittest.mock.patch(
+                'pantos.cli.statuses.record_service_node_success'), \
+            unittest.mock.patch(
+                'pantos.cli.statuses.record_service_node_failure'):
+        mock_service_node_client().status.return_value = \
+            ServiceNodeClient.TransferStatusResponse(
+                task_uuid, Blockchain.ETHEREUM, Blockchain.POLYGON, sender,
+                recipient, source_token, destination_token, amount, 5,
+                ServiceNodeTransferStatus.CONFIRMED, source_transfer_id,
+                transaction_hash.to_0x_hex())
+        yield mock_service_node_client()
+
+
+@pytest.mark.parametrize('block_number', [300, 990])
+def test_find_destination_transfer_found(block_number, transfer_event_logs,
+                                         transfer_event_log, transaction_hash,
+                                         destination_transfer_id, nonce,
+                                         signatures):
+    transfer_event_log['blockNumber'] = block_number
+    transfer_event_logs[block_number // _BLOCKS_PER_QUERY *
+                        _BLOCKS_PER_QUERY] = [transfer_event_log]
+
+    destination_transfer = find_destination_transfer(
+        Blockchain.POLYGON, Blockchain.ETHEREUM, transaction_hash.to_0x_hex())
+
+    assert destination_transfer.latest_block_number == _LATEST_BLOCK_NUMBER
+    assert destination_transfer.transaction_block_number == block_number
+    assert destination_transfer.destination_transaction_id == \
+        transaction_hash.to_0x_hex()
+    assert destination_transfer.destination_transfer_id == \
+        destination_transfer_id
+    assert destination_transfer.validator_nonce == nonce
+    assert destination_transfer.signatures == [
+        f'0x{signature.hex()}' for signature in signatures
+    ]
+
+
+def test_find_destination_transfer_not_found(transfer_event_logs,
+                                             transfer_event_log,
+                                             queried_chunks, transaction_hash):
+    # Transfer from another source blockchain
+    transfer_event_log['args']['request']['sourceBlockchainId'] = \
+        Blockchain.BNB_CHAIN.value
+    transfer_event_logs[900] = [transfer_event_log]
+
+    destination_transfer = find_destination_transfer(
+        Blockchain.POLYGON, Blockchain.ETHEREUM, transaction_hash.to_0x_hex(),
+        250)
+
+    assert destination_transfer is None
+    assert sorted(queried_chunks) == [(751, 799), (800, 899), (900, 999),
+                                      (1000, 1000)]
+
+
+def test_find_destination_transfer_cached(transfer_event_logs,
+                                          transfer_event_log, queried_chunks,
+                                          transaction_hash):
+    transfer_event_log['blockNumber'] = 850
+    transfer_event_logs[801] = [transfer_event_log]
+    find_destination_transfer(Blockchain.POLYGON, Blockchain.ETHEREUM,
+                              transaction_hash.to_0x_hex(), 200)
+    queried_chunks.clear()
+
+    destination_transfer = find_destination_transfer(
+        Blockchain.POLYGON, Blockchain.ETHEREUM, transaction_hash.to_0x_hex(),
+        200)
+
+    # Only the chunks without enough confirmations are queried again
+    assert sorted(queried_chunks) == [(900, 999), (1000, 1000)]
+    assert destination_transfer.transaction_block_number == 850
+    assert destination_transfer.destination_transaction_id == \
+        transaction_hash.to_0x_hex()
+
+
+@pytest.mark.parametrize('block_number, destination_transfer_status',
+                         [(990, DestinationTransferStatus.SUBMITTED),
+                          (950, DestinationTransferStatus.CONFIRMED)])
+def test_get_token_transfer_status_destination_found(
+        block_number, destination_transfer_status, service_node_client,
+        transfer_event_logs, transfer_event_log, service_node, task_uuid,
+        transaction_hash, source_transfer_id, destination_transfer_id, amount):
+    transfer_event_log['blockNumber'] = block_number
+    transfer_event_logs[900] = [transfer_event_log]
+
+    transfer_status = get_token_transfer_status(Blockchain.ETHEREUM,
+                                                service_node, task_uuid)
+
+    service_node_client.status.assert_called_once_with(unittest.mock.ANY,
+                                                       task_uuid, 10)
+    assert transfer_status.destination_blockchain is Blockchain.POLYGON
+    assert transfer_status.source_transfer_status is \
+        ServiceNodeTransferStatus.CONFIRMED
+    assert transfer_status.destination_transfer_status is \
+        destination_transfer_status
+    assert transfer_status.source_transaction_id == \
+        transaction_hash.to_0x_hex()
+    assert transfer_status.source_transfer_id == source_transfer_id
+    assert transfer_status.destination_transfer_id == destination_transfer_id
+    assert transfer_status.amount == amount
+
+
+def test_get_token_transfer_status_destination_not_found(
+        service_node_client, transfer_event_logs, service_node, task_uuid):
+    transfer_status = get_token_transfer_status(Blockchain.ETHEREUM,
+                                                service_node, task_uuid, 10)
+
+    assert transfer_status.source_transfer_status is \
+        ServiceNodeTransferStatus.CONFIRMED
+    assert transfer_status.destination_transfer_status is \
+        DestinationTransferStatus.UNKNOWN
+    assert transfer_status.destination_transaction_id is None
+
+
+def test_get_token_transfer_status_source_not_confirmed(
+        service_node_client, transfer_event_logs, queried_chunks, service_node,
+        task_uuid):
+    service_node_client.status.return_value.status = \
+        ServiceNodeTransferStatus.ACCEPTED
+
+    transfer_status = get_token_transfer_status(Blockchain.ETHEREUM,
+                                                service_node, task_uuid)
+
+    assert transfer_status.source_transfer_status is \
+        ServiceNodeTransferStatus.ACCEPTED
+    assert transfer_status.source_transaction_id is None
+    assert queried_chunks == []
+
+
+def test_get_token_transfer_status_error(service_node_client,
+                                         transfer_event_logs, service_node,
+                                         task_uuid):
+    service_node_client.status.side_effect = Exception
+
+    with pytest.raises(ClientCliError, match='service node'):
+        get_token_transfer_status(Blockchain.ETHEREUM, service_node, task_uuid)
+
+
+def test_get_token_transfer_status_service_node_unavailable(
+        service_node_client, service_node, task_uuid):
+    with unittest.mock.patch('pantos.cli.statuses.is_service_node_available',
+                             return_value=False):
+        with pytest.raises(ClientCliError, match='currently unavailable'):
+            get_token_transfer_status(Blockchain.ETHEREUM, service_node,
+                                      task_uuid)
+
+    service_node_client.status.assert_not_called()
@@ -0,0 +1,188 @@
+import pathlib
+import unittest.mock
+
+import pytest
+from pantos.client.library.api import ServiceNodeTaskInfo
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.types import BlockchainAddress
+
+from pantos.cli.balances import TokenBalances
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.sweeps import SweepAccount
+from pantos.cli.sweeps import get_sweep_amount
+from pantos.cli.sweeps import read_sweep_accounts
+from pantos.cli.sweeps import sweep_tokens
+from pantos.cli.transfers import TransferInput
+
+_TOKEN_SYMBOL = 'usdc'
+
+_TOKEN_ADDRESSES = {
+    TOKEN_SYMBOL_PAN: BlockchainAddress(
+        '0x7EFfCc0a130E452c2FB78bFEDBd02a33E03FD50d'),
+    _TOKEN_SYMBOL: BlockchainAddress(
+        '0x57FeAEC5F8f3A19264d8DfF24a88dA9F774e30a2')
+}
+
+_RECIPIENT_ADDRESS = BlockchainAddress(
+    '0x5B1059888f0D2693459de34b4B2061A0DEff9d2F')
+
+
+def _create_sweep_account(index, balance, fee_balance):
+    return SweepAccount(pathlib.Path(f'{index}.keystore'), f'key{index}',
+                        BlockchainAddress(f'0x{index:040x}'), balance,
+                        fee_balance)
+
+
+@pytest.fixture
+def library_api():
+    with unittest.mock.patch(
+            'pantos.cli.sweeps.get_token_address',
+            side_effect=lambda _, token_symbol: _TOKEN_ADDRESSES[token_symbol]
+    ), unittest.mock.patch(
+            'pantos.cli.sweeps.get_account_address',
+            side_effect=lambda _, private_key: f'address-{private_key}'), \
+            unittest.mock.patch('pantos.cli.sweeps.api') as mock_api:
+        mock_api.decrypt_private_key.side_effect = \
+            lambda _, keystore, password: f'{keystore}-{password}'
+        yield mock_api
+
+
+@pytest.fixture
+def read_token_balances():
+    with unittest.mock.patch('pantos.cli.sweeps.read_token_balances'
+                             ) as mock_read_token_balances:
+        yield mock_read_token_balances
+
+
+def test_read_sweep_accounts_correct(library_api, read_token_balances,
+                                     tmp_path):
+    keystore_paths = [tmp_path / f'{index}.keystore' for index in range(3)]
+    for index, keystore_path in enumerate(keystore_paths):
+        keystore_path.write_text(f'keystore{index}')
+    account_addresses = [
+        f'address-keystore{index}-password' for index in range(3)
+    ]
+    read_token_balances.return_value = TokenBalances(
+        100, {
+            (token_address, account_address): index * 100 +
+            (10 if token_address == _TOKEN_ADDRESSES[TOKEN_SYMBOL_PAN] else 0)
+            for index, account_address in enumerate(account_addresses)
+            for token_address in _TOKEN_ADDRESSES.values()
+        })
+
+    sweep_accounts = read_sweep_accounts(Blockchain.ETHEREUM, _TOKEN_SYMBOL,
+                                         keystore_paths, 'password', 2)
+
+    read_token_balances.assert_called_once_with(
+        Blockchain.ETHEREUM,
+        [_TOKEN_ADDRESSES[_TOKEN_SYMBOL], _TOKEN_ADDRESSES[TOKEN_SYMBOL_PAN]],
+        account_addresses, max_workers=2)
+
+    assert sweep_accounts == [
+        SweepAccount(keystore_path, f'keystore{index}-password',
+                     f'address-keystore{index}-password', index * 100,
+                     index * 100 + 10)
+        for index, keystore_path in enumerate(keystore_paths)
+    ]
+
+
+def test_read_sweep_accounts_failures(library_api, read_token_balances,
+                                      tmp_path):
+    keystore_paths = [
+        tmp_path / 'valid.keystore', tmp_path / 'invalid.keystore',
+        tmp_path / 'missing.keystore'
+    ]
+    keystore_paths[0].write_text('valid')
+    keystore_paths[1].write_text('secret')
+
+    def decrypt_private_key(blockchain, keystore, password):
+        if keystore != 'valid':
+            raise Exception(f'invalid keystore: {keystore}')
+        return keystore
+
+    library_api.decrypt_private_key.side_effect = decrypt_private_key
+    pan_address = _TOKEN_ADDRESSES[TOKEN_SYMBOL_PAN]
+    read_token_balances.return_value = TokenBalances(
+        100, {(pan_address, 'address-valid'): 100})
+
+    sweep_accounts = read_sweep_accounts(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN,
+                                         keystore_paths, 'password')
+
+    assert sweep_accounts[0] == SweepAccount(keystore_paths[0], 'valid',
+                                             'address-valid', 100, 100)
+    # Only the balances of the decrypted accounts are read
+    read_token_balances.assert_called_once_with(Blockchain.ETHEREUM,
+                                                [pan_address, pan_address],
+                                                ['address-valid'],
+                                                max_workers=16)
+    assert isinstance(sweep_accounts[1], ClientCliError)
+    assert 'unable to decrypt' in str(sweep_accounts[1])
+    assert 'secret' not in str(sweep_accounts[1])
+    assert isinstance(sweep_accounts[2], ClientCliError)
+    assert 'unable to read' in str(sweep_accounts[2])
+
+
+def test_read_sweep_accounts_balances_error(library_api, read_token_balances,
+                                            tmp_path):
+    keystore_path = tmp_path / 'valid.keystore'
+    keystore_path.write_text('valid')
+    read_token_balances.side_effect = Exception
+
+    with pytest.raises(ClientCliError, match='balances'):
+        read_sweep_accounts(Blockchain.ETHEREUM, _TOKEN_SYMBOL,
+                            [keystore_path], 'password')
+
+
+@pytest.mark.parametrize(
+    'token_symbol, balance, fee_balance, min_amount, sweep_amount',
+    [(TOKEN_SYMBOL_PAN, 1000, 1000, 0, 900),
+     (TOKEN_SYMBOL_PAN.upper(), 1000, 1000, 0, 900),
+     (TOKEN_SYMBOL_PAN, 100, 100, 0, 0), (TOKEN_SYMBOL_PAN, 50, 50, 0, 0),
+     (TOKEN_SYMBOL_PAN, 1000, 1000, 901, 0),
+     (TOKEN_SYMBOL_PAN, 1000, 1000, 900, 900),
+     (_TOKEN_SYMBOL, 1000, 100, 0, 1000), (_TOKEN_SYMBOL, 1000, 99, 0, 0),
+     (_TOKEN_SYMBOL, 0, 100, 0, 0), (_TOKEN_SYMBOL, 1000, 100, 1001, 0)])
+def test_get_sweep_amount_correct(token_symbol, balance, fee_balance,
+                                  min_amount, sweep_amount):
+    sweep_account = _create_sweep_account(1, balance, fee_balance)
+
+    assert get_sweep_amount(sweep_account, token_symbol, 100,
+                            min_amount) == sweep_amount
+
+
+@unittest.mock.patch('pantos.cli.sweeps.submit_signed_transfers')
+@unittest.mock.patch('pantos.cli.sweeps.sign_transfer')
+def test_sweep_tokens_correct(mock_sign_transfer, mock_submit_signed_transfers,
+                              service_node, task_uuid):
+    sweep_accounts = [
+        _create_sweep_account(index, 1000, 1000) for index in range(3)
+    ]
+    service_node_bid = (service_node, unittest.mock.Mock(fee=100))
+
+    def sign_transfer(source_blockchain, private_key, transfer_input,
+                      service_node_bid):
+        if private_key == 'key1':
+            raise Exception('signing failed')
+        return private_key
+
+    mock_sign_transfer.side_effect = sign_transfer
+    mock_submit_signed_transfers.return_value = [
+        ServiceNodeTaskInfo(task_uuid, service_node),
+        ClientCliError('the signed transfer has expired')
+    ]
+
+    results = sweep_tokens(Blockchain.ETHEREUM, Blockchain.POLYGON,
+                           _RECIPIENT_ADDRESS, TOKEN_SYMBOL_PAN,
+                           [(sweep_account, 900)
+                            for sweep_account in sweep_accounts],
+                           service_node_bid, 4)
+
+    mock_sign_transfer.assert_any_call(
+        Blockchain.ETHEREUM, 'key0',
+        TransferInput(Blockchain.POLYGON, _RECIPIENT_ADDRESS, TOKEN_SYMBOL_PAN,
+                      900), service_node_bid)
+    mock_submit_signed_transfers.assert_called_once_with(['key0', 'key2'], 4)
+    assert results[0] == ServiceNodeTaskInfo(task_uuid, service_node)
+    assert str(results[1]) == 'signing failed'
+    assert isinstance(results[2], ClientCliError)
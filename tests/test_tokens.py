@@ -0,0 +1,143 @@
+import decimal
+import unittest.mock
+
+import pytest
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.types import BlockchainAddress
+from pantos.common.types import TokenSymbol
+
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.tokens import TokenMetadata
+from pantos.cli.tokens import convert_amount_to_main_unit
+from pantos.cli.tokens import convert_amount_to_subunit
+from pantos.cli.tokens import get_token_metadata
+from pantos.cli.tokens import refresh_token_metadata
+
+_PAN_ADDRESS = BlockchainAddress('0xC892F1D09a7BEF98d65e7f9bD4642d36BC506441')
+
+_BEST_ADDRESS = BlockchainAddress('0x5B1059888f0D2693459de34b4B2061A0DEff9d2F')
+
+pytestmark = pytest.mark.usefixtures('cache_config')
+
+
+@pytest.fixture
+def library_blockchain_config():
+    library_blockchain_config = {
+        'hub': '0xbafFb84601BeC1FCb4B842f8917E3eA850781BE7',
+        'tokens': {
+            'best': _BEST_ADDRESS,
+            'pan': _PAN_ADDRESS,
+            'panpol': ''
+        }
+    }
+    with unittest.mock.patch('pantos.cli.tokens.get_library_blockchain_config',
+                             return_value=library_blockchain_config):
+        yield library_blockchain_config
+
+
+@pytest.fixture
+def protocol_version():
+    with unittest.mock.patch('pantos.cli.tokens.get_protocol_version',
+                             return_value='0.1.0') as mock_protocol_version:
+        yield mock_protocol_version
+
+
+@pytest.fixture
+def blockchain_client():
+    with unittest.mock.patch(
+            'pantos.cli.tokens.get_blockchain_client') as mock_get_client:
+        mock_get_client().read_token_decimals.side_effect = \
+            lambda token_address: 18 if token_address == _PAN_ADDRESS else 8
+        mock_get_client.reset_mock()
+        yield mock_get_client()
+
+
+def test_get_token_metadata_cached(library_blockchain_config, protocol_version,
+                                   blockchain_client):
+    for _ in range(3):
+        token_metadata = get_token_metadata(Blockchain.ETHEREUM,
+                                            TokenSymbol('PAN'))
+        assert token_metadata == TokenMetadata(TOKEN_SYMBOL_PAN, _PAN_ADDRESS,
+                                               18)
+
+    blockchain_client.read_token_decimals.assert_called_once_with(_PAN_ADDRESS)
+
+
+def test_get_token_metadata_per_blockchain(library_blockchain_config,
+                                           protocol_version,
+                                           blockchain_client):
+    get_token_metadata(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN)
+    get_token_metadata(Blockchain.POLYGON, TOKEN_SYMBOL_PAN)
+
+    assert blockchain_client.read_token_decimals.call_count == 2
+
+
+def test_get_token_metadata_hub_changed(library_blockchain_config,
+                                        protocol_version, blockchain_client):
+    get_token_metadata(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN)
+    library_blockchain_config['hub'] = \
+        '0xFB37499DC5401Dc39a0734df1fC7924d769721d5'
+    get_token_metadata(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN)
+
+    assert blockchain_client.read_token_decimals.call_count == 2
+
+
+def test_get_token_metadata_protocol_version_changed(library_blockchain_config,
+                                                     protocol_version,
+                                                     blockchain_client):
+    get_token_metadata(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN)
+    protocol_version.return_value = '0.2.0'
+    get_token_metadata(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN)
+
+    assert blockchain_client.read_token_decimals.call_count == 2
+
+
+def test_get_token_metadata_unknown_token(library_blockchain_config,
+                                          protocol_version, blockchain_client):
+    for token_symbol in ['panpol', 'unknown']:
+        with pytest.raises(ClientCliError):
+            get_token_metadata(Blockchain.ETHEREUM, TokenSymbol(token_symbol))
+
+    blockchain_client.read_token_decimals.assert_not_called()
+
+
+def test_refresh_token_metadata(library_blockchain_config, protocol_version,
+                                blockchain_client):
+    tokens_metadata = refresh_token_metadata(Blockchain.ETHEREUM)
+    get_token_metadata(Blockchain.ETHEREUM, TokenSymbol('best'))
+    get_token_metadata(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN)
+
+    assert tokens_metadata == [
+        TokenMetadata(TokenSymbol('best'), _BEST_ADDRESS, 8),
+        TokenMetadata(TOKEN_SYMBOL_PAN, _PAN_ADDRESS, 18)
+    ]
+    assert blockchain_client.read_token_decimals.call_count == 2
+
+
+@pytest.mark.parametrize('amount_subunit, amount_main_unit',
+                         [(0, decimal.Decimal(0)),
+                          (150000000000000000, decimal.Decimal('0.15')),
+                          (10**18, decimal.Decimal(1))])
+def test_convert_amount(amount_subunit, amount_main_unit,
+                        library_blockchain_config, protocol_version,
+                        blockchain_client):
+    assert convert_amount_to_main_unit(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN,
+                                       amount_subunit) == amount_main_unit
+    assert convert_amount_to_subunit(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN,
+                                     amount_main_unit) == amount_subunit
+
+
+def test_convert_amount_too_many_decimals(library_blockchain_config,
+                                          protocol_version, blockchain_client):
+    with pytest.raises(ClientCliError):
+        convert_amount_to_subunit(Blockchain.ETHEREUM, TokenSymbol('best'),
+                                  decimal.Decimal('0.000000001'))
+
+
+def test_convert_amount_negative():
+    with pytest.raises(ClientCliError):
+        convert_amount_to_subunit(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN,
+                                  decimal.Decimal(-1))
+    with pytest.raises(ClientCliError):
+        convert_amount_to_main_unit(Blockchain.ETHEREUM, TOKEN_SYMBOL_PAN, -1)
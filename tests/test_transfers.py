@@ -0,0 +1,270 @@
+import decimal
+import time
+import unittest.mock
+import uuid
+
+import pytest
+from pantos.client.library import api
+from pantos.client.library.blockchains import BlockchainClient
+from pantos.client.library.constants import TOKEN_SYMBOL_PAN
+from pantos.common.blockchains.enums import Blockchain
+from pantos.common.servicenodes import ServiceNodeClient
+from pantos.common.types import BlockchainAddress
+
+from pantos.cli.exceptions import ClientCliError
+from pantos.cli.transfers import SignedTransfer
+from pantos.cli.transfers import TransferInput
+from pantos.cli.transfers import read_signed_transfers
+from pantos.cli.transfers import read_transfer_inputs
+from pantos.cli.transfers import sign_transfer
+from pantos.cli.transfers import sign_transfers
+from pantos.cli.transfers import submit_signed_transfers
+from pantos.cli.transfers import write_signed_transfers
+
+_SENDER_ADDRESS = BlockchainAddress(
+    '0x8a8D3Bb6E4E6A6A4e3AaB5A5A7C3f2D1E0f9A8b7')
+
+_RECIPIENT_ADDRESS = BlockchainAddress(
+    '0x5B1059888f0D2693459de34b4B2061A0DEff9d2F')
+
+_SERVICE_NODE_ADDRESS_1 = BlockchainAddress(
+    '0x07bd2D7b9A0dE9C3A8d1b2C1d7d2f0b1E5cA6f90')
+
+_SERVICE_NODE_ADDRESS_2 = BlockchainAddress(
+    '0x1F2e3D4c5B6a7980A1b2C3d4E5f60718293a4B5c')
+
+_TOKEN_ADDRESSES = {
+    Blockchain.ETHEREUM: BlockchainAddress(
+        '0xC892F1D09a7BEF98d65e7f9bD4642d36BC506441'),
+    Blockchain.POLYGON: BlockchainAddress(
+        '0x5538e600dc919f72858dd4D4F5E4327ec6f2af60')
+}
+
+
+def _create_bid(fee, execution_time=600, valid_until=None):
+    return api.ServiceNodeBid(
+        Blockchain.ETHEREUM, Blockchain.POLYGON, fee, execution_time,
+        int(time.time()) + 3600 if valid_until is None else valid_until,
+        '0xbid')
+
+
+def _create_signed_transfer(service_node_address=_SERVICE_NODE_ADDRESS_1,
+                            bid_valid_until=None):
+    return SignedTransfer(Blockchain.ETHEREUM, Blockchain.POLYGON,
+                          service_node_address,
+                          _create_bid(10**17, valid_until=bid_valid_until),
+                          _SENDER_ADDRESS, _RECIPIENT_ADDRESS,
+                          _TOKEN_ADDRESSES[Blockchain.ETHEREUM],
+                          _TOKEN_ADDRESSES[Blockchain.POLYGON], 5 * 10**18,
+                          2**255 + 1,
+                          int(time.time()) + 3600, '0xsignature')
+
+
+@pytest.fixture
+def blockchain_client():
+    with unittest.mock.patch(
+            'pantos.cli.transfers.get_blockchain_client') as mock_get_client:
+        mock_client = mock_get_client()
+        mock_client.is_valid_recipient_address.return_value = True
+        mock_client.compute_transfer_signature.return_value = \
+            BlockchainClient.ComputeTransferSignatureResponse(
+                _SENDER_ADDRESS, 1, '0xsingle')
+        mock_client.compute_transfer_from_signature.return_value = \
+            BlockchainClient.ComputeTransferFromSignatureResponse(
+                _SENDER_ADDRESS, 2, '0xcross')
+        yield mock_client
+
+
+@pytest.fixture
+def tokens():
+    with unittest.mock.patch(
+            'pantos.cli.transfers.get_token_address',
+            side_effect=lambda blockchain, token_symbol: _TOKEN_ADDRESSES[
+                blockchain]), unittest.mock.patch(
+                    'pantos.cli.transfers.convert_amount_to_subunit',
+                    side_effect=lambda blockchain, token_symbol, amount: int(
+                        amount * 10**18)):
+        yield
+
+
+@pytest.fixture
+def service_node_bids():
+    service_node_bids = {
+        _SERVICE_NODE_ADDRESS_1: [
+            _create_bid(3 * 10**17),
+            _create_bid(10**17)
+        ],
+        _SERVICE_NODE_ADDRESS_2: [_create_bid(2 * 10**17)]
+    }
+    with unittest.mock.patch(
+            'pantos.cli.transfers.stream_service_node_bids', side_effect=lambda
+            *_: iter(service_node_bids.items())) as mock_stream_bids:
+        yield mock_stream_bids
+
+
+@pytest.fixture
+def submit_transfer():
+    with unittest.mock.patch('pantos.cli.transfers.get_service_node_timeout',
+                             return_value=10):
+        with unittest.mock.patch.object(
+                ServiceNodeClient, 'submit_transfer') as mock_submit_transfer:
+            yield mock_submit_transfer
+
+
+def test_read_transfer_inputs_correct(tmp_path):
+    path = tmp_path / 'transfers.csv'
+    path.write_text('destination,recipient,token,amount\n'
+                    f'polygon,{_RECIPIENT_ADDRESS},pan,1.5\n'
+                    f'ETHEREUM, {_SENDER_ADDRESS} ,PAN,2\n')
+
+    transfer_inputs = read_transfer_inputs(path)
+
+    assert transfer_inputs == [
+        TransferInput(Blockchain.POLYGON, _RECIPIENT_ADDRESS, TOKEN_SYMBOL_PAN,
+                      decimal.Decimal('1.5')),
+        TransferInput(Blockchain.ETHEREUM, _SENDER_ADDRESS,
+                      api.TokenSymbol('PAN'), decimal.Decimal(2))
+    ]
+
+
+@pytest.mark.parametrize('row', [
+    f'unknown,{_RECIPIENT_ADDRESS},pan,1', f'polygon,{_RECIPIENT_ADDRESS},pan',
+    f'polygon,{_RECIPIENT_ADDRESS},pan,abc'
+])
+def test_read_transfer_inputs_invalid_row(row, tmp_path):
+    path = tmp_path / 'transfers.csv'
+    path.write_text(f'destination,recipient,token,amount\n{row}\n')
+
+    with pytest.raises(ClientCliError, match='line 2'):
+        read_transfer_inputs(path)
+
+
+def test_signed_transfers_round_trip(tmp_path):
+    path = tmp_path / 'signed.jsonl'
+    signed_transfers = [
+        _create_signed_transfer(),
+        _create_signed_transfer(_SERVICE_NODE_ADDRESS_2)
+    ]
+
+    write_signed_transfers(path, signed_transfers[:1])
+    write_signed_transfers(path, signed_transfers[1:])
+
+    assert read_signed_transfers(path) == signed_transfers
+
+
+def test_read_signed_transfers_invalid_line(tmp_path):
+    path = tmp_path / 'signed.jsonl'
+    path.write_text('{"source_blockchain": "ETHEREUM"}\n')
+
+    with pytest.raises(ClientCliError, match='line 1'):
+        read_signed_transfers(path)
+
+
+def test_sign_transfers_cheapest_bid(blockchain_client, tokens,
+                                     service_node_bids):
+    transfer_inputs = [
+        TransferInput(Blockchain.POLYGON, _RECIPIENT_ADDRESS, TOKEN_SYMBOL_PAN,
+                      decimal.Decimal(1)),
+        TransferInput(Blockchain.ETHEREUM, _RECIPIENT_ADDRESS,
+                      TOKEN_SYMBOL_PAN, decimal.Decimal(2))
+    ]
+
+    signed_transfers = sign_transfers(Blockchain.ETHEREUM, 'key',
+                                      transfer_inputs)
+
+    assert service_node_bids.call_count == 2
+    assert [(signed_transfer.service_node_address,
+             signed_transfer.service_node_bid.fee, signed_transfer.signature,
+             signed_transfer.sender_nonce, signed_transfer.token_amount,
+             signed_transfer.destination_token_address)
+            for signed_transfer in signed_transfers
+            ] == [(_SERVICE_NODE_ADDRESS_1, 10**17, '0xcross', 2, 10**18,
+                   _TOKEN_ADDRESSES[Blockchain.POLYGON]),
+                  (_SERVICE_NODE_ADDRESS_1, 10**17, '0xsingle', 1, 2 * 10**18,
+                   _TOKEN_ADDRESSES[Blockchain.ETHEREUM])]
+    assert signed_transfers[0].valid_until > time.time() + 600
+
+
+def test_sign_transfer_amount_in_subunit(blockchain_client, tokens):
+    bid = _create_bid(10**17)
+
+    signed_transfer = sign_transfer(
+        Blockchain.ETHEREUM, 'key',
+        TransferInput(Blockchain.POLYGON, _RECIPIENT_ADDRESS, TOKEN_SYMBOL_PAN,
+                      123456789), (_SERVICE_NODE_ADDRESS_2, bid))
+
+    assert signed_transfer.token_amount == 123456789
+    assert signed_transfer.service_node_address == _SERVICE_NODE_ADDRESS_2
+    assert signed_transfer.service_node_bid is bid
+
+
+def test_sign_transfers_chosen_bid(blockchain_client, tokens,
+                                   service_node_bids):
+    transfer_inputs = [
+        TransferInput(Blockchain.POLYGON, _RECIPIENT_ADDRESS, TOKEN_SYMBOL_PAN,
+                      decimal.Decimal(1))
+    ]
+
+    signed_transfers = sign_transfers(
+        Blockchain.ETHEREUM, 'key', transfer_inputs,
+        (BlockchainAddress(_SERVICE_NODE_ADDRESS_1.lower()), 0))
+
+    assert signed_transfers[0].service_node_bid.fee == 3 * 10**17
+
+
+def test_sign_transfers_unknown_bid(blockchain_client, tokens,
+                                    service_node_bids):
+    transfer_inputs = [
+        TransferInput(Blockchain.POLYGON, _RECIPIENT_ADDRESS, TOKEN_SYMBOL_PAN,
+                      decimal.Decimal(1))
+    ]
+
+    with pytest.raises(ClientCliError, match='has no bid 1'):
+        sign_transfers(Blockchain.ETHEREUM, 'key', transfer_inputs,
+                       (_SERVICE_NODE_ADDRESS_2, 1))
+
+
+def test_sign_transfers_invalid_recipient(blockchain_client, tokens,
+                                          service_node_bids):
+    blockchain_client.is_valid_recipient_address.return_value = False
+    transfer_inputs = [
+        TransferInput(Blockchain.POLYGON, _RECIPIENT_ADDRESS, TOKEN_SYMBOL_PAN,
+                      decimal.Decimal(1))
+    ]
+
+    with pytest.raises(ClientCliError, match='invalid recipient address'):
+        sign_transfers(Blockchain.ETHEREUM, 'key', transfer_inputs)
+
+
+def test_submit_signed_transfers_correct(blockchain_client, submit_transfer):
+    task_ids = [uuid.uuid4(), uuid.uuid4()]
+    submit_transfer.side_effect = task_ids
+    blockchain_client.read_service_node_url.return_value = 'https://node'
+    signed_transfers = [_create_signed_transfer(), _create_signed_transfer()]
+
+    results = submit_signed_transfers(signed_transfers)
+
+    assert sorted(result.task_id for result in results) == sorted(task_ids)
+    blockchain_client.read_service_node_url.assert_called_once_with(
+        _SERVICE_NODE_ADDRESS_1)
+    submit_transfer_request, timeout = \
+        submit_transfer.call_args.args
+    assert submit_transfer_request.service_node_url == 'https://node'
+    assert submit_transfer_request.sender_nonce == 2**255 + 1
+    assert timeout == 10
+
+
+def test_submit_signed_transfers_partial_failure(blockchain_client,
+                                                 submit_transfer):
+    submit_transfer.side_effect = Exception('rejected')
+    signed_transfers = [
+        _create_signed_transfer(bid_valid_until=int(time.time()) - 1),
+        _create_signed_transfer()
+    ]
+
+    results = submit_signed_transfers(signed_transfers)
+
+    assert isinstance(results[0], ClientCliError)
+    assert str(results[0]).startswith('the signed transfer has expired')
+    assert str(results[1]) == 'rejected'
+    submit_transfer.assert_called_once()